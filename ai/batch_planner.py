@@ -0,0 +1,278 @@
+"""
+LLM批量请求规划器
+按token预算（而非固定条数）打包批次，失败批次二分重试，并按批次大小记录解析失败率用于自动调优
+
+- 估算每个条目的prompt/completion token数，贪心打包到预算上限
+- 批次解析失败（JSON截断/格式错误）时对半拆分重试，单条仍失败才走降级结果
+- 按批次大小区间（1, 2-3, 4-7, 8-15, ...）统计尝试次数和失败次数；
+  某个区间失败率超过阈值时自动收紧最大条数
+- 统计可持久化到JSON文件，下次运行继续使用
+"""
+import json
+import math
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import LLM_BATCH_CONFIG
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 解析失败类异常：触发二分重试（json.JSONDecodeError是ValueError的子类）
+PARSE_ERRORS = (ValueError, TypeError, KeyError)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的token数
+
+    英文约4个字符1个token，中日韩字符约1个字符1个token，至少为1
+    """
+    if not text:
+        return 1
+    cjk = sum(1 for ch in text if '⺀' <= ch <= '鿿' or '가' <= ch <= '힯')
+    return max(1, cjk + math.ceil((len(text) - cjk) / 4))
+
+
+def size_bucket(size: int) -> int:
+    """批次大小所在的统计区间下界（2的幂）"""
+    return 1 << (max(1, size).bit_length() - 1)
+
+
+class BatchStats:
+    """按批次大小区间统计的解析失败率（线程安全，可持久化）"""
+
+    def __init__(self, stats_file: Optional[Path] = None):
+        self.stats_file = Path(stats_file) if stats_file else None
+        self._lock = threading.Lock()
+        # {task: {bucket: {'attempts': n, 'failures': n}}}
+        self._data: Dict[str, Dict[int, Dict[str, int]]] = {}
+        self._load()
+
+    def _load(self):
+        if not self.stats_file or not self.stats_file.exists():
+            return
+        try:
+            raw = json.loads(self.stats_file.read_text(encoding='utf-8'))
+            self._data = {
+                task: {int(bucket): dict(counts) for bucket, counts in buckets.items()}
+                for task, buckets in raw.items()
+            }
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取批次统计失败，将重新统计: {str(e)}")
+            self._data = {}
+
+    def save(self):
+        """写入统计文件（未配置stats_file时不做任何事）"""
+        if not self.stats_file:
+            return
+        with self._lock:
+            payload = {
+                task: {str(bucket): counts for bucket, counts in sorted(buckets.items())}
+                for task, buckets in self._data.items()
+            }
+        try:
+            self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+            self.stats_file.write_text(json.dumps(payload, indent=2), encoding='utf-8')
+        except OSError as e:
+            logger.warning(f"保存批次统计失败: {str(e)}")
+
+    def record(self, task: str, size: int, failed: bool):
+        """记录一次批次请求结果"""
+        bucket = size_bucket(size)
+        with self._lock:
+            counts = self._data.setdefault(task, {}).setdefault(
+                bucket, {'attempts': 0, 'failures': 0}
+            )
+            counts['attempts'] += 1
+            counts['failures'] += int(failed)
+
+    def failure_rates(self, task: str) -> Dict[int, Tuple[int, float]]:
+        """
+        获取某任务各区间的失败率
+
+        Returns:
+            {bucket: (attempts, failure_rate)}
+        """
+        with self._lock:
+            buckets = dict(self._data.get(task, {}))
+        return {
+            bucket: (counts['attempts'], counts['failures'] / counts['attempts'])
+            for bucket, counts in sorted(buckets.items())
+            if counts['attempts']
+        }
+
+    def reset(self, task: str = None):
+        """清空统计（task为None时清空全部）"""
+        with self._lock:
+            if task is None:
+                self._data.clear()
+            else:
+                self._data.pop(task, None)
+
+
+_shared_stats: Optional[BatchStats] = None
+_shared_stats_lock = threading.Lock()
+
+
+def get_shared_stats() -> BatchStats:
+    """进程内共享的批次统计（所有LLMClient实例共用，便于跨调用自动调优）"""
+    global _shared_stats
+    with _shared_stats_lock:
+        if _shared_stats is None:
+            _shared_stats = BatchStats(LLM_BATCH_CONFIG.get("stats_file"))
+        return _shared_stats
+
+
+class BatchPlanner:
+    """
+    Token预算批次规划器
+
+    Example:
+        >>> planner = BatchPlanner('translation', max_completion_tokens=2000,
+        ...                        completion_tokens_fn=lambda w: estimate_tokens(w) + 8)
+        >>> results = planner.run(words, request_fn, fallback_fn)
+    """
+
+    def __init__(
+        self,
+        task: str,
+        max_completion_tokens: int,
+        prompt_overhead_tokens: int = 300,
+        prompt_tokens_fn: Callable[[Any], int] = None,
+        completion_tokens_fn: Callable[[Any], int] = None,
+        max_items: int = None,
+        prompt_token_budget: int = None,
+        stats: BatchStats = None,
+    ):
+        """
+        初始化规划器
+
+        Args:
+            task: 任务名（统计按任务区分，如 'token_classification'）
+            max_completion_tokens: 单次请求允许的最大输出token数（即max_tokens）
+            prompt_overhead_tokens: prompt固定部分（说明、示例）的token数
+            prompt_tokens_fn: 单个条目在prompt中占用的token数，默认按文本估算+4
+            completion_tokens_fn: 单个条目在输出中占用的token数，默认按文本估算+16
+            max_items: 单批最大条数（None表示使用配置值）
+            prompt_token_budget: 单批prompt token预算（None表示使用配置值）
+            stats: 统计对象（None表示使用进程内共享统计）
+        """
+        self.task = task
+        self.prompt_overhead_tokens = prompt_overhead_tokens
+        self.prompt_tokens_fn = prompt_tokens_fn or (lambda item: estimate_tokens(str(item)) + 4)
+        self.completion_tokens_fn = completion_tokens_fn or (lambda item: estimate_tokens(str(item)) + 16)
+        self.max_items = max_items or LLM_BATCH_CONFIG["max_items"].get(task, 50)
+        self.prompt_token_budget = prompt_token_budget or LLM_BATCH_CONFIG["prompt_token_budget"]
+        self.completion_token_budget = int(
+            max_completion_tokens * LLM_BATCH_CONFIG["completion_safety_ratio"]
+        )
+        self.stats = stats or get_shared_stats()
+
+    def effective_max_items(self) -> int:
+        """
+        结合历史失败率得到当前的最大条数
+
+        从小到大找到第一个样本足够且失败率超过阈值的区间，上限收紧到该区间下界以下
+        """
+        threshold = LLM_BATCH_CONFIG["failure_rate_threshold"]
+        min_samples = LLM_BATCH_CONFIG["min_samples"]
+
+        for bucket, (attempts, rate) in self.stats.failure_rates(self.task).items():
+            if attempts >= min_samples and rate > threshold:
+                return max(1, min(self.max_items, bucket - 1))
+        return self.max_items
+
+    def plan(self, items: Sequence[Any]) -> List[List[Any]]:
+        """
+        把条目贪心打包成批次（保持原顺序）
+
+        单批同时满足：prompt预算、completion预算、最大条数；
+        单个条目超预算时独占一批
+        """
+        max_items = self.effective_max_items()
+        batches = []
+        current = []
+        prompt_tokens = self.prompt_overhead_tokens
+        completion_tokens = 0
+
+        for item in items:
+            item_prompt = self.prompt_tokens_fn(item)
+            item_completion = self.completion_tokens_fn(item)
+
+            if current and (
+                len(current) >= max_items
+                or prompt_tokens + item_prompt > self.prompt_token_budget
+                or completion_tokens + item_completion > self.completion_token_budget
+            ):
+                batches.append(current)
+                current = []
+                prompt_tokens = self.prompt_overhead_tokens
+                completion_tokens = 0
+
+            current.append(item)
+            prompt_tokens += item_prompt
+            completion_tokens += item_completion
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    def run(
+        self,
+        items: Sequence[Any],
+        request_fn: Callable[[List[Any]], List[Any]],
+        fallback_fn: Callable[[List[Any]], List[Any]],
+    ) -> List[Any]:
+        """
+        按计划执行所有批次
+
+        Args:
+            items: 待处理条目
+            request_fn: 处理一个批次，返回结果列表；解析失败时抛出ValueError等PARSE_ERRORS
+            fallback_fn: 生成降级结果（单条解析仍失败，或API调用本身失败时使用）
+
+        Returns:
+            所有批次结果按顺序拼接的列表
+        """
+        batches = self.plan(items)
+        logger.info(
+            f"[{self.task}] {len(items)} 个条目规划为 {len(batches)} 个批次 "
+            f"(最大条数={self.effective_max_items()}, completion预算={self.completion_token_budget})"
+        )
+
+        results = []
+        for idx, batch in enumerate(batches, 1):
+            results.extend(self._run_batch(batch, request_fn, fallback_fn, label=str(idx)))
+
+        self.stats.save()
+        return results
+
+    def _run_batch(self, batch, request_fn, fallback_fn, label: str) -> List[Any]:
+        """执行单个批次，解析失败时二分重试"""
+        try:
+            batch_results = request_fn(batch)
+        except PARSE_ERRORS as e:
+            self.stats.record(self.task, len(batch), failed=True)
+            if len(batch) == 1:
+                logger.error(f"[{self.task}] 批次 {label} 单条解析失败，使用降级结果: {str(e)}")
+                return fallback_fn(batch)
+
+            mid = len(batch) // 2
+            logger.warning(
+                f"[{self.task}] 批次 {label} ({len(batch)}条) 解析失败，拆分为 "
+                f"{mid}+{len(batch) - mid} 重试: {str(e)}"
+            )
+            return (
+                self._run_batch(batch[:mid], request_fn, fallback_fn, f"{label}a")
+                + self._run_batch(batch[mid:], request_fn, fallback_fn, f"{label}b")
+            )
+        except Exception as e:
+            # API调用本身失败（已在_call_llm中重试过），拆分也无济于事
+            logger.error(f"[{self.task}] 批次 {label} 失败: {str(e)}")
+            return fallback_fn(batch)
+
+        self.stats.record(self.task, len(batch), failed=False)
+        return batch_results
@@ -1,6 +1,6 @@
 """
 LLM客户端模块
-支持OpenAI, Anthropic, Deepseek等多种LLM提供商
+支持OpenAI, Anthropic, Deepseek等多种LLM提供商（以及离线基准测试用的local_stub）
 用于生成聚类主题和需求卡片
 """
 import os
@@ -12,6 +12,8 @@ from config.settings import LLM_PROVIDER, LLM_CONFIG
 from utils.logger import get_logger
 from utils.retry import retry
 from utils.exceptions import LLMException
+from ai.batch_planner import BatchPlanner, estimate_tokens
+from ai.client_registry import get_provider_client
 
 logger = get_logger(__name__)
 
@@ -24,7 +26,7 @@ class LLMClient:
         初始化LLM客户端
 
         Args:
-            provider: LLM提供商 ('openai', 'anthropic', 'deepseek')
+            provider: LLM提供商 ('openai', 'anthropic', 'deepseek', 'local_stub')
                       默认使用config.settings中的配置
         """
         self.provider = provider or LLM_PROVIDER
@@ -42,24 +44,8 @@ class LLMClient:
         logger.info(f"LLM客户端初始化完成: {self.provider} / {self.config['model']}")
 
     def _init_client(self):
-        """初始化具体的LLM客户端"""
-        if self.provider == "openai":
-            from openai import OpenAI
-            return OpenAI(
-                api_key=self.config["api_key"],
-                base_url=self.config.get("base_url")
-            )
-        elif self.provider == "anthropic":
-            from anthropic import Anthropic
-            return Anthropic(api_key=self.config["api_key"])
-        elif self.provider == "deepseek":
-            from openai import OpenAI  # Deepseek使用OpenAI兼容接口
-            return OpenAI(
-                api_key=self.config["api_key"],
-                base_url=self.config.get("base_url")
-            )
-        else:
-            raise ValueError(f"不支持的提供商: {self.provider}")
+        """获取具体的LLM客户端（进程内共享，复用同一个HTTP连接池）"""
+        return get_provider_client(self.provider, self.config)
 
     @retry(max_attempts=3, delay=1, backoff=2, exceptions=(ConnectionError, TimeoutError, Exception))
     def _call_llm(self, messages: List[Dict[str, str]],
@@ -80,7 +66,7 @@ class LLMClient:
         max_tokens = max_tokens or self.config["max_tokens"]
 
         try:
-            if self.provider in ["openai", "deepseek"]:
+            if self.provider in ["openai", "deepseek", "local_stub"]:
                 response = self.client.chat.completions.create(
                     model=self.config["model"],
                     messages=messages,
@@ -277,29 +263,49 @@ class LLMClient:
 
     def batch_classify_tokens(self,
                              tokens: List[str],
-                             batch_size: int = 50) -> List[Dict]:
+                             batch_size: int = None) -> List[Dict]:
         """
         批量分类tokens的类型
 
+        批次按token预算打包（长n-gram少放、短token多放），解析失败的批次二分重试，
+        单个token仍失败时才降级为 other/low（带 'fallback': True 标记）
+
         Args:
             tokens: token文本列表
-            batch_size: 批次大小
+            batch_size: 单批最大条数（None表示使用LLM_BATCH_CONFIG中的配置）
 
         Returns:
-            分类结果列表，每个元素包含 {'token': ..., 'token_type': ..., 'confidence': ...}
+            分类结果列表，每个元素包含 {'token': ..., 'token_type': ..., 'confidence': ...}，
+            降级结果另含 'fallback': True
         """
-        logger.info(f"批量分类 {len(tokens)} 个tokens (batch_size={batch_size})...")
+        logger.info(f"批量分类 {len(tokens)} 个tokens...")
+
+        planner = BatchPlanner(
+            'token_classification',
+            max_completion_tokens=self.config["max_tokens"],
+            prompt_overhead_tokens=250,
+            # 输出格式: {"token": "...", "token_type": "...", "confidence": "..."}
+            completion_tokens_fn=lambda token: estimate_tokens(token) + 22,
+            max_items=batch_size,
+        )
 
-        all_results = []
+        def fallback(batch: List[str]) -> List[Dict]:
+            # 显式标记降级结果，与LLM真实给出的 other/low 区分
+            return [{'token': token, 'token_type': 'other', 'confidence': 'low', 'fallback': True}
+                    for token in batch]
 
-        # 分批处理
-        for i in range(0, len(tokens), batch_size):
-            batch = tokens[i:i + batch_size]
+        all_results = planner.run(tokens, self._classify_token_batch, fallback)
 
-            # 构建prompt
-            tokens_str = "\n".join([f"{idx+1}. {token}" for idx, token in enumerate(batch)])
+        logger.info(f"完成分类: {len(all_results)} 个tokens")
 
-            prompt = f"""你是一个NLP专家，负责将搜索关键词中的token分类。
+        return all_results
+
+    def _classify_token_batch(self, batch: List[str]) -> List[Dict]:
+        """分类单个批次的tokens（响应无法解析时抛出ValueError）"""
+        # 构建prompt
+        tokens_str = "\n".join([f"{idx+1}. {token}" for idx, token in enumerate(batch)])
+
+        prompt = f"""你是一个NLP专家，负责将搜索关键词中的token分类。
 
 【Token分类标准】
 - intent: 意图词（如 "best", "top", "how to", "cheap", "free"）
@@ -317,67 +323,78 @@ class LLMClient:
 
 请直接返回JSON数组，不要其他说明:"""
 
-            messages = [{"role": "user", "content": prompt}]
-
-            try:
-                # 调用LLM
-                response = self._call_llm(messages, temperature=0.3)
-
-                # 解析响应
-                # 尝试提取JSON数组
-                json_match = re.search(r'\[.*\]', response, re.DOTALL)
-                if json_match:
-                    results = json.loads(json_match.group())
-                else:
-                    results = json.loads(response.strip())
-
-                # 验证结果
-                for result in results:
-                    if 'token' in result and 'token_type' in result:
-                        all_results.append(result)
-
-                logger.info(f"批次 {i//batch_size + 1}: 分类了 {len(results)} 个tokens")
-
-            except Exception as e:
-                logger.error(f"批次 {i//batch_size + 1} 失败: {str(e)}")
-                # 对失败的token使用默认分类
-                for token in batch:
-                    all_results.append({
-                        'token': token,
-                        'token_type': 'other',
-                        'confidence': 'low'
-                    })
+        messages = [{"role": "user", "content": prompt}]
 
-        logger.info(f"完成分类: {len(all_results)} 个tokens")
+        # 调用LLM
+        response = self._call_llm(messages, temperature=0.3)
 
-        return all_results
+        # 解析响应
+        # 尝试提取JSON数组
+        json_match = re.search(r'\[.*\]', response, re.DOTALL)
+        if json_match:
+            results = json.loads(json_match.group())
+        else:
+            results = json.loads(response.strip())
+
+        if not isinstance(results, list):
+            raise ValueError("响应不是JSON数组")
+
+        # 验证结果
+        valid_results = [
+            result for result in results
+            if isinstance(result, dict) and 'token' in result and 'token_type' in result
+        ]
+
+        logger.info(f"批次({len(batch)}个): 分类了 {len(valid_results)} 个tokens")
+
+        return valid_results
 
     def batch_translate_seed_words(self,
                                    seed_words: List[str],
-                                   batch_size: int = 50) -> Dict[str, str]:
+                                   batch_size: int = None) -> Dict[str, str]:
         """
         批量翻译词根（seed_words）
         使用AI进行更准确、更符合SEO语境的翻译
 
+        批次按token预算打包，解析失败的批次二分重试，单个词仍失败时才标记为"[word]"
+
         Args:
             seed_words: 词根列表
-            batch_size: 批次大小
+            batch_size: 单批最大条数（None表示使用LLM_BATCH_CONFIG中的配置）
 
         Returns:
             翻译结果字典 {word: translation}
         """
-        logger.info(f"批量翻译 {len(seed_words)} 个词根 (batch_size={batch_size})...")
+        logger.info(f"批量翻译 {len(seed_words)} 个词根...")
+
+        planner = BatchPlanner(
+            'translation',
+            max_completion_tokens=self.config["max_tokens"],
+            prompt_overhead_tokens=350,
+            # 输出格式: "word": "翻译",
+            completion_tokens_fn=lambda word: estimate_tokens(word) + 10,
+            max_items=batch_size,
+        )
+
+        def fallback(batch: List[str]) -> List[tuple]:
+            return [(word, f"[{word}]") for word in batch]  # 标记为未翻译
 
         all_translations = {}
+        for word, trans in planner.run(seed_words, self._translate_seed_batch, fallback):
+            # 同一个词在多个批次出现时保留有效翻译
+            if word not in all_translations or all_translations[word] == f"[{word}]":
+                all_translations[word] = trans
+
+        logger.info(f"完成翻译: {len(all_translations)} 个词根")
 
-        # 分批处理
-        for i in range(0, len(seed_words), batch_size):
-            batch = seed_words[i:i + batch_size]
+        return all_translations
 
-            # 构建prompt
-            words_str = "\n".join([f"{idx+1}. {word}" for idx, word in enumerate(batch)])
+    def _translate_seed_batch(self, batch: List[str]) -> List[tuple]:
+        """翻译单个批次的词根，返回[(word, translation)]（响应无法解析时抛出ValueError）"""
+        # 构建prompt
+        words_str = "\n".join([f"{idx+1}. {word}" for idx, word in enumerate(batch)])
 
-            prompt = f"""你是一个专业的翻译专家，专门翻译英文SEO关键词和搜索词根。
+        prompt = f"""你是一个专业的翻译专家，专门翻译英文SEO关键词和搜索词根。
 
 【翻译原则】
 1. 提供精准、简洁的中文翻译（2-4个字为佳）
@@ -408,37 +425,29 @@ class LLMClient:
 
 请直接返回JSON对象，不要其他说明:"""
 
-            messages = [{"role": "user", "content": prompt}]
-
-            try:
-                # 调用LLM
-                response = self._call_llm(messages, temperature=0.3)
+        messages = [{"role": "user", "content": prompt}]
 
-                # 解析响应
-                # 尝试提取JSON对象
-                json_match = re.search(r'\{.*\}', response, re.DOTALL)
-                if json_match:
-                    translations = json.loads(json_match.group())
-                else:
-                    translations = json.loads(response.strip())
+        # 调用LLM
+        response = self._call_llm(messages, temperature=0.3)
 
-                # 验证并添加结果
-                for word, trans in translations.items():
-                    if word in batch:  # 确保是本批次的词
-                        all_translations[word] = trans
+        # 解析响应
+        # 尝试提取JSON对象
+        json_match = re.search(r'\{.*\}', response, re.DOTALL)
+        if json_match:
+            translations = json.loads(json_match.group())
+        else:
+            translations = json.loads(response.strip())
 
-                logger.info(f"批次 {i//batch_size + 1}: 翻译了 {len(translations)} 个词根")
+        if not isinstance(translations, dict):
+            raise ValueError("响应不是JSON对象")
 
-            except Exception as e:
-                logger.error(f"批次 {i//batch_size + 1} 翻译失败: {str(e)}")
-                # 对失败的词使用默认翻译
-                for word in batch:
-                    if word not in all_translations:
-                        all_translations[word] = f"[{word}]"  # 标记为未翻译
+        # 验证并添加结果（确保是本批次的词）
+        batch_words = set(batch)
+        results = [(word, trans) for word, trans in translations.items() if word in batch_words]
 
-        logger.info(f"完成翻译: {len(all_translations)} 个词根")
+        logger.info(f"批次({len(batch)}个): 翻译了 {len(results)} 个词根")
 
-        return all_translations
+        return results
 
 
 def test_llm_client():
@@ -0,0 +1,180 @@
+"""
+LLM提供商客户端注册表
+进程内共享的OpenAI/Anthropic客户端和httpx连接池
+
+LLMClient / ClusterLabeler等会被频繁创建（每个大组、每个服务实例一次），
+如果每次都新建SDK客户端，就会每次都重新建立TLS连接。这里按
+(provider, api_key, base_url) 缓存客户端，并让它们共用一个调优过的httpx连接池：
+- keep-alive复用连接
+- 安装了h2时启用HTTP/2
+- 连接数上限、超时可配置（LLM_HTTP_CONFIG）
+- 线程安全，可用于并发批处理
+- 提供连接池统计（请求数、平均延迟、活跃/空闲连接数）
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from config.settings import LLM_HTTP_CONFIG
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_provider_clients: Dict[tuple, object] = {}
+
+_stats_lock = threading.Lock()
+_stats = {
+    'clients_created': 0,
+    'client_cache_hits': 0,
+    'requests': 0,
+    'responses': 0,
+    'total_latency_ms': 0.0,
+}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _on_request(request: httpx.Request):
+    request.extensions['registry_start'] = time.perf_counter()
+    with _stats_lock:
+        _stats['requests'] += 1
+
+
+def _on_response(response: httpx.Response):
+    start = response.request.extensions.get('registry_start')
+    with _stats_lock:
+        _stats['responses'] += 1
+        if start is not None:
+            _stats['total_latency_ms'] += (time.perf_counter() - start) * 1000
+
+
+def get_http_client() -> httpx.Client:
+    """获取进程内共享的httpx客户端（首次调用时创建）"""
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            http2 = LLM_HTTP_CONFIG["http2"] and _http2_available()
+            _http_client = httpx.Client(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=LLM_HTTP_CONFIG["max_connections"],
+                    max_keepalive_connections=LLM_HTTP_CONFIG["max_keepalive_connections"],
+                    keepalive_expiry=LLM_HTTP_CONFIG["keepalive_expiry"],
+                ),
+                timeout=httpx.Timeout(
+                    LLM_HTTP_CONFIG["timeout"],
+                    connect=LLM_HTTP_CONFIG["connect_timeout"],
+                ),
+                event_hooks={'request': [_on_request], 'response': [_on_response]},
+            )
+            logger.info(
+                f"创建共享HTTP连接池: max_connections={LLM_HTTP_CONFIG['max_connections']}, "
+                f"keepalive={LLM_HTTP_CONFIG['max_keepalive_connections']}, http2={http2}"
+            )
+        return _http_client
+
+
+def _client_key(provider: str, config: Dict) -> tuple:
+    if provider == "local_stub" and not config.get("base_url"):
+        # 进程内模拟：不同的延迟/错误注入配置对应不同实例
+        return (provider, tuple(sorted((k, str(v)) for k, v in config.items())))
+    return (provider, config.get("api_key"), config.get("base_url"))
+
+
+def _create_client(provider: str, config: Dict):
+    if provider in ("openai", "deepseek") or (provider == "local_stub" and config.get("base_url")):
+        # Deepseek和localhost模拟服务都使用OpenAI兼容接口
+        from openai import OpenAI
+        return OpenAI(
+            api_key=config["api_key"],
+            base_url=config.get("base_url"),
+            http_client=get_http_client(),
+        )
+    elif provider == "anthropic":
+        from anthropic import Anthropic
+        return Anthropic(api_key=config["api_key"], http_client=get_http_client())
+    elif provider == "local_stub":
+        from ai.local_stub import LocalStubClient
+        return LocalStubClient(config)
+    else:
+        raise ValueError(f"不支持的提供商: {provider}")
+
+
+def get_provider_client(provider: str, config: Dict):
+    """
+    获取（或创建）提供商SDK客户端
+
+    Args:
+        provider: 'openai', 'anthropic', 'deepseek', 'local_stub'
+        config: LLM_CONFIG中对应的配置
+
+    Returns:
+        进程内共享的客户端实例
+    """
+    key = _client_key(provider, config)
+    with _lock:
+        client = _provider_clients.get(key)
+    if client is not None:
+        with _stats_lock:
+            _stats['client_cache_hits'] += 1
+        return client
+
+    # 在锁外创建（get_http_client内部会加锁），再用setdefault保证只保留一个实例
+    client = _create_client(provider, config)
+    with _lock:
+        existing = _provider_clients.setdefault(key, client)
+    if existing is client:
+        with _stats_lock:
+            _stats['clients_created'] += 1
+        logger.info(f"创建{provider}客户端（进程内共享）")
+    return existing
+
+
+def get_pool_stats() -> Dict:
+    """
+    获取连接池统计
+
+    Returns:
+        {'clients_created', 'client_cache_hits', 'requests', 'responses',
+         'avg_latency_ms', 'connections', 'idle_connections', 'http2'}
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+
+    total_latency = stats.pop('total_latency_ms')
+    stats['avg_latency_ms'] = total_latency / stats['responses'] if stats['responses'] else 0.0
+
+    connections = []
+    with _lock:
+        client = _http_client
+    if client is not None and not client.is_closed:
+        # httpx未公开连接池接口，这里读取httpcore连接池（取不到时返回0）
+        pool = getattr(getattr(client, '_transport', None), '_pool', None)
+        connections = list(getattr(pool, 'connections', []) or [])
+    stats['connections'] = len(connections)
+    stats['idle_connections'] = sum(1 for conn in connections if conn.is_idle())
+    stats['http2'] = bool(LLM_HTTP_CONFIG["http2"] and _http2_available())
+    return stats
+
+
+def reset_registry():
+    """关闭共享连接池并清空缓存的客户端（测试或配置变更后使用）"""
+    global _http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+        _provider_clients.clear()
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0.0 if key == 'total_latency_ms' else 0
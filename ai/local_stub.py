@@ -0,0 +1,520 @@
+"""
+本地模拟LLM提供商（local_stub）
+用于离线端到端基准测试和CI：不调用任何外部API，按prompt类型返回确定性的合法JSON
+
+两种使用方式：
+1. 进程内模拟：LLM_CONFIG["local_stub"]["base_url"] 为空时，LLMClient 直接使用 LocalStubClient
+2. localhost模拟服务：python -m ai.local_stub --port 8765 启动OpenAI兼容HTTP服务，
+   然后设置 LOCAL_STUB_BASE_URL=http://127.0.0.1:8765/v1
+
+支持的prompt类型：聚类主题、需求卡片、Token分类、词根翻译、Reddit分析、产品识别
+（另外兼容聚类语义标注、商品AI分析、聚类价值评估）
+
+可配置项（见 config.settings.LLM_CONFIG["local_stub"]）：
+- latency_distribution / latency_ms / latency_jitter_ms: 延迟分布
+- error_rate: 模拟服务端错误（HTTP 500）的概率
+- rate_limit_rate: 模拟限流（HTTP 429）的概率
+- seed: 延迟和错误注入的随机种子（响应内容只取决于prompt，与种子无关）
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# prompt类型常量
+PROMPT_TYPES = [
+    "cluster_theme",
+    "demand_card",
+    "token_classification",
+    "translation",
+    "reddit_analysis",
+    "product_identification",
+    "cluster_labeling",
+    "product_analysis",
+    "cluster_assessment",
+    "generic",
+]
+
+LATENCY_DISTRIBUTIONS = ["fixed", "uniform", "normal", "lognormal", "exponential"]
+
+_STUB_TOKEN_TYPES = ["intent", "action", "object", "other"]
+_STUB_DEMAND_TYPES = ["tool", "content", "service", "education", "other"]
+_STUB_PRODUCT_CATEGORIES = ["electronics", "software", "service", "content", "other"]
+_STUB_CONFIDENCE = ["high", "medium", "low"]
+
+
+class LocalStubError(Exception):
+    """模拟的服务端错误（对应HTTP 500）"""
+
+    status_code = 500
+
+
+class LocalStubRateLimitError(LocalStubError):
+    """模拟的限流错误（对应HTTP 429）"""
+
+    status_code = 429
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# ==================== prompt识别与响应生成 ====================
+
+def _stable_hash(text: str) -> int:
+    """与进程无关的稳定哈希（Python内置hash()每个进程随机化，不能用于确定性输出）"""
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:12], 16)
+
+
+def _pick(options: List, key: str):
+    """根据key确定性地选择一个选项"""
+    return options[_stable_hash(key) % len(options)]
+
+
+def _section(text: str, start_marker: str, end_marker: str) -> str:
+    """截取两个标记之间的文本"""
+    start = text.find(start_marker)
+    if start < 0:
+        return ""
+    end = text.find(end_marker, start + len(start_marker))
+    return text[start + len(start_marker):end if end >= 0 else len(text)]
+
+
+def _numbered_items(text: str) -> List[str]:
+    """提取 "1. xxx" 格式的编号列表"""
+    return [m.group(1).strip() for m in re.finditer(r'^\s*\d+\.\s+(.+?)\s*$', text, re.MULTILINE)]
+
+
+def _bullet_items(text: str) -> List[str]:
+    """提取 "- xxx" 格式的列表"""
+    return [m.group(1).strip() for m in re.finditer(r'^\s*-\s+(.+?)\s*$', text, re.MULTILINE)]
+
+
+def _top_words(phrases: List[str], n: int = 3) -> List[str]:
+    """统计短语中最常见的单词（用于生成看起来合理的标签）"""
+    counter = Counter()
+    for phrase in phrases:
+        counter.update(w for w in re.findall(r'[a-z]+', phrase.lower()) if len(w) > 2)
+    return [w for w, _ in counter.most_common(n)]
+
+
+def detect_prompt_type(messages: List[Dict[str, str]]) -> str:
+    """
+    根据消息内容识别prompt类型
+
+    Args:
+        messages: 消息列表 [{"role": ..., "content": ...}]
+
+    Returns:
+        PROMPT_TYPES中的一个
+    """
+    text = "\n".join(m.get("content") or "" for m in messages)
+
+    if "【待分类Tokens】" in text or '"token_type"' in text:
+        return "token_classification"
+    if "【待翻译词根】" in text:
+        return "translation"
+    if '"demand_title"' in text:
+        return "demand_card"
+    if '"is_product"' in text:
+        return "product_identification"
+    if '"llm_label"' in text:
+        return "cluster_labeling"
+    if '"tag1"' in text:
+        return "reddit_analysis"
+    if '"product_brief"' in text:
+        return "product_analysis"
+    if '"theme"' in text:
+        return "cluster_theme"
+    if "摘要：" in text and "推荐：" in text:
+        return "cluster_assessment"
+    return "generic"
+
+
+def build_stub_response(prompt_type: str, messages: List[Dict[str, str]]) -> str:
+    """
+    生成确定性的、符合各调用方解析格式的响应文本
+
+    Args:
+        prompt_type: detect_prompt_type()的返回值
+        messages: 原始消息列表
+
+    Returns:
+        响应文本（除generic和cluster_assessment外均为JSON）
+    """
+    text = "\n".join(m.get("content") or "" for m in messages)
+    key = hashlib.md5(text.encode("utf-8")).hexdigest()
+
+    if prompt_type == "token_classification":
+        tokens = _numbered_items(_section(text, "【待分类Tokens】", "【要求】"))
+        return json.dumps([
+            {
+                "token": token,
+                "token_type": _pick(_STUB_TOKEN_TYPES, token),
+                "confidence": _pick(_STUB_CONFIDENCE, "conf:" + token),
+            }
+            for token in tokens
+        ], ensure_ascii=False)
+
+    if prompt_type == "translation":
+        words = _numbered_items(_section(text, "【待翻译词根】", "【要求】"))
+        return json.dumps({word: f"{word}（译）" for word in words}, ensure_ascii=False)
+
+    if prompt_type == "product_identification":
+        variables = re.findall(r'^\s*\d+\.\s+"(.+?)"', text, re.MULTILINE)
+        results = []
+        for var in variables:
+            is_product = _stable_hash(var) % 3 == 0
+            results.append({
+                "variable_text": var,
+                "is_product": is_product,
+                "category": _pick(_STUB_PRODUCT_CATEGORIES, var) if is_product else None,
+                "description": f"Stub description for {var}",
+                "commercial_value": _stable_hash("value:" + var) % 101 if is_product else 0,
+            })
+        return json.dumps(results, ensure_ascii=False)
+
+    if prompt_type == "demand_card":
+        words = _top_words(_bullet_items(_section(text, "【示例短语", "【要求】")))
+        title = " ".join(words) or f"需求{key[:6]}"
+        return json.dumps({
+            "demand_title": f"{title}需求",
+            "demand_description": f"用户围绕 {title} 寻找解决方案（模拟生成）",
+            "user_intent": f"了解并获取 {title} 相关的工具或内容",
+            "pain_points": [f"{w}相关信息分散" for w in words[:3]] or ["信息分散"],
+            "target_audience": "搜索相关关键词的用户",
+            "priority": _pick(_STUB_CONFIDENCE, "priority:" + key),
+            "confidence_score": _stable_hash("score:" + key) % 51 + 50,
+        }, ensure_ascii=False)
+
+    if prompt_type == "cluster_labeling":
+        words = _top_words(_bullet_items(_section(text, "Phrases in this cluster:", "Please analyze")))
+        return json.dumps({
+            "llm_label": " ".join(w.capitalize() for w in words) or "Misc",
+            "llm_summary": f"Users are searching for {' '.join(words) or 'various topics'}.",
+            "primary_demand_type": _pick(_STUB_DEMAND_TYPES, key),
+            "secondary_demand_types": [],
+            "labeling_confidence": _stable_hash("conf:" + key) % 41 + 60,
+        }, ensure_ascii=False)
+
+    if prompt_type == "reddit_analysis":
+        return json.dumps({
+            "tag1": f"标签{key[:2]}",
+            "tag2": f"标签{key[2:4]}",
+            "tag3": f"标签{key[4:6]}",
+            "importance_score": _stable_hash(key) % 5 + 1,
+            "confidence": _stable_hash("conf:" + key) % 41 + 60,
+        }, ensure_ascii=False)
+
+    if prompt_type == "product_analysis":
+        return json.dumps({
+            "tags": [f"标签{key[:2]}", f"标签{key[2:4]}", f"标签{key[4:6]}"],
+            "product_brief": "模拟商品简介",
+            "core_need": "模拟核心需求",
+            "virtual_product_fit": _pick(_STUB_CONFIDENCE, key),
+            "fit_reason": "模拟适配原因",
+        }, ensure_ascii=False)
+
+    if prompt_type == "cluster_theme":
+        words = _top_words(_bullet_items(_section(text, "示例短语", "【要求】")))
+        return json.dumps({
+            "theme": " ".join(words) or "未分类",
+            "confidence": _pick(_STUB_CONFIDENCE, key),
+        }, ensure_ascii=False)
+
+    if prompt_type == "cluster_assessment":
+        words = _top_words(_numbered_items(text))
+        return (
+            f"摘要：用户在寻找 {' '.join(words) or '相关内容'}\n"
+            f"评估：模拟评估结果\n"
+            f"推荐：{'是' if _stable_hash(key) % 2 == 0 else '否'}\n"
+            f"置信度：{(_stable_hash('conf:' + key) % 50 + 50) / 100:.2f}"
+        )
+
+    return "OK"
+
+
+# ==================== 模拟引擎 ====================
+
+class LocalStubEngine:
+    """
+    模拟引擎：负责延迟注入、错误注入和统计
+
+    响应内容只由prompt决定（可复现）；延迟和错误注入由seed驱动的随机数决定。
+    线程安全，可被并发批处理路径共享。
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.model = config.get("model", "local-stub")
+        self.latency_distribution = config.get("latency_distribution", "fixed")
+        self.latency_ms = float(config.get("latency_ms", 0) or 0)
+        self.latency_jitter_ms = float(config.get("latency_jitter_ms", 0) or 0)
+        self.error_rate = float(config.get("error_rate", 0) or 0)
+        self.rate_limit_rate = float(config.get("rate_limit_rate", 0) or 0)
+
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"不支持的延迟分布: {self.latency_distribution}")
+
+        self._rng = random.Random(config.get("seed", 42))
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self._latency_total = 0.0
+
+    def _sample_latency(self) -> float:
+        """按配置的分布采样一次延迟（秒）"""
+        mean = self.latency_ms
+        jitter = self.latency_jitter_ms
+        dist = self.latency_distribution
+
+        with self._lock:
+            if dist == "fixed" or mean <= 0:
+                value = mean
+            elif dist == "uniform":
+                value = self._rng.uniform(mean - jitter, mean + jitter)
+            elif dist == "normal":
+                value = self._rng.gauss(mean, jitter)
+            elif dist == "lognormal":
+                # 以mean为中位数，jitter/mean为形状参数的长尾分布
+                sigma = jitter / mean if jitter > 0 else 0.0
+                value = mean * self._rng.lognormvariate(0.0, sigma)
+            else:  # exponential
+                value = self._rng.expovariate(1.0 / mean)
+
+        return max(0.0, value) / 1000.0
+
+    def _roll_failure(self) -> Optional[str]:
+        """决定本次请求是否注入错误"""
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return "rate_limit"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "error"
+        return None
+
+    def complete(self, messages: List[Dict[str, str]]) -> Dict:
+        """
+        处理一次chat completion请求
+
+        Returns:
+            {'prompt_type': str, 'content': str, 'prompt_tokens': int, 'completion_tokens': int}
+
+        Raises:
+            LocalStubRateLimitError: 模拟429
+            LocalStubError: 模拟500
+        """
+        latency = self._sample_latency()
+        if latency > 0:
+            time.sleep(latency)
+
+        prompt_type = detect_prompt_type(messages)
+        failure = self._roll_failure()
+
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats[f"type:{prompt_type}"] += 1
+            self._latency_total += latency
+            if failure == "rate_limit":
+                self._stats["rate_limited"] += 1
+            elif failure == "error":
+                self._stats["errors"] += 1
+
+        if failure == "rate_limit":
+            raise LocalStubRateLimitError("local_stub: rate limit exceeded (simulated 429)")
+        if failure == "error":
+            raise LocalStubError("local_stub: internal server error (simulated 500)")
+
+        content = build_stub_response(prompt_type, messages)
+        prompt_chars = sum(len(m.get("content") or "") for m in messages)
+
+        return {
+            "prompt_type": prompt_type,
+            "content": content,
+            # 粗略估算：约4个字符1个token
+            "prompt_tokens": prompt_chars // 4 + 1,
+            "completion_tokens": len(content) // 4 + 1,
+        }
+
+    def get_stats(self) -> Dict:
+        """获取统计信息（请求数、错误数、限流数、按prompt类型计数、平均注入延迟）"""
+        with self._lock:
+            requests = self._stats["requests"]
+            return {
+                "requests": requests,
+                "errors": self._stats["errors"],
+                "rate_limited": self._stats["rate_limited"],
+                "by_prompt_type": {
+                    k.split(":", 1)[1]: v for k, v in self._stats.items() if k.startswith("type:")
+                },
+                "avg_latency_ms": round(self._latency_total / requests * 1000, 2) if requests else 0.0,
+            }
+
+    def reset_stats(self):
+        """清空统计信息"""
+        with self._lock:
+            self._stats.clear()
+            self._latency_total = 0.0
+
+
+# ==================== 进程内OpenAI兼容客户端 ====================
+
+class _StubCompletions:
+    def __init__(self, engine: LocalStubEngine):
+        self._engine = engine
+
+    def create(self, model: str = None, messages: List[Dict[str, str]] = None, **kwargs):
+        """模拟 OpenAI client.chat.completions.create（忽略temperature等生成参数）"""
+        result = self._engine.complete(messages or [])
+        return SimpleNamespace(
+            id=f"stub-{_stable_hash(result['content']):x}",
+            model=model or self._engine.model,
+            choices=[SimpleNamespace(
+                index=0,
+                message=SimpleNamespace(role="assistant", content=result["content"]),
+                finish_reason="stop",
+            )],
+            usage=SimpleNamespace(
+                prompt_tokens=result["prompt_tokens"],
+                completion_tokens=result["completion_tokens"],
+                total_tokens=result["prompt_tokens"] + result["completion_tokens"],
+            ),
+        )
+
+
+class LocalStubClient:
+    """
+    进程内模拟客户端，接口与 openai.OpenAI 的 chat.completions 部分一致
+
+    Example:
+        >>> client = LocalStubClient({"latency_ms": 50, "error_rate": 0.01})
+        >>> resp = client.chat.completions.create(model="x", messages=[...])
+        >>> resp.choices[0].message.content
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        self.engine = LocalStubEngine(config)
+        self.chat = SimpleNamespace(completions=_StubCompletions(self.engine))
+
+    def get_stats(self) -> Dict:
+        """获取模拟引擎统计信息"""
+        return self.engine.get_stats()
+
+
+# ==================== localhost OpenAI兼容服务 ====================
+
+def create_stub_server(host: str = "127.0.0.1", port: int = 8765, config: Optional[Dict] = None):
+    """
+    创建OpenAI兼容的本地HTTP模拟服务（POST .../chat/completions）
+
+    Args:
+        host: 监听地址
+        port: 监听端口（0表示随机端口）
+        config: 模拟配置，默认使用 LLM_CONFIG["local_stub"]
+
+    Returns:
+        ThreadingHTTPServer实例（调用 serve_forever() 启动，server.engine 可读取统计）
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    if config is None:
+        from config.settings import LLM_CONFIG
+        config = LLM_CONFIG["local_stub"]
+
+    engine = LocalStubEngine(config)
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # 支持keep-alive，便于测量连接复用
+
+        def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+                return
+
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+                return
+
+            try:
+                result = engine.complete(request.get("messages") or [])
+            except LocalStubRateLimitError as e:
+                self._send_json(
+                    429,
+                    {"error": {"message": str(e), "type": "rate_limit_error"}},
+                    headers={"Retry-After": str(e.retry_after)},
+                )
+                return
+            except LocalStubError as e:
+                self._send_json(500, {"error": {"message": str(e), "type": "server_error"}})
+                return
+
+            self._send_json(200, {
+                "id": f"stub-{_stable_hash(result['content']):x}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model") or engine.model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": result["content"]},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": result["prompt_tokens"],
+                    "completion_tokens": result["completion_tokens"],
+                    "total_tokens": result["prompt_tokens"] + result["completion_tokens"],
+                },
+            })
+
+        def do_GET(self):
+            # 便于基准测试时查看服务端统计
+            if self.path.rstrip("/").endswith("/stats"):
+                self._send_json(200, engine.get_stats())
+            else:
+                self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+
+        def log_message(self, format, *args):
+            logger.debug("local_stub: " + format % args)
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.engine = engine
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="启动OpenAI兼容的本地模拟LLM服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    stub_server = create_stub_server(args.host, args.port)
+    print(f"local_stub serving on http://{args.host}:{stub_server.server_address[1]}/v1")
+    try:
+        stub_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub_server.server_close()
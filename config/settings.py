@@ -31,6 +31,10 @@ DATABASE_CONFIG = {
     "user": os.getenv("DB_USER", "root"),
     "password": os.getenv("DB_PASSWORD", ""),
     "charset": "utf8mb4",
+    # 连接池（进程内每个DATABASE_URL共用一个引擎，仅MySQL生效）
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),        # 常驻连接数
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),  # 高峰期允许额外创建的连接数
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),  # 等待可用连接的超时（秒）
 }
 
 # SQLAlchemy连接字符串
@@ -53,6 +57,11 @@ EMBEDDING_BATCH_SIZE = 256
 EMBEDDING_CACHE_FILE = CACHE_DIR / "embeddings_round{round_id}.npz"
 MODEL_VERSION_FILE = CACHE_DIR / "model_version.txt"
 
+# 模板发现的n-gram倒排索引（短语变化时自动重建）
+NGRAM_INDEX_FILE = CACHE_DIR / "ngram_index.npz"
+# 词性/翻译缓存（utils/annotation_cache.py）
+ANNOTATION_CACHE_FILE = CACHE_DIR / "annotations.sqlite3"
+
 # ==================== 聚类配置 ====================
 # 大组聚类参数（Phase 2）
 LARGE_CLUSTER_CONFIG = {
@@ -76,7 +85,7 @@ INCREMENTAL_KNN_K = 5
 INCREMENTAL_DISTANCE_THRESHOLD = 0.5  # 余弦距离阈值
 
 # ==================== LLM配置 ====================
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")  # openai, anthropic, deepseek
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")  # openai, anthropic, deepseek, local_stub
 
 LLM_CONFIG = {
     "openai": {
@@ -99,6 +108,46 @@ LLM_CONFIG = {
         "temperature": 0.3,
         "max_tokens": 2000,
     },
+    # 本地模拟提供商（离线基准测试/CI用，不调用任何外部API）
+    # base_url为空时使用进程内模拟；填写如 http://127.0.0.1:8765/v1 则走localhost模拟服务
+    "local_stub": {
+        "api_key": os.getenv("LOCAL_STUB_API_KEY", "local-stub"),
+        "model": os.getenv("LOCAL_STUB_MODEL", "local-stub"),
+        "base_url": os.getenv("LOCAL_STUB_BASE_URL", ""),
+        "temperature": 0.3,
+        "max_tokens": 2000,
+        # 延迟分布: fixed, uniform, normal, lognormal, exponential
+        "latency_distribution": os.getenv("LOCAL_STUB_LATENCY_DIST", "fixed"),
+        "latency_ms": float(os.getenv("LOCAL_STUB_LATENCY_MS", "0")),           # 平均延迟（毫秒）
+        "latency_jitter_ms": float(os.getenv("LOCAL_STUB_LATENCY_JITTER_MS", "0")),  # 抖动/标准差（毫秒）
+        "error_rate": float(os.getenv("LOCAL_STUB_ERROR_RATE", "0")),           # 模拟500错误的概率
+        "rate_limit_rate": float(os.getenv("LOCAL_STUB_RATE_LIMIT_RATE", "0")),  # 模拟429限流的概率
+        "seed": int(os.getenv("LOCAL_STUB_SEED", "42")),                        # 随机种子（延迟/错误注入）
+    },
+}
+
+# LLM HTTP连接池（ai/client_registry.py）：所有提供商客户端进程内共享
+LLM_HTTP_CONFIG = {
+    "max_connections": int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20")),           # 最大连接数
+    "max_keepalive_connections": int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10")),  # 保持的空闲连接数
+    "keepalive_expiry": float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60")),      # 空闲连接保持时间（秒）
+    "timeout": float(os.getenv("LLM_HTTP_TIMEOUT", "120")),                       # 请求超时（秒）
+    "connect_timeout": float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "10")),        # 建连超时（秒）
+    "http2": os.getenv("LLM_HTTP2", "true").lower() == "true",                    # 安装h2时启用HTTP/2
+}
+
+# 批量LLM请求规划（ai/batch_planner.py）：按token预算打包，失败二分重试
+LLM_BATCH_CONFIG = {
+    "prompt_token_budget": int(os.getenv("LLM_BATCH_PROMPT_TOKENS", "6000")),  # 单批prompt token预算
+    "completion_safety_ratio": 0.8,   # 预估输出不超过max_tokens的比例（留余量防截断）
+    "max_items": {                    # 单批最大条数（上限，实际由预算决定）
+        "token_classification": 150,
+        "translation": 150,
+        "product_identification": 30,
+    },
+    "failure_rate_threshold": 0.3,    # 某批次大小区间解析失败率超过此值时收紧上限
+    "min_samples": 3,                 # 区间至少有多少次请求才参与调优
+    "stats_file": CACHE_DIR / "llm_batch_stats.json",  # 失败率统计持久化文件
 }
 
 # ==================== 数据源配置 ====================
@@ -180,6 +229,30 @@ LOG_CONFIG = {
     },
 }
 
+# ==================== 分词配置 ====================
+# n-gram分片多进程提取（utils/ngram_counter.py）
+SEGMENTATION_CONFIG = {
+    "workers": int(os.getenv("SEGMENT_WORKERS", "0")),  # 进程数（0=CPU核数，1=单进程）
+    "shard_size": 50000,                 # 每个分片的短语数
+    "min_parallel_phrases": 200000,      # 短语数少于此值时单进程计数（进程启动/传输开销不划算）
+}
+
+# 词性/翻译缓存（utils/annotation_cache.py）
+ANNOTATION_CACHE_CONFIG = {
+    "enabled": os.getenv("ANNOTATION_CACHE_ENABLED", "true").lower() == "true",
+    "negative_ttl_seconds": 86400,       # 失败记录的有效期（过期后重新请求）
+    "warm_up_on_create": True,           # 缓存文件首次创建时从word_segments预热
+}
+
+# 批量翻译（utils/translation.py TranslationService）
+TRANSLATION_CONFIG = {
+    "workers": int(os.getenv("TRANSLATION_WORKERS", "4")),  # 并发请求线程数
+    "max_chars": 4500,                   # 单次请求字符上限（Google Translate为5000）
+    "max_items": 100,                    # 单次请求最大词数
+    "max_retries": 3,                    # 单个请求失败重试次数
+    "backoff_seconds": 0.5,              # 重试退避基数（指数退避+随机抖动）
+}
+
 # ==================== Louvain聚类配置 (Phase 2B) ====================
 LOUVAIN_CONFIG = {
     # K近邻图构建参数
@@ -209,6 +282,13 @@ CLUSTER_LABELING_CONFIG = {
     "max_tokens": 500,              # 每次调用最大token数
 }
 
+# 聚类标注跨轮次复用（core/cluster_label_reuse.py）
+CLUSTER_LABEL_REUSE_CONFIG = {
+    "enabled": True,
+    "similarity_threshold": 0.95,      # 与历史质心的余弦相似度下限
+    "member_overlap_threshold": 0.5,   # 成员短语Jaccard重合度下限
+}
+
 # ==================== 版本信息 ====================
 MVP_VERSION = "1.0"
 LAST_UPDATED = "2024-12-19"
@@ -0,0 +1,255 @@
+"""
+聚类标注跨轮次复用
+每轮重新聚类后，大部分聚类和上一轮几乎相同，没必要重新调用LLM标注
+
+流程:
+1. 计算聚类质心（成员短语embedding均值，L2归一化）
+2. 在cluster_label_memory中找余弦相似度最高的历史质心
+3. 相似度 >= similarity_threshold 且 成员Jaccard重合度 >= member_overlap_threshold → 直接复用标注
+4. 其余聚类（新出现/已漂移）才送LLM，结果写回记忆表
+
+复用时保留标注当时的质心和成员快照，避免聚类缓慢漂移时一直沿用旧标注。
+"""
+import json
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from config.settings import CLUSTER_LABEL_REUSE_CONFIG
+from storage.repository import ClusterLabelMemoryRepository
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 可复用的标注字段
+LABEL_FIELDS = (
+    'llm_label',
+    'llm_summary',
+    'main_theme',
+    'primary_demand_type',
+    'secondary_demand_types',
+    'labeling_confidence',
+)
+
+
+def compute_centroid(embeddings: np.ndarray) -> np.ndarray:
+    """计算L2归一化的质心（float32）"""
+    centroid = np.asarray(embeddings, dtype=np.float32).mean(axis=0)
+    norm = np.linalg.norm(centroid)
+    return centroid / norm if norm > 0 else centroid
+
+
+def member_overlap(members_a: np.ndarray, members_b: np.ndarray) -> float:
+    """两组成员短语ID的Jaccard重合度（输入为去重后的数组）"""
+    if len(members_a) == 0 and len(members_b) == 0:
+        return 1.0
+    intersection = len(np.intersect1d(members_a, members_b, assume_unique=True))
+    union = len(members_a) + len(members_b) - intersection
+    return intersection / union if union else 0.0
+
+
+class ClusterLabelReuser:
+    """聚类标注复用器"""
+
+    def __init__(
+        self,
+        cluster_level: str = 'A',
+        round_id: int = 1,
+        embed_fn: Callable[[List[str]], np.ndarray] = None,
+        similarity_threshold: float = None,
+        overlap_threshold: float = None
+    ):
+        """
+        初始化复用器
+
+        Args:
+            cluster_level: 聚类级别（'A'或'B'）
+            round_id: 当前轮次
+            embed_fn: 文本→embedding矩阵的函数（None表示使用EmbeddingService及其缓存）
+            similarity_threshold: 质心余弦相似度阈值（None表示使用配置值）
+            overlap_threshold: 成员重合度阈值（None表示使用配置值）
+        """
+        self.cluster_level = cluster_level
+        self.round_id = round_id
+        self.similarity_threshold = (
+            similarity_threshold if similarity_threshold is not None
+            else CLUSTER_LABEL_REUSE_CONFIG["similarity_threshold"]
+        )
+        self.overlap_threshold = (
+            overlap_threshold if overlap_threshold is not None
+            else CLUSTER_LABEL_REUSE_CONFIG["member_overlap_threshold"]
+        )
+        self._embed_fn = embed_fn
+        self._embedding_service = None
+
+        self.stats = {'reused': 0, 'matched': 0, 'drifted': 0, 'novel': 0}
+        self._load_memories()
+
+    def _load_memories(self):
+        """加载历史质心到内存矩阵"""
+        with ClusterLabelMemoryRepository() as repo:
+            memories = repo.get_memories(self.cluster_level)
+
+            self._memory_ids = [m.memory_id for m in memories]
+            self._members = [np.frombuffer(m.member_ids, dtype=np.int32) for m in memories]
+            self._labels = [{field: getattr(m, field) for field in LABEL_FIELDS} for m in memories]
+            self._raw_centroids = [np.frombuffer(m.centroid, dtype=np.float32) for m in memories]
+
+        # 质心矩阵在第一次匹配、知道当前embedding维度后再构建
+        self._centroids = None
+        self._dim = None
+        logger.info(f"加载了 {len(self._memory_ids)} 条{self.cluster_level}级聚类标注记忆")
+
+    def _select_dimension(self, dim: int):
+        """只保留质心维度与当前embedding一致的记忆（更换embedding模型后旧记忆无法比较，跳过）"""
+        keep = [i for i, centroid in enumerate(self._raw_centroids) if centroid.size == dim]
+        skipped = len(self._raw_centroids) - len(keep)
+        if skipped:
+            logger.warning(f"跳过 {skipped} 条质心维度与当前embedding（{dim}维）不一致的标注记忆")
+
+        self._memory_ids = [self._memory_ids[i] for i in keep]
+        self._members = [self._members[i] for i in keep]
+        self._labels = [self._labels[i] for i in keep]
+        self._raw_centroids = [self._raw_centroids[i] for i in keep]
+        self._centroids = np.vstack(self._raw_centroids) if keep else None
+        self._dim = dim
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        if self._embed_fn is not None:
+            return self._embed_fn(texts)
+
+        if self._embedding_service is None:
+            from core.embedding import EmbeddingService
+            self._embedding_service = EmbeddingService(use_cache=True)
+            self._embedding_service.load_cache(self.round_id)
+        return self._embedding_service.embed_texts(texts, show_progress=False)
+
+    def match_cluster(
+        self,
+        cluster_id: int,
+        phrase_ids: List[int],
+        phrases: List[str],
+        required_field: str = 'llm_label'
+    ) -> Dict:
+        """
+        查找可复用的历史标注
+
+        Args:
+            cluster_id: 当前聚类ID
+            phrase_ids: 成员短语ID
+            phrases: 成员短语文本（用于计算质心）
+            required_field: 需要复用的字段（Phase 2C为'llm_label'，Phase 3为'main_theme'）
+
+        Returns:
+            匹配结果字典，status为:
+            - 'reused': 可直接复用，labels为历史标注
+            - 'matched': 找到同一聚类但缺少required_field，需调用LLM后补全
+            - 'drifted': 找到相近聚类但成员变化太大，需重新标注
+            - 'novel': 新聚类
+        """
+        centroid = compute_centroid(self._embed(phrases))
+        members = np.unique(np.asarray(phrase_ids, dtype=np.int32))
+        if self._dim != centroid.size:
+            self._select_dimension(centroid.size)
+
+        match = {
+            'cluster_id': cluster_id,
+            'centroid': centroid,
+            'member_ids': members,
+            'status': 'novel',
+            'memory_id': None,
+            'similarity': 0.0,
+            'overlap': 0.0,
+            'labels': None,
+        }
+
+        if self._centroids is not None:
+            similarities = self._centroids @ centroid
+            # 相似度达标的候选按相似度从高到低检查成员重合度
+            for idx in np.argsort(-similarities):
+                similarity = float(similarities[idx])
+                if similarity < self.similarity_threshold:
+                    break
+
+                overlap = member_overlap(self._members[idx], members)
+                if overlap < self.overlap_threshold:
+                    if match['status'] == 'novel':
+                        match.update(status='drifted', memory_id=self._memory_ids[idx],
+                                     similarity=similarity, overlap=overlap)
+                    continue
+
+                labels = self._labels[idx]
+                status = 'reused' if labels.get(required_field) else 'matched'
+                match.update(status=status, memory_id=self._memory_ids[idx],
+                             similarity=similarity, overlap=overlap, labels=dict(labels))
+                break
+
+        self.stats[match['status']] += 1
+        if match['status'] == 'reused':
+            with ClusterLabelMemoryRepository() as repo:
+                repo.mark_reused(match['memory_id'], cluster_id, self.round_id)
+
+        return match
+
+    def remember(self, match: Dict, labels: Dict):
+        """
+        保存LLM标注结果到记忆表
+
+        - matched: 只补全标注字段，保留原快照
+        - drifted: 更新为新快照，未在本次提供的标注字段一律清空（旧成员的标注已过期，
+          其他阶段需重新标注）
+        - novel: 新增记忆
+        """
+        labels = {k: v for k, v in labels.items() if k in LABEL_FIELDS}
+        if isinstance(labels.get('secondary_demand_types'), list):
+            labels['secondary_demand_types'] = json.dumps(labels['secondary_demand_types'])
+
+        snapshot = {
+            'cluster_id': match['cluster_id'],
+            'round_id': self.round_id,
+            'centroid': match['centroid'].astype(np.float32).tobytes(),
+            'member_ids': match['member_ids'].astype(np.int32).tobytes(),
+            'size': len(match['member_ids']),
+        }
+
+        with ClusterLabelMemoryRepository() as repo:
+            if match['status'] == 'matched':
+                repo.update_memory(match['memory_id'], cluster_id=match['cluster_id'],
+                                   round_id=self.round_id, **labels)
+                idx = self._memory_ids.index(match['memory_id'])
+                self._labels[idx].update(labels)
+                return
+
+            if match['status'] == 'drifted':
+                fields = {field: None for field in LABEL_FIELDS}
+                fields.update(labels)
+                repo.update_memory(match['memory_id'], reuse_count=0, **snapshot, **fields)
+                idx = self._memory_ids.index(match['memory_id'])
+                self._centroids[idx] = match['centroid']
+                self._raw_centroids[idx] = self._centroids[idx]
+                self._members[idx] = match['member_ids']
+                self._labels[idx] = fields
+                return
+
+            memory = repo.add_memory(cluster_level=self.cluster_level, reuse_count=0,
+                                     **snapshot, **labels)
+            memory_id = memory.memory_id
+
+        self._memory_ids.append(memory_id)
+        self._members.append(match['member_ids'])
+        self._labels.append({field: labels.get(field) for field in LABEL_FIELDS})
+        self._raw_centroids.append(match['centroid'].astype(np.float32))
+        centroid = match['centroid'][np.newaxis, :]
+        self._centroids = centroid if self._centroids is None else np.vstack([self._centroids, centroid])
+
+    def finish(self):
+        """保存embedding缓存并输出复用统计"""
+        if self._embedding_service is not None:
+            self._embedding_service.save_cache()
+
+        total = sum(self.stats.values())
+        logger.info(
+            f"标注复用统计: 共{total}个聚类，复用{self.stats['reused']}个，"
+            f"补全{self.stats['matched']}个，漂移{self.stats['drifted']}个，新增{self.stats['novel']}个"
+        )
+        return dict(self.stats)
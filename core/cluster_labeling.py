@@ -11,8 +11,7 @@ if __name__ == "__main__":
 import json
 import random
 from typing import List, Dict, Optional
-from openai import OpenAI
-
+from ai.client_registry import get_provider_client
 from config.settings import LLM_CONFIG, CLUSTER_LABELING_CONFIG
 from utils.logger import get_logger
 
@@ -23,21 +22,19 @@ class ClusterLabeler:
     """聚类语义标注器"""
 
     def __init__(self, provider: str = "deepseek"):
-        """初始化DeepSeek标注器"""
+        """初始化DeepSeek标注器（provider='local_stub'用于离线基准测试）"""
         self.provider = provider
 
-        if provider == "deepseek":
-            config = LLM_CONFIG["deepseek"]
-            self.client = OpenAI(
-                api_key=config["api_key"],
-                base_url=config["base_url"]
-            )
-            self.model = config["model"]
-            self.temperature = CLUSTER_LABELING_CONFIG["temperature"]
-            self.max_tokens = CLUSTER_LABELING_CONFIG["max_tokens"]
-        else:
+        if provider not in ("deepseek", "local_stub"):
             raise ValueError(f"Unsupported provider: {provider}")
 
+        # 共享进程内的客户端和HTTP连接池
+        config = LLM_CONFIG[provider]
+        self.client = get_provider_client(provider, config)
+        self.model = config["model"]
+        self.temperature = CLUSTER_LABELING_CONFIG["temperature"]
+        self.max_tokens = CLUSTER_LABELING_CONFIG["max_tokens"]
+
         logger.info(f"初始化ClusterLabeler - Provider: {provider}, Model: {self.model}")
 
     def label_cluster(
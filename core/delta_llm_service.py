@@ -0,0 +1,210 @@
+"""
+增量LLM分类/翻译服务
+只把未知或过期的tokens/词根送给LLM，已有结果直接从数据库复用
+
+- Token分类：复用tokens表中已有的token_type（"未分类"标记的视为过期）
+- 词根翻译：复用word_segments表中已有的translation（空值和"[word]"降级标记视为过期）
+- 新结果通过批量upsert写回数据库
+
+Phase 5重跑时只有新增的tokens会产生LLM调用。
+"""
+from typing import List, Dict, Optional, Tuple
+
+from storage.repository import TokenRepository
+from storage.word_segment_repository import WordSegmentRepository
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def is_fallback_classification(result: Dict) -> bool:
+    """batch_classify_tokens在批次失败时的降级结果（带 'fallback': True 标记，LLM真实给出的 other/low 不算）"""
+    return bool(result.get('fallback'))
+
+
+def is_stale_translation(word: str, translation: Optional[str]) -> bool:
+    """翻译为空或为batch_translate_seed_words的降级标记"[word]"时视为过期"""
+    return not translation or translation == f"[{word}]"
+
+
+class DeltaLLMService:
+    """增量分类/翻译服务：批量查已有结果 → 只送缺失项给LLM → 批量写回"""
+
+    def __init__(self, llm_client=None, provider: str = None):
+        """
+        初始化服务
+
+        Args:
+            llm_client: LLMClient实例（可选，默认在确实需要调用LLM时才创建）
+            provider: LLM提供商（仅在未传入llm_client时使用）
+        """
+        self._llm_client = llm_client
+        self._provider = provider
+
+    @property
+    def llm(self):
+        """延迟创建LLM客户端：全部命中缓存时无需API密钥"""
+        if self._llm_client is None:
+            from ai.client import LLMClient
+            self._llm_client = LLMClient(provider=self._provider)
+        return self._llm_client
+
+    # ==================== Token分类 ====================
+
+    def lookup_token_types(self, tokens: List[str]) -> Dict[str, Dict]:
+        """
+        批量查询tokens表中已有的有效分类
+
+        Returns:
+            {token: {'token': ..., 'token_type': ..., 'confidence': ..., 'cached': True}}
+            "未分类"的token不在结果中
+        """
+        with TokenRepository() as repo:
+            existing = repo.get_tokens_by_texts(tokens)
+
+        return {
+            text: {
+                'token': text,
+                'token_type': token.token_type,
+                'confidence': 'high' if token.verified else 'medium',
+                'cached': True,
+            }
+            for text, token in existing.items()
+            if token.notes != TokenRepository.UNCLASSIFIED_NOTE
+        }
+
+    def classify_tokens(
+        self,
+        tokens: List[str],
+        in_phrase_counts: Optional[Dict[str, int]] = None,
+        round_id: int = 1,
+        batch_size: int = None,
+        force: bool = False
+    ) -> Tuple[List[Dict], Dict]:
+        """
+        增量分类tokens
+
+        Args:
+            tokens: token文本列表
+            in_phrase_counts: {token: 出现次数}（写回tokens表时使用，可选）
+            round_id: 新token的first_seen_round
+            batch_size: 单批最大条数（None表示由批次规划器按token预算决定）
+            force: 为True时忽略已有结果，全部重新分类
+
+        Returns:
+            (results, stats)
+            - results: 与batch_classify_tokens相同格式的列表，顺序与输入一致
+            - stats: {'total', 'cached', 'sent', 'fallback'}
+        """
+        unique_tokens = list(dict.fromkeys(tokens))
+        in_phrase_counts = in_phrase_counts or {}
+
+        cached = {} if force else self.lookup_token_types(unique_tokens)
+        to_classify = [t for t in unique_tokens if t not in cached]
+
+        logger.info(
+            f"增量分类: 共{len(unique_tokens)}个tokens，"
+            f"复用{len(cached)}个，送LLM {len(to_classify)}个"
+        )
+
+        fresh = {}
+        fallback_count = 0
+        if to_classify:
+            for result in self.llm.batch_classify_tokens(to_classify, batch_size=batch_size):
+                fresh[result['token']] = result
+
+            rows = []
+            for text, result in fresh.items():
+                fallback = is_fallback_classification(result)
+                fallback_count += int(fallback)
+                rows.append({
+                    'token_text': text,
+                    'token_type': result.get('token_type', 'other'),
+                    'in_phrase_count': in_phrase_counts.get(text, 0),
+                    # 降级结果标记为未分类，下次重跑时重新送LLM
+                    'notes': TokenRepository.UNCLASSIFIED_NOTE if fallback else None,
+                })
+
+            with TokenRepository() as repo:
+                inserted, updated = repo.bulk_upsert_tokens(rows, first_seen_round=round_id)
+            logger.info(f"分类结果已写回: 新增{inserted}个，更新{updated}个")
+
+        results = []
+        for text in unique_tokens:
+            result = cached.get(text) or fresh.get(text)
+            if result:
+                results.append(result)
+
+        stats = {
+            'total': len(unique_tokens),
+            'cached': len(cached),
+            'sent': len(to_classify),
+            'fallback': fallback_count,
+        }
+        return results, stats
+
+    # ==================== 词根翻译 ====================
+
+    def lookup_translations(self, words: List[str]) -> Dict[str, str]:
+        """批量查询word_segments中已有的有效翻译"""
+        with WordSegmentRepository() as repo:
+            existing = repo.get_translations(words)
+
+        return {
+            word: trans
+            for word, trans in existing.items()
+            if not is_stale_translation(word, trans)
+        }
+
+    def translate_words(
+        self,
+        words: List[str],
+        batch_size: int = None,
+        force: bool = False
+    ) -> Tuple[Dict[str, str], Dict]:
+        """
+        增量翻译词根
+
+        Args:
+            words: 词根列表
+            batch_size: 单批最大条数（None表示由批次规划器按token预算决定）
+            force: 为True时忽略已有翻译，全部重新翻译
+
+        Returns:
+            (translations, stats)
+            - translations: {word: translation}，包含复用的和新翻译的
+            - stats: {'total', 'cached', 'sent', 'failed'}
+        """
+        unique_words = list(dict.fromkeys(words))
+
+        cached = {} if force else self.lookup_translations(unique_words)
+        to_translate = [w for w in unique_words if w not in cached]
+
+        logger.info(
+            f"增量翻译: 共{len(unique_words)}个词根，"
+            f"复用{len(cached)}个，送LLM {len(to_translate)}个"
+        )
+
+        fresh = {}
+        failed = 0
+        if to_translate:
+            fresh = self.llm.batch_translate_seed_words(to_translate, batch_size=batch_size)
+
+            # 降级标记不写回数据库，下次重跑时重新翻译
+            valid = {w: t for w, t in fresh.items() if not is_stale_translation(w, t)}
+            failed = len(to_translate) - len(valid)
+
+            with WordSegmentRepository() as repo:
+                inserted, updated = repo.bulk_upsert_translations(valid)
+            logger.info(f"翻译结果已写回: 新增{inserted}个，更新{updated}个")
+
+        translations = dict(cached)
+        translations.update(fresh)
+
+        stats = {
+            'total': len(unique_words),
+            'cached': len(cached),
+            'sent': len(to_translate),
+            'failed': failed,
+        }
+        return translations, stats
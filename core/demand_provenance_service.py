@@ -47,6 +47,7 @@ from sqlalchemy import func, and_, or_
 from sqlalchemy.orm import Session
 
 from storage.models import get_session, Demand, Phrase, Product, Token
+from storage.repository import StatsSnapshotRepository
 from storage.models_traceability import (
     DemandPhraseMapping,
     DemandProductMapping,
@@ -145,12 +146,16 @@ class DemandProvenanceService:
         )
 
         self.session.add(provenance)
+        StatsSnapshotRepository(self.session).apply_deltas({'demands.total': 1})
         self.session.commit()
 
         return demand.demand_id
 
     # ==================== 2. 关联管理 ====================
 
+    # 批量关联时IN查询的分块大小
+    IN_CHUNK_SIZE = 500
+
     def link_demand_to_phrases(
         self,
         demand_id: int,
@@ -161,7 +166,7 @@ class DemandProvenanceService:
         method: str
     ) -> List[int]:
         """
-        建立需求与短语的关联
+        建立需求与短语的关联（等同于bulk_link_demand_to_phrases）
 
         Args:
             demand_id: 需求ID
@@ -174,74 +179,62 @@ class DemandProvenanceService:
         Returns:
             mapping_ids: 创建的关联ID列表
         """
+        return self.bulk_link_demand_to_phrases(
+            demand_id, phrase_ids, relevance_scores, source, phase, method
+        )
+
+    def bulk_link_demand_to_phrases(
+        self,
+        demand_id: int,
+        phrase_ids: List[int],
+        relevance_scores: List[float],
+        source: str,
+        phase: str,
+        method: str
+    ) -> List[int]:
+        """
+        批量建立需求与短语的关联
+
+        已有关联只更新评分并记录'updated'事件，新关联批量插入并记录'linked_phrase'事件，
+        整个过程一次提交
+
+        Returns:
+            mapping_ids: 与phrase_ids顺序一致的关联ID列表
+        """
         if len(phrase_ids) != len(relevance_scores):
             raise ValueError("phrase_ids和relevance_scores长度必须相同")
 
-        mapping_ids = []
-
-        for phrase_id, score in zip(phrase_ids, relevance_scores):
-            # 检查是否已存在
-            existing = self.session.query(DemandPhraseMapping).filter_by(
-                demand_id=demand_id,
-                phrase_id=phrase_id
-            ).first()
-
-            if existing:
-                # 更新评分
-                old_score = float(existing.relevance_score)
-                existing.relevance_score = Decimal(str(score))
-                mapping_id = existing.mapping_id
-
-                # 记录更新事件
-                provenance = DemandProvenance(
-                    demand_id=demand_id,
-                    event_type='updated',
-                    event_description=f'更新短语关联评分 (ID: {phrase_id})',
-                    old_value=json.dumps({'relevance_score': old_score}),
-                    new_value=json.dumps({'relevance_score': score}),
-                    triggered_by_phase=phase,
-                    triggered_by_method=method,
-                    triggered_by_user='system',
-                    related_data_type='phrase',
-                    related_data_id=phrase_id
-                )
-                self.session.add(provenance)
-            else:
-                # 创建新关联
-                mapping = DemandPhraseMapping(
-                    demand_id=demand_id,
-                    phrase_id=phrase_id,
-                    relevance_score=Decimal(str(score)),
-                    mapping_source=source,
-                    created_by_phase=phase,
-                    created_by_method=method
-                )
-                self.session.add(mapping)
-                self.session.flush()
-                mapping_id = mapping.mapping_id
-
-                # 记录溯源事件
-                provenance = DemandProvenance(
-                    demand_id=demand_id,
-                    event_type='linked_phrase',
-                    event_description=f'关联短语 (ID: {phrase_id})',
-                    new_value=json.dumps({
-                        'phrase_id': phrase_id,
-                        'relevance_score': score,
-                        'source': source
-                    }),
-                    triggered_by_phase=phase,
-                    triggered_by_method=method,
-                    triggered_by_user='system',
-                    related_data_type='phrase',
-                    related_data_id=phrase_id
-                )
-                self.session.add(provenance)
+        def update_event(phrase_id, old, score):
+            return {
+                'event_type': 'updated',
+                'event_description': f'更新短语关联评分 (ID: {phrase_id})',
+                'old_value': json.dumps({'relevance_score': float(old['relevance_score'])}),
+                'new_value': json.dumps({'relevance_score': score}),
+                'related_data_type': 'phrase',
+                'related_data_id': phrase_id,
+            }
 
-            mapping_ids.append(mapping_id)
+        def link_event(phrase_id, score):
+            return {
+                'event_type': 'linked_phrase',
+                'event_description': f'关联短语 (ID: {phrase_id})',
+                'new_value': json.dumps({
+                    'phrase_id': phrase_id,
+                    'relevance_score': score,
+                    'source': source
+                }),
+                'related_data_type': 'phrase',
+                'related_data_id': phrase_id,
+            }
 
-        self.session.commit()
-        return mapping_ids
+        return self._bulk_link(
+            DemandPhraseMapping, 'phrase_id', demand_id,
+            items=list(zip(phrase_ids, relevance_scores)),
+            values_fn=lambda score: {'relevance_score': Decimal(str(score))},
+            source=source, phase=phase, method=method,
+            link_event_fn=link_event,
+            update_event_fn=update_event
+        )
 
     def link_demand_to_products(
         self,
@@ -254,7 +247,7 @@ class DemandProvenanceService:
         method: str
     ) -> List[int]:
         """
-        建立需求与商品的关联
+        建立需求与商品的关联（等同于bulk_link_demand_to_products）
 
         Args:
             demand_id: 需求ID
@@ -268,61 +261,53 @@ class DemandProvenanceService:
         Returns:
             mapping_ids: 创建的关联ID列表
         """
-        if not (len(product_ids) == len(fit_scores) == len(fit_levels)):
-            raise ValueError("product_ids, fit_scores和fit_levels长度必须相同")
+        return self.bulk_link_demand_to_products(
+            demand_id, product_ids, fit_scores, fit_levels, source, phase, method
+        )
 
-        mapping_ids = []
+    def bulk_link_demand_to_products(
+        self,
+        demand_id: int,
+        product_ids: List[int],
+        fit_scores: List[float],
+        fit_levels: List[str],
+        source: str,
+        phase: str,
+        method: str
+    ) -> List[int]:
+        """
+        批量建立需求与商品的关联
 
-        for product_id, score, level in zip(product_ids, fit_scores, fit_levels):
-            # 检查是否已存在
-            existing = self.session.query(DemandProductMapping).filter_by(
-                demand_id=demand_id,
-                product_id=product_id
-            ).first()
+        已有关联只更新适配度，新关联批量插入并记录'linked_product'事件，整个过程一次提交
 
-            if existing:
-                # 更新评分
-                existing.fit_score = Decimal(str(score))
-                existing.fit_level = level
-                mapping_id = existing.mapping_id
-            else:
-                # 创建新关联
-                mapping = DemandProductMapping(
-                    demand_id=demand_id,
-                    product_id=product_id,
-                    fit_score=Decimal(str(score)),
-                    fit_level=level,
-                    mapping_source=source,
-                    created_by_phase=phase,
-                    created_by_method=method
-                )
-                self.session.add(mapping)
-                self.session.flush()
-                mapping_id = mapping.mapping_id
-
-                # 记录溯源事件
-                provenance = DemandProvenance(
-                    demand_id=demand_id,
-                    event_type='linked_product',
-                    event_description=f'关联商品 (ID: {product_id})',
-                    new_value=json.dumps({
-                        'product_id': product_id,
-                        'fit_score': score,
-                        'fit_level': level,
-                        'source': source
-                    }),
-                    triggered_by_phase=phase,
-                    triggered_by_method=method,
-                    triggered_by_user='system',
-                    related_data_type='product',
-                    related_data_id=product_id
-                )
-                self.session.add(provenance)
+        Returns:
+            mapping_ids: 与product_ids顺序一致的关联ID列表
+        """
+        if not (len(product_ids) == len(fit_scores) == len(fit_levels)):
+            raise ValueError("product_ids, fit_scores和fit_levels长度必须相同")
 
-            mapping_ids.append(mapping_id)
+        def link_event(product_id, value):
+            score, level = value
+            return {
+                'event_type': 'linked_product',
+                'event_description': f'关联商品 (ID: {product_id})',
+                'new_value': json.dumps({
+                    'product_id': product_id,
+                    'fit_score': score,
+                    'fit_level': level,
+                    'source': source
+                }),
+                'related_data_type': 'product',
+                'related_data_id': product_id,
+            }
 
-        self.session.commit()
-        return mapping_ids
+        return self._bulk_link(
+            DemandProductMapping, 'product_id', demand_id,
+            items=[(pid, (score, level)) for pid, score, level in zip(product_ids, fit_scores, fit_levels)],
+            values_fn=lambda value: {'fit_score': Decimal(str(value[0])), 'fit_level': value[1]},
+            source=source, phase=phase, method=method,
+            link_event_fn=link_event
+        )
 
     def link_demand_to_tokens(
         self,
@@ -335,7 +320,7 @@ class DemandProvenanceService:
         method: str
     ) -> List[int]:
         """
-        建立需求与Token的关联
+        建立需求与Token的关联（等同于bulk_link_demand_to_tokens）
 
         Args:
             demand_id: 需求ID
@@ -349,61 +334,166 @@ class DemandProvenanceService:
         Returns:
             mapping_ids: 创建的关联ID列表
         """
+        return self.bulk_link_demand_to_tokens(
+            demand_id, token_ids, token_roles, importance_scores, source, phase, method
+        )
+
+    def bulk_link_demand_to_tokens(
+        self,
+        demand_id: int,
+        token_ids: List[int],
+        token_roles: List[str],
+        importance_scores: List[float],
+        source: str,
+        phase: str,
+        method: str
+    ) -> List[int]:
+        """
+        批量建立需求与Token的关联
+
+        已有关联只更新角色和重要性，新关联批量插入并记录'linked_token'事件，整个过程一次提交
+
+        Returns:
+            mapping_ids: 与token_ids顺序一致的关联ID列表
+        """
         if not (len(token_ids) == len(token_roles) == len(importance_scores)):
             raise ValueError("token_ids, token_roles和importance_scores长度必须相同")
 
-        mapping_ids = []
+        def link_event(token_id, value):
+            role, score = value
+            return {
+                'event_type': 'linked_token',
+                'event_description': f'关联Token (ID: {token_id})',
+                'new_value': json.dumps({
+                    'token_id': token_id,
+                    'token_role': role,
+                    'importance_score': score,
+                    'source': source
+                }),
+                'related_data_type': 'token',
+                'related_data_id': token_id,
+            }
 
-        for token_id, role, score in zip(token_ids, token_roles, importance_scores):
-            # 检查是否已存在
-            existing = self.session.query(DemandTokenMapping).filter_by(
-                demand_id=demand_id,
-                token_id=token_id
-            ).first()
+        return self._bulk_link(
+            DemandTokenMapping, 'token_id', demand_id,
+            items=[(tid, (role, score)) for tid, role, score in zip(token_ids, token_roles, importance_scores)],
+            values_fn=lambda value: {'token_role': value[0], 'importance_score': Decimal(str(value[1]))},
+            source=source, phase=phase, method=method,
+            link_event_fn=link_event
+        )
 
-            if existing:
-                # 更新
-                existing.token_role = role
-                existing.importance_score = Decimal(str(score))
-                mapping_id = existing.mapping_id
-            else:
-                # 创建新关联
-                mapping = DemandTokenMapping(
-                    demand_id=demand_id,
-                    token_id=token_id,
-                    token_role=role,
-                    importance_score=Decimal(str(score)),
-                    mapping_source=source,
-                    created_by_phase=phase,
-                    created_by_method=method
-                )
-                self.session.add(mapping)
-                self.session.flush()
-                mapping_id = mapping.mapping_id
-
-                # 记录溯源事件
-                provenance = DemandProvenance(
-                    demand_id=demand_id,
-                    event_type='linked_token',
-                    event_description=f'关联Token (ID: {token_id})',
-                    new_value=json.dumps({
-                        'token_id': token_id,
-                        'token_role': role,
-                        'importance_score': score,
-                        'source': source
-                    }),
-                    triggered_by_phase=phase,
-                    triggered_by_method=method,
-                    triggered_by_user='system',
-                    related_data_type='token',
-                    related_data_id=token_id
-                )
-                self.session.add(provenance)
+    def _bulk_link(
+        self,
+        mapping_cls,
+        target_field: str,
+        demand_id: int,
+        items: List[Tuple],
+        values_fn,
+        source: str,
+        phase: str,
+        method: str,
+        link_event_fn,
+        update_event_fn=None
+    ) -> List[int]:
+        """
+        批量关联的通用实现
 
-            mapping_ids.append(mapping_id)
+        1. 一次（分块）IN查询取出已有关联
+        2. 已有关联用bulk_update_mappings更新，新关联用bulk_insert_mappings插入
+        3. 按 (demand_id, target_id) 回查新关联的mapping_id（兼容不支持RETURNING的MySQL）
+        4. 溯源事件用bulk_insert_mappings插入，最后一次提交
 
-        self.session.commit()
-        return mapping_ids
+        Args:
+            mapping_cls: 关联表模型
+            target_field: 目标ID字段名（phrase_id/product_id/token_id）
+            items: [(target_id, 原始值)]
+            values_fn: 原始值 → 关联表字段字典
+            link_event_fn: (target_id, 原始值) → 新关联的溯源事件字段
+            update_event_fn: (target_id, 旧字段值, 原始值) → 更新事件字段（None表示更新不记录事件）
+        """
+        target_col = getattr(mapping_cls, target_field)
+        value_fields = list(values_fn(items[0][1]).keys()) if items else []
+        unique_ids = list(dict.fromkeys(target_id for target_id, _ in items))
+
+        try:
+            # 1. 已有关联（同一目标有多条时取最早的一条）
+            existing = {}
+            for i in range(0, len(unique_ids), self.IN_CHUNK_SIZE):
+                chunk = unique_ids[i:i + self.IN_CHUNK_SIZE]
+                rows = self.session.query(
+                    mapping_cls.mapping_id,
+                    target_col,
+                    *[getattr(mapping_cls, field) for field in value_fields]
+                ).filter(
+                    mapping_cls.demand_id == demand_id,
+                    target_col.in_(chunk)
+                ).order_by(mapping_cls.mapping_id.desc())
+                for row in rows:
+                    existing[row[1]] = (row[0], dict(zip(value_fields, row[2:])))
+
+            # 2. 按输入顺序区分更新/新增（重复ID按顺序处理，后出现的视为更新）
+            updates = {}
+            new_rows = {}
+            events = []
+            for target_id, value in items:
+                values = values_fn(value)
+                if target_id in existing or target_id in new_rows:
+                    if target_id in existing:
+                        mapping_id, old = existing[target_id]
+                        updates[mapping_id] = {'mapping_id': mapping_id, **values}
+                        existing[target_id] = (mapping_id, values)
+                    else:
+                        old = {field: new_rows[target_id][field] for field in value_fields}
+                        new_rows[target_id].update(values)
+                    if update_event_fn:
+                        events.append(update_event_fn(target_id, old, value))
+                else:
+                    new_rows[target_id] = {
+                        'demand_id': demand_id,
+                        target_field: target_id,
+                        'mapping_source': source,
+                        'created_by_phase': phase,
+                        'created_by_method': method,
+                        **values
+                    }
+                    events.append(link_event_fn(target_id, value))
+
+            if updates:
+                self.session.bulk_update_mappings(mapping_cls, list(updates.values()))
+            if new_rows:
+                self.session.bulk_insert_mappings(mapping_cls, list(new_rows.values()))
+
+            # 3. 回查新关联的mapping_id
+            mapping_ids = {target_id: mapping_id for target_id, (mapping_id, _) in existing.items()}
+            new_ids = list(new_rows.keys())
+            for i in range(0, len(new_ids), self.IN_CHUNK_SIZE):
+                chunk = new_ids[i:i + self.IN_CHUNK_SIZE]
+                rows = self.session.query(mapping_cls.mapping_id, target_col).filter(
+                    mapping_cls.demand_id == demand_id,
+                    target_col.in_(chunk)
+                )
+                for mapping_id, target_id in rows:
+                    mapping_ids.setdefault(target_id, mapping_id)
+
+            # 4. 溯源事件
+            if events:
+                self.session.bulk_insert_mappings(DemandProvenance, [
+                    {
+                        'demand_id': demand_id,
+                        'triggered_by_phase': phase,
+                        'triggered_by_method': method,
+                        'triggered_by_user': 'system',
+                        **event
+                    }
+                    for event in events
+                ])
+
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        return [mapping_ids[target_id] for target_id, _ in items]
 
     # ==================== 3. 置信度管理 ====================
 
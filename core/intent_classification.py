@@ -11,10 +11,13 @@ Intent Classification Module
 """
 
 import re
-from typing import List, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 import sys
 
+import numpy as np
+
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -22,6 +25,97 @@ sys.path.insert(0, str(project_root))
 from ai.client import LLMClient
 
 
+# 短语切分为单词（与正则 \w 的定义一致）
+_WORD_RE = re.compile(r'\w+')
+
+# 以"边界 + 单词 + 边界"开头的模式：(^|\b|\s)单词(\b|\s)，其中的单词一定是短语里一个完整的 \w+ 片段
+_ANCHOR_WORD_RE = re.compile(r'^(?:\^|\\b|\\s)([a-z0-9]+)(?:\\b|\\s(?![*?{]))')
+
+
+class IntentPatternMatcher:
+    """
+    意图模式批量匹配引擎
+
+    所有模式只编译一次，并按锚点单词建立 单词 → 模式 查找表：
+    每条短语只做一次单词切分，只对查找表给出的候选模式运行正则
+    （没有锚点单词的模式对每条短语都是候选），得到 (短语数 × 模式数) 的命中矩阵，
+    再按原有的模式顺序和权重累加出 (短语数 × 意图数) 的得分矩阵，浮点结果与逐短语逐模式 re.search 完全一致。
+    """
+
+    def __init__(self, intent_patterns: Dict[str, Dict]):
+        """
+        Args:
+            intent_patterns: 意图识别规则（IntentClassifier.INTENT_PATTERNS 格式）
+        """
+        self.intent_names: List[str] = list(intent_patterns)
+
+        # (意图序号, 正则, 得分)，顺序与classify_phrase的累加顺序一致
+        self.patterns: List[Tuple[int, re.Pattern, float]] = []
+        for intent_idx, patterns in enumerate(intent_patterns.values()):
+            for key, factor in (('keywords', None), ('prefixes', 1.5), ('suffixes', 0.5)):
+                for pattern in patterns.get(key, []):
+                    score = patterns['weight'] if factor is None else patterns['weight'] * factor
+                    self.patterns.append((intent_idx, re.compile(pattern), score))
+
+        # 锚点单词 → 模式序号；没有锚点单词的模式总是候选
+        self.word_patterns: Dict[str, List[int]] = {}
+        self.always_candidates: List[int] = []
+        for p, (_, regex, _) in enumerate(self.patterns):
+            anchor = _ANCHOR_WORD_RE.match(regex.pattern)
+            if anchor:
+                self.word_patterns.setdefault(anchor.group(1), []).append(p)
+            else:
+                self.always_candidates.append(p)
+
+    def hit_matrix(self, phrases_lower: List[str]) -> np.ndarray:
+        """
+        命中矩阵
+
+        Args:
+            phrases_lower: 小写短语列表
+
+        Returns:
+            (len(phrases_lower), 模式数) 的bool矩阵，[i, p] 表示 re.search(模式p, 短语i) 是否命中
+        """
+        regexes = [regex for _, regex, _ in self.patterns]
+        word_patterns = self.word_patterns
+        always_candidates = self.always_candidates
+        findall = _WORD_RE.findall
+
+        rows, cols = [], []
+        for i, phrase in enumerate(phrases_lower):
+            candidates = set(always_candidates)
+            for word in findall(phrase):
+                matched = word_patterns.get(word)
+                if matched:
+                    candidates.update(matched)
+            for p in candidates:
+                if regexes[p].search(phrase):
+                    rows.append(i)
+                    cols.append(p)
+
+        hits = np.zeros((len(phrases_lower), len(self.patterns)), dtype=bool)
+        hits[rows, cols] = True
+        return hits
+
+    def score_matrix(self, phrases: List[str]) -> np.ndarray:
+        """
+        得分矩阵
+
+        Args:
+            phrases: 短语列表
+
+        Returns:
+            (len(phrases), 意图数) 的float64矩阵，列顺序同 intent_names，未命中的意图得分为0
+        """
+        hits = self.hit_matrix([phrase.lower() for phrase in phrases])
+        scores = np.zeros((len(phrases), len(self.intent_names)), dtype=np.float64)
+        # 按原累加顺序逐模式相加（未命中时加0.0，不改变结果）
+        for p, (intent_idx, _, score) in enumerate(self.patterns):
+            scores[:, intent_idx] += hits[:, p] * score
+        return scores
+
+
 class IntentClassifier:
     """
     意图分类器
@@ -95,6 +189,7 @@ class IntentClassifier:
         """
         self.use_llm = use_llm
         self.llm_client = llm_client if use_llm else None
+        self.matcher = IntentPatternMatcher(self.INTENT_PATTERNS)
 
     def classify_phrase(self, phrase: str) -> Dict:
         """
@@ -115,33 +210,23 @@ class IntentClassifier:
         """
         phrase_lower = phrase.lower()
 
-        # 计算每个意图的得分
-        intent_scores = {}
-
-        for intent_name, patterns in self.INTENT_PATTERNS.items():
-            score = 0.0
-
-            # 关键词匹配
-            if 'keywords' in patterns:
-                for keyword_pattern in patterns['keywords']:
-                    if re.search(keyword_pattern, phrase_lower):
-                        score += patterns['weight']
+        # 计算每个意图的得分（模式已预编译，按规则顺序累加）
+        scores = [0.0] * len(self.matcher.intent_names)
+        for intent_idx, regex, score in self.matcher.patterns:
+            if regex.search(phrase_lower):
+                scores[intent_idx] += score
 
-            # 前缀匹配
-            if 'prefixes' in patterns:
-                for prefix_pattern in patterns['prefixes']:
-                    if re.search(prefix_pattern, phrase_lower):
-                        score += patterns['weight'] * 1.5  # 前缀权重更高
-
-            # 后缀匹配
-            if 'suffixes' in patterns:
-                for suffix_pattern in patterns['suffixes']:
-                    if re.search(suffix_pattern, phrase_lower):
-                        score += patterns['weight'] * 0.5  # 后缀权重较低
+        intent_scores = {
+            intent_name: score
+            for intent_name, score in zip(self.matcher.intent_names, scores)
+            if score > 0
+        }
 
-            if score > 0:
-                intent_scores[intent_name] = score
+        return self._result_from_scores(intent_scores)
 
+    @staticmethod
+    def _result_from_scores(intent_scores: Dict[str, float]) -> Dict:
+        """由各意图得分（只含得分>0的意图，按规则顺序）得到分类结果"""
         # 如果没有匹配任何意图，归类为'other'
         if not intent_scores:
             return {
@@ -166,31 +251,57 @@ class IntentClassifier:
             'all_intents': normalized_scores
         }
 
-    def classify_batch(self, phrases: List[str]) -> List[Dict]:
+    def score_matrix(self, phrases: List[str], workers: int = 1, shard_size: int = 50000) -> np.ndarray:
+        """
+        批量计算意图得分矩阵
+
+        Args:
+            phrases: 短语列表
+            workers: 进程数（>1且短语数超过shard_size时分片多进程计算）
+            shard_size: 每个分片的短语数
+
+        Returns:
+            (len(phrases), 意图数) 的得分矩阵，列顺序同 INTENT_PATTERNS
+        """
+        if workers <= 1 or len(phrases) <= shard_size:
+            return self.matcher.score_matrix(phrases)
+
+        shards = [phrases[i:i + shard_size] for i in range(0, len(phrases), shard_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return np.vstack(list(executor.map(self.matcher.score_matrix, shards)))
+
+    def classify_batch(self, phrases: List[str], workers: int = 1) -> List[Dict]:
         """
-        批量分类短语意图
+        批量分类短语意图（结果与逐条classify_phrase相同）
 
         Args:
             phrases: 短语列表
+            workers: 进程数（见score_matrix）
 
         Returns:
             分类结果列表
         """
-        results = []
+        scores = self.score_matrix(phrases, workers=workers)
+        intent_names = self.matcher.intent_names
 
-        for phrase in phrases:
-            result = self.classify_phrase(phrase)
-            results.append(result)
+        results = []
+        for row in scores.tolist():
+            intent_scores = {
+                intent_name: score
+                for intent_name, score in zip(intent_names, row)
+                if score > 0
+            }
+            results.append(self._result_from_scores(intent_scores))
 
         return results
 
-    def analyze_cluster_intent(self, phrases: List[str], sample_size: int = 50) -> Dict:
+    def analyze_cluster_intent(self, phrases: List[str], sample_size: Optional[int] = 50) -> Dict:
         """
         分析聚类簇的整体意图分布
 
         Args:
             phrases: 簇中的短语列表
-            sample_size: 抽样大小
+            sample_size: 抽样大小（None表示分析全部短语）
 
         Returns:
             {
@@ -205,18 +316,53 @@ class IntentClassifier:
                 'sample_size': 50
             }
         """
-        # 限制样本大小
-        sample_size = min(sample_size, len(phrases))
+        # 批量分类
+        classifications = self.classify_batch(self._sample_phrases(phrases, sample_size))
 
-        if len(phrases) <= sample_size:
-            sample_phrases = phrases
-        else:
-            # 取前N个（按重要性排序）
-            sample_phrases = phrases[:sample_size]
+        return self._summarize_intents(classifications)
 
-        # 批量分类
-        classifications = self.classify_batch(sample_phrases)
+    def analyze_clusters_intent(
+        self,
+        clusters: Dict[int, List[str]],
+        sample_size: Optional[int] = None,
+        workers: int = 1
+    ) -> Dict[int, Dict]:
+        """
+        批量分析多个聚类簇的意图分布（所有簇的短语合并为一次批量分类）
+
+        Args:
+            clusters: {cluster_id: [短语]}
+            sample_size: 每个簇的抽样大小（None表示分析全部短语）
+            workers: 进程数（见score_matrix）
+
+        Returns:
+            {cluster_id: analyze_cluster_intent的返回结构}
+        """
+        samples = {
+            cluster_id: self._sample_phrases(phrases, sample_size)
+            for cluster_id, phrases in clusters.items()
+        }
+        all_phrases = [phrase for sample in samples.values() for phrase in sample]
+        classifications = self.classify_batch(all_phrases, workers=workers)
+
+        results = {}
+        offset = 0
+        for cluster_id, sample in samples.items():
+            results[cluster_id] = self._summarize_intents(classifications[offset:offset + len(sample)])
+            offset += len(sample)
+
+        return results
+
+    @staticmethod
+    def _sample_phrases(phrases: List[str], sample_size: Optional[int]) -> List[str]:
+        """取簇的前N个短语（按重要性排序）"""
+        if sample_size is None or len(phrases) <= sample_size:
+            return phrases
+        return phrases[:sample_size]
 
+    @staticmethod
+    def _summarize_intents(classifications: List[Dict]) -> Dict:
+        """统计一组分类结果的意图分布"""
         # 统计意图分布
         intent_counts = {}
         for classification in classifications:
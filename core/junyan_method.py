@@ -12,6 +12,9 @@ import re
 from collections import Counter, defaultdict
 from typing import List, Dict, Set, Tuple
 
+from utils.aho_corasick import AhoCorasickMatcher, replace_at
+from utils.template_matcher import TemplateMatcher, template_literals
+
 
 class JunyanTemplateExtractor:
     """君言方法 - 步骤1：从种子词提取模板"""
@@ -59,6 +62,9 @@ class JunyanTemplateExtractor:
         template_examples = defaultdict(list)  # {模板模式: [示例短语]}
         template_seeds = defaultdict(set)  # {模板模式: {匹配的种子词}}
 
+        # 一次扫描所有短语，记录每个种子词在每条短语中的出现位置
+        occurrences = self._find_seed_occurrences(seed_words)
+
         # 对每个种子词进行处理
         for i, seed in enumerate(seed_words, 1):
             if i % 10 == 0 or i == len(seed_words):
@@ -66,19 +72,16 @@ class JunyanTemplateExtractor:
 
             seed_lower = seed.lower()
 
-            # 找到包含该种子词的所有短语
-            matched_phrases = []
-            for j, phrase_l in enumerate(self.phrase_lower):
-                if seed_lower in phrase_l:
-                    matched_phrases.append((self.phrases[j], phrase_l))
-
-            if not matched_phrases:
-                continue
+            # 包含该种子词的所有短语（短语序号, 种子词起始位置列表）
+            if seed_lower:
+                matched_phrases = occurrences.get(seed_lower, [])
+            else:
+                matched_phrases = [(j, list(range(len(phrase_l) + 1)))
+                                   for j, phrase_l in enumerate(self.phrase_lower)]
 
             # 将种子词替换为占位符{X}，得到模板模式
-            for original_phrase, phrase_l in matched_phrases:
-                # 找到种子词的位置
-                pattern = phrase_l.replace(seed_lower, '{X}')
+            for j, starts in matched_phrases:
+                pattern = replace_at(self.phrase_lower[j], starts, len(seed_lower), '{X}')
 
                 # 统计模板
                 template_patterns[pattern] += 1
@@ -86,7 +89,7 @@ class JunyanTemplateExtractor:
 
                 # 保存示例（最多5个）
                 if len(template_examples[pattern]) < 5:
-                    template_examples[pattern].append(original_phrase)
+                    template_examples[pattern].append(self.phrases[j])
 
         # 按频次排序，过滤低频模板
         templates = []
@@ -110,6 +113,22 @@ class JunyanTemplateExtractor:
 
         return templates
 
+    def _find_seed_occurrences(self, seed_words: List[str]) -> Dict[str, List[Tuple[int, List[int]]]]:
+        """
+        用Aho-Corasick自动机一次扫描全部短语，找出每个种子词的所有出现位置
+
+        Returns:
+            {种子词小写: [(短语序号, [起始位置, ...]), ...]}（短语按原顺序）
+        """
+        matcher = AhoCorasickMatcher(seed.lower() for seed in seed_words)
+        print(f"[匹配] 多模式匹配引擎: Aho-Corasick ({matcher.backend})")
+
+        occurrences = defaultdict(list)
+        for j, phrase_l in enumerate(self.phrase_lower):
+            for pattern_id, starts in matcher.find_all(phrase_l).items():
+                occurrences[matcher.patterns[pattern_id]].append((j, starts))
+        return occurrences
+
 
 class JunyanVariableExtractor:
     """君言方法 - 步骤2：从模板提取变量"""
@@ -178,47 +197,48 @@ class JunyanVariableExtractor:
         first_char_freq = Counter()
         last_char_freq = Counter()
 
+        # 所有模板编译进一个多模板匹配器，每条短语只扫描一次
+        matcher = TemplateMatcher([
+            (self._template_to_regex(template), template_literals(template, r'\{X\}'))
+            for template in templates
+        ])
+        template_hits = matcher.match_all(self.phrase_lower)
+
         # 对每个模板进行处理
         for i, template in enumerate(templates, 1):
             print(f"  处理模板 {i}/{len(templates)}: \"{template}\"")
 
-            # 将模板转换为正则表达式
-            regex_pattern = self._template_to_regex(template)
-            if not regex_pattern:
+            if matcher.regexes[i - 1] is None:
                 continue
 
-            regex = re.compile(regex_pattern, re.IGNORECASE)
-
-            # 匹配所有短语
+            # 该模板匹配到的短语
             matched_count = 0
-            for phrase_l in self.phrase_lower:
-                match = regex.search(phrase_l)
-                if match:
-                    # 提取变量
-                    variable = match.group(1).strip()
-
-                    # 过滤空变量和停用词
-                    if not variable or variable in stop_words_set:
-                        continue
-
-                    # 过滤过短的变量
-                    if len(variable) < 2:
-                        continue
-
-                    # 统计
-                    variable_freq[variable] += 1
-                    variable_templates[variable].add(template)
-
-                    # 记录模板-变量映射
-                    if variable not in template_variable_map[template]:
-                        template_variable_map[template].append(variable)
-
-                    # 统计首字/末字
-                    if len(variable) > 0:
-                        first_char_freq[variable[0]] += 1
-                        last_char_freq[variable[-1]] += 1
-
-                    matched_count += 1
+            for _, match in template_hits[i - 1]:
+                # 提取变量
+                variable = match.group(1).strip()
+
+                # 过滤空变量和停用词
+                if not variable or variable in stop_words_set:
+                    continue
+
+                # 过滤过短的变量
+                if len(variable) < 2:
+                    continue
+
+                # 统计
+                variable_freq[variable] += 1
+                variable_templates[variable].add(template)
+
+                # 记录模板-变量映射
+                if variable not in template_variable_map[template]:
+                    template_variable_map[template].append(variable)
+
+                # 统计首字/末字
+                if len(variable) > 0:
+                    first_char_freq[variable[0]] += 1
+                    last_char_freq[variable[-1]] += 1
+
+                matched_count += 1
 
             print(f"    匹配到 {matched_count} 条数据")
 
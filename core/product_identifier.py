@@ -13,25 +13,30 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from ai.client import LLMClient
+from ai.batch_planner import BatchPlanner, estimate_tokens
 
 
 class ProductIdentifier:
     """产品实体识别器：用DeepSeek AI识别真实产品"""
 
-    def __init__(self):
-        self.llm = LLMClient(provider="deepseek")
+    MAX_TOKENS = 2000  # 单次识别请求的最大输出token数
+
+    def __init__(self, provider: str = "deepseek"):
+        self.llm = LLMClient(provider=provider)
 
     def identify_products_from_variables(
         self,
         valid_variables: List[Dict],
-        batch_size: int = 10
+        batch_size: int = None
     ) -> List[Dict]:
         """
         从变量中识别产品实体
 
+        批次按token预算打包，解析失败的批次二分重试
+
         Args:
             valid_variables: 通过交叉验证的高质量变量
-            batch_size: 批量处理大小
+            batch_size: 单批最大条数（None表示使用LLM_BATCH_CONFIG中的配置）
 
         Returns:
             识别出的产品实体列表
@@ -40,33 +45,42 @@ class ProductIdentifier:
         print("Phase 7: Product Entity Identification with DeepSeek AI".center(70))
         print("="*70)
 
-        products = []
-        total_batches = (len(valid_variables) + batch_size - 1) // batch_size
+        planner = BatchPlanner(
+            'product_identification',
+            max_completion_tokens=self.MAX_TOKENS,
+            prompt_overhead_tokens=300,
+            prompt_tokens_fn=lambda var: estimate_tokens(var['variable_text']) + 16,
+            # 输出格式: variable_text/is_product/category/description/commercial_value
+            completion_tokens_fn=lambda var: estimate_tokens(var['variable_text']) + 55,
+            max_items=batch_size,
+        )
 
-        print(f"\n[Processing] {len(valid_variables)} variables in {total_batches} batches...")
+        print(f"\n[Processing] {len(valid_variables)} variables (batches planned by token budget)...")
 
-        for i in range(0, len(valid_variables), batch_size):
-            batch = valid_variables[i:i+batch_size]
-            batch_num = i // batch_size + 1
+        request_count = 0
 
-            print(f"\n  Batch {batch_num}/{total_batches}: Processing {len(batch)} variables...")
+        def identify(batch: List[Dict]) -> List[Dict]:
+            """单次请求：进度输出 + 请求间隔（二分重试的子批次同样计入）"""
+            nonlocal request_count
+            request_count += 1
+            # 避免API限流
+            if request_count > 1:
+                time.sleep(1)
 
-            # 批量识别
+            print(f"\n  Request {request_count}: Processing {len(batch)} variables...")
             batch_products = self._identify_batch(batch)
-            products.extend(batch_products)
-
             print(f"    Identified {len(batch_products)} products from this batch")
+            return batch_products
 
-            # 避免API限流
-            if batch_num < total_batches:
-                time.sleep(1)
+        # 一次规划、一次执行：解析失败的批次二分重试，单条失败视为非产品
+        products = planner.run(valid_variables, identify, lambda failed: [])
 
         print(f"\n[Result] Total products identified: {len(products)}")
 
         return products
 
     def _identify_batch(self, variables: List[Dict]) -> List[Dict]:
-        """批量识别产品"""
+        """批量识别产品（响应无法解析时抛出ValueError）"""
 
         # 构建批量识别的prompt
         variable_list = []
@@ -106,53 +120,48 @@ Return ONLY a JSON array with this exact structure:
 
 Return ONLY valid JSON, no markdown formatting, no explanation."""
 
-        try:
-            response = self.llm._call_llm(
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=2000
-            )
+        response = self.llm._call_llm(
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=self.MAX_TOKENS
+        )
+
+        # 清理响应（移除可能的markdown格式）
+        response = response.strip()
+        if response.startswith("```json"):
+            response = response[7:]
+        if response.startswith("```"):
+            response = response[3:]
+        if response.endswith("```"):
+            response = response[:-3]
+        response = response.strip()
+
+        # 解析JSON（失败时抛出ValueError，由BatchPlanner拆分重试）
+        results = json.loads(response)
+
+        # 只保留识别为产品的结果
+        products = []
+        for result in results:
+            if result.get('is_product', False):
+                # 找到原始变量数据
+                original_var = next(
+                    (v for v in variables if v['variable_text'] == result['variable_text']),
+                    None
+                )
+
+                if original_var:
+                    products.append({
+                        'product_name': result['variable_text'],
+                        'category': result['category'],
+                        'description': result['description'],
+                        'commercial_value': result['commercial_value'],
+                        'frequency': original_var['frequency'],
+                        'template_match_count': original_var['template_match_count'],
+                        'total_volume': original_var['total_volume'],
+                        'cross_validation_score': original_var['cross_validation_score']
+                    })
 
-            # 清理响应（移除可能的markdown格式）
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.startswith("```"):
-                response = response[3:]
-            if response.endswith("```"):
-                response = response[:-3]
-            response = response.strip()
-
-            # 解析JSON
-            results = json.loads(response)
-
-            # 只保留识别为产品的结果
-            products = []
-            for result in results:
-                if result.get('is_product', False):
-                    # 找到原始变量数据
-                    original_var = next(
-                        (v for v in variables if v['variable_text'] == result['variable_text']),
-                        None
-                    )
-
-                    if original_var:
-                        products.append({
-                            'product_name': result['variable_text'],
-                            'category': result['category'],
-                            'description': result['description'],
-                            'commercial_value': result['commercial_value'],
-                            'frequency': original_var['frequency'],
-                            'template_match_count': original_var['template_match_count'],
-                            'total_volume': original_var['total_volume'],
-                            'cross_validation_score': original_var['cross_validation_score']
-                        })
-
-            return products
-
-        except Exception as e:
-            print(f"    [ERROR] Failed to process batch: {str(e)}")
-            return []
+        return products
 
 
 def run_product_identification_pipeline():
@@ -182,8 +191,7 @@ def run_product_identification_pipeline():
     print("\n[Step 2] Identifying products with DeepSeek AI...")
     identifier = ProductIdentifier()
     products = identifier.identify_products_from_variables(
-        valid_variables=valid_variables,
-        batch_size=10
+        valid_variables=valid_variables
     )
 
     # 3. 按商业价值排序
@@ -19,8 +19,9 @@ import json
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from storage.models import Phrase
+from config.settings import NGRAM_INDEX_FILE
 from storage.repository import PhraseRepository
+from utils.ngram_index import NGramIndex
 
 
 class NGramAnalyzer:
@@ -76,11 +77,17 @@ class NGramAnalyzer:
     def analyze_all_ngrams(
         self,
         phrases: List[str],
-        min_freq: int = 3
+        min_freq: int = 3,
+        ngram_index: NGramIndex = None
     ) -> Dict[str, Counter]:
         """
         分析所有类型的N-gram（2/3/4-gram）
 
+        Args:
+            phrases: 短语列表
+            min_freq: 最小频次过滤
+            ngram_index: 已建好的n-gram倒排索引（None时一次扫描短语构建）
+
         Returns:
             {
                 'bigrams': Counter(...),
@@ -90,21 +97,22 @@ class NGramAnalyzer:
         """
         print(f"\n[Analyzing N-grams] From {len(phrases)} phrases...")
 
+        if ngram_index is None:
+            print("  Building 2/3/4-gram index (single pass)...")
+            ngram_index = NGramIndex.build(phrases, ngram_sizes=(2, 3, 4))
+
         results = {}
 
         # 2-gram
-        print("  Extracting 2-grams...")
-        results['bigrams'] = self.extract_ngrams(phrases, n=2, min_freq=min_freq)
+        results['bigrams'] = ngram_index.counter(2, min_freq=min_freq)
         print(f"    Found {len(results['bigrams'])} unique 2-grams (freq >= {min_freq})")
 
         # 3-gram
-        print("  Extracting 3-grams...")
-        results['trigrams'] = self.extract_ngrams(phrases, n=3, min_freq=min_freq)
+        results['trigrams'] = ngram_index.counter(3, min_freq=min_freq)
         print(f"    Found {len(results['trigrams'])} unique 3-grams (freq >= {min_freq})")
 
         # 4-gram
-        print("  Extracting 4-grams...")
-        results['fourgrams'] = self.extract_ngrams(phrases, n=4, min_freq=max(2, min_freq-1))
+        results['fourgrams'] = ngram_index.counter(4, min_freq=max(2, min_freq-1))
         print(f"    Found {len(results['fourgrams'])} unique 4-grams (freq >= {max(2, min_freq-1)})")
 
         return results
@@ -121,19 +129,26 @@ class TemplateDiscoverer:
         self,
         ngram_results: Dict[str, Counter],
         phrases: List[str],
-        min_template_freq: int = 10
+        min_template_freq: int = 10,
+        ngram_index: NGramIndex = None
     ) -> List[Dict]:
         """
         从N-gram中发现模板
 
         策略：
         1. 高频N-gram作为模板候选的"锚点"
-        2. 找到包含这个锚点的所有短语
+        2. 找到包含这个锚点的所有短语（查n-gram倒排表）
         3. 分析这些短语的共同结构
         4. 提取固定部分和可变部分，形成模板
+
+        Args:
+            ngram_index: 与phrases对应的n-gram倒排索引（需包含3/4-gram，None时现场构建）
         """
         print(f"\n[Discovering Templates] From N-grams...")
 
+        if ngram_index is None:
+            ngram_index = NGramIndex.build(phrases, ngram_sizes=(3, 4))
+
         templates = []
 
         # 从trigrams和fourgrams中寻找模板（它们更有结构性）
@@ -161,6 +176,7 @@ class TemplateDiscoverer:
             template = self._extract_template_from_anchor(
                 anchor=anchor,
                 phrases=phrases,
+                ngram_index=ngram_index,
                 min_matches=min_template_freq
             )
 
@@ -175,6 +191,7 @@ class TemplateDiscoverer:
         self,
         anchor: str,
         phrases: List[str],
+        ngram_index: NGramIndex,
         min_matches: int = 10
     ) -> Dict:
         """
@@ -189,9 +206,8 @@ class TemplateDiscoverer:
         matching_phrases = ["best laptop for gaming", "best laptop for students", ...]
         → 模板: "best laptop for {X}"
         """
-        # 找到所有包含这个锚点的短语
-        anchor_lower = anchor.lower()
-        matching_phrases = [p for p in phrases if anchor_lower in p.lower()]
+        # 找到所有包含这个锚点的短语（锚点是按词切分得到的n-gram，直接查倒排表）
+        matching_phrases = ngram_index.ngram_phrases(' '.join(anchor.lower().split()), phrases)
 
         if len(matching_phrases) < min_matches:
             return None
@@ -366,15 +382,15 @@ def run_template_discovery():
     # 1. 加载数据
     print("\n[Step 1] Loading phrases from database...")
     with PhraseRepository() as repo:
-        phrases_db = repo.session.query(Phrase).all()
+        phrases = [row[0] for rows in repo.stream_phrases(('phrase',)) for row in rows]
 
-    phrases = [p.phrase for p in phrases_db]
     print(f"  Loaded {len(phrases)} phrases")
 
-    # 2. N-gram分析
+    # 2. N-gram分析（倒排索引持久化在缓存目录，短语没变时直接复用）
     print("\n[Step 2] Analyzing N-grams...")
+    ngram_index = NGramIndex.load_or_build(phrases, NGRAM_INDEX_FILE)
     analyzer = NGramAnalyzer()
-    ngram_results = analyzer.analyze_all_ngrams(phrases, min_freq=5)
+    ngram_results = analyzer.analyze_all_ngrams(phrases, min_freq=5, ngram_index=ngram_index)
 
     # 3. 模板发现
     print("\n[Step 3] Discovering templates...")
@@ -382,7 +398,8 @@ def run_template_discovery():
     templates = discoverer.discover_templates_from_ngrams(
         ngram_results=ngram_results,
         phrases=phrases,
-        min_template_freq=10
+        min_template_freq=10,
+        ngram_index=ngram_index
     )
 
     # 4. 模板质量过滤
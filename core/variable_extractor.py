@@ -13,8 +13,8 @@ import json
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from storage.models import Phrase
 from storage.repository import PhraseRepository
+from utils.template_matcher import TemplateMatcher, template_literals
 
 
 class VariableExtractor:
@@ -57,6 +57,15 @@ class VariableExtractor:
 
         print(f"\n[Processing] Applying {len(self.templates)} templates to {len(phrases)} phrases...")
 
+        # 所有模板编译进一个多模板匹配器：短语只转一次小写，每条短语只对锚点命中的候选模板跑正则
+        compiled = [self._template_to_regex(template['template_pattern']) for template in self.templates]
+        matcher = TemplateMatcher([
+            (regex_pattern, template_literals(template['template_pattern']))
+            for template, (regex_pattern, _) in zip(self.templates, compiled)
+        ])
+        phrases_lower = [phrase.lower() for phrase in phrases]
+        template_hits = matcher.match_all(phrases_lower)
+
         # 对每个模板提取变量
         for i, template in enumerate(self.templates, 1):
             if i % 5 == 0:
@@ -64,7 +73,10 @@ class VariableExtractor:
 
             matches = self._apply_template_to_phrases(
                 template=template,
+                capture_info=compiled[i - 1][1],
+                hits=template_hits[i - 1],
                 phrases=phrases,
+                phrases_lower=phrases_lower,
                 phrase_volumes=phrase_volumes
             )
 
@@ -80,46 +92,41 @@ class VariableExtractor:
     def _apply_template_to_phrases(
         self,
         template: Dict,
+        capture_info: Dict,
+        hits: List[Tuple[int, re.Match]],
         phrases: List[str],
+        phrases_lower: List[str],
         phrase_volumes: Dict[str, int]
     ) -> List[Dict]:
-        """对短语应用模板，提取变量"""
+        """把模板在短语上的匹配结果（[(短语序号, 匹配对象)]）转换为变量匹配记录"""
         matches = []
-
-        # 将模板模式转换为正则表达式
         pattern = template['template_pattern']
-        regex_pattern, capture_info = self._template_to_regex(pattern)
-
-        if not regex_pattern:
-            return matches
-
-        regex = re.compile(regex_pattern, re.IGNORECASE)
-
-        for phrase in phrases:
-            match = regex.search(phrase.lower())
-            if match:
-                # 提取变量值
-                variables = {}
-                for i, group in enumerate(match.groups(), 1):
-                    slot = f"slot_{i}"
-                    variables[slot] = group.strip()
-
-                # 分解短语为：前缀、变量、后缀
-                decomposition = self._decompose_phrase(phrase, match, pattern, capture_info)
-
-                matches.append({
-                    'phrase': phrase,
-                    'phrase_lower': phrase.lower(),
-                    'volume': phrase_volumes.get(phrase, 0),
-                    'template_anchor': template['anchor'],
-                    'template_pattern': pattern,
-                    'variables': variables,
-                    # 新增：详细分解
-                    'prefix': decomposition['prefix'],
-                    'suffix': decomposition['suffix'],
-                    'middle_parts': decomposition['middle_parts'],  # 中间穿插的固定部分
-                    'variable_positions': decomposition['variable_positions']
-                })
+
+        for phrase_index, match in hits:
+            phrase = phrases[phrase_index]
+
+            # 提取变量值
+            variables = {}
+            for i, group in enumerate(match.groups(), 1):
+                slot = f"slot_{i}"
+                variables[slot] = group.strip()
+
+            # 分解短语为：前缀、变量、后缀
+            decomposition = self._decompose_phrase(phrase, match, pattern, capture_info)
+
+            matches.append({
+                'phrase': phrase,
+                'phrase_lower': phrases_lower[phrase_index],
+                'volume': phrase_volumes.get(phrase, 0),
+                'template_anchor': template['anchor'],
+                'template_pattern': pattern,
+                'variables': variables,
+                # 新增：详细分解
+                'prefix': decomposition['prefix'],
+                'suffix': decomposition['suffix'],
+                'middle_parts': decomposition['middle_parts'],  # 中间穿插的固定部分
+                'variable_positions': decomposition['variable_positions']
+            })
 
         return matches
 
@@ -374,11 +381,13 @@ def run_variable_extraction_pipeline():
 
     # 2. 加载短语数据
     print("\n[Step 2] Loading phrases from database...")
+    phrases = []
+    phrase_volumes = {}
     with PhraseRepository() as repo:
-        phrases_db = repo.session.query(Phrase).all()
-
-    phrases = [p.phrase for p in phrases_db]
-    phrase_volumes = {p.phrase: p.volume for p in phrases_db}
+        for rows in repo.stream_phrases(('phrase', 'volume')):
+            for phrase, volume in rows:
+                phrases.append(phrase)
+                phrase_volumes[phrase] = volume
 
     print(f"  Loaded {len(phrases)} phrases")
 
@@ -0,0 +1,124 @@
+"""
+列加载器基准测试：ORM实体加载 vs 只读列加载（storage/read_models.py）
+
+在临时SQLite数据库中生成N行word_segments，分别测量：
+- orm:        query(WordSegment).all() 后构建 Counter/词性/翻译（旧版load_all_tokens）
+- rows:       load_token_rows 元组 → 同样的Counter/词性/翻译（新版load_all_tokens）
+- frame:      select_frame → pandas DataFrame
+- structured: select_structured → NumPy结构化数组
+
+运行方式:
+    python scripts/benchmark_column_loaders.py [--rows 1000000]
+"""
+import sys
+import gc
+import time
+import argparse
+import tempfile
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from storage.models import Base, WordSegment
+from storage.read_models import load_token_rows, select_frame, select_structured
+
+
+def build_database(db_path: Path, rows: int):
+    """生成测试数据：约1/3单词带词性，1/2带翻译"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine, tables=[WordSegment.__table__])
+
+    chunk = 50000
+    with engine.begin() as conn:
+        for start in range(0, rows, chunk):
+            conn.execute(insert(WordSegment.__table__), [
+                {
+                    'word': f"word{i}" if i % 3 == 0 else f"word{i} phrase",
+                    'frequency': i % 97 + 1,
+                    'word_count': 1 if i % 3 == 0 else 2,
+                    'pos_tag': 'NN' if i % 3 == 0 else None,
+                    'pos_category': 'Noun' if i % 3 == 0 else None,
+                    'pos_chinese': '名词' if i % 3 == 0 else None,
+                    'translation': f"翻译{i}" if i % 2 == 0 else None,
+                }
+                for i in range(start, min(start + chunk, rows))
+            ])
+    return engine
+
+
+def load_orm(session):
+    token_counter, pos_tags, translations = Counter(), {}, {}
+    for ws in session.query(WordSegment).filter(WordSegment.frequency >= 1).all():
+        token_counter[ws.word] = ws.frequency
+        if ws.word_count == 1 and ws.pos_tag:
+            pos_tags[ws.word] = (ws.pos_tag, ws.pos_category, ws.pos_chinese)
+        if ws.translation:
+            translations[ws.word] = ws.translation
+    return token_counter, pos_tags, translations
+
+
+def load_rows(session):
+    token_counter, pos_tags, translations = Counter(), {}, {}
+    for word, frequency, word_count, pos_tag, pos_category, pos_chinese, translation \
+            in load_token_rows(session, 1):
+        token_counter[word] = frequency
+        if word_count == 1 and pos_tag:
+            pos_tags[word] = (pos_tag, pos_category, pos_chinese)
+        if translation:
+            translations[word] = translation
+    return token_counter, pos_tags, translations
+
+
+def load_frame(session):
+    return select_frame(session, (WordSegment.word, WordSegment.frequency, WordSegment.translation))
+
+
+def load_structured(session):
+    return select_structured(session, (WordSegment.word, WordSegment.frequency, WordSegment.word_count))
+
+
+def measure(name: str, fn, Session):
+    session = Session()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(session)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    session.close()
+    size = len(result[0]) if isinstance(result, tuple) else len(result)
+    print(f"  {name:<12} {elapsed:>8.2f}s   峰值内存 {peak / 1024 / 1024:>8.1f} MB   {size} 行")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列加载器基准测试')
+    parser.add_argument('--rows', type=int, default=1000000, help='word_segments行数（默认1000000）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'benchmark.db'
+        print(f"生成 {args.rows} 行word_segments...")
+        engine = build_database(db_path, args.rows)
+        Session = sessionmaker(bind=engine)
+
+        print("\n加载方式       耗时        峰值内存")
+        orm_result = measure('orm', load_orm, Session)
+        rows_result = measure('rows', load_rows, Session)
+        measure('frame', load_frame, Session)
+        measure('structured', load_structured, Session)
+
+        assert orm_result == rows_result, "ORM加载与列加载结果不一致"
+        print("\n✓ orm与rows结果一致")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
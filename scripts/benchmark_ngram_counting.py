@@ -0,0 +1,106 @@
+"""
+n-gram计数基准测试：字符串Counter实现 vs 整数词表实现（utils/ngram_counter.py）
+
+生成N条模拟关键词短语（Zipf分布词表，1~8个词），分别用
+segment_keywords_unified(engine='python') 和 engine='numpy' 统计1-6-gram，
+比较耗时、峰值内存并校验结果一致。--workers 大于1时再测量分片多进程模式
+（峰值内存只统计主进程）。
+
+运行方式:
+    python scripts/benchmark_ngram_counting.py [--phrases 1000000] [--min-frequency 2] [--workers 4]
+"""
+import sys
+import gc
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+
+from utils.keyword_segmentation import segment_keywords_unified
+from utils.ngram_counter import count_ngrams_sharded
+
+
+class BenchmarkPhrase:
+    """模拟Phrase对象（只需phrase和seed_word属性）"""
+    __slots__ = ('phrase', 'seed_word')
+
+    def __init__(self, phrase: str, seed_word: str):
+        self.phrase = phrase
+        self.seed_word = seed_word
+
+
+def generate_phrases(count: int, vocab_size: int = 50000, seeds: int = 200, seed: int = 42):
+    """生成模拟短语：词频服从Zipf分布，长度1~8"""
+    rng = np.random.default_rng(seed)
+    vocab = [''.join(chr(97 + int(c)) for c in rng.integers(0, 26, rng.integers(3, 9)))
+             for _ in range(vocab_size)]
+    seed_words = [vocab[i] for i in range(seeds)]
+
+    lengths = rng.integers(1, 9, count)
+    word_ids = np.minimum(rng.zipf(1.2, int(lengths.sum())) - 1, vocab_size - 1)
+    seed_ids = rng.integers(0, seeds, count)
+
+    phrases = []
+    offset = 0
+    for i, length in enumerate(lengths.tolist()):
+        words = [vocab[w] for w in word_ids[offset:offset + length].tolist()]
+        offset += length
+        phrases.append(BenchmarkPhrase(' '.join(words), seed_words[seed_ids[i]]))
+    return phrases
+
+
+def measure(name: str, phrases, stopwords, min_frequency: int, engine: str, workers: int = 1):
+    """先单独计时，再在tracemalloc下重跑一次取峰值内存（tracemalloc会显著拖慢计时）"""
+    def run():
+        if workers > 1:
+            return count_ngrams_sharded(phrases, stopwords, min_frequency=min_frequency, workers=workers)
+        return segment_keywords_unified(phrases, stopwords, min_frequency=min_frequency,
+                                        engine=engine, workers=1)
+
+    gc.collect()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {name:<8} {elapsed:>8.2f}s   峰值内存 {peak / 1024 / 1024:>8.1f} MB   {len(result[0])} 个token")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='n-gram计数基准测试')
+    parser.add_argument('--phrases', type=int, default=1000000, help='短语数量（默认1000000）')
+    parser.add_argument('--min-frequency', type=int, default=2, help='最小频次阈值（默认2）')
+    parser.add_argument('--workers', type=int, default=1, help='分片多进程模式的进程数（默认1，不测量）')
+    args = parser.parse_args()
+
+    print(f"生成 {args.phrases} 条短语...")
+    phrases = generate_phrases(args.phrases)
+    stopwords = {"for", "the", "of", "in", "on", "at", "to", "and", "or"}
+
+    print("\n引擎          耗时        峰值内存")
+    python_result = measure('python', phrases, stopwords, args.min_frequency, 'python')
+    numpy_result = measure('numpy', phrases, stopwords, args.min_frequency, 'numpy')
+
+    results = {'numpy': numpy_result}
+    if args.workers > 1:
+        results[f'{args.workers}进程'] = measure(f'x{args.workers}', phrases, stopwords, args.min_frequency,
+                                                'numpy', workers=args.workers)
+
+    for name, result in results.items():
+        assert python_result == result, f"python与{name}结果不一致"
+        assert list(python_result[0]) == list(result[0]), f"python与{name}输出顺序不一致"
+    print(f"\n✓ python与{'/'.join(results)}结果一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+来源词根表内存对比：dict[str, set]（原结构） vs SeedProvenance（词根ID的CSR表）
+
+生成N条模拟关键词短语（与benchmark_ngram_counting.py相同的分布），
+用segment_keywords_with_seed_tracking得到word_to_seeds/ngram_to_seeds，
+分别统计两种结构额外占用的内存（token字符串和词根名两种结构共享，不计入），
+并校验内容一致。
+
+运行方式:
+    python scripts/benchmark_seed_provenance.py [--phrases 1000000] [--seeds 500] [--min-frequency 2]
+"""
+import sys
+import gc
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmark_ngram_counting import generate_phrases
+from utils.keyword_segmentation import segment_keywords_with_seed_tracking
+
+
+def dict_of_sets_bytes(token_to_seeds: dict) -> int:
+    """dict[str, set] 的容器开销：dict本身 + 每个token的set对象"""
+    return sys.getsizeof(token_to_seeds) + sum(sys.getsizeof(seeds) for seeds in token_to_seeds.values())
+
+
+def traced_bytes(build) -> int:
+    """tracemalloc实测构建结果后仍存活的内存"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description='来源词根表内存对比')
+    parser.add_argument('--phrases', type=int, default=1000000, help='短语数量（默认1000000）')
+    parser.add_argument('--seeds', type=int, default=500, help='词根数量（默认500）')
+    parser.add_argument('--min-frequency', type=int, default=2, help='最小频次阈值（默认2）')
+    args = parser.parse_args()
+
+    print(f"生成 {args.phrases} 条短语（{args.seeds} 个词根）...")
+    phrases = generate_phrases(args.phrases, seeds=args.seeds)
+    stopwords = {"for", "the", "of", "in", "on", "at", "to", "and", "or"}
+
+    start = time.perf_counter()
+    _, word_to_seeds, _, ngram_to_seeds = segment_keywords_with_seed_tracking(
+        phrases, stopwords, min_ngram_frequency=args.min_frequency
+    )
+    print(f"分词耗时 {time.perf_counter() - start:.2f}s，"
+          f"{len(word_to_seeds)} 个单词 + {len(ngram_to_seeds)} 个短语，"
+          f"{word_to_seeds.indices.size + ngram_to_seeds.indices.size} 条词根关联")
+
+    print("\n结构                     估算(getsizeof)     实测(tracemalloc)")
+    rows = []
+    for name, provenance in (('word_to_seeds', word_to_seeds), ('ngram_to_seeds', ngram_to_seeds)):
+        as_sets = provenance.to_sets()
+        assert {token: frozenset(seeds) for token, seeds in as_sets.items()} == dict(provenance.items()), \
+            f"{name} 内容不一致"
+
+        sets_estimate = dict_of_sets_bytes(as_sets)
+        # 新建set副本时复用已有的token和词根名字符串，只统计容器本身
+        sets_traced = traced_bytes(lambda: {token: set(seeds) for token, seeds in as_sets.items()})
+        csr_traced = traced_bytes(lambda: provenance.subset(provenance))
+        rows.append((sets_estimate, provenance.nbytes))
+
+        print(f"  {name:<15} dict[str, set] {sets_estimate / 1024 / 1024:>9.1f} MB   {sets_traced / 1024 / 1024:>9.1f} MB")
+        print(f"  {name:<15} SeedProvenance {provenance.nbytes / 1024 / 1024:>9.1f} MB   {csr_traced / 1024 / 1024:>9.1f} MB")
+
+    sets_total = sum(r[0] for r in rows)
+    csr_total = sum(r[1] for r in rows)
+    print(f"\n✓ 内容一致，合计 {sets_total / 1024 / 1024:.1f} MB → {csr_total / 1024 / 1024:.1f} MB"
+          f"（{sets_total / max(csr_total, 1):.1f}x）")
+
+
+if __name__ == "__main__":
+    main()
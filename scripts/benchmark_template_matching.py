@@ -0,0 +1,108 @@
+"""
+多模板匹配基准测试：逐模板逐短语 regex.search（原实现） vs TemplateMatcher（utils/template_matcher.py）
+
+生成M个模板（"best {X}"、"{X} for sale"、"{X} vs {X}" 这类1~3个字面片段的模板）
+和N条模拟关键词短语（约一半套用某个模板），分别用两种方式匹配全部短语，
+比较耗时并校验每个模板匹配到的短语及捕获内容一致。
+
+运行方式:
+    python scripts/benchmark_template_matching.py [--templates 200] [--phrases 1000000]
+"""
+import sys
+import re
+import time
+import random
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.variable_extractor import VariableExtractor
+from utils.template_matcher import TemplateMatcher, template_literals
+
+
+def generate_data(template_count: int, phrase_count: int, seed: int = 42):
+    """生成模板和短语：词表随机小写单词，短语约一半由模板填充变量得到"""
+    rng = random.Random(seed)
+    vocab = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 8)))
+             for _ in range(20000)]
+
+    templates = set()
+    while len(templates) < template_count:
+        literals = [' '.join(rng.sample(vocab[:2000], rng.randint(1, 2))) for _ in range(rng.randint(1, 3))]
+        shape = rng.randint(0, 2)
+        if shape == 0:
+            pattern = ' {X} '.join(literals) + ' {X}'
+        elif shape == 1:
+            pattern = '{X} ' + ' {X} '.join(literals)
+        else:
+            pattern = ' {X} '.join(literals)
+        if '{X}' in pattern:
+            templates.add(pattern)
+    templates = sorted(templates)
+
+    phrases = []
+    for _ in range(phrase_count):
+        if rng.random() < 0.5:
+            pattern = rng.choice(templates)
+            while '{X}' in pattern:
+                pattern = pattern.replace('{X}', ' '.join(rng.choices(vocab, k=rng.randint(1, 2))), 1)
+            phrases.append(pattern)
+        else:
+            phrases.append(' '.join(rng.choices(vocab, k=rng.randint(2, 8))))
+    return templates, phrases
+
+
+def match_naive(regex_patterns, phrases):
+    """原实现：每个模板编译一次正则，对每条短语重新转小写并search"""
+    results = []
+    for regex_pattern in regex_patterns:
+        regex = re.compile(regex_pattern, re.IGNORECASE)
+        hits = []
+        for j, phrase in enumerate(phrases):
+            match = regex.search(phrase.lower())
+            if match:
+                hits.append((j, match.groups()))
+        results.append(hits)
+    return results
+
+
+def match_indexed(regex_patterns, templates, phrases):
+    """TemplateMatcher：锚点自动机筛候选模板，短语只转一次小写"""
+    matcher = TemplateMatcher([
+        (regex_pattern, template_literals(template))
+        for regex_pattern, template in zip(regex_patterns, templates)
+    ])
+    phrases_lower = [phrase.lower() for phrase in phrases]
+    buckets = matcher.match_all(phrases_lower)
+    return [[(j, match.groups()) for j, match in hits] for hits in buckets], matcher.backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多模板匹配基准测试')
+    parser.add_argument('--templates', type=int, default=200, help='模板数量（默认200）')
+    parser.add_argument('--phrases', type=int, default=1000000, help='短语数量（默认1000000）')
+    args = parser.parse_args()
+
+    print(f"生成 {args.templates} 个模板、{args.phrases} 条短语...")
+    templates, phrases = generate_data(args.templates, args.phrases)
+    extractor = VariableExtractor(discovered_templates=[])
+    regex_patterns = [extractor._template_to_regex(template)[0] for template in templates]
+
+    start = time.perf_counter()
+    indexed, backend = match_indexed(regex_patterns, templates, phrases)
+    indexed_elapsed = time.perf_counter() - start
+    print(f"  TemplateMatcher ({backend}) {indexed_elapsed:>8.2f}s   {sum(map(len, indexed))} 个匹配")
+
+    start = time.perf_counter()
+    naive = match_naive(regex_patterns, phrases)
+    naive_elapsed = time.perf_counter() - start
+    print(f"  逐模板正则              {naive_elapsed:>8.2f}s   {sum(map(len, naive))} 个匹配")
+
+    assert naive == indexed, "两种方式匹配结果不一致"
+    print(f"\n✓ 结果一致，加速 {naive_elapsed / indexed_elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
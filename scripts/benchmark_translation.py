@@ -0,0 +1,89 @@
+"""
+批量翻译对比：原逐批串行（固定间隔 + 失败逐词回退） vs TranslationService（按字符装箱 + 线程池并发 + 退避重试）
+
+用本地StubTranslator模拟翻译服务（固定请求延迟 + 按字符的延迟 + 随机失败/丢行），
+不访问网络，两种方式的译文必须一致。
+
+运行方式:
+    python scripts/benchmark_translation.py [--words 20000] [--workers 8] [--latency 0.3] [--fail-rate 0.05]
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmark_ngram_counting import generate_phrases
+from utils.translation import StubTranslator, TranslationService
+
+
+def sequential_translate(words, translator, batch_size=100, delay=0.3):
+    """原translate_words_batch的流程：逐批串行，批次间固定间隔，失败时整批逐词翻译"""
+    translations = {}
+    for start in range(0, len(words), batch_size):
+        batch = words[start:start + batch_size]
+        try:
+            lines = translator.translate('\n'.join(batch)).split('\n')
+            for i, word in enumerate(batch):
+                translations[word] = lines[i].strip() if i < len(lines) else word
+            if start + batch_size < len(words):
+                time.sleep(delay)
+        except Exception:
+            for word in batch:
+                try:
+                    translations[word] = translator.translate(word)
+                    time.sleep(0.1)
+                except Exception:
+                    translations[word] = word
+    return translations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量翻译对比')
+    parser.add_argument('--words', type=int, default=20000, help='待翻译的词数（默认20000）')
+    parser.add_argument('--workers', type=int, default=8, help='TranslationService线程数（默认8）')
+    parser.add_argument('--latency', type=float, default=0.3, help='模拟单次请求延迟（秒，默认0.3）')
+    parser.add_argument('--fail-rate', type=float, default=0.05, help='模拟请求失败率（默认0.05）')
+    args = parser.parse_args()
+
+    # 与Phase 0分词相同：从模拟短语中取不重复的单词和2-gram
+    words = []
+    seen = set()
+    for phrase in generate_phrases(args.words):
+        tokens = phrase.phrase.split()
+        for token in tokens + [' '.join(tokens[i:i + 2]) for i in range(len(tokens) - 1)]:
+            if token not in seen:
+                seen.add(token)
+                words.append(token)
+        if len(words) >= args.words:
+            break
+    words = words[:args.words]
+    print(f"{len(words)} 个词，模拟请求延迟 {args.latency}s，失败率 {args.fail_rate}")
+
+    def stub():
+        return StubTranslator(latency=args.latency, per_char_latency=0.00002, fail_rate=args.fail_rate, seed=1)
+
+    translator = stub()
+    start = time.perf_counter()
+    expected = sequential_translate(words, translator)
+    sequential_seconds = time.perf_counter() - start
+    print(f"  逐批串行          {sequential_seconds:8.2f}s  {translator.requests} 次请求，"
+          f"{sum(1 for w in words if expected[w] == w)} 个失败")
+
+    translator = stub()
+    service = TranslationService(lambda: translator, workers=args.workers, use_cache=False)
+    translations, stats = service.translate(words)
+    print(f"  TranslationService {stats['seconds']:7.2f}s  {stats['requests']} 次请求"
+          f"（{stats['batches']} 批，重试 {stats['retries']} 次），{stats['failed']} 个失败")
+
+    mismatched = [w for w in words if w in translations and expected[w] != w and translations[w] != expected[w]]
+    if mismatched:
+        print(f"\n✗ 译文不一致: {mismatched[:5]}")
+        sys.exit(1)
+    print(f"\n✓ 译文一致，加速 {sequential_seconds / max(stats['seconds'], 0.01):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -139,22 +139,14 @@ def import_selections(csv_file: Path):
             selection_score = int(row['selection_score'])
             is_selected = bool(row['is_selected'])
 
-            # 查找聚类
-            cluster = repo.session.query(ClusterMeta).filter(
-                ClusterMeta.cluster_id == cluster_id,
-                ClusterMeta.cluster_level == 'A'
-            ).first()
-
-            if cluster:
-                cluster.selection_score = selection_score
-                cluster.is_selected = is_selected
+            # 通过仓储更新（同步维护统计快照中的选中数）
+            if repo.update_selection(cluster_id, 'A', is_selected=is_selected,
+                                     selection_score=selection_score):
                 updated_count += 1
             else:
                 not_found_count += 1
                 print(f"  ⚠️  簇ID {cluster_id} 在数据库中不存在")
 
-        repo.session.commit()
-
     print(f"\n✓ 更新完成")
     print(f"  成功更新: {updated_count} 个聚类")
     if not_found_count > 0:
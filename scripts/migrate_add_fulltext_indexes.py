@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：为商品和Reddit板块建立全文索引
+- SQLite: 创建FTS5虚拟表 products_fts / reddit_subreddits_fts 及同步触发器，并按现有数据重建
+- MySQL: 添加FULLTEXT索引 ft_products_text / ft_reddit_subreddits_text
+
+可重复运行（已存在的索引会跳过，SQLite会重新同步索引内容）
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from storage.models import get_engine
+from storage.fulltext import FULLTEXT_SPECS, ensure_fulltext_index
+
+
+def main():
+    print("=" * 60)
+    print("[Migrate] Adding full-text indexes")
+    print("=" * 60)
+
+    engine = get_engine()
+    print(f"\n[Info] Database dialect: {engine.dialect.name}")
+
+    for spec in FULLTEXT_SPECS:
+        try:
+            ensure_fulltext_index(engine, spec)
+            print(f"[OK] {spec.table}: ({', '.join(spec.columns)})")
+        except Exception as e:
+            print(f"[ERROR] {spec.table}: {str(e)}")
+            return False
+
+    print("\n[Done] Full-text search is enabled for ProductRepository.search "
+          "and RedditSubredditRepository.query")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
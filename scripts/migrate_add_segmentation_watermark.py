@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：为 segmentation_batches 表添加 max_phrase_id 字段（增量分词高水位）
+
+增量分词只处理 phrase_id 大于已完成批次 max_phrase_id 的短语。
+已有批次的 max_phrase_id 为空，视为从未增量分词：首次运行会对全部短语分词一次。
+如果word_segments已经是当前全部短语的分词结果，可加 --mark-current
+把当前最大phrase_id记为高水位，避免重复累加。
+
+执行方式：
+python scripts/migrate_add_segmentation_watermark.py [--mark-current]
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from sqlalchemy import func, inspect, text
+from storage.models import Phrase, SegmentationBatch, get_session
+
+
+def main(mark_current: bool = False):
+    print("=" * 70)
+    print("数据库迁移：segmentation_batches 表添加 max_phrase_id 字段")
+    print("=" * 70)
+
+    session = get_session()
+    try:
+        print("\n【步骤1】检查表是否存在...")
+        inspector = inspect(session.connection())
+        if not inspector.has_table('segmentation_batches'):
+            print("✓ segmentation_batches 表不存在，将由 SQLAlchemy 自动创建（包含新字段）")
+            return True
+
+        print("\n【步骤2】检查 max_phrase_id 字段是否存在...")
+        columns = [col['name'] for col in inspector.get_columns('segmentation_batches')]
+        if 'max_phrase_id' in columns:
+            print("✓ max_phrase_id 字段已存在，无需添加")
+        else:
+            session.execute(text("ALTER TABLE segmentation_batches ADD COLUMN max_phrase_id BIGINT"))
+            session.commit()
+            print("✓ max_phrase_id 字段添加成功")
+
+        if mark_current:
+            print("\n【步骤3】记录当前高水位...")
+            max_phrase_id = session.query(func.max(Phrase.phrase_id)).scalar() or 0
+            session.add(SegmentationBatch(
+                phrase_count=0,
+                word_count=0,
+                new_word_count=0,
+                duration_seconds=0,
+                max_phrase_id=max_phrase_id,
+                status='completed',
+                notes='Watermark baseline (migration)'
+            ))
+            session.commit()
+            print(f"✓ 高水位已设置为 phrase_id {max_phrase_id}")
+
+        print("\n✅ 迁移完成！")
+        return True
+    except Exception as e:
+        session.rollback()
+        print(f"\n❌ 迁移失败: {str(e)}")
+        return False
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    success = main(mark_current='--mark-current' in sys.argv[1:])
+    sys.exit(0 if success else 1)
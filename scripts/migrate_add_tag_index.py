@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：为JSON标签字段建立规范化关联表
+- product_tags:      products.tags 中的每个标签
+- seed_word_types:   seed_words.token_types 中的每个分类
+- seed_word_demands: seed_words.related_demand_ids 中的每个需求ID
+
+建表后从现有JSON字段全量回填；之后由Repository在写入时同步。
+可重复运行（每次都会清空关联表后重新回填）
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from storage.models import get_session
+from storage.tag_index import backfill
+
+
+def main():
+    print("=" * 60)
+    print("[Migrate] Adding tag index tables")
+    print("=" * 60)
+
+    session = get_session()
+    try:
+        counts = backfill(session)
+    except Exception as e:
+        print(f"[ERROR] Backfill failed: {str(e)}")
+        return False
+    finally:
+        session.close()
+
+    for table_name, count in counts.items():
+        print(f"[OK] {table_name}: {count} rows")
+
+    print("\n[Done] Tag filters in ProductRepository.search and "
+          "SeedWordRepository.get_seeds_by_type/get_seeds_by_demand now use the index")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,45 @@
+"""
+全量重建统计快照（stats_snapshot）
+
+统计快照在导入、聚类、创建需求等写操作时增量维护；直接改库、批量重置等操作会绕过增量更新，
+运行此脚本按当前数据重新计算全部计数器。首次使用时也需要运行一次（会自动建表）。
+
+运行方式:
+    python scripts/rebuild_stats_snapshot.py
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from storage.repository import StatsSnapshotRepository
+
+
+def main():
+    print("="*70)
+    print("重建统计快照".center(70))
+    print("="*70)
+
+    print("\n【步骤1】全量聚合并写入stats_snapshot...")
+    with StatsSnapshotRepository() as repo:
+        counters = repo.rebuild()
+        phrase_stats = repo.get_phrase_statistics()
+        dashboard = repo.get_dashboard_stats()
+
+    print(f"✓ 写入 {len(counters)} 个计数器")
+
+    print("\n【步骤2】快照摘要")
+    print(f"  短语总数: {phrase_stats['total_count']:,}")
+    print(f"  已聚类(A): {phrase_stats['clustered_A']:,}")
+    print(f"  大组/小组: {dashboard['clusters_A']} / {dashboard['clusters_B']}")
+    print(f"  需求数: {dashboard['demands_count']}")
+    print(f"  Token数: {dashboard['tokens_count']}")
+
+    print("\n" + "="*70)
+    print("✅ 统计快照重建完成！".center(70))
+    print("="*70)
+
+
+if __name__ == "__main__":
+    main()
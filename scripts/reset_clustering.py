@@ -18,7 +18,7 @@ from utils.encoding_fix import setup_encoding
 setup_encoding()
 # ======================================================
 
-from storage.repository import PhraseRepository, ClusterMetaRepository
+from storage.repository import PhraseRepository, ClusterMetaRepository, StatsSnapshotRepository
 from storage.models import Phrase
 from utils.logger import get_logger
 
@@ -75,6 +75,12 @@ def reset_clustering(round_id: int = 1):
         repo.session.commit()
         print(f"✓ 已删除 {deleted.rowcount} 条聚类元数据记录")
 
+    # 3. 批量重置绕过了增量统计，重建统计快照
+    print("\n【步骤3】重建统计快照...")
+    with StatsSnapshotRepository() as repo:
+        repo.rebuild()
+        print("✓ 统计快照已重建")
+
     print("\n" + "="*70)
     print("✅ 聚类结果重置完成！".center(70))
     print("="*70)
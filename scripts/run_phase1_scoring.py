@@ -31,7 +31,7 @@ from utils.encoding_fix import setup_encoding
 setup_encoding()
 # ======================================================
 
-from storage.repository import PhraseRepository
+from storage.repository import PhraseRepository, StatsSnapshotRepository
 from storage.models import ClusterMeta, Phrase
 from core.cluster_scoring import ClusterScorer
 from core.cluster_llm_assessment import ClusterLLMAssessor
@@ -156,6 +156,7 @@ def run_phase1_scoring(level: str = 'A',
 
     with PhraseRepository() as phrase_repo:
         saved_count = 0
+        created_count = 0
 
         for cluster_id, score_dict in scores.items():
             # 检查ClusterMeta是否存在
@@ -200,8 +201,11 @@ def run_phase1_scoring(level: str = 'A',
                     new_meta.llm_value_assessment = llm_result['value_assessment']
 
                 phrase_repo.session.add(new_meta)
+                created_count += 1
                 saved_count += 1
 
+        # 新建的聚类计入统计快照，随评分结果一起提交
+        StatsSnapshotRepository(phrase_repo.session).apply_deltas({f'clusters.{level}': created_count})
         phrase_repo.session.commit()
 
     print(f"[OK] 保存完成，共更新/创建 {saved_count} 条记录")
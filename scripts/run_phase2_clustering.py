@@ -42,7 +42,6 @@ from config.settings import OUTPUT_DIR
 from core.embedding import EmbeddingService
 from core.clustering import cluster_phrases_large
 from storage.repository import PhraseRepository, ClusterMetaRepository
-from storage.models import Phrase
 
 
 def run_phase2_clustering(round_id: int = 1, limit: int = 0,
@@ -66,31 +65,23 @@ def run_phase2_clustering(round_id: int = 1, limit: int = 0,
     # 1. 从数据库加载短语
     print("\n【步骤1】从数据库加载短语...")
     with PhraseRepository() as repo:
-        # 获取未处理的短语
-        query = repo.session.query(Phrase).filter(
-            Phrase.processed_status == 'unseen'
-        )
-
+        # 获取未处理的短语（按phrase_id键集分页流式读取，只查需要的列）
         if limit > 0:
-            query = query.limit(limit)
             print(f"⚠️  测试模式：仅处理前 {limit} 条短语")
 
-        phrases_db = query.all()
+        columns = ('phrase_id', 'phrase', 'frequency', 'volume', 'seed_word', 'source_type')
+        phrases = [
+            dict(zip(columns, row))
+            for rows in repo.stream_phrases(
+                columns, filters={'processed_status': 'unseen'}, limit=limit or None
+            )
+            for row in rows
+        ]
 
-        if not phrases_db:
+        if not phrases:
             print("\n❌ 没有待处理的短语！")
             return False
 
-        # 转换为字典列表
-        phrases = [{
-            'phrase_id': p.phrase_id,
-            'phrase': p.phrase,
-            'frequency': p.frequency,
-            'volume': p.volume,
-            'seed_word': p.seed_word,
-            'source_type': p.source_type,
-        } for p in phrases_db]
-
         print(f"✓ 加载了 {len(phrases)} 条待聚类短语")
 
     # 2. 计算Embeddings
@@ -129,11 +120,7 @@ def run_phase2_clustering(round_id: int = 1, limit: int = 0,
     # 4.1 更新phrases表的cluster_id_A
     print("\n  更新phrases表...")
     with PhraseRepository() as repo:
-        success_count = 0
-        for i, phrase_id in enumerate(phrase_ids):
-            cluster_id = int(cluster_ids[i])
-            if repo.update_cluster_assignment(phrase_id, cluster_id_A=cluster_id):
-                success_count += 1
+        success_count = repo.bulk_update_cluster_assignments(phrase_ids, cluster_ids_A=cluster_ids)
 
         print(f"  ✓ 已更新 {success_count}/{len(phrase_ids)} 条记录的cluster_id_A")
 
@@ -377,13 +377,10 @@ def update_database(cluster_ids, phrases, cluster_info, round_id=1):
     # 1. 更新phrases表
     print("\n  更新phrases表的cluster_id_A...")
     with PhraseRepository() as repo:
-        success_count = 0
-        for i, phrase in enumerate(phrases):
-            phrase_id = phrase['phrase_id']
-            cluster_id = int(cluster_ids[i])
-
-            if repo.update_cluster_assignment(phrase_id, cluster_id_A=cluster_id):
-                success_count += 1
+        success_count = repo.bulk_update_cluster_assignments(
+            [phrase['phrase_id'] for phrase in phrases],
+            cluster_ids_A=cluster_ids
+        )
 
         print(f"  ✓ 已更新 {success_count}/{len(phrases)} 条记录")
 
@@ -9,6 +9,7 @@ Phase 2C: DeepSeek语义标注脚本
     --round-id: 数据轮次ID（默认为1）
     --limit: 限制标注的聚类数量（0=全部）
     --min-cluster-size: 仅标注大小>=此值的聚类（默认10）
+    --no-label-reuse: 不复用上一轮相同聚类的标注，全部重新调用LLM
 
 示例:
     # 标注所有聚类
@@ -21,6 +22,7 @@ Phase 2C: DeepSeek语义标注脚本
     python scripts/run_phase2_label_clusters.py --min-cluster-size=20
 """
 import sys
+import json
 import argparse
 from pathlib import Path
 
@@ -32,15 +34,17 @@ sys.path.insert(0, str(project_root))
 from utils.encoding_fix import setup_encoding
 setup_encoding()
 
-from config.settings import OUTPUT_DIR
+from config.settings import OUTPUT_DIR, CLUSTER_LABEL_REUSE_CONFIG
 from core.cluster_labeling import ClusterLabeler
+from core.cluster_label_reuse import ClusterLabelReuser
 from storage.repository import ClusterMetaRepository, PhraseRepository
 from storage.models import ClusterMeta, Phrase
 
 def run_phase2_label_clusters(
     round_id: int = 1,
     limit: int = 0,
-    min_cluster_size: int = 10
+    min_cluster_size: int = 10,
+    reuse_labels: bool = True
 ):
     """执行Phase 2C DeepSeek语义标注"""
     print("\n" + "="*70)
@@ -82,6 +86,7 @@ def run_phase2_label_clusters(
 
             clusters_to_label.append({
                 'cluster_id': cluster.cluster_id,
+                'phrase_ids': [p.phrase_id for p in phrases_db],
                 'phrases': phrases,
                 'size': cluster.size
             })
@@ -105,6 +110,11 @@ def run_phase2_label_clusters(
     success_count = 0
     fail_count = 0
 
+    # 复用上一轮几乎相同聚类的标注，只有新出现/漂移的聚类送LLM
+    reuser = None
+    if reuse_labels and CLUSTER_LABEL_REUSE_CONFIG["enabled"]:
+        reuser = ClusterLabelReuser(cluster_level='A', round_id=round_id)
+
     for i, cluster in enumerate(clusters_to_label, 1):
         cluster_id = cluster['cluster_id']
         phrases = cluster['phrases']
@@ -112,7 +122,27 @@ def run_phase2_label_clusters(
         print(f"\n[{i}/{len(clusters_to_label)}] 标注聚类 {cluster_id} ({cluster['size']} phrases)...")
 
         try:
-            result = labeler.label_cluster(cluster_id, phrases)
+            match = None
+            if reuser:
+                match = reuser.match_cluster(cluster_id, cluster['phrase_ids'], phrases,
+                                             required_field='llm_label')
+
+            if match and match['status'] == 'reused':
+                labels = match['labels']
+                result = {
+                    'llm_label': labels['llm_label'],
+                    'llm_summary': labels['llm_summary'] or '',
+                    'primary_demand_type': labels['primary_demand_type'] or 'other',
+                    'secondary_demand_types': json.loads(labels['secondary_demand_types'] or '[]'),
+                    'labeling_confidence': labels['labeling_confidence'] or 0,
+                }
+                print(f"  ↺ 复用历史标注 (相似度={match['similarity']:.3f}, 重合度={match['overlap']:.2f})")
+            else:
+                result = labeler.label_cluster(cluster_id, phrases)
+                # 标注失败（置信度0）不写入记忆，下次重试
+                if match and result['labeling_confidence'] > 0:
+                    reuser.remember(match, result)
+
             labeling_results[cluster_id] = result
 
             print(f"  ✓ 标签: {result['llm_label']}")
@@ -126,6 +156,8 @@ def run_phase2_label_clusters(
             fail_count += 1
             continue
 
+    reuse_stats = reuser.finish() if reuser else None
+
     # 5. 更新数据库
     print("\n【步骤5】更新数据库...")
     update_count = 0
@@ -133,7 +165,6 @@ def run_phase2_label_clusters(
     with ClusterMetaRepository() as repo:
         for cluster_id, result in labeling_results.items():
             # 转换secondary_demand_types为JSON字符串
-            import json
             secondary_types_json = json.dumps(result['secondary_demand_types'])
 
             # 更新cluster_meta表
@@ -166,6 +197,9 @@ def run_phase2_label_clusters(
     report_lines.append(f"  标注成功数: {success_count}")
     report_lines.append(f"  标注失败数: {fail_count}")
     report_lines.append(f"  成功率: {success_count/(success_count+fail_count)*100:.1f}%")
+    if reuse_stats:
+        report_lines.append(f"  复用历史标注: {reuse_stats['reused']}")
+        report_lines.append(f"  LLM新标注: {len(clusters_to_label) - reuse_stats['reused']}")
     report_lines.append("")
 
     # 需求类型分布
@@ -244,6 +278,7 @@ def main():
     parser.add_argument('--round-id', type=int, default=1, help='数据轮次ID')
     parser.add_argument('--limit', type=int, default=0, help='限制标注数量（0=全部）')
     parser.add_argument('--min-cluster-size', type=int, default=10, help='最小聚类大小')
+    parser.add_argument('--no-label-reuse', action='store_true', help='不复用历史标注，全部重新调用LLM')
 
     args = parser.parse_args()
 
@@ -251,7 +286,8 @@ def main():
         success = run_phase2_label_clusters(
             round_id=args.round_id,
             limit=args.limit,
-            min_cluster_size=args.min_cluster_size
+            min_cluster_size=args.min_cluster_size,
+            reuse_labels=not args.no_label_reuse
         )
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
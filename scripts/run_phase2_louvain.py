@@ -36,7 +36,6 @@ from config.settings import OUTPUT_DIR, LOUVAIN_CONFIG
 from core.embedding import EmbeddingService
 from core.graph_clustering import cluster_phrases_louvain
 from storage.repository import PhraseRepository, ClusterMetaRepository
-from storage.models import Phrase
 
 
 def run_phase2_louvain(
@@ -54,25 +53,21 @@ def run_phase2_louvain(
     # 1. 从数据库加载短语
     print("\n【步骤1】从数据库加载短语...")
     with PhraseRepository() as repo:
-        query = repo.session.query(Phrase)
-
+        # 按phrase_id键集分页流式读取，只查需要的列
         if limit > 0:
-            query = query.limit(limit)
             print(f"⚠️  测试模式：仅处理前 {limit} 条短语")
 
-        phrases_db = query.all()
+        columns = ('phrase_id', 'phrase', 'frequency', 'volume')
+        phrases = [
+            dict(zip(columns, row))
+            for rows in repo.stream_phrases(columns, limit=limit or None)
+            for row in rows
+        ]
 
-        if not phrases_db:
+        if not phrases:
             print("\n❌ 没有待处理的短语！")
             return False
 
-        phrases = [{
-            'phrase_id': p.phrase_id,
-            'phrase': p.phrase,
-            'frequency': p.frequency,
-            'volume': p.volume,
-        } for p in phrases_db]
-
         print(f"✓ 加载了 {len(phrases)} 条待聚类短语")
 
     # 2. 计算Embeddings
@@ -109,11 +104,7 @@ def run_phase2_louvain(
     # 5.1 更新phrases表
     print("  更新phrases表...")
     with PhraseRepository() as repo:
-        success_count = 0
-        for i, phrase_id in enumerate(phrase_ids):
-            cluster_id = int(cluster_ids[i])
-            if repo.update_cluster_assignment(phrase_id, cluster_id_A=cluster_id):
-                success_count += 1
+        success_count = repo.bulk_update_cluster_assignments(phrase_ids, cluster_ids_A=cluster_ids)
 
         print(f"  ✓ 已更新 {success_count}/{len(phrase_ids)} 条记录的cluster_id_A")
 
@@ -161,25 +161,14 @@ def resplit_cluster(cluster_id: int, round_id: int = 1, new_id_start: int = 1001
     # 4.1 更新phrases表
     print(f"\n  更新phrases表...")
     with PhraseRepository() as repo:
-        success_count = 0
-        for i, phrase_id in enumerate(phrase_ids):
-            new_cluster_id = int(new_cluster_ids[i])
-            if repo.update_cluster_assignment(phrase_id, cluster_id_A=new_cluster_id):
-                success_count += 1
+        success_count = repo.bulk_update_cluster_assignments(phrase_ids, cluster_ids_A=new_cluster_ids)
 
         print(f"  ✓ 已更新 {success_count}/{len(phrase_ids)} 条记录的cluster_id_A")
 
     # 4.2 删除旧的cluster_meta记录
     print(f"\n  删除旧的聚类元数据（簇 {cluster_id}）...")
-    from storage.models import ClusterMeta
     with ClusterMetaRepository() as repo:
-        old_meta = repo.session.query(ClusterMeta).filter(
-            ClusterMeta.cluster_id == cluster_id,
-            ClusterMeta.cluster_level == 'A'
-        ).first()
-        if old_meta:
-            repo.session.delete(old_meta)
-            repo.session.commit()
+        if repo.delete_cluster(cluster_id, 'A'):
             print(f"  ✓ 已删除簇 {cluster_id} 的元数据")
 
     # 4.3 保存新的cluster_meta记录
@@ -10,6 +10,7 @@ Cluster Intent Analysis Script
 使用方式：
   python scripts/run_phase3_intent_analysis.py --level A
   python scripts/run_phase3_intent_analysis.py --level A --sample-size 30
+  python scripts/run_phase3_intent_analysis.py --level A --workers 4
 
 创建日期：2025-12-23
 """
@@ -18,7 +19,7 @@ import sys
 import argparse
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 import time
 import json
 
@@ -34,7 +35,7 @@ setup_encoding()
 from storage.repository import PhraseRepository
 from storage.models import ClusterMeta
 from core.intent_classification import IntentClassifier
-from sqlalchemy import text
+from storage.read_models import load_cluster_phrases
 
 
 def load_cluster_data(level: str = 'A') -> Dict[int, List[str]]:
@@ -50,42 +51,21 @@ def load_cluster_data(level: str = 'A') -> Dict[int, List[str]]:
     print(f"\n加载聚类数据 (Level {level})...")
 
     with PhraseRepository() as phrase_repo:
-        if level == 'A':
-            phrases_with_cluster = phrase_repo.session.execute(
-                text("""
-                SELECT cluster_id_A, phrase
-                FROM phrases
-                WHERE cluster_id_A IS NOT NULL AND cluster_id_A != -1
-                """)
-            ).fetchall()
-        else:
-            phrases_with_cluster = phrase_repo.session.execute(
-                text("""
-                SELECT cluster_id_B, phrase
-                FROM phrases
-                WHERE cluster_id_B IS NOT NULL AND cluster_id_B != -1
-                """)
-            ).fetchall()
-
-    # 组织数据
-    clusters_data = {}
-    for cluster_id, phrase in phrases_with_cluster:
-        if cluster_id not in clusters_data:
-            clusters_data[cluster_id] = []
-        clusters_data[cluster_id].append(phrase)
+        clusters_data = load_cluster_phrases(phrase_repo.session, cluster_level=level)
 
     print(f"[OK] 加载了 {len(clusters_data)} 个聚类簇")
 
     return clusters_data
 
 
-def run_intent_analysis(level: str = 'A', sample_size: int = 50):
+def run_intent_analysis(level: str = 'A', sample_size: Optional[int] = None, workers: int = 1):
     """
     执行Phase 3意图分析
 
     Args:
         level: 聚类级别 ('A' or 'B')
-        sample_size: 每个簇的抽样大小
+        sample_size: 每个簇的抽样大小（None表示分析全部短语）
+        workers: 意图打分的进程数
     """
     print("\n" + "="*70)
     print(f"Phase 3: 聚类意图分析 (Level {level})")
@@ -106,17 +86,14 @@ def run_intent_analysis(level: str = 'A', sample_size: int = 50):
     print(f"[OK] 分类器初始化完成")
 
     # 3. 批量分析意图
-    print(f"\n[步骤2/3] 批量分析聚类意图（sample_size={sample_size}）...")
+    print(f"\n[步骤2/3] 批量分析聚类意图（sample_size={sample_size or '全部'}）...")
 
-    intent_results = {}
-    total_clusters = len(clusters_data)
-
-    for i, (cluster_id, phrases) in enumerate(clusters_data.items(), 1):
-        if i % 50 == 0 or i == 1:
-            print(f"  进度: {i}/{total_clusters} ({i/total_clusters*100:.1f}%)")
-
-        result = classifier.analyze_cluster_intent(phrases, sample_size=sample_size)
-        intent_results[cluster_id] = result
+    # 所有簇的短语一次批量打分
+    intent_results = classifier.analyze_clusters_intent(
+        clusters_data,
+        sample_size=sample_size,
+        workers=workers
+    )
 
     print(f"[OK] 意图分析完成，共分析 {len(intent_results)} 个簇")
 
@@ -222,6 +199,9 @@ def main():
   # 对大组进行意图分析，每簇抽样30个
   python scripts/run_phase3_intent_analysis.py --level A --sample-size 30
 
+  # 分析全部短语，4个进程打分
+  python scripts/run_phase3_intent_analysis.py --level A --workers 4
+
   # 对小组进行意图分析
   python scripts/run_phase3_intent_analysis.py --level B
         """
@@ -238,8 +218,15 @@ def main():
     parser.add_argument(
         '--sample-size',
         type=int,
-        default=50,
-        help='每个簇的抽样大小（默认50）'
+        default=None,
+        help='每个簇的抽样大小（默认分析全部短语）'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='意图打分的进程数（默认1）'
     )
 
     args = parser.parse_args()
@@ -247,7 +234,8 @@ def main():
     try:
         run_intent_analysis(
             level=args.level,
-            sample_size=args.sample_size
+            sample_size=args.sample_size,
+            workers=args.workers
         )
 
     except KeyboardInterrupt:
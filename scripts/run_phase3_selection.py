@@ -3,10 +3,12 @@ Phase 3: 大组筛选
 生成聚类分析报告，使用LLM生成主题标签，供人工筛选
 
 运行方式:
-    python scripts/run_phase3_selection.py [--skip-llm]
+    python scripts/run_phase3_selection.py [--skip-llm] [--round-id N] [--no-label-reuse]
 
 参数:
     --skip-llm: 跳过LLM主题生成（用于测试或API额度不足时）
+    --round-id: 数据轮次ID（默认为1，用于embedding缓存）
+    --no-label-reuse: 不复用上一轮相同聚类的主题，全部重新调用LLM
 """
 import sys
 import argparse
@@ -21,19 +23,45 @@ from utils.encoding_fix import setup_encoding
 setup_encoding()
 # ======================================================
 
-from config.settings import OUTPUT_DIR, CLUSTER_EXAMPLE_PHRASES_COUNT
+from config.settings import OUTPUT_DIR, CLUSTER_EXAMPLE_PHRASES_COUNT, CLUSTER_LABEL_REUSE_CONFIG
 from ai.client import LLMClient
+from core.cluster_label_reuse import ClusterLabelReuser
 from storage.repository import ClusterMetaRepository
-from storage.models import ClusterMeta
+from storage.models import ClusterMeta, Phrase
 import pandas as pd
 
 
-def generate_cluster_themes(skip_llm: bool = False):
+def load_cluster_members(cluster_ids):
+    """
+    一次查询加载各聚类的成员短语
+
+    Returns:
+        {cluster_id: (phrase_ids, phrases)}
+    """
+    members = {cluster_id: ([], []) for cluster_id in cluster_ids}
+
+    with ClusterMetaRepository() as repo:
+        rows = repo.session.query(Phrase.phrase_id, Phrase.phrase, Phrase.cluster_id_A).filter(
+            Phrase.cluster_id_A.isnot(None),
+            Phrase.cluster_id_A >= 0
+        ).all()
+
+    for phrase_id, phrase, cluster_id in rows:
+        if cluster_id in members:
+            members[cluster_id][0].append(phrase_id)
+            members[cluster_id][1].append(phrase)
+
+    return members
+
+
+def generate_cluster_themes(skip_llm: bool = False, round_id: int = 1, reuse_labels: bool = True):
     """
     为所有聚类生成主题标签
 
     Args:
         skip_llm: 是否跳过LLM调用（用于测试）
+        round_id: 数据轮次ID
+        reuse_labels: 是否复用上一轮几乎相同聚类的主题
 
     Returns:
         clusters列表
@@ -69,26 +97,47 @@ def generate_cluster_themes(skip_llm: bool = False):
         try:
             llm = LLMClient()
 
+            # 复用上一轮几乎相同聚类的主题，只有新出现/漂移的聚类送LLM
+            reuser = None
+            if reuse_labels and CLUSTER_LABEL_REUSE_CONFIG["enabled"]:
+                reuser = ClusterLabelReuser(cluster_level='A', round_id=round_id)
+                members = load_cluster_members([c.cluster_id for c in clusters])
+
             # 批量处理
             for i, cluster in enumerate(clusters, 1):
-                # 解析示例短语
-                example_phrases = cluster.example_phrases.split('; ')
-
-                # 调用LLM生成主题
-                result = llm.generate_cluster_theme(
-                    example_phrases=example_phrases,
-                    cluster_size=cluster.size,
-                    cluster_id=cluster.cluster_id
-                )
-
-                # 更新主题
-                cluster.main_theme = result['theme']
+                match = None
+                if reuser and members[cluster.cluster_id][0]:
+                    phrase_ids, phrases = members[cluster.cluster_id]
+                    match = reuser.match_cluster(cluster.cluster_id, phrase_ids, phrases,
+                                                 required_field='main_theme')
+
+                if match and match['status'] == 'reused':
+                    cluster.main_theme = match['labels']['main_theme']
+                else:
+                    # 解析示例短语
+                    example_phrases = cluster.example_phrases.split('; ')
+
+                    # 调用LLM生成主题
+                    result = llm.generate_cluster_theme(
+                        example_phrases=example_phrases,
+                        cluster_size=cluster.size,
+                        cluster_id=cluster.cluster_id
+                    )
+
+                    # 更新主题
+                    cluster.main_theme = result['theme']
+                    if match:
+                        reuser.remember(match, {'main_theme': result['theme']})
 
                 # 显示进度
                 if i % 10 == 0:
                     print(f"  进度: {i}/{len(clusters)} ({i/len(clusters)*100:.1f}%)")
 
             print(f"\n✓ 已生成 {len(clusters)} 个聚类的主题标签")
+            if reuser:
+                reuse_stats = reuser.finish()
+                print(f"  其中复用历史主题 {reuse_stats['reused']} 个，"
+                      f"LLM新生成 {len(clusters) - reuse_stats['reused']} 个")
 
         except Exception as e:
             print(f"\n❌ LLM主题生成失败: {str(e)}")
@@ -282,6 +331,12 @@ def main():
         action='store_true',
         help='跳过LLM主题生成（用于测试或API额度不足时）'
     )
+    parser.add_argument('--round-id', type=int, default=1, help='数据轮次ID')
+    parser.add_argument(
+        '--no-label-reuse',
+        action='store_true',
+        help='不复用历史主题，全部重新调用LLM'
+    )
 
     args = parser.parse_args()
 
@@ -291,7 +346,11 @@ def main():
 
     try:
         # 1. 生成聚类主题
-        clusters = generate_cluster_themes(skip_llm=args.skip_llm)
+        clusters = generate_cluster_themes(
+            skip_llm=args.skip_llm,
+            round_id=args.round_id,
+            reuse_labels=not args.no_label_reuse
+        )
         if not clusters:
             return False
 
@@ -35,6 +35,7 @@ from storage.repository import (
     TokenRepository
 )
 from storage.models import Phrase, ClusterMeta, Demand
+from storage.read_models import load_cluster_phrase_dicts, select_rows
 import pandas as pd
 from utils.token_extractor import extract_tokens_from_phrase
 
@@ -166,11 +167,11 @@ def load_embeddings_for_phrases(phrase_ids: list, round_id: int = 1) -> np.ndarr
 
     # 获取短语文本
     with PhraseRepository() as repo:
-        phrases_db = repo.session.query(Phrase).filter(
-            Phrase.phrase_id.in_(phrase_ids)
-        ).all()
-
-        phrase_map = {p.phrase_id: p.phrase for p in phrases_db}
+        phrase_map = dict(select_rows(
+            repo.session,
+            (Phrase.phrase_id, Phrase.phrase),
+            where=[Phrase.phrase_id.in_(phrase_ids)]
+        ))
 
     # 提取embeddings
     embeddings = []
@@ -220,23 +221,14 @@ def process_cluster_small_grouping(cluster_A: ClusterMeta,
     # 1. 加载该大组的所有短语
     print(f"\n【步骤1】加载大组短语...")
     with PhraseRepository() as repo:
-        phrases_db = repo.get_phrases_by_cluster(cluster_id, cluster_level='A')
+        # 只查需要的字段，不构造Phrase实体
+        phrases = load_cluster_phrase_dicts(repo.session, cluster_id, cluster_level='A')
 
-        if not phrases_db:
+        if not phrases:
             print(f"  ⚠️  大组 {cluster_id} 没有短语，跳过")
             return []
 
-        print(f"  ✓ 加载了 {len(phrases_db)} 条短语")
-
-        # 转换为字典列表
-        phrases = [{
-            'phrase_id': p.phrase_id,
-            'phrase': p.phrase,
-            'frequency': p.frequency,
-            'volume': p.volume,
-            'seed_word': p.seed_word,
-            'source_type': p.source_type,
-        } for p in phrases_db]
+        print(f"  ✓ 加载了 {len(phrases)} 条短语")
 
         phrase_ids = [p['phrase_id'] for p in phrases]
 
@@ -262,11 +254,7 @@ def process_cluster_small_grouping(cluster_A: ClusterMeta,
     # 4. 更新数据库 - cluster_id_B
     print(f"\n【步骤4】更新数据库...")
     with PhraseRepository() as repo:
-        success_count = 0
-        for i, phrase_id in enumerate(phrase_ids):
-            cluster_id_B = int(cluster_ids_B[i])
-            if repo.update_cluster_assignment(phrase_id, cluster_id_B=cluster_id_B):
-                success_count += 1
+        success_count = repo.bulk_update_cluster_assignments(phrase_ids, cluster_ids_B=cluster_ids_B)
 
         print(f"  ✓ 已更新 {success_count}/{len(phrase_ids)} 条记录的cluster_id_B")
 
@@ -10,6 +10,7 @@ Phase 5: Token提取与分类
     --min-frequency: 最小频次阈值（默认3）
     --sample-size: 采样短语数量（0=全部，默认10000）
     --round-id: 数据轮次ID（默认1）
+    --force-reclassify: 忽略tokens表中已有分类，全部重新送LLM分类
 """
 import sys
 import argparse
@@ -31,7 +32,7 @@ from utils.token_extractor import (
     extract_tokens, extract_bigrams, extract_ngrams,
     extract_demand_patterns, analyze_token_framework
 )
-from ai.client import LLMClient
+from core.delta_llm_service import DeltaLLMService, is_fallback_classification
 from storage.repository import PhraseRepository, TokenRepository
 
 
@@ -55,21 +56,18 @@ def load_phrases_for_token_extraction(sample_size: int = 0, round_id: int = 1) -
         #     Phrase.mapped_demand_id.isnot(None)
         # ).all()
 
-        # 获取指定轮次的短语
-        from storage.models import Phrase
-
+        # 按phrase_id键集分页流式读取，只查phrase列
         if sample_size > 0:
-            phrases_db = repo.session.query(Phrase).limit(sample_size).all()
-            print(f"  ✓ 加载了 {len(phrases_db)} 条短语（采样模式）")
+            phrases = [row[0] for rows in repo.stream_phrases(('phrase',), limit=sample_size)
+                       for row in rows if row[0]]
+            print(f"  ✓ 加载了 {len(phrases)} 条短语（采样模式）")
         else:
             count = repo.get_phrase_count()
             print(f"  ✓ 准备加载所有 {count} 条短语...")
-            phrases_db = repo.session.query(Phrase).all()
+            phrases = [row[0] for rows in repo.stream_phrases(('phrase',))
+                       for row in rows if row[0]]
             print(f"  ✓ 加载完成")
 
-    # 提取短语文本
-    phrases = [p.phrase for p in phrases_db if p.phrase]
-
     print(f"  ✓ 有效短语: {len(phrases)} 条")
 
     return phrases
@@ -99,7 +97,8 @@ def save_tokens_to_csv(tokens_with_types: List[Dict], output_file: Path):
 def run_phase5_tokens(skip_llm: bool = False,
                       min_frequency: int = 8,
                       sample_size: int = 10000,
-                      round_id: int = 1):
+                      round_id: int = 1,
+                      force_reclassify: bool = False):
     """
     执行Phase 5: Token提取与分类
 
@@ -108,6 +107,7 @@ def run_phase5_tokens(skip_llm: bool = False,
         min_frequency: 最小频次阈值（默认8）
         sample_size: 采样短语数量（0=全部）
         round_id: 数据轮次
+        force_reclassify: 是否忽略已有分类全部重新分类（默认只分类新tokens）
     """
     print("\n" + "="*70)
     print("Phase 5: Token提取与分类".center(70))
@@ -158,34 +158,41 @@ def run_phase5_tokens(skip_llm: bool = False,
     tokens_with_types = []
     tokens_classified = {}  # {token_text: token_type}
 
+    delta_service = DeltaLLMService()
+
     if skip_llm:
-        print("\n【阶段3】⚠️  跳过LLM分类")
-        # 使用默认类型
+        print("\n【阶段3】⚠️  跳过LLM分类（复用已有分类）")
+        # 已分类过的token复用数据库结果，其余使用默认类型
+        known_types = delta_service.lookup_token_types([ng['text'] for ng in candidate_ngrams])
         for ng in candidate_ngrams:
+            known = known_types.get(ng['text'])
             tokens_with_types.append({
                 'token_text': ng['text'],
-                'token_type': 'other',
+                'token_type': known['token_type'] if known else 'other',
                 'gram_size': ng['gram_size'],
                 'in_phrase_count': ng['frequency'],
-                'confidence': 'low',
+                'confidence': known['confidence'] if known else 'low',
                 'verified': False,
-                'notes': '未分类'
+                'notes': None if known else TokenRepository.UNCLASSIFIED_NOTE
             })
-            tokens_classified[ng['text']] = 'other'
+            tokens_classified[ng['text']] = known['token_type'] if known else 'other'
+        print(f"  ✓ 复用已有分类 {len(known_types)} 个")
     else:
-        print("\n【阶段3】LLM批量分类...")
+        print("\n【阶段3】LLM批量分类（增量：只分类新tokens）...")
 
         try:
-            llm = LLMClient()
-
             # 提取n-gram文本列表
             ngram_texts = [ng['text'] for ng in candidate_ngrams]
 
-            # 批量分类（对2-4词组合和单词都进行分类）
-            classifications = llm.batch_classify_tokens(
+            # 增量分类（对2-4词组合和单词都进行分类，已分类的直接复用）
+            classifications, delta_stats = delta_service.classify_tokens(
                 tokens=ngram_texts,
-                batch_size=50
+                in_phrase_counts={ng['text']: ng['frequency'] for ng in candidate_ngrams},
+                round_id=round_id,
+                force=force_reclassify
             )
+            print(f"  ✓ 复用已有分类 {delta_stats['cached']} 个，"
+                  f"新送LLM分类 {delta_stats['sent']} 个")
 
             # 合并频次和分类结果
             ngram_data_map = {
@@ -206,7 +213,9 @@ def run_phase5_tokens(skip_llm: bool = False,
                     'in_phrase_count': ng_data.get('freq', 0),
                     'confidence': classification.get('confidence', 'medium'),
                     'verified': False,
-                    'notes': None
+                    # 批次失败的降级结果保留"未分类"标记，下次重跑时重新分类
+                    'notes': (TokenRepository.UNCLASSIFIED_NOTE
+                              if is_fallback_classification(classification) else None)
                 })
 
                 tokens_classified[ngram_text] = token_type
@@ -261,27 +270,18 @@ def run_phase5_tokens(skip_llm: bool = False,
     # 【阶段6】保存到数据库
     print("\n【阶段6】保存到数据库...")
 
+    inserted_count = 0
     with TokenRepository() as repo:
-        inserted_count = 0
-
-        for token_data in tokens_with_types:
-            try:
-                token = repo.create_token(
-                    token_text=token_data['token_text'],
-                    token_type=token_data['token_type'],
-                    in_phrase_count=token_data['in_phrase_count'],
-                    first_seen_round=round_id,
-                    verified=token_data['verified'],
-                    notes=token_data.get('notes')
-                )
-
-                inserted_count += 1
-
-            except Exception as e:
-                print(f"    ⚠️  保存失败: {token_data['token_text']} - {str(e)}")
-                continue
-
-        print(f"  ✓ 成功保存 {inserted_count} 个tokens到数据库")
+        try:
+            new_count, updated_count = repo.bulk_upsert_tokens(
+                tokens_with_types,
+                first_seen_round=round_id
+            )
+            inserted_count = new_count + updated_count
+            print(f"  ✓ 成功保存 {inserted_count} 个tokens到数据库"
+                  f"（新增 {new_count}，更新 {updated_count}）")
+        except Exception as e:
+            print(f"    ⚠️  保存失败: {str(e)}")
 
     # 【阶段7】生成CSV报告
     print("\n【阶段7】生成CSV报告...")
@@ -416,6 +416,11 @@ def main():
         default=1,
         help='数据轮次ID（默认1）'
     )
+    parser.add_argument(
+        '--force-reclassify',
+        action='store_true',
+        help='忽略已有分类，全部重新送LLM分类'
+    )
 
     args = parser.parse_args()
 
@@ -424,7 +429,8 @@ def main():
             skip_llm=args.skip_llm,
             min_frequency=args.min_frequency,
             sample_size=args.sample_size,
-            round_id=args.round_id
+            round_id=args.round_id,
+            force_reclassify=args.force_reclassify
         )
         sys.exit(0 if success else 1)
 
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+全文检索子系统
+替代 LIKE '%kw%'（无法走索引，必然全表扫描）
+
+- SQLite: FTS5外部内容虚拟表（content=原表），由INSERT/UPDATE/DELETE触发器保持同步，按bm25排序
+- MySQL: FULLTEXT索引 + MATCH ... AGAINST (BOOLEAN MODE)，按匹配得分排序
+- 关键词统一转换为"所有词前缀匹配"（red shoe → red* AND shoe*）
+- 全文索引未建立、或关键词无法分词（中日韩文本、MySQL下全是短词）时，调用方回退到LIKE
+
+另外提供键集分页条件和可跳过/估算的计数，供ProductRepository.search和
+RedditSubredditRepository.query共用。
+"""
+import re
+import weakref
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, column, false, func, inspect, literal_column, or_, select, table, text
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 估算计数的上限：结果数达到上限时只返回上限值（下界）
+COUNT_ESTIMATE_CAP = 10000
+
+# MySQL InnoDB默认的最小分词长度（innodb_ft_min_token_size）
+MYSQL_MIN_TOKEN_SIZE = 3
+
+_WORD_RE = re.compile(r"[0-9A-Za-zÀ-ɏ]+")
+_CJK_RE = re.compile(r"[⺀-鿿가-힯]")
+
+
+@dataclass(frozen=True)
+class FullTextSpec:
+    """一张表的全文索引定义"""
+    table: str
+    pk: str
+    columns: Tuple[str, ...]
+
+    @property
+    def fts_table(self) -> str:
+        """SQLite FTS5虚拟表名"""
+        return f"{self.table}_fts"
+
+    @property
+    def index_name(self) -> str:
+        """MySQL FULLTEXT索引名"""
+        return f"ft_{self.table}_text"
+
+
+PRODUCT_FULLTEXT = FullTextSpec('products', 'product_id', ('product_name', 'description'))
+REDDIT_FULLTEXT = FullTextSpec('reddit_subreddits', 'subreddit_id', ('name', 'description'))
+
+FULLTEXT_SPECS = (PRODUCT_FULLTEXT, REDDIT_FULLTEXT)
+
+# {engine: {table: bool}} 全文索引是否可用（按引擎缓存）
+_availability = weakref.WeakKeyDictionary()
+
+
+# ==================== 建立索引 ====================
+
+def _sqlite_statements(spec: FullTextSpec) -> List[str]:
+    cols = ', '.join(spec.columns)
+    new_cols = ', '.join(f"new.{c}" for c in spec.columns)
+    old_cols = ', '.join(f"old.{c}" for c in spec.columns)
+    fts = spec.fts_table
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{spec.table}', content_rowid='{spec.pk}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {spec.table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{spec.pk}, {new_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {spec.table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{spec.pk}, {old_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {spec.table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{spec.pk}, {old_cols}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{spec.pk}, {new_cols}); END",
+        # 按原表内容重建（新建虚拟表或修复不一致时）
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def ensure_fulltext_index(engine, spec: FullTextSpec):
+    """
+    为一张表建立全文索引（幂等）
+
+    SQLite建FTS5虚拟表和同步触发器并重建索引内容；MySQL建FULLTEXT索引
+    """
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == 'sqlite':
+            for statement in _sqlite_statements(spec):
+                conn.execute(text(statement))
+        elif dialect == 'mysql':
+            exists = conn.execute(text(
+                "SELECT COUNT(*) FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = :table AND index_name = :index"
+            ), {'table': spec.table, 'index': spec.index_name}).scalar()
+            if not exists:
+                conn.execute(text(
+                    f"ALTER TABLE {spec.table} ADD FULLTEXT INDEX {spec.index_name} "
+                    f"({', '.join(spec.columns)})"
+                ))
+        else:
+            logger.warning(f"{dialect}不支持全文索引，{spec.table}将继续使用LIKE搜索")
+            return
+
+    _availability.pop(engine, None)
+    logger.info(f"全文索引已就绪: {spec.table} ({dialect})")
+
+
+def ensure_all_fulltext_indexes(engine):
+    """为所有支持全文检索的表建立索引"""
+    for spec in FULLTEXT_SPECS:
+        ensure_fulltext_index(engine, spec)
+
+
+def fulltext_available(session, spec: FullTextSpec) -> bool:
+    """当前数据库是否已为该表建立全文索引（按引擎缓存）"""
+    engine = session.get_bind()
+    cache = _availability.setdefault(engine, {})
+    if spec.table not in cache:
+        # 用会话自己的连接检查，避免另取连接归还时回滚当前事务
+        connection = session.connection()
+        dialect = engine.dialect.name
+        if dialect == 'sqlite':
+            cache[spec.table] = inspect(connection).has_table(spec.fts_table)
+        elif dialect == 'mysql':
+            cache[spec.table] = any(
+                index['name'] == spec.index_name
+                for index in inspect(connection).get_indexes(spec.table)
+            )
+        else:
+            cache[spec.table] = False
+    return cache[spec.table]
+
+
+# ==================== 查询构造 ====================
+
+def build_match_query(keyword: str, dialect: str) -> Optional[str]:
+    """
+    把用户关键词转换为全文检索语法（所有词前缀匹配）
+
+    Returns:
+        检索表达式；无法使用全文检索时返回None（调用方回退到LIKE）
+    """
+    if not keyword or _CJK_RE.search(keyword):
+        return None
+
+    words = _WORD_RE.findall(keyword.lower())
+    if dialect == 'mysql':
+        words = [w for w in words if len(w) >= MYSQL_MIN_TOKEN_SIZE]
+        return ' '.join(f"+{w}*" for w in words) or None
+    return ' '.join(f'"{w}"*' for w in words) or None
+
+
+def apply_fulltext(query, session, spec: FullTextSpec, model, keyword: str):
+    """
+    给ORM查询加上全文匹配条件
+
+    Returns:
+        (query, relevance表达式)；无法使用全文检索时返回 (None, None)
+    """
+    if not fulltext_available(session, spec):
+        return None, None
+
+    dialect = session.get_bind().dialect.name
+    match_query = build_match_query(keyword, dialect)
+    if match_query is None:
+        return None, None
+
+    columns = [getattr(model, name) for name in spec.columns]
+    pk = getattr(model, spec.pk)
+
+    if dialect == 'sqlite':
+        fts = table(spec.fts_table, column('rowid'))
+        query = query.join(fts, fts.c.rowid == pk).filter(
+            literal_column(spec.fts_table).op('MATCH')(match_query)
+        )
+        # bm25越小越相关，取负数使"越大越相关"
+        relevance = -func.bm25(literal_column(spec.fts_table))
+    else:
+        from sqlalchemy.dialects.mysql import match
+        relevance = match(*columns, against=match_query).in_boolean_mode()
+        query = query.filter(relevance)
+
+    return query, relevance
+
+
+def _keyset_equal(expr, value):
+    return expr.is_(None) if value is None else expr == value
+
+
+def _keyset_after(expr, value, descending: bool):
+    # SQLite和MySQL都把NULL排在最小的位置：升序在最前，降序在最后
+    if value is None:
+        return false() if descending else expr.isnot(None)
+    if descending:
+        return or_(expr < value, expr.is_(None))
+    return expr > value
+
+
+def keyset_condition(order_columns: Sequence[Tuple], cursor: Sequence):
+    """
+    键集分页条件：按字典序取排在cursor之后的行（支持NULL值）
+
+    Args:
+        order_columns: [(列表达式, 是否降序)]，与ORDER BY一致，最后一列应为主键
+        cursor: 上一页最后一行对应各列的值
+    """
+    conditions = []
+    for i, (expr, descending) in enumerate(order_columns):
+        equal_prefix = [_keyset_equal(order_columns[j][0], cursor[j]) for j in range(i)]
+        conditions.append(and_(*equal_prefix, _keyset_after(expr, cursor[i], descending)))
+    return or_(*conditions)
+
+
+def count_results(query, mode: str = 'exact') -> Optional[int]:
+    """
+    统计结果数
+
+    Args:
+        mode: 'exact'精确计数；'estimate'最多数到COUNT_ESTIMATE_CAP（达到上限时为下界）；
+              'skip'不计数，返回None
+    """
+    if mode == 'skip':
+        return None
+    if mode == 'estimate':
+        capped = query.order_by(None).limit(COUNT_ESTIMATE_CAP).subquery()
+        return query.session.execute(select(func.count()).select_from(capped)).scalar()
+    return query.order_by(None).count()
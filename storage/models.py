@@ -10,10 +10,14 @@ MVP版本数据库模型
 - MySQL使用ENUM类型
 - SQLite使用String + CheckConstraint
 """
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from decimal import Decimal
 from sqlalchemy import (
     create_engine,
+    event,
     Column,
     Integer,
     BigInteger,
@@ -25,9 +29,10 @@ from sqlalchemy import (
     DECIMAL,
     Index,
     CheckConstraint,
+    LargeBinary,
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
 from config.settings import DATABASE_URL, DATABASE_CONFIG
 
 Base = declarative_base()
@@ -290,6 +295,7 @@ class SegmentationBatch(Base):
     word_count = Column(Integer)  # 生成了多少个单词
     new_word_count = Column(Integer)  # 新增了多少个单词
     duration_seconds = Column(Integer)  # 耗时（秒）
+    max_phrase_id = Column(BigInteger)  # 高水位：已分词到的最大phrase_id（增量分词从其后继续）
 
     # 状态
     status = enum_column(
@@ -468,6 +474,51 @@ class ClusterMeta(Base):
         )
 
 
+class ClusterLabelMemory(Base):
+    """
+    聚类标注记忆表（跨轮次复用LLM标注）
+
+    保存每个已标注聚类的质心向量和成员短语ID，下一轮聚类时先找最相近的历史质心，
+    相似度和成员重合度都达标则直接复用标注，不再调用LLM
+    """
+
+    __tablename__ = "cluster_label_memory"
+
+    memory_id = Column(Integer, primary_key=True, autoincrement=True)
+    cluster_level = enum_column(
+        "cluster_level",
+        ["A", "B"],
+        enum_name="memory_cluster_level_enum",
+        nullable=False,
+        index=True
+    )
+    cluster_id = Column(Integer)  # 最近一次对应的聚类ID（仅供参考，聚类ID每轮会变）
+    round_id = Column(Integer, nullable=False)  # 最近一次更新的轮次
+
+    # 质心和成员（float32 / int32 原始字节）
+    centroid = Column(LargeBinary(length=2**24), nullable=False)  # L2归一化后的质心
+    member_ids = Column(LargeBinary(length=2**24), nullable=False)  # 排序后的phrase_id
+    size = Column(Integer)
+
+    # 可复用的标注字段
+    llm_label = Column(String(100))
+    llm_summary = Column(Text)
+    main_theme = Column(String(255))
+    primary_demand_type = Column(String(50))
+    secondary_demand_types = Column(Text)  # JSON格式
+    labeling_confidence = Column(Integer)
+
+    reuse_count = Column(Integer, default=0)  # 被复用的次数
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return (
+            f"<ClusterLabelMemory(id={self.memory_id}, level='{self.cluster_level}', "
+            f"size={self.size}, label='{self.llm_label or self.main_theme}')>"
+        )
+
+
 # ==================== 8. RedditSubreddit Reddit板块数据 ====================
 class RedditSubreddit(Base):
     """Reddit板块数据表 - 存储Reddit板块信息及AI分析结果"""
@@ -778,40 +829,265 @@ class UIConfig(Base):
         return f"<UIConfig(config_id={self.config_id}, config_key='{self.config_key}', config_type='{self.config_type}')>"
 
 
+# ==================== 11. StatsSnapshot 统计快照 ====================
+class StatsSnapshot(Base):
+    """
+    统计快照表（仪表盘用）
+
+    每行一个计数器（如 phrases.total、phrases.by_source.semrush），
+    在导入/聚类/创建需求等写操作提交时增量更新，UI直接读取，不再对phrases全表做聚合；
+    scripts/rebuild_stats_snapshot.py 可全量重建以修正漂移
+    """
+    __tablename__ = 'stats_snapshot'
+
+    stat_key = Column(String(100), primary_key=True)
+    stat_value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<StatsSnapshot({self.stat_key}={self.stat_value})>"
+
+
+# ==================== 12. 标签/分类关联表（JSON字段的规范化索引） ====================
+class ProductTag(Base):
+    """商品标签关联表 - Product.tags（JSON数组）的索引副本，由ProductRepository写入时同步"""
+    __tablename__ = 'product_tags'
+
+    product_id = Column(BigInteger, primary_key=True)
+    tag = Column(String(100), primary_key=True, index=True)
+
+    def __repr__(self):
+        return f"<ProductTag(product_id={self.product_id}, tag='{self.tag}')>"
+
+
+class SeedWordType(Base):
+    """词根分类关联表 - SeedWord.token_types（JSON数组）的索引副本"""
+    __tablename__ = 'seed_word_types'
+
+    seed_id = Column(Integer, primary_key=True)
+    token_type = Column(String(20), primary_key=True, index=True)
+
+    def __repr__(self):
+        return f"<SeedWordType(seed_id={self.seed_id}, token_type='{self.token_type}')>"
+
+
+class SeedWordDemand(Base):
+    """词根需求关联表 - SeedWord.related_demand_ids（JSON数组）的索引副本"""
+    __tablename__ = 'seed_word_demands'
+
+    seed_id = Column(Integer, primary_key=True)
+    demand_id = Column(Integer, primary_key=True, index=True)
+
+    def __repr__(self):
+        return f"<SeedWordDemand(seed_id={self.seed_id}, demand_id={self.demand_id})>"
+
+
 # ==================== 数据库引擎和会话 ====================
-def get_engine():
-    """获取数据库引擎（强制使用UTF-8编码）"""
-    # 根据数据库类型添加编码参数
-    connect_args = {}
+# 每个DATABASE_URL只创建一个引擎（连接池），所有Repository共用
+_engines = {}
+_session_factories = {}
+_scoped_sessions = {}
+_engine_lock = threading.Lock()
+
+_pool_stats_lock = threading.Lock()
+_pool_stats = {}
+
+
+def _new_pool_stats():
+    return {
+        'connects': 0,            # 新建的数据库连接数（TCP+认证握手）
+        'connect_time_ms': 0.0,   # 新建连接总耗时
+        'checkouts': 0,           # 从连接池取出连接的次数
+        'checkins': 0,            # 归还连接的次数
+        'hold_time_ms': 0.0,      # 连接被占用的总时长
+    }
+
+
+def _install_pool_metrics(engine, url: str):
+    """在引擎上注册连接池事件，统计建连/取出/归还"""
+    stats = _pool_stats.setdefault(url, _new_pool_stats())
+
+    @event.listens_for(engine, "do_connect")
+    def _before_connect(dialect, conn_rec, cargs, cparams):
+        conn_rec.info['connect_start'] = time.perf_counter()
+
+    @event.listens_for(engine.pool, "connect")
+    def _on_connect(dbapi_conn, conn_rec):
+        start = conn_rec.info.pop('connect_start', None)
+        with _pool_stats_lock:
+            stats['connects'] += 1
+            if start is not None:
+                stats['connect_time_ms'] += (time.perf_counter() - start) * 1000
+
+    @event.listens_for(engine.pool, "checkout")
+    def _on_checkout(dbapi_conn, conn_rec, conn_proxy):
+        conn_rec.info['checkout_start'] = time.perf_counter()
+        with _pool_stats_lock:
+            stats['checkouts'] += 1
+
+    @event.listens_for(engine.pool, "checkin")
+    def _on_checkin(dbapi_conn, conn_rec):
+        start = conn_rec.info.pop('checkout_start', None)
+        with _pool_stats_lock:
+            stats['checkins'] += 1
+            if start is not None:
+                stats['hold_time_ms'] += (time.perf_counter() - start) * 1000
+
+
+def get_engine(url: str = None):
+    """
+    获取数据库引擎（强制使用UTF-8编码）
+
+    同一个URL在进程内只创建一次，连接池大小由DATABASE_CONFIG中的
+    pool_size / max_overflow / pool_timeout 控制
+
+    Args:
+        url: 数据库连接字符串（默认DATABASE_URL）
+    """
+    url = url or DATABASE_URL
+    engine = _engines.get(url)
+    if engine is not None:
+        return engine
+
+    with _engine_lock:
+        engine = _engines.get(url)
+        if engine is not None:
+            return engine
+
+        # 根据数据库类型添加编码参数
+        pool_args = {}
+        if url.startswith("sqlite"):
+            # SQLite默认使用UTF-8，但显式设置确保一致性
+            connect_args = {"check_same_thread": False}
+        else:
+            # MySQL/MariaDB强制使用UTF-8编码
+            connect_args = {"charset": "utf8mb4"}
+            pool_args = {
+                "pool_size": DATABASE_CONFIG["pool_size"],
+                "max_overflow": DATABASE_CONFIG["max_overflow"],
+                "pool_timeout": DATABASE_CONFIG["pool_timeout"],
+            }
+
+        engine = create_engine(
+            url,
+            echo=False,  # 设为True可以看到SQL语句
+            pool_pre_ping=True,  # 连接池健康检查
+            pool_recycle=3600,   # 连接回收时间（秒）
+            connect_args=connect_args,  # 添加编码参数
+            **pool_args
+        )
+        _install_pool_metrics(engine, url)
+        _engines[url] = engine
+        return engine
 
-    if IS_SQLITE:
-        # SQLite默认使用UTF-8，但显式设置确保一致性
-        connect_args = {"check_same_thread": False}
-    else:
-        # MySQL/MariaDB强制使用UTF-8编码
-        connect_args = {"charset": "utf8mb4"}
-
-    engine = create_engine(
-        DATABASE_URL,
-        echo=False,  # 设为True可以看到SQL语句
-        pool_pre_ping=True,  # 连接池健康检查
-        pool_recycle=3600,   # 连接回收时间（秒）
-        connect_args=connect_args  # 添加编码参数
-    )
-    return engine
+
+def get_session_factory(url: str = None):
+    """获取绑定到共享引擎的sessionmaker（每个URL只创建一次）"""
+    url = url or DATABASE_URL
+    factory = _session_factories.get(url)
+    if factory is None:
+        engine = get_engine(url)
+        with _engine_lock:
+            factory = _session_factories.setdefault(url, sessionmaker(bind=engine))
+    return factory
 
 
 def get_session():
-    """获取数据库会话"""
-    engine = get_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
+    """获取数据库会话（新Session，连接来自共享连接池；调用方负责close）"""
+    return get_session_factory()()
+
+
+def get_scoped_session(url: str = None):
+    """
+    获取线程本地的scoped_session注册表
+
+    同一线程内多次调用得到同一个Session，适合Streamlit页面（每次rerun在
+    同一脚本线程执行）和线程池任务；用完后调用 remove_scoped_session()
+    """
+    url = url or DATABASE_URL
+    registry = _scoped_sessions.get(url)
+    if registry is None:
+        factory = get_session_factory(url)
+        with _engine_lock:
+            registry = _scoped_sessions.setdefault(url, scoped_session(factory))
+    return registry
+
+
+def remove_scoped_session(url: str = None):
+    """关闭并移除当前线程的scoped session（连接归还连接池）"""
+    registry = _scoped_sessions.get(url or DATABASE_URL)
+    if registry is not None:
+        registry.remove()
+
+
+@contextmanager
+def session_scope():
+    """
+    事务型会话上下文：正常退出时提交，异常时回滚，最后关闭
+
+    Example:
+        >>> with session_scope() as session:
+        ...     session.add(Phrase(...))
+    """
+    session = get_session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def get_pool_stats(url: str = None) -> dict:
+    """
+    获取连接池统计
+
+    Returns:
+        {'connects', 'avg_connect_ms', 'checkouts', 'checkins', 'avg_hold_ms',
+         'checked_out', 'pool_size', 'overflow', 'status'}
+    """
+    url = url or DATABASE_URL
+    with _pool_stats_lock:
+        stats = dict(_pool_stats.get(url) or _new_pool_stats())
+
+    connect_time = stats.pop('connect_time_ms')
+    hold_time = stats.pop('hold_time_ms')
+    stats['avg_connect_ms'] = connect_time / stats['connects'] if stats['connects'] else 0.0
+    stats['avg_hold_ms'] = hold_time / stats['checkins'] if stats['checkins'] else 0.0
+
+    engine = _engines.get(url)
+    pool = engine.pool if engine is not None else None
+    stats['checked_out'] = pool.checkedout() if hasattr(pool, 'checkedout') else 0
+    stats['pool_size'] = pool.size() if hasattr(pool, 'size') else 0
+    stats['overflow'] = pool.overflow() if hasattr(pool, 'overflow') else 0
+    stats['status'] = pool.status() if pool is not None else 'not created'
+    return stats
+
+
+def dispose_engines():
+    """关闭所有缓存的引擎和连接池（测试或切换数据库后使用）"""
+    with _engine_lock:
+        for registry in _scoped_sessions.values():
+            registry.remove()
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _session_factories.clear()
+        _scoped_sessions.clear()
+    with _pool_stats_lock:
+        _pool_stats.clear()
 
 
 def create_all_tables():
     """创建所有表（仅首次运行）"""
     engine = get_engine()
     Base.metadata.create_all(engine)
+
+    # 全文索引（SQLite FTS5虚拟表+触发器 / MySQL FULLTEXT）
+    from storage.fulltext import ensure_all_fulltext_indexes
+    ensure_all_fulltext_indexes(engine)
     print("SUCCESS: All tables created")
 
 
@@ -831,14 +1107,25 @@ __all__ = [
     "SegmentationBatch",
     "SeedWord",
     "ClusterMeta",
+    "ClusterLabelMemory",
     "RedditSubreddit",
     "AIPromptConfig",
     "Product",
     "ProductFieldDefinition",
     "ProductImportLog",
     "UIConfig",
+    "StatsSnapshot",
+    "ProductTag",
+    "SeedWordType",
+    "SeedWordDemand",
     "get_engine",
     "get_session",
+    "get_session_factory",
+    "get_scoped_session",
+    "remove_scoped_session",
+    "session_scope",
+    "get_pool_stats",
+    "dispose_engines",
     "create_all_tables",
     "drop_all_tables",
 ]
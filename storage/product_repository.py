@@ -9,14 +9,17 @@
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import json
-from sqlalchemy import or_, and_, func, desc, asc
+from sqlalchemy import or_, and_, func, desc, asc, select
 from sqlalchemy.orm import Session
 from storage.models import (
     get_session,
     Product,
     ProductFieldDefinition,
-    ProductImportLog
+    ProductImportLog,
+    ProductTag
 )
+from storage.fulltext import PRODUCT_FULLTEXT, apply_fulltext, count_results, keyset_condition
+from storage import tag_index
 
 
 # ==================== ProductRepository ====================
@@ -56,6 +59,9 @@ class ProductRepository:
         """
         product = Product(**data)
         self.session.add(product)
+        if product.tags:
+            self.session.flush()
+            tag_index.sync_product_tags(self.session, {product.product_id: product.tags})
         self.session.commit()
         return product.product_id
 
@@ -72,7 +78,13 @@ class ProductRepository:
         if not products:
             return 0
 
-        self.session.bulk_insert_mappings(Product, products)
+        # 有标签时需要回填主键以同步product_tags
+        has_tags = any(p.get('tags') for p in products)
+        self.session.bulk_insert_mappings(Product, products, return_defaults=has_tags)
+        if has_tags:
+            tag_index.sync_product_tags(self.session, {
+                p['product_id']: p['tags'] for p in products if p.get('tags')
+            })
         self.session.commit()
         return len(products)
 
@@ -126,6 +138,8 @@ class ProductRepository:
         result = self.session.query(Product).filter_by(
             product_id=product_id
         ).update(data)
+        if result and 'tags' in data:
+            tag_index.sync_product_tags(self.session, {product_id: data['tags']})
         self.session.commit()
         return result > 0
 
@@ -142,6 +156,8 @@ class ProductRepository:
         result = self.session.query(Product).filter_by(
             product_id=product_id
         ).delete()
+        if result:
+            tag_index.remove_product_tags(self.session, [product_id])
         self.session.commit()
         return result > 0
 
@@ -200,11 +216,16 @@ class ProductRepository:
         min_review_count: Optional[int] = None,
         tags: Optional[List[str]] = None,
         limit: int = 100,
-        offset: int = 0
-    ) -> Tuple[List[Dict[str, Any]], int]:
+        offset: int = 0,
+        after: Optional[Tuple] = None,
+        count_mode: str = 'exact'
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
         """
         [REQ-2.7] 高级搜索（支持多条件组合）
 
+        关键词优先走全文索引（SQLite FTS5 / MySQL FULLTEXT），按相关度排序，
+        结果带relevance字段；全文索引不可用或关键词无法分词时回退到LIKE
+
         Args:
             keyword: 关键词（搜索商品名称和描述）
             platform: 平台筛选
@@ -214,20 +235,27 @@ class ProductRepository:
             min_review_count: 最低评价数量
             tags: 标签筛选（包含任一标签）
             limit: 返回数量限制
-            offset: 偏移量
+            offset: 偏移量（传after时忽略）
+            after: 键集分页游标，即上一页最后一条的 next_cursor(product)
+            count_mode: 'exact'精确计数，'estimate'估算（最多数到上限），'skip'不计数（总数为None）
 
         Returns:
             (商品列表, 总数量)
         """
         query = self.session.query(Product)
+        relevance = None
 
         # 关键词搜索
         if keyword:
-            keyword_filter = or_(
-                Product.product_name.like(f"%{keyword}%"),
-                Product.description.like(f"%{keyword}%")
-            )
-            query = query.filter(keyword_filter)
+            fts_query, relevance = apply_fulltext(query, self.session, PRODUCT_FULLTEXT, Product, keyword)
+            if fts_query is not None:
+                query = fts_query.add_columns(relevance.label('relevance'))
+            else:
+                keyword_filter = or_(
+                    Product.product_name.like(f"%{keyword}%"),
+                    Product.description.like(f"%{keyword}%")
+                )
+                query = query.filter(keyword_filter)
 
         # 平台筛选
         if platform:
@@ -247,20 +275,51 @@ class ProductRepository:
         if min_review_count is not None:
             query = query.filter(Product.review_count >= min_review_count)
 
-        # 标签筛选（JSON字段搜索）
+        # 标签筛选：优先走product_tags索引，未迁移时回退到JSON字段LIKE
         if tags:
-            tag_filters = []
-            for tag in tags:
-                tag_filters.append(Product.tags.like(f'%"{tag}"%'))
-            query = query.filter(or_(*tag_filters))
+            if tag_index.index_ready(self.session):
+                query = query.filter(Product.product_id.in_(
+                    select(ProductTag.product_id).where(ProductTag.tag.in_(tags))
+                ))
+            else:
+                tag_filters = []
+                for tag in tags:
+                    tag_filters.append(Product.tags.like(f'%"{tag}"%'))
+                query = query.filter(or_(*tag_filters))
 
         # 获取总数
-        total = query.count()
+        total = count_results(query, count_mode)
 
-        # 分页
-        products = query.limit(limit).offset(offset).all()
+        # 排序：有相关度时按相关度降序，最后按主键保证顺序稳定（键集分页需要）
+        order_columns = [(Product.product_id, False)]
+        if relevance is not None:
+            order_columns.insert(0, (relevance, True))
+        query = query.order_by(*[expr.desc() if desc_ else expr.asc() for expr, desc_ in order_columns])
 
-        return [self._to_dict(p) for p in products], total
+        # 分页
+        if after is not None:
+            query = query.filter(keyset_condition(order_columns, after)).limit(limit)
+        else:
+            query = query.limit(limit).offset(offset)
+
+        results = []
+        for row in query.all():
+            if relevance is not None:
+                product, score = row
+                item = self._to_dict(product)
+                item['relevance'] = float(score)
+            else:
+                item = self._to_dict(row)
+            results.append(item)
+
+        return results, total
+
+    @staticmethod
+    def next_cursor(product: Dict[str, Any]) -> Tuple:
+        """由search结果的最后一条生成下一页的after游标"""
+        if 'relevance' in product:
+            return (product['relevance'], product['product_id'])
+        return (product['product_id'],)
 
     def get_pending_ai_analysis(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -307,6 +366,8 @@ class ProductRepository:
             "ai_analysis_status": status,
             "updated_at": datetime.utcnow()
         })
+        if result:
+            tag_index.sync_product_tags(self.session, {product_id: tags})
         self.session.commit()
         return result > 0
 
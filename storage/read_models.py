@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+只读列加载层（Read Model）
+热点读取路径只需要两三列时，直接 session.execute(select(列...)) 取元组，
+不构造ORM实体、不进identity map，内存和耗时都远小于 query(Model).all()
+
+提供三种结果形态：
+- select_rows: 元组列表（构建dict/Counter时最快）
+- select_frame: pandas DataFrame
+- select_structured: NumPy结构化数组（整数列无NULL时为int64，否则为object）
+
+以及基于它们的常用加载器（word_segments分词结果、按聚类加载短语等）
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Integer, select
+from sqlalchemy.orm import Session
+
+from storage.models import Phrase, WordSegment
+
+
+def _build_select(columns: Sequence, where: Iterable = (), order_by: Sequence = ()):
+    stmt = select(*columns)
+    for condition in where:
+        stmt = stmt.where(condition)
+    if order_by:
+        stmt = stmt.order_by(*order_by)
+    return stmt
+
+
+def select_rows(session: Session, columns: Sequence, where: Iterable = (),
+                order_by: Sequence = ()) -> List[Tuple]:
+    """
+    查询指定列，返回元组列表
+
+    Args:
+        session: 数据库会话
+        columns: 列对象（如 WordSegment.word）
+        where: 过滤条件列表
+        order_by: 排序列
+
+    Returns:
+        [(col1, col2, ...), ...]
+    """
+    result = session.execute(_build_select(columns, where, order_by))
+    return [tuple(row) for row in result]
+
+
+def select_frame(session: Session, columns: Sequence, where: Iterable = (),
+                 order_by: Sequence = ()):
+    """
+    查询指定列，返回pandas DataFrame（列名为字段名）
+    """
+    import pandas as pd
+
+    result = session.execute(_build_select(columns, where, order_by))
+    return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+
+def select_structured(session: Session, columns: Sequence, where: Iterable = (),
+                      order_by: Sequence = ()) -> np.ndarray:
+    """
+    查询指定列，返回NumPy结构化数组
+
+    整数列没有NULL时为int64，其余列为object
+    """
+    result = session.execute(_build_select(columns, where, order_by))
+    names = list(result.keys())
+    rows = result.fetchall()
+
+    dtypes = []
+    for idx, (name, column) in enumerate(zip(names, columns)):
+        is_integer = isinstance(getattr(column, 'type', None), Integer)
+        if is_integer and all(row[idx] is not None for row in rows):
+            dtypes.append((name, np.int64))
+        else:
+            dtypes.append((name, object))
+
+    return np.array([tuple(row) for row in rows], dtype=dtypes)
+
+
+# ==================== 常用加载器 ====================
+
+def load_token_rows(session: Session, min_frequency: int = 1) -> List[Tuple]:
+    """
+    加载分词结果（load_all_tokens用）
+
+    Returns:
+        [(word, frequency, word_count, pos_tag, pos_category, pos_chinese, translation), ...]
+    """
+    return select_rows(session, (
+        WordSegment.word,
+        WordSegment.frequency,
+        WordSegment.word_count,
+        WordSegment.pos_tag,
+        WordSegment.pos_category,
+        WordSegment.pos_chinese,
+        WordSegment.translation,
+    ), where=[WordSegment.frequency >= min_frequency])
+
+
+def load_word_annotation_rows(session: Session) -> List[Tuple]:
+    """
+    加载已有词性或翻译的词（注释缓存预热用）
+
+    Returns:
+        [(word, pos_tag, pos_category, pos_chinese, translation), ...]
+    """
+    return select_rows(session, (
+        WordSegment.word,
+        WordSegment.pos_tag,
+        WordSegment.pos_category,
+        WordSegment.pos_chinese,
+        WordSegment.translation,
+    ), where=[WordSegment.pos_tag.isnot(None) | WordSegment.translation.isnot(None)])
+
+
+def load_cluster_phrase_dicts(
+    session: Session,
+    cluster_id: int,
+    cluster_level: str = 'A',
+    fields: Sequence[str] = ('phrase_id', 'phrase', 'frequency', 'volume', 'seed_word', 'source_type')
+) -> List[Dict]:
+    """
+    加载指定聚类的短语（只取需要的字段）
+
+    Returns:
+        [{field: value}, ...]，按phrase_id排序
+    """
+    cluster_col = Phrase.cluster_id_A if cluster_level == 'A' else Phrase.cluster_id_B
+    rows = select_rows(
+        session,
+        [getattr(Phrase, field) for field in fields],
+        where=[cluster_col == cluster_id],
+        order_by=[Phrase.phrase_id]
+    )
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def load_cluster_phrases(session: Session, cluster_level: str = 'A') -> Dict[int, List[str]]:
+    """
+    按聚类分组加载短语文本（排除噪音点-1和未聚类）
+
+    Returns:
+        {cluster_id: [phrase, ...]}
+    """
+    cluster_col = Phrase.cluster_id_A if cluster_level == 'A' else Phrase.cluster_id_B
+    rows = select_rows(
+        session,
+        (cluster_col, Phrase.phrase),
+        where=[cluster_col.isnot(None), cluster_col != -1]
+    )
+
+    clusters: Dict[int, List[str]] = {}
+    for cluster_id, phrase in rows:
+        clusters.setdefault(cluster_id, []).append(phrase)
+    return clusters
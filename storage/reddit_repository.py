@@ -5,7 +5,7 @@ Reddit板块分析功能 - 数据访问层
 1. RedditSubredditRepository - Reddit板块数据访问
 2. AIPromptConfigRepository - AI提示词配置数据访问
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from sqlalchemy import or_, and_, func
 from sqlalchemy.orm import Session
@@ -14,6 +14,7 @@ from storage.models import (
     RedditSubreddit,
     AIPromptConfig
 )
+from storage.fulltext import REDDIT_FULLTEXT, apply_fulltext, count_results, keyset_condition
 
 
 # ==================== RedditSubredditRepository ====================
@@ -236,7 +237,9 @@ class RedditSubredditRepository:
         sort_by: str = "created_at",
         sort_order: str = "desc",
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        after: Optional[Tuple] = None,
+        count_mode: str = 'exact'
     ) -> Dict[str, Any]:
         """
         通用查询方法
@@ -250,19 +253,23 @@ class RedditSubredditRepository:
                 - subscribers_min: int - 最小订阅数
                 - subscribers_max: int - 最大订阅数
                 - batch_id: str - 批次ID
-                - search_text: str - 搜索文本（名称或描述）
-            sort_by: 排序字段
+                - search_text: str - 搜索文本（名称或描述，优先走全文索引）
+            sort_by: 排序字段（有search_text时可用'relevance'按相关度排序）
             sort_order: 排序方向（asc/desc）
             limit: 返回数量限制
-            offset: 偏移量
+            offset: 偏移量（传after时忽略）
+            after: 键集分页游标（上一次返回的next_cursor）
+            count_mode: 'exact'精确计数，'estimate'估算（最多数到上限），'skip'不计数（total为None）
 
         Returns:
             {
                 'total': int,
-                'data': List[Dict]
+                'data': List[Dict],
+                'next_cursor': tuple  # 下一页的after游标，没有更多数据时为None
             }
         """
         query = self.session.query(RedditSubreddit)
+        relevance = None
 
         # 应用筛选条件
         if filters:
@@ -295,34 +302,54 @@ class RedditSubredditRepository:
             if 'batch_id' in filters:
                 query = query.filter(RedditSubreddit.import_batch_id == filters['batch_id'])
 
-            # 文本搜索
+            # 文本搜索（全文索引不可用时回退到LIKE）
             if 'search_text' in filters and filters['search_text']:
-                search_pattern = f"%{filters['search_text']}%"
-                query = query.filter(
-                    or_(
-                        RedditSubreddit.name.like(search_pattern),
-                        RedditSubreddit.description.like(search_pattern)
-                    )
+                fts_query, relevance = apply_fulltext(
+                    query, self.session, REDDIT_FULLTEXT, RedditSubreddit, filters['search_text']
                 )
+                if fts_query is not None:
+                    query = fts_query
+                else:
+                    search_pattern = f"%{filters['search_text']}%"
+                    query = query.filter(
+                        or_(
+                            RedditSubreddit.name.like(search_pattern),
+                            RedditSubreddit.description.like(search_pattern)
+                        )
+                    )
 
         # 获取总数
-        total = query.count()
+        total = count_results(query, count_mode)
 
-        # 排序
-        if sort_order.lower() == 'desc':
-            query = query.order_by(getattr(RedditSubreddit, sort_by).desc())
+        # 排序（最后按主键保证顺序稳定，键集分页需要）
+        descending = sort_order.lower() == 'desc'
+        if sort_by == 'relevance':
+            sort_expr = relevance if relevance is not None else RedditSubreddit.subreddit_id
         else:
-            query = query.order_by(getattr(RedditSubreddit, sort_by).asc())
+            sort_expr = getattr(RedditSubreddit, sort_by)
+        order_columns = [(sort_expr, descending), (RedditSubreddit.subreddit_id, descending)]
+        query = query.add_columns(sort_expr.label('sort_key')).order_by(
+            *[expr.desc() if desc_ else expr.asc() for expr, desc_ in order_columns]
+        )
 
         # 分页
-        query = query.limit(limit).offset(offset)
+        if after is not None:
+            query = query.filter(keyset_condition(order_columns, after)).limit(limit)
+        else:
+            query = query.limit(limit).offset(offset)
 
         # 执行查询
-        subreddits = query.all()
+        rows = query.all()
+
+        next_cursor = None
+        if len(rows) == limit:
+            last, last_key = rows[-1]
+            next_cursor = (last_key, last.subreddit_id)
 
         return {
             'total': total,
-            'data': [self._to_dict(s) for s in subreddits]
+            'data': [self._to_dict(s) for s, _ in rows],
+            'next_cursor': next_cursor
         }
 
     # ==================== 统计方法 ====================
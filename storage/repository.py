@@ -2,12 +2,19 @@
 数据库操作封装（Repository层）
 提供CRUD操作接口，隔离业务逻辑和数据库细节
 """
+import weakref
+from collections import Counter
+from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, update, insert, bindparam, inspect
 from tqdm import tqdm
 
-from storage.models import Phrase, Demand, Token, ClusterMeta, SeedWord, get_session
+from storage.models import (
+    Phrase, Demand, Token, ClusterMeta, ClusterLabelMemory, SeedWord, StatsSnapshot,
+    SeedWordType, SeedWordDemand, get_session
+)
+from storage import tag_index
 
 
 class PhraseRepository:
@@ -46,11 +53,14 @@ class PhraseRepository:
         total_inserted = 0
         failed_records = []
 
-        # 分批插入
+        snapshot = StatsSnapshotRepository(self.session)
+
+        # 分批插入（统计快照随批次一起提交）
         for i in tqdm(range(0, len(records), batch_size), desc="插入进度"):
             batch = records[i:i + batch_size]
             try:
                 self.session.bulk_insert_mappings(Phrase, batch)
+                snapshot.apply_deltas(self._insert_deltas(batch))
                 self.session.commit()
                 total_inserted += len(batch)
             except Exception as e:
@@ -65,6 +75,7 @@ class PhraseRepository:
                 try:
                     phrase_obj = Phrase(**record)
                     self.session.add(phrase_obj)
+                    snapshot.apply_deltas(self._insert_deltas([record]))
                     self.session.commit()
                     total_inserted += 1
                 except Exception as e:
@@ -78,6 +89,44 @@ class PhraseRepository:
         print(f"✓ 成功插入 {total_inserted} 条记录")
         return total_inserted
 
+    @staticmethod
+    def _insert_deltas(records: List[Dict]) -> Dict[str, int]:
+        """新插入短语对应的统计快照增量"""
+        deltas = Counter()
+        for record in records:
+            deltas['phrases.total'] += 1
+            deltas[StatsSnapshotRepository.group_key('phrases.by_source', record.get('source_type'))] += 1
+            deltas[StatsSnapshotRepository.group_key(
+                'phrases.by_status', record.get('processed_status') or 'unseen')] += 1
+            deltas[StatsSnapshotRepository.group_key('phrases.by_round', record.get('first_seen_round'))] += 1
+            if record.get('cluster_id_A') is not None:
+                deltas['phrases.clustered_A'] += 1
+            if record.get('cluster_id_B') is not None:
+                deltas['phrases.clustered_B'] += 1
+            if record.get('mapped_demand_id') is not None:
+                deltas['phrases.mapped_to_demand'] += 1
+        return deltas
+
+    @staticmethod
+    def _assignment_deltas(old_rows, assign_A: bool, assign_B: bool) -> Dict[str, int]:
+        """
+        聚类分配对应的统计快照增量
+
+        Args:
+            old_rows: 更新前的 [(processed_status, cluster_id_A, cluster_id_B)]
+            assign_A / assign_B: 本次是否写入cluster_id_A / cluster_id_B
+        """
+        deltas = Counter()
+        for status, cluster_id_A, cluster_id_B in old_rows:
+            if status != 'assigned':
+                deltas[StatsSnapshotRepository.group_key('phrases.by_status', status)] -= 1
+                deltas['phrases.by_status.assigned'] += 1
+            if assign_A and cluster_id_A is None:
+                deltas['phrases.clustered_A'] += 1
+            if assign_B and cluster_id_B is None:
+                deltas['phrases.clustered_B'] += 1
+        return deltas
+
     def get_phrase_count(self) -> int:
         """获取短语总数"""
         return self.session.query(func.count(Phrase.phrase_id)).scalar()
@@ -120,13 +169,25 @@ class PhraseRepository:
                 - source_type: 数据源类型
                 - processed_status: 处理状态
                 - first_seen_round: 首次出现轮次
+                - after_phrase_id: 只取phrase_id大于此值的短语
 
         Returns:
             (phrases_list, total_count)
         """
-        query = self.session.query(Phrase)
+        query = self._apply_phrase_filters(self.session.query(Phrase), filters)
+
+        # 获取总数
+        total = query.count()
+
+        # 分页
+        offset = (page - 1) * page_size
+        phrases = query.offset(offset).limit(page_size).all()
+
+        return phrases, total
 
-        # 应用过滤器
+    @staticmethod
+    def _apply_phrase_filters(query, filters: Dict = None):
+        """应用get_phrases_paginated/stream_phrases共用的过滤条件"""
         if filters:
             if 'cluster_id_A' in filters:
                 query = query.filter(Phrase.cluster_id_A == filters['cluster_id_A'])
@@ -138,15 +199,76 @@ class PhraseRepository:
                 query = query.filter(Phrase.processed_status == filters['processed_status'])
             if 'first_seen_round' in filters:
                 query = query.filter(Phrase.first_seen_round == filters['first_seen_round'])
+            if 'after_phrase_id' in filters:
+                query = query.filter(Phrase.phrase_id > filters['after_phrase_id'])
+        return query
 
-        # 获取总数
-        total = query.count()
+    STREAM_CHUNK_SIZE = 10000
 
-        # 分页
-        offset = (page - 1) * page_size
-        phrases = query.offset(offset).limit(page_size).all()
+    def stream_phrases(self, columns: Tuple[str, ...] = ('phrase_id', 'phrase'),
+                       filters: Dict = None, chunk_size: int = None,
+                       limit: Optional[int] = None, as_arrays: bool = False):
+        """
+        按phrase_id键集分页流式读取短语（全量扫描用）
 
-        return phrases, total
+        与get_phrases_paginated不同，每块都是 WHERE phrase_id > 上一块最大ID ORDER BY phrase_id LIMIT n，
+        走主键索引，不做OFFSET也不做count()，全表扫描为O(n)；只查询需要的列，不构造ORM对象。
+
+        Args:
+            columns: 需要的列名（Phrase字段名）
+            filters: 过滤条件字典（同get_phrases_paginated）
+            chunk_size: 每块行数（默认STREAM_CHUNK_SIZE）
+            limit: 最多返回的行数（None表示全部）
+            as_arrays: True时每块返回 {列名: numpy数组}（phrase_id为int64，其余为object），否则返回元组列表
+
+        Yields:
+            每块的 [(col1, col2, ...), ...] 或 {col: np.ndarray}
+
+        Example:
+            >>> with PhraseRepository() as repo:
+            ...     for rows in repo.stream_phrases(('phrase',)):
+            ...         texts.extend(row[0] for row in rows)
+        """
+        chunk_size = chunk_size or self.STREAM_CHUNK_SIZE
+        columns = tuple(columns)
+        # phrase_id是键集游标，未请求时也要查询，返回前再去掉
+        select_columns = columns if 'phrase_id' in columns else ('phrase_id',) + columns
+        cursor_idx = select_columns.index('phrase_id')
+        strip_cursor = 'phrase_id' not in columns
+
+        base_query = self._apply_phrase_filters(
+            self.session.query(*[getattr(Phrase, col) for col in select_columns]), filters
+        )
+
+        last_id = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            batch_size = chunk_size if remaining is None else min(chunk_size, remaining)
+            query = base_query
+            if last_id is not None:
+                query = query.filter(Phrase.phrase_id > last_id)
+            rows = query.order_by(Phrase.phrase_id).limit(batch_size).all()
+            if not rows:
+                break
+
+            last_id = rows[-1][cursor_idx]
+            if remaining is not None:
+                remaining -= len(rows)
+
+            rows = [tuple(row[1:]) for row in rows] if strip_cursor else [tuple(row) for row in rows]
+            if as_arrays:
+                import numpy as np
+                # phrase_id为int64，其余列可能含NULL，统一用object
+                yield {
+                    col: np.array([row[i] for row in rows],
+                                  dtype=np.int64 if col == 'phrase_id' else object)
+                    for i, col in enumerate(columns)
+                }
+            else:
+                yield rows
+
+            if len(rows) < batch_size:
+                break
 
     def get_unseen_phrases(self, limit: Optional[int] = None) -> List[Phrase]:
         """
@@ -179,6 +301,10 @@ class PhraseRepository:
         try:
             phrase = self.session.query(Phrase).filter(Phrase.phrase_id == phrase_id).first()
             if phrase:
+                StatsSnapshotRepository(self.session).apply_deltas(self._assignment_deltas(
+                    [(phrase.processed_status, phrase.cluster_id_A, phrase.cluster_id_B)],
+                    cluster_id_A is not None, cluster_id_B is not None
+                ))
                 if cluster_id_A is not None:
                     phrase.cluster_id_A = cluster_id_A
                 if cluster_id_B is not None:
@@ -192,13 +318,93 @@ class PhraseRepository:
             print(f"⚠️  更新失败: {str(e)}")
             return False
 
-    def get_statistics(self) -> Dict:
+    def bulk_update_cluster_assignments(
+        self,
+        phrase_ids,
+        cluster_ids_A=None,
+        cluster_ids_B=None,
+        chunk_size: int = 5000
+    ) -> int:
+        """
+        批量更新短语的聚类分配（分块executemany UPDATE，单个事务）
+
+        与update_cluster_assignment语义一致：只更新提供的列，并把processed_status设为'assigned'
+
+        Args:
+            phrase_ids: 短语ID数组
+            cluster_ids_A: 大组ID数组（与phrase_ids等长，None表示不更新）
+            cluster_ids_B: 小组ID数组（与phrase_ids等长，None表示不更新）
+            chunk_size: 每次executemany的行数
+
+        Returns:
+            更新的记录数
+        """
+        if cluster_ids_A is None and cluster_ids_B is None:
+            return 0
+
+        table = Phrase.__table__
+        values = {'processed_status': 'assigned'}
+        columns = {}
+        if cluster_ids_A is not None:
+            values['cluster_id_A'] = bindparam('b_cluster_id_A')
+            columns['b_cluster_id_A'] = cluster_ids_A
+        if cluster_ids_B is not None:
+            values['cluster_id_B'] = bindparam('b_cluster_id_B')
+            columns['b_cluster_id_B'] = cluster_ids_B
+
+        for name, ids in columns.items():
+            if len(ids) != len(phrase_ids):
+                raise ValueError(f"{name[2:]}数组长度({len(ids)})与phrase_ids({len(phrase_ids)})不一致")
+
+        stmt = update(table).where(table.c.phrase_id == bindparam('b_phrase_id')).values(**values)
+
+        rows = [
+            {'b_phrase_id': int(phrase_id), **{name: int(ids[i]) for name, ids in columns.items()}}
+            for i, phrase_id in enumerate(phrase_ids)
+        ]
+
+        snapshot = StatsSnapshotRepository(self.session)
+        track_stats = snapshot.table_exists()
+
+        updated = 0
+        try:
+            for i in range(0, len(rows), chunk_size):
+                chunk = rows[i:i + chunk_size]
+                if track_stats:
+                    # 更新前的状态决定快照增量（同一事务内，随数据一起提交）
+                    old_rows = self.session.query(
+                        Phrase.processed_status, Phrase.cluster_id_A, Phrase.cluster_id_B
+                    ).filter(Phrase.phrase_id.in_([row['b_phrase_id'] for row in chunk])).all()
+                    snapshot.apply_deltas(self._assignment_deltas(
+                        old_rows, cluster_ids_A is not None, cluster_ids_B is not None
+                    ))
+                result = self.session.connection().execute(stmt, chunk)
+                updated += result.rowcount if result.rowcount >= 0 else len(chunk)
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            raise e
+
+        return updated
+
+    def get_statistics(self, use_snapshot: bool = True) -> Dict:
         """
         获取短语表统计信息
 
+        Args:
+            use_snapshot: 优先读取统计快照（stats_snapshot未初始化时回退到实时聚合）
+
         Returns:
             统计信息字典
         """
+        if use_snapshot:
+            stats = StatsSnapshotRepository(self.session).get_phrase_statistics()
+            if stats is not None:
+                return stats
+        return self._compute_statistics()
+
+    def _compute_statistics(self) -> Dict:
+        """对phrases表实时聚合统计"""
         stats = {
             'total_count': self.get_phrase_count(),
             'by_source': {},
@@ -408,6 +614,7 @@ class ClusterMetaRepository:
                 selection_score=None
             )
             self.session.add(cluster)
+            StatsSnapshotRepository(self.session).apply_deltas({f'clusters.{cluster_level}': 1})
 
         self.session.commit()
         return cluster
@@ -434,6 +641,10 @@ class ClusterMetaRepository:
                      ClusterMeta.cluster_level == cluster_level)
             ).first()
             if cluster:
+                if bool(cluster.is_selected) != bool(is_selected):
+                    StatsSnapshotRepository(self.session).apply_deltas(
+                        {f'clusters.selected_{cluster_level}': 1 if is_selected else -1}
+                    )
                 cluster.is_selected = is_selected
                 cluster.selection_score = selection_score
                 self.session.commit()
@@ -444,6 +655,27 @@ class ClusterMetaRepository:
             # 抛出异常而不是打印，让调用方处理
             raise e
 
+    def delete_cluster(self, cluster_id: int, cluster_level: str) -> bool:
+        """删除聚类元数据（同步扣减统计快照）"""
+        cluster = self.session.query(ClusterMeta).filter(
+            and_(ClusterMeta.cluster_id == cluster_id,
+                 ClusterMeta.cluster_level == cluster_level)
+        ).first()
+        if not cluster:
+            return False
+
+        try:
+            StatsSnapshotRepository(self.session).apply_deltas({
+                f'clusters.{cluster_level}': -1,
+                f'clusters.selected_{cluster_level}': -1 if cluster.is_selected else 0,
+            })
+            self.session.delete(cluster)
+            self.session.commit()
+            return True
+        except Exception:
+            self.session.rollback()
+            raise
+
     def update_cluster_labeling(
         self,
         cluster_id: int,
@@ -492,6 +724,66 @@ class ClusterMetaRepository:
             raise e
 
 
+class ClusterLabelMemoryRepository:
+    """聚类标注记忆表操作封装"""
+
+    def __init__(self, session: Session = None):
+        self.session = session or get_session()
+        self._should_close = session is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._should_close:
+            self.session.close()
+
+    def get_memories(self, cluster_level: str = 'A') -> List[ClusterLabelMemory]:
+        """获取某级别的全部标注记忆"""
+        return self.session.query(ClusterLabelMemory).filter(
+            ClusterLabelMemory.cluster_level == cluster_level
+        ).order_by(ClusterLabelMemory.memory_id).all()
+
+    def add_memory(self, **fields) -> ClusterLabelMemory:
+        """新增一条标注记忆"""
+        try:
+            memory = ClusterLabelMemory(**fields)
+            self.session.add(memory)
+            self.session.commit()
+            return memory
+        except Exception as e:
+            self.session.rollback()
+            raise e
+
+    def update_memory(self, memory_id: int, **fields) -> bool:
+        """更新标注记忆的指定字段"""
+        try:
+            updated = self.session.query(ClusterLabelMemory).filter(
+                ClusterLabelMemory.memory_id == memory_id
+            ).update(fields, synchronize_session=False)
+            self.session.commit()
+            return updated > 0
+        except Exception as e:
+            self.session.rollback()
+            raise e
+
+    def mark_reused(self, memory_id: int, cluster_id: int, round_id: int) -> bool:
+        """记录一次复用（质心和成员保持标注时的快照，避免缓慢漂移累积）"""
+        try:
+            updated = self.session.query(ClusterLabelMemory).filter(
+                ClusterLabelMemory.memory_id == memory_id
+            ).update({
+                'cluster_id': cluster_id,
+                'round_id': round_id,
+                'reuse_count': func.coalesce(ClusterLabelMemory.reuse_count, 0) + 1,
+            }, synchronize_session=False)
+            self.session.commit()
+            return updated > 0
+        except Exception as e:
+            self.session.rollback()
+            raise e
+
+
 class DemandRepository:
     """需求卡片表操作封装"""
 
@@ -523,6 +815,7 @@ class DemandRepository:
             status=status
         )
         self.session.add(demand)
+        StatsSnapshotRepository(self.session).apply_deltas({'demands.total': 1})
         self.session.commit()
         self.session.refresh(demand)  # 刷新对象，确保所有属性都已加载
         return demand
@@ -542,6 +835,12 @@ class DemandRepository:
 class TokenRepository:
     """Token词库表操作封装"""
 
+    # 未经LLM有效分类的token备注标记（--skip-llm或分类失败降级），重跑时会重新送LLM分类
+    UNCLASSIFIED_NOTE = '未分类'
+
+    # IN查询分块大小（避免超出SQLite变量数限制）
+    IN_CHUNK_SIZE = 500
+
     def __init__(self, session: Session = None):
         self.session = session or get_session()
         self._should_close = session is None
@@ -580,6 +879,7 @@ class TokenRepository:
             notes=notes
         )
         self.session.add(token)
+        StatsSnapshotRepository(self.session).apply_deltas({'tokens.total': 1})
         self.session.commit()
         return token
 
@@ -610,6 +910,93 @@ class TokenRepository:
             return True
         return False
 
+    def get_tokens_by_texts(self, token_texts: List[str]) -> Dict[str, Token]:
+        """
+        批量查询tokens（分块IN查询）
+
+        Args:
+            token_texts: token文本列表
+
+        Returns:
+            {token_text: Token对象}，不存在的token不在结果中
+        """
+        texts = list(dict.fromkeys(token_texts))
+        result = {}
+
+        for i in range(0, len(texts), self.IN_CHUNK_SIZE):
+            chunk = texts[i:i + self.IN_CHUNK_SIZE]
+            for token in self.session.query(Token).filter(Token.token_text.in_(chunk)).all():
+                result[token.token_text] = token
+
+        return result
+
+    def bulk_upsert_tokens(self, tokens: List[Dict], first_seen_round: int = 1) -> Tuple[int, int]:
+        """
+        批量插入或更新tokens（一次IN查询 + bulk_insert/bulk_update，只提交一次）
+
+        更新规则与create_token保持一致：
+        - in_phrase_count取新旧最大值
+        - 已审核（verified）的token不修改token_type
+        - 未分类的新数据（notes=UNCLASSIFIED_NOTE）不覆盖已有的有效分类
+
+        Args:
+            tokens: 字典列表，每个字典至少包含token_text和token_type，
+                    可选in_phrase_count、verified、notes
+            first_seen_round: 新token的首次出现轮次
+
+        Returns:
+            (新增数, 更新数)
+        """
+        # 同一批次内重复的token以最后一条为准
+        rows = {t['token_text']: t for t in tokens if t.get('token_text')}
+        if not rows:
+            return 0, 0
+
+        existing = self.get_tokens_by_texts(list(rows.keys()))
+
+        inserts = []
+        updates = []
+        for text, row in rows.items():
+            is_unclassified = row.get('notes') == self.UNCLASSIFIED_NOTE
+            token = existing.get(text)
+
+            if token is None:
+                inserts.append({
+                    'token_text': text,
+                    'token_type': row.get('token_type') or 'other',
+                    'in_phrase_count': row.get('in_phrase_count', 0),
+                    'first_seen_round': first_seen_round,
+                    'verified': bool(row.get('verified', False)),
+                    'notes': row.get('notes'),
+                })
+                continue
+
+            update = {
+                'token_id': token.token_id,
+                'in_phrase_count': max(token.in_phrase_count or 0, row.get('in_phrase_count', 0)),
+            }
+            if not token.verified and not is_unclassified and row.get('token_type'):
+                update['token_type'] = row['token_type']
+                # 重新分类后清除"未分类"标记
+                if token.notes == self.UNCLASSIFIED_NOTE:
+                    update['notes'] = row.get('notes')
+            if row.get('notes') and not is_unclassified:
+                update['notes'] = row['notes']
+            updates.append(update)
+
+        try:
+            if inserts:
+                self.session.bulk_insert_mappings(Token, inserts)
+                StatsSnapshotRepository(self.session).apply_deltas({'tokens.total': len(inserts)})
+            if updates:
+                self.session.bulk_update_mappings(Token, updates)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        return len(inserts), len(updates)
+
     def bulk_insert_tokens(self, tokens: List[Dict]) -> int:
         """批量插入tokens"""
         inserted = 0
@@ -628,6 +1015,11 @@ class TokenRepository:
 class SeedWordRepository:
     """词根管理表操作封装"""
 
+    # IN查询每块的词根数
+    IN_CHUNK_SIZE = 500
+    # 批量UPDATE每次executemany的行数
+    UPDATE_CHUNK_SIZE = 1000
+
     def __init__(self, session: Session = None):
         """初始化Repository"""
         self.session = session or get_session()
@@ -686,11 +1078,15 @@ class SeedWordRepository:
         import json
 
         existing = self.get_seed_word(seed_word)
+        snapshot = StatsSnapshotRepository(self.session)
 
         if existing:
+            old_counters = self._snapshot_counters(existing)
+
             # 更新现有记录（仅更新非None的字段）
             if token_types is not None:
                 existing.token_types = json.dumps(token_types)
+                tag_index.sync_seed_word_types(self.session, {existing.seed_id: token_types})
             if primary_token_type is not None:
                 existing.primary_token_type = primary_token_type
             if definition is not None:
@@ -716,6 +1112,9 @@ class SeedWordRepository:
             if notes is not None:
                 existing.notes = notes
 
+            deltas = Counter(self._snapshot_counters(existing))
+            deltas.subtract(old_counters)
+            snapshot.apply_deltas(deltas)
             self.session.commit()
             return existing
         else:
@@ -739,9 +1138,24 @@ class SeedWordRepository:
                 notes=notes
             )
             self.session.add(new_seed)
+            if token_types:
+                self.session.flush()
+                tag_index.sync_seed_word_types(self.session, {new_seed.seed_id: token_types})
+            snapshot.apply_deltas({'seed_words.total': 1, **self._snapshot_counters(new_seed)})
             self.session.commit()
             return new_seed
 
+    @staticmethod
+    def _snapshot_counters(seed: SeedWord) -> Dict[str, int]:
+        """单个词根在统计快照中对应的计数器"""
+        counters = {
+            StatsSnapshotRepository.group_key('seed_words.by_primary_type', seed.primary_token_type): 1,
+            StatsSnapshotRepository.group_key('seed_words.by_status', seed.status): 1,
+        }
+        if seed.verified:
+            counters['seed_words.verified'] = 1
+        return counters
+
     def get_seed_word(self, seed_word: str) -> Optional[SeedWord]:
         """根据词根文本查询记录"""
         return self.session.query(SeedWord).filter(
@@ -798,6 +1212,14 @@ class SeedWordRepository:
             return self.session.query(SeedWord).filter(
                 SeedWord.primary_token_type == token_type
             ).order_by(SeedWord.expansion_count.desc()).all()
+        elif tag_index.index_ready(self.session):
+            # 匹配主要类别或seed_word_types索引
+            return self.session.query(SeedWord).filter(or_(
+                SeedWord.primary_token_type == token_type,
+                SeedWord.seed_id.in_(
+                    self.session.query(SeedWordType.seed_id).filter(SeedWordType.token_type == token_type)
+                )
+            )).order_by(SeedWord.expansion_count.desc()).all()
         else:
             # 匹配主要类别或包含在多分类中
             all_seeds = self.session.query(SeedWord).all()
@@ -837,25 +1259,15 @@ class SeedWordRepository:
             if not seed_obj:
                 return False
 
-            # 统计该词根扩展的phrase数量
-            expansion_count = self.session.query(func.count(Phrase.phrase_id)).filter(
-                Phrase.seed_word == seed_word
-            ).scalar() or 0
-
-            # 统计总搜索量
-            total_volume = self.session.query(func.sum(Phrase.volume)).filter(
-                Phrase.seed_word == seed_word
-            ).scalar() or 0
-
-            # 统计平均频次
-            avg_frequency = self.session.query(func.avg(Phrase.frequency)).filter(
-                Phrase.seed_word == seed_word
-            ).scalar() or 0
+            # 一次聚合查询得到扩展数、总搜索量和平均频次
+            expansion_count, total_volume, avg_frequency = self._aggregate_expansion_stats(
+                [seed_word]
+            ).get(seed_word, (0, 0, 0))
 
             # 更新
             seed_obj.expansion_count = expansion_count
             seed_obj.total_volume = total_volume
-            seed_obj.avg_frequency = int(avg_frequency)
+            seed_obj.avg_frequency = avg_frequency
 
             self.session.commit()
             return True
@@ -864,20 +1276,113 @@ class SeedWordRepository:
             print(f"❌ 更新词根统计失败: {str(e)}")
             return False
 
-    def batch_update_all_stats(self) -> int:
+    def _aggregate_expansion_stats(self, seed_words: Optional[List[str]] = None) -> Dict[str, Tuple[int, int, int]]:
+        """
+        按seed_word分组聚合phrases（GROUP BY一次完成）
+
+        Args:
+            seed_words: 只聚合这些词根（分块IN查询）；None表示全部
+
+        Returns:
+            {seed_word: (expansion_count, total_volume, avg_frequency)}
+        """
+        query = self.session.query(
+            Phrase.seed_word,
+            func.count(Phrase.phrase_id),
+            func.sum(Phrase.volume),
+            func.avg(Phrase.frequency)
+        ).filter(Phrase.seed_word.isnot(None)).group_by(Phrase.seed_word)
+
+        if seed_words is None:
+            chunks = [query]
+        else:
+            chunks = [
+                query.filter(Phrase.seed_word.in_(seed_words[i:i + self.IN_CHUNK_SIZE]))
+                for i in range(0, len(seed_words), self.IN_CHUNK_SIZE)
+            ]
+
+        stats = {}
+        for chunk_query in chunks:
+            for seed_word, count, volume, avg_frequency in chunk_query:
+                stats[seed_word] = (count or 0, int(volume or 0), int(avg_frequency or 0))
+        return stats
+
+    def get_round_seed_words(self, round_id: Optional[int] = None) -> List[str]:
+        """
+        获取某一轮导入涉及的词根（已在seed_words表中的）
+
+        Args:
+            round_id: 轮次，None表示最新一轮（phrases.first_seen_round最大值）
         """
-        批量更新所有词根的统计信息
+        if round_id is None:
+            round_id = self.session.query(func.max(Phrase.first_seen_round)).scalar()
+            if round_id is None:
+                return []
+
+        touched = self.session.query(Phrase.seed_word).filter(
+            Phrase.first_seen_round == round_id,
+            Phrase.seed_word.isnot(None)
+        ).distinct()
+        return [
+            seed_word for (seed_word,) in
+            self.session.query(SeedWord.seed_word).filter(SeedWord.seed_word.in_(touched))
+        ]
+
+    def batch_update_all_stats(self, seed_words: Optional[List[str]] = None,
+                               incremental: bool = False, round_id: Optional[int] = None) -> int:
+        """
+        批量更新词根的统计信息
+
+        phrases按seed_word一次GROUP BY聚合，再用一条UPDATE语句executemany写回，
+        整批只提交一次（原来每个词根3次聚合查询+1次提交）
+
+        Args:
+            seed_words: 只更新这些词根；None表示全部
+            incremental: 增量模式，只更新round_id轮导入涉及的词根
+            round_id: 增量模式的轮次，None表示最新一轮
 
         Returns:
             更新成功的数量
         """
-        all_seeds = self.get_all_seed_words()
-        success_count = 0
+        full_refresh = not incremental and seed_words is None
+        if incremental:
+            seed_words = self.get_round_seed_words(round_id)
+        elif full_refresh:
+            seed_words = [w for (w,) in self.session.query(SeedWord.seed_word)]
+
+        if not seed_words:
+            return 0
+
+        print(f"\n📊 批量更新 {len(seed_words)} 个词根的统计信息...")
+        stats = self._aggregate_expansion_stats(None if full_refresh else list(seed_words))
+
+        table = SeedWord.__table__
+        stmt = update(table).where(table.c.seed_word == bindparam('b_seed_word')).values(
+            expansion_count=bindparam('b_expansion_count'),
+            total_volume=bindparam('b_total_volume'),
+            avg_frequency=bindparam('b_avg_frequency')
+        )
+        rows = []
+        for seed_word in seed_words:
+            expansion_count, total_volume, avg_frequency = stats.get(seed_word, (0, 0, 0))
+            rows.append({
+                'b_seed_word': seed_word,
+                'b_expansion_count': expansion_count,
+                'b_total_volume': total_volume,
+                'b_avg_frequency': avg_frequency,
+            })
 
-        print(f"\n📊 批量更新 {len(all_seeds)} 个词根的统计信息...")
-        for seed in tqdm(all_seeds, desc="更新进度"):
-            if self.update_expansion_stats(seed.seed_word):
-                success_count += 1
+        try:
+            success_count = 0
+            connection = self.session.connection()
+            for i in range(0, len(rows), self.UPDATE_CHUNK_SIZE):
+                result = connection.execute(stmt, rows[i:i + self.UPDATE_CHUNK_SIZE])
+                success_count += result.rowcount
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            print(f"❌ 更新词根统计失败: {str(e)}")
+            return 0
 
         print(f"✓ 成功更新 {success_count} 个词根")
         return success_count
@@ -914,6 +1419,7 @@ class SeedWordRepository:
                 demand_ids.append(demand_id)
 
             seed_obj.related_demand_ids = json.dumps(demand_ids)
+            tag_index.sync_seed_word_demands(self.session, {seed_obj.seed_id: demand_ids})
             self.session.commit()
             return True
         except Exception as e:
@@ -923,7 +1429,16 @@ class SeedWordRepository:
 
     def get_seeds_by_demand(self, demand_id: int) -> List[SeedWord]:
         """获取与指定需求关联的所有词根"""
-        # 查询primary_demand_id匹配的
+        if tag_index.index_ready(self.session):
+            # 主要需求或seed_word_demands索引
+            return self.session.query(SeedWord).filter(or_(
+                SeedWord.primary_demand_id == demand_id,
+                SeedWord.seed_id.in_(
+                    self.session.query(SeedWordDemand.seed_id).filter(SeedWordDemand.demand_id == demand_id)
+                )
+            )).all()
+
+        # 未迁移时回退：查询primary_demand_id匹配的
         primary_seeds = self.session.query(SeedWord).filter(
             SeedWord.primary_demand_id == demand_id
         ).all()
@@ -947,8 +1462,18 @@ class SeedWordRepository:
         result_dict = {s.seed_id: s for s in primary_seeds + related_seeds}
         return list(result_dict.values())
 
-    def get_statistics(self) -> Dict:
-        """获取词根统计信息"""
+    def get_statistics(self, use_snapshot: bool = True) -> Dict:
+        """
+        获取词根统计信息
+
+        Args:
+            use_snapshot: 优先读取统计快照（stats_snapshot未初始化时回退到实时统计）
+        """
+        if use_snapshot:
+            stats = StatsSnapshotRepository(self.session).get_seed_word_statistics()
+            if stats is not None:
+                return stats
+
         total = self.session.query(func.count(SeedWord.seed_id)).scalar() or 0
 
         # 按主要类别统计
@@ -979,6 +1504,219 @@ class SeedWordRepository:
         }
 
 
+class StatsSnapshotRepository:
+    """
+    统计快照表操作封装
+
+    计数器键名:
+    - phrases.total / phrases.by_source.<src> / phrases.by_status.<status> / phrases.by_round.<n>
+    - phrases.clustered_A / phrases.clustered_B / phrases.mapped_to_demand
+    - clusters.A / clusters.B / clusters.selected_A / clusters.selected_B
+    - demands.total / tokens.total
+    - seed_words.total / seed_words.by_primary_type.<type> / seed_words.by_status.<status> / seed_words.verified
+
+    写操作在同一事务里调用apply_deltas，随数据一起提交；快照未初始化（未执行过rebuild）时
+    读取方法返回None，调用方回退到实时聚合
+    """
+
+    INITIALIZED_KEY = 'meta.initialized'
+    NULL_KEY = 'null'
+
+    # 已确认存在stats_snapshot表的引擎（旧库未建表时增量更新直接跳过；
+    # 只缓存存在的结果，未建表时每次重新检查，迁移后无需重启即生效）
+    _table_ready = weakref.WeakKeyDictionary()
+
+    def __init__(self, session: Session = None):
+        self.session = session or get_session()
+        self._should_close = session is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._should_close:
+            self.session.close()
+
+    @classmethod
+    def group_key(cls, prefix: str, value) -> str:
+        """分组计数器键名（None记为'null'）"""
+        return f"{prefix}.{cls.NULL_KEY if value is None else value}"
+
+    def table_exists(self) -> bool:
+        """stats_snapshot表是否存在（只缓存存在的结果）"""
+        bind = self.session.get_bind()
+        if bind in self._table_ready:
+            return True
+        # 用会话自己的连接检查，避免另取连接归还时回滚当前事务（SQLite内存库共用一个连接）
+        exists = inspect(self.session.connection()).has_table(StatsSnapshot.__tablename__)
+        if exists:
+            self._table_ready[bind] = True
+        return exists
+
+    def apply_deltas(self, deltas: Dict[str, int]):
+        """
+        累加计数器（不提交，由调用方随数据一起提交）
+
+        Args:
+            deltas: {stat_key: 增量}
+        """
+        deltas = {key: int(value) for key, value in deltas.items() if value}
+        if not deltas or not self.table_exists():
+            return
+
+        table = StatsSnapshot.__table__
+        now = datetime.utcnow()
+        existing = {
+            key for (key,) in self.session.query(StatsSnapshot.stat_key).filter(
+                StatsSnapshot.stat_key.in_(list(deltas))
+            )
+        }
+
+        connection = self.session.connection()
+        if existing:
+            stmt = update(table).where(table.c.stat_key == bindparam('b_key')).values(
+                stat_value=table.c.stat_value + bindparam('b_delta'),
+                updated_at=now
+            )
+            connection.execute(stmt, [{'b_key': key, 'b_delta': deltas[key]} for key in existing])
+
+        missing = [key for key in deltas if key not in existing]
+        if missing:
+            connection.execute(insert(table), [
+                {'stat_key': key, 'stat_value': deltas[key], 'updated_at': now} for key in missing
+            ])
+
+    def get_snapshot(self) -> Dict[str, int]:
+        """读取全部计数器（表很小，一次查询）"""
+        if not self.table_exists():
+            return {}
+        return {key: value for key, value in self.session.query(
+            StatsSnapshot.stat_key, StatsSnapshot.stat_value
+        )}
+
+    def rebuild(self) -> Dict[str, int]:
+        """
+        全量重建快照（修正增量维护产生的漂移）
+
+        Returns:
+            重建后的计数器
+        """
+        StatsSnapshot.__table__.create(self.session.get_bind(), checkfirst=True)
+
+        counters = {self.INITIALIZED_KEY: 1}
+
+        phrase_stats = PhraseRepository(self.session)._compute_statistics()
+        counters['phrases.total'] = phrase_stats['total_count']
+        for group in ('by_source', 'by_status', 'by_round'):
+            for value, count in phrase_stats[group].items():
+                counters[self.group_key(f'phrases.{group}', value)] = count
+        for field in ('clustered_A', 'clustered_B', 'mapped_to_demand'):
+            counters[f'phrases.{field}'] = phrase_stats[field]
+
+        for level in ('A', 'B'):
+            counters[f'clusters.{level}'] = self.session.query(func.count(ClusterMeta.cluster_id)).filter(
+                ClusterMeta.cluster_level == level
+            ).scalar() or 0
+            counters[f'clusters.selected_{level}'] = self.session.query(func.count(ClusterMeta.cluster_id)).filter(
+                ClusterMeta.cluster_level == level,
+                ClusterMeta.is_selected == True
+            ).scalar() or 0
+
+        counters['demands.total'] = self.session.query(func.count(Demand.demand_id)).scalar() or 0
+        counters['tokens.total'] = self.session.query(func.count(Token.token_id)).scalar() or 0
+
+        counters['seed_words.total'] = self.session.query(func.count(SeedWord.seed_id)).scalar() or 0
+        for group, column in (('by_primary_type', SeedWord.primary_token_type), ('by_status', SeedWord.status)):
+            for value, count in self.session.query(column, func.count(SeedWord.seed_id)).group_by(column):
+                counters[self.group_key(f'seed_words.{group}', value)] = count
+        counters['seed_words.verified'] = self.session.query(func.count(SeedWord.seed_id)).filter(
+            SeedWord.verified == True
+        ).scalar() or 0
+
+        now = datetime.utcnow()
+        try:
+            self.session.query(StatsSnapshot).delete()
+            self.session.bulk_insert_mappings(StatsSnapshot, [
+                {'stat_key': key, 'stat_value': value, 'updated_at': now}
+                for key, value in counters.items()
+            ])
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        return counters
+
+    @classmethod
+    def _group(cls, snapshot: Dict[str, int], prefix: str, cast=None) -> Dict:
+        """取出某个前缀下的分组计数（跳过已减到0的分组）"""
+        result = {}
+        prefix = prefix + '.'
+        for key, value in snapshot.items():
+            if key.startswith(prefix) and value:
+                name = key[len(prefix):]
+                if name == cls.NULL_KEY:
+                    name = None
+                elif cast is not None:
+                    name = cast(name)
+                result[name] = value
+        return result
+
+    def get_phrase_statistics(self) -> Optional[Dict]:
+        """从快照读取短语统计（格式同PhraseRepository.get_statistics，未初始化时返回None）"""
+        snapshot = self.get_snapshot()
+        if not snapshot.get(self.INITIALIZED_KEY):
+            return None
+        return {
+            'total_count': snapshot.get('phrases.total', 0),
+            'by_source': self._group(snapshot, 'phrases.by_source'),
+            'by_status': self._group(snapshot, 'phrases.by_status'),
+            'by_round': self._group(snapshot, 'phrases.by_round', cast=int),
+            'clustered_A': snapshot.get('phrases.clustered_A', 0),
+            'clustered_B': snapshot.get('phrases.clustered_B', 0),
+            'mapped_to_demand': snapshot.get('phrases.mapped_to_demand', 0),
+        }
+
+    def get_seed_word_statistics(self) -> Optional[Dict]:
+        """从快照读取词根统计（格式同SeedWordRepository.get_statistics，未初始化时返回None）"""
+        snapshot = self.get_snapshot()
+        if not snapshot.get(self.INITIALIZED_KEY):
+            return None
+        total = snapshot.get('seed_words.total', 0)
+        by_primary_type = {t: 0 for t in ['intent', 'action', 'object', 'other']}
+        by_primary_type.update({
+            t: c for t, c in self._group(snapshot, 'seed_words.by_primary_type').items() if t in by_primary_type
+        })
+        by_status = {s: 0 for s in ['active', 'paused', 'archived']}
+        by_status.update({
+            s: c for s, c in self._group(snapshot, 'seed_words.by_status').items() if s in by_status
+        })
+        verified_count = snapshot.get('seed_words.verified', 0)
+        return {
+            'total': total,
+            'by_primary_type': by_primary_type,
+            'by_status': by_status,
+            'verified_count': verified_count,
+            'verified_rate': round(verified_count / total * 100, 1) if total > 0 else 0
+        }
+
+    def get_dashboard_stats(self) -> Optional[Dict]:
+        """首页仪表盘统计（未初始化时返回None）"""
+        snapshot = self.get_snapshot()
+        if not snapshot.get(self.INITIALIZED_KEY):
+            return None
+        return {
+            'phrases_count': snapshot.get('phrases.total', 0),
+            'clusters_A': snapshot.get('clusters.A', 0),
+            'clusters_B': snapshot.get('clusters.B', 0),
+            'selected_A': snapshot.get('clusters.selected_A', 0),
+            'demands_count': snapshot.get('demands.total', 0),
+            'tokens_count': snapshot.get('tokens.total', 0),
+            'by_source': self._group(snapshot, 'phrases.by_source'),
+            'by_status': self._group(snapshot, 'phrases.by_status'),
+        }
+
+
 # ==================== 测试工具函数 ====================
 def test_database_connection():
     """测试数据库连接"""
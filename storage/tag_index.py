@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+JSON字段的规范化索引（关联表同步）
+
+Product.tags、SeedWord.token_types、SeedWord.related_demand_ids以JSON文本存储，
+按标签/类型/需求查找只能 LIKE '%"tag"%' 或全表 json.loads。这里把它们同步到关联表：
+- product_tags (product_id, tag)
+- seed_word_types (seed_id, token_type)
+- seed_word_demands (seed_id, demand_id)
+
+Repository写入JSON字段时在同一事务内调用sync_*（先删后插），查询时用关联表子查询走索引。
+关联表不存在（旧库未迁移）时同步直接跳过、查询回退到原来的方式；
+scripts/migrate_add_tag_index.py 负责建表并从JSON字段回填。
+"""
+import json
+import weakref
+from typing import Dict, Iterable, List
+
+from sqlalchemy import delete, func, inspect, select
+from sqlalchemy.orm import Session
+
+from storage.models import Product, ProductTag, SeedWord, SeedWordDemand, SeedWordType
+
+INDEX_TABLES = (ProductTag.__table__, SeedWordType.__table__, SeedWordDemand.__table__)
+
+# 已确认建立关联表的引擎（只缓存已建立的结果，未迁移时每次重新检查）
+_ready = weakref.WeakKeyDictionary()
+
+_CHUNK_SIZE = 500
+
+
+def parse_json_list(value) -> List:
+    """解析JSON数组字段（已是列表时直接返回，格式错误时返回空列表）"""
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+
+def index_ready(session: Session) -> bool:
+    """关联表是否已建立"""
+    bind = session.get_bind()
+    if bind in _ready:
+        return True
+    # 用会话自己的连接检查，避免另取连接归还时回滚当前事务
+    inspector = inspect(session.connection())
+    ready = all(inspector.has_table(t.name) for t in INDEX_TABLES)
+    if ready:
+        _ready[bind] = True
+    return ready
+
+
+def _replace_rows(session: Session, model, owner_col: str, value_col: str,
+                  values_by_owner: Dict[int, Iterable]):
+    """先删除这些owner的旧关联，再批量插入新关联（不提交）"""
+    owner_ids = list(values_by_owner)
+    column = getattr(model, owner_col)
+    for i in range(0, len(owner_ids), _CHUNK_SIZE):
+        session.execute(delete(model).where(column.in_(owner_ids[i:i + _CHUNK_SIZE])))
+
+    rows = []
+    for owner_id, values in values_by_owner.items():
+        for value in dict.fromkeys(v for v in values if v is not None and v != ''):
+            rows.append({owner_col: owner_id, value_col: value})
+    if rows:
+        session.bulk_insert_mappings(model, rows)
+
+
+def sync_product_tags(session: Session, tags_by_product: Dict[int, object]):
+    """
+    同步商品标签
+
+    Args:
+        tags_by_product: {product_id: 标签列表或JSON文本}
+    """
+    if not tags_by_product or not index_ready(session):
+        return
+    _replace_rows(session, ProductTag, 'product_id', 'tag', {
+        product_id: [str(tag)[:100] for tag in parse_json_list(tags)]
+        for product_id, tags in tags_by_product.items()
+    })
+
+
+def sync_seed_word_types(session: Session, types_by_seed: Dict[int, object]):
+    """
+    同步词根分类
+
+    Args:
+        types_by_seed: {seed_id: 分类列表或JSON文本}
+    """
+    if not types_by_seed or not index_ready(session):
+        return
+    _replace_rows(session, SeedWordType, 'seed_id', 'token_type', {
+        seed_id: [str(t) for t in parse_json_list(types)]
+        for seed_id, types in types_by_seed.items()
+    })
+
+
+def sync_seed_word_demands(session: Session, demands_by_seed: Dict[int, object]):
+    """
+    同步词根关联需求
+
+    Args:
+        demands_by_seed: {seed_id: 需求ID列表或JSON文本}
+    """
+    if not demands_by_seed or not index_ready(session):
+        return
+    _replace_rows(session, SeedWordDemand, 'seed_id', 'demand_id', {
+        seed_id: [int(d) for d in parse_json_list(demands) if str(d).lstrip('-').isdigit()]
+        for seed_id, demands in demands_by_seed.items()
+    })
+
+
+def remove_product_tags(session: Session, product_ids: List[int]):
+    """删除商品时清理标签关联（不提交）"""
+    if product_ids and index_ready(session):
+        _replace_rows(session, ProductTag, 'product_id', 'tag', {pid: [] for pid in product_ids})
+
+
+def backfill(session: Session, batch_size: int = 5000) -> Dict[str, int]:
+    """
+    建表并从JSON字段全量回填关联表（提交）
+
+    Returns:
+        {'product_tags': 行数, 'seed_word_types': 行数, 'seed_word_demands': 行数}
+    """
+    connection = session.connection()
+    for table in INDEX_TABLES:
+        table.create(connection, checkfirst=True)
+
+    try:
+        for table in INDEX_TABLES:
+            session.execute(table.delete())
+
+        products = session.query(Product.product_id, Product.tags).filter(Product.tags.isnot(None)).all()
+        for i in range(0, len(products), batch_size):
+            sync_product_tags(session, dict(products[i:i + batch_size]))
+
+        seeds = session.query(SeedWord.seed_id, SeedWord.token_types, SeedWord.related_demand_ids).all()
+        sync_seed_word_types(session, {seed_id: types for seed_id, types, _ in seeds if types})
+        sync_seed_word_demands(session, {seed_id: demands for seed_id, _, demands in seeds if demands})
+
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    return {
+        table.name: session.execute(select(func.count()).select_from(table)).scalar()
+        for table in INDEX_TABLES
+    }
@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 
 from storage.models import WordSegment, SegmentationBatch, get_session
+from storage.read_models import load_token_rows
 
 
 class WordSegmentRepository:
@@ -82,26 +83,23 @@ class WordSegmentRepository:
             >>>     # pos只包含单词的词性信息
             >>>     # trans包含所有tokens的翻译
         """
-        # 加载所有word_segments（不区分word_count）
-        all_tokens_query = self.session.query(WordSegment).filter(
-            WordSegment.frequency >= min_frequency
-        ).all()
-
+        # 只查需要的列，不构造WordSegment实体（不区分word_count）
         token_counter = Counter()
         pos_tags = {}
         translations = {}
 
-        for ws in all_tokens_query:
+        for word, frequency, word_count, pos_tag, pos_category, pos_chinese, translation \
+                in load_token_rows(self.session, min_frequency):
             # 频次统计
-            token_counter[ws.word] = ws.frequency
+            token_counter[word] = frequency
 
             # 词性信息（仅单词有）
-            if ws.word_count == 1 and ws.pos_tag:
-                pos_tags[ws.word] = (ws.pos_tag, ws.pos_category, ws.pos_chinese)
+            if word_count == 1 and pos_tag:
+                pos_tags[word] = (pos_tag, pos_category, pos_chinese)
 
             # 翻译（单词和短语都可能有）
-            if ws.translation:
-                translations[ws.word] = ws.translation
+            if translation:
+                translations[word] = translation
 
         # 加载最新批次信息
         latest_batch = self.get_latest_batch()
@@ -186,6 +184,9 @@ class WordSegmentRepository:
             latest_batch
         )
 
+    # 批量upsert每块的行数
+    UPSERT_CHUNK_SIZE = 1000
+
     def save_word_segments(
         self,
         word_counter: Counter,
@@ -193,11 +194,17 @@ class WordSegmentRepository:
         translations: Optional[Dict[str, str]] = None,
         batch_id: Optional[int] = None,
         ngram_counter: Optional[Counter] = None,
-        ngram_translations: Optional[Dict[str, str]] = None
+        ngram_translations: Optional[Dict[str, str]] = None,
+        chunk_size: int = None
     ) -> Tuple[int, int]:
         """
         保存或更新分词结果（支持单词和短语）
 
+        使用集合式批量upsert，不再逐词查询：
+        - MySQL: INSERT ... ON DUPLICATE KEY UPDATE frequency = frequency + VALUES(frequency)
+        - SQLite: INSERT ... ON CONFLICT(word) DO UPDATE
+        已存在的词：频次累加，提供了词性/翻译则覆盖，word_count为空时补全
+
         Args:
             word_counter: {word: frequency} Counter对象（单词）
             pos_tags: {word: (pos_tag, pos_category, pos_chinese)}（仅单词）
@@ -205,96 +212,188 @@ class WordSegmentRepository:
             batch_id: 所属批次ID
             ngram_counter: {ngram: frequency} Counter对象（短语，可选）
             ngram_translations: {ngram: translation}（短语翻译，可选）
+            chunk_size: 每块upsert的行数（默认UPSERT_CHUNK_SIZE）
 
         Returns:
             (新增单词数, 新增短语数)
         """
-        new_words_count = 0
-        new_ngrams_count = 0
+        chunk_size = chunk_size or self.UPSERT_CHUNK_SIZE
+        pos_tags = pos_tags or {}
+        translations = translations or {}
+        ngram_translations = ngram_translations or {}
 
-        # 1. 保存单词（word_count=1）
+        # 1. 单词行（word_count=1）
+        rows = []
         for word, frequency in word_counter.items():
-            word_count = 1  # 单词
-
-            # 检查是否已存在
-            existing = self.session.query(WordSegment).filter(
-                WordSegment.word == word
-            ).first()
-
-            if existing:
-                # 更新频次（累加）
-                existing.frequency += frequency
-                existing.updated_at = datetime.utcnow()
-
-                # 更新词性和翻译（如果提供）
-                if pos_tags and word in pos_tags:
-                    pos_tag, pos_category, pos_chinese = pos_tags[word]
-                    existing.pos_tag = pos_tag
-                    existing.pos_category = pos_category
-                    existing.pos_chinese = pos_chinese
-
-                if translations and word in translations:
-                    existing.translation = translations[word]
-
-                # 确保 word_count 正确
-                if not existing.word_count:
-                    existing.word_count = word_count
-            else:
-                # 创建新记录
-                new_word = WordSegment(
-                    word=word,
-                    frequency=frequency,
-                    word_count=word_count,
-                    pos_tag=pos_tags[word][0] if pos_tags and word in pos_tags else None,
-                    pos_category=pos_tags[word][1] if pos_tags and word in pos_tags else None,
-                    pos_chinese=pos_tags[word][2] if pos_tags and word in pos_tags else None,
-                    translation=translations.get(word) if translations else None,
-                )
-                self.session.add(new_word)
-                new_words_count += 1
-
-        # 2. 保存短语（word_count>1）
+            pos_tag, pos_category, pos_chinese = pos_tags.get(word, (None, None, None))
+            rows.append({
+                'word': word,
+                'frequency': frequency,
+                'word_count': 1,
+                'pos_tag': pos_tag,
+                'pos_category': pos_category,
+                'pos_chinese': pos_chinese,
+                'translation': translations.get(word),
+            })
+
+        # 2. 短语行（word_count>1，短语没有词性）
         if ngram_counter:
             for ngram, frequency in ngram_counter.items():
-                word_count = len(ngram.split())  # 短语词数
-
-                # 检查是否已存在
-                existing = self.session.query(WordSegment).filter(
-                    WordSegment.word == ngram
-                ).first()
-
-                if existing:
-                    # 更新频次（累加）
-                    existing.frequency += frequency
-                    existing.updated_at = datetime.utcnow()
-
-                    # 更新翻译（如果提供）
-                    if ngram_translations and ngram in ngram_translations:
-                        existing.translation = ngram_translations[ngram]
-
-                    # 确保 word_count 正确
-                    if not existing.word_count:
-                        existing.word_count = word_count
-                else:
-                    # 创建新记录（短语没有词性）
-                    new_ngram = WordSegment(
-                        word=ngram,
-                        frequency=frequency,
-                        word_count=word_count,
-                        translation=ngram_translations.get(ngram) if ngram_translations else None,
-                    )
-                    self.session.add(new_ngram)
-                    new_ngrams_count += 1
+                rows.append({
+                    'word': ngram,
+                    'frequency': frequency,
+                    'word_count': len(ngram.split()),
+                    'pos_tag': None,
+                    'pos_category': None,
+                    'pos_chinese': None,
+                    'translation': ngram_translations.get(ngram),
+                })
+
+        # 3. 统计新增数量（分块IN查询已存在的词）
+        existing = self._get_existing_words([row['word'] for row in rows], chunk_size)
+        new_words_count = sum(
+            1 for row in rows if row['word_count'] == 1 and row['word'] not in existing
+        )
+        new_ngrams_count = sum(
+            1 for row in rows if row['word_count'] > 1 and row['word'] not in existing
+        )
+
+        # 4. 分块upsert
+        stmt = self._build_upsert_statement()
+        now = datetime.utcnow()
+        for i in range(0, len(rows), chunk_size):
+            chunk = rows[i:i + chunk_size]
+            for row in chunk:
+                row['created_at'] = now
+                row['updated_at'] = now
+            self.session.execute(stmt, chunk)
 
         self.session.commit()
         return new_words_count, new_ngrams_count
 
+    def _get_existing_words(self, words: List[str], chunk_size: int) -> set:
+        """分块IN查询已存在的词"""
+        existing = set()
+        for i in range(0, len(words), chunk_size):
+            chunk = words[i:i + chunk_size]
+            existing.update(
+                word for (word,) in self.session.query(WordSegment.word).filter(
+                    WordSegment.word.in_(chunk)
+                )
+            )
+        return existing
+
+    def _build_upsert_statement(self):
+        """按数据库方言构造word_segments的upsert语句（用于executemany）"""
+        table = WordSegment.__table__
+        dialect = self.session.get_bind().dialect.name
+
+        if dialect == 'mysql':
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(table)
+            incoming = stmt.inserted
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(table)
+            incoming = stmt.excluded
+
+        update_values = {
+            'frequency': table.c.frequency + incoming.frequency,
+            'pos_tag': func.coalesce(incoming.pos_tag, table.c.pos_tag),
+            'pos_category': func.coalesce(incoming.pos_category, table.c.pos_category),
+            'pos_chinese': func.coalesce(incoming.pos_chinese, table.c.pos_chinese),
+            'translation': func.coalesce(incoming.translation, table.c.translation),
+            'word_count': func.coalesce(func.nullif(table.c.word_count, 0), incoming.word_count),
+            'updated_at': incoming.updated_at,
+        }
+
+        if dialect == 'mysql':
+            return stmt.on_duplicate_key_update(**update_values)
+        return stmt.on_conflict_do_update(index_elements=[table.c.word], set_=update_values)
+
     def get_word_segment(self, word: str) -> Optional[WordSegment]:
         """获取单个单词的分词记录"""
         return self.session.query(WordSegment).filter(
             WordSegment.word == word
         ).first()
 
+    def get_translations(self, words: List[str], chunk_size: int = 500) -> Dict[str, Optional[str]]:
+        """
+        批量查询翻译（分块IN查询）
+
+        Args:
+            words: 单词/短语列表
+            chunk_size: 每次IN查询的数量
+
+        Returns:
+            {word: translation}，仅包含word_segments中已存在的词（translation可能为None）
+        """
+        unique_words = list(dict.fromkeys(words))
+        result = {}
+
+        for i in range(0, len(unique_words), chunk_size):
+            chunk = unique_words[i:i + chunk_size]
+            rows = self.session.query(
+                WordSegment.word,
+                WordSegment.translation
+            ).filter(WordSegment.word.in_(chunk)).all()
+            result.update({word: translation for word, translation in rows})
+
+        return result
+
+    def bulk_upsert_translations(
+        self,
+        translations: Dict[str, str],
+        chunk_size: int = 500
+    ) -> Tuple[int, int]:
+        """
+        批量写入翻译：已存在的词更新translation，不存在的词新建记录（frequency=0）
+
+        Args:
+            translations: {word: translation}
+            chunk_size: 每次IN查询的数量
+
+        Returns:
+            (新增数, 更新数)
+        """
+        if not translations:
+            return 0, 0
+
+        words = list(translations.keys())
+        existing_ids = {}
+        for i in range(0, len(words), chunk_size):
+            chunk = words[i:i + chunk_size]
+            rows = self.session.query(
+                WordSegment.word,
+                WordSegment.word_id
+            ).filter(WordSegment.word.in_(chunk)).all()
+            existing_ids.update({word: word_id for word, word_id in rows})
+
+        now = datetime.utcnow()
+        updates = [
+            {'word_id': existing_ids[word], 'translation': trans, 'updated_at': now}
+            for word, trans in translations.items() if word in existing_ids
+        ]
+        inserts = [
+            {
+                'word': word,
+                'frequency': 0,
+                'word_count': len(word.split()),
+                'translation': trans,
+                'created_at': now,
+                'updated_at': now,
+            }
+            for word, trans in translations.items() if word not in existing_ids
+        ]
+
+        if updates:
+            self.session.bulk_update_mappings(WordSegment, updates)
+        if inserts:
+            self.session.bulk_insert_mappings(WordSegment, inserts)
+        self.session.commit()
+
+        return len(inserts), len(updates)
+
     def get_all_words(self) -> List[str]:
         """获取所有已分词的单词列表"""
         words = self.session.query(WordSegment.word).all()
@@ -438,7 +537,8 @@ class WordSegmentRepository:
         batch_id: int,
         word_count: int,
         new_word_count: int,
-        duration_seconds: int
+        duration_seconds: int,
+        max_phrase_id: Optional[int] = None
     ):
         """
         完成批次记录
@@ -448,12 +548,15 @@ class WordSegmentRepository:
             word_count: 总单词数
             new_word_count: 新增单词数
             duration_seconds: 耗时（秒）
+            max_phrase_id: 本批次已分词到的最大phrase_id（增量分词的高水位）
         """
         batch = self.session.query(SegmentationBatch).get(batch_id)
         if batch:
             batch.word_count = word_count
             batch.new_word_count = new_word_count
             batch.duration_seconds = duration_seconds
+            if max_phrase_id is not None:
+                batch.max_phrase_id = max_phrase_id
             batch.status = 'completed'
             self.session.commit()
 
@@ -479,41 +582,71 @@ class WordSegmentRepository:
 
     # ==================== 增量分词支持 ====================
 
-    def get_segmented_phrase_ids(self) -> set:
+    def get_segmentation_watermark(self) -> int:
         """
-        获取所有已经分词过的phrase_id集合
+        获取增量分词的高水位：已完成批次记录的最大phrase_id
 
-        通过查询SegmentationBatch表关联的phrase记录
+        phrase_id自增，高水位之后的短语即为尚未分词的短语
 
         Returns:
-            已分词的phrase_id集合
+            最大phrase_id（从未增量分词时为0）
         """
-        from storage.models import Phrase
-
-        # 获取所有已完成的批次ID
-        completed_batches = self.session.query(SegmentationBatch.batch_id).filter(
+        watermark = self.session.query(func.max(SegmentationBatch.max_phrase_id)).filter(
             SegmentationBatch.status == 'completed'
-        ).all()
+        ).scalar()
+        return watermark or 0
 
-        if not completed_batches:
-            return set()
+    def get_word_annotations(
+        self,
+        words: List[str],
+        chunk_size: int = 500
+    ) -> Tuple[set, Dict[str, Tuple[str, str, str]], Dict[str, str]]:
+        """
+        分块IN查询一批词的已有记录、词性和翻译（替代逐词get_word_segment）
 
-        batch_ids = [b[0] for b in completed_batches]
+        Returns:
+            (已存在的词集合, {word: (pos_tag, pos_category, pos_chinese)}, {word: translation})
+        """
+        existing = set()
+        pos_tags = {}
+        translations = {}
+        for i in range(0, len(words), chunk_size):
+            rows = self.session.query(
+                WordSegment.word,
+                WordSegment.pos_tag,
+                WordSegment.pos_category,
+                WordSegment.pos_chinese,
+                WordSegment.translation
+            ).filter(WordSegment.word.in_(words[i:i + chunk_size]))
+            for word, pos_tag, pos_category, pos_chinese, translation in rows:
+                existing.add(word)
+                if pos_tag:
+                    pos_tags[word] = (pos_tag, pos_category, pos_chinese)
+                if translation:
+                    translations[word] = translation
+        return existing, pos_tags, translations
+
+    def get_segmented_phrase_ids(self) -> set:
+        """
+        获取所有已经分词过的phrase_id集合（phrase_id不超过高水位的短语）
+
+        Returns:
+            已分词的phrase_id集合
+        """
+        from storage.models import Phrase
 
-        # 注意：当前设计中SegmentationBatch没有直接记录处理了哪些phrases
-        # 作为替代方案，我们可以通过batch_date时间戳来推断
-        # 或者我们可以添加一个新表phrase_segmentation_log
-        # 简单方案：假设所有processed_status != 'unseen'的phrases都已分词
+        watermark = self.get_segmentation_watermark()
+        if not watermark:
+            return set()
 
-        # 这里返回空集合，因为当前架构不支持精确追踪
-        # 建议：后续可以添加phrase_segmentation_log表
-        return set()
+        return {
+            phrase_id for (phrase_id,) in
+            self.session.query(Phrase.phrase_id).filter(Phrase.phrase_id <= watermark)
+        }
 
     def get_unsegmented_phrases(self, limit: Optional[int] = None) -> List:
         """
-        获取未分词的phrases
-
-        根据简化策略：优先处理新导入的rounds
+        获取未分词的phrases（phrase_id大于增量分词高水位的短语）
 
         Args:
             limit: 限制返回数量（None=全部）
@@ -523,14 +656,8 @@ class WordSegmentRepository:
         """
         from storage.models import Phrase
 
-        # 策略：获取最新一轮（first_seen_round最大）的phrases
-        latest_round_query = self.session.query(func.max(Phrase.first_seen_round)).scalar()
-
-        if not latest_round_query:
-            return []
-
         query = self.session.query(Phrase).filter(
-            Phrase.first_seen_round == latest_round_query
+            Phrase.phrase_id > self.get_segmentation_watermark()
         ).order_by(Phrase.phrase_id)
 
         if limit:
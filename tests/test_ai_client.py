@@ -4,6 +4,7 @@ LLM客户端测试
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from ai.client import LLMClient
+from ai.batch_planner import BatchPlanner, BatchStats
 from utils.exceptions import LLMException
 
 
@@ -277,6 +278,7 @@ class TestBatchClassifyTokens:
             assert results[0]['token_type'] == "intent"
             assert results[1]['token'] == "shoes"
             assert results[1]['token_type'] == "object"
+            assert not any(r.get('fallback') for r in results)
 
     @patch('ai.client.OpenAI')
     def test_batch_classify_tokens_failure_fallback(self, mock_openai):
@@ -302,3 +304,146 @@ class TestBatchClassifyTokens:
             assert len(results) == 1
             assert results[0]['token_type'] == 'other'
             assert results[0]['confidence'] == 'low'
+            assert results[0]['fallback'] is True
+
+
+class TestLocalStubProvider:
+    """测试本地模拟提供商（local_stub）"""
+
+    STUB_CONFIG = {
+        'local_stub': {
+            'api_key': 'local-stub',
+            'model': 'local-stub',
+            'base_url': '',
+            'temperature': 0.3,
+            'max_tokens': 2000,
+            'latency_distribution': 'fixed',
+            'latency_ms': 0,
+            'latency_jitter_ms': 0,
+            'error_rate': 0,
+            'rate_limit_rate': 0,
+            'seed': 42,
+        }
+    }
+
+    @pytest.fixture(autouse=True)
+    def isolated_batch_stats(self):
+        """批次统计不写入data/cache"""
+        with patch('ai.batch_planner._shared_stats', BatchStats()):
+            yield
+
+    def test_classify_tokens_deterministic(self):
+        """测试Token分类返回合法且确定的结果"""
+        with patch('ai.client.LLM_CONFIG', self.STUB_CONFIG):
+            tokens = ["best", "download", "shoes"]
+            first = LLMClient(provider='local_stub').batch_classify_tokens(tokens)
+            second = LLMClient(provider='local_stub').batch_classify_tokens(tokens)
+
+            assert [r['token'] for r in first] == tokens
+            assert all(r['token_type'] in ['intent', 'action', 'object', 'other'] for r in first)
+            assert first == second
+
+    def test_translate_and_demand_card(self):
+        """测试翻译和需求卡片返回可解析的JSON"""
+        with patch('ai.client.LLM_CONFIG', self.STUB_CONFIG):
+            client = LLMClient(provider='local_stub')
+
+            translations = client.batch_translate_seed_words(["best", "free"])
+            assert set(translations) == {"best", "free"}
+            assert not any(t.startswith('[') for t in translations.values())
+
+            card = client.generate_demand_card(
+                cluster_id_A=1, cluster_id_B=2, main_theme="跑鞋",
+                phrases=["best running shoes", "running shoes sale"],
+                total_frequency=10, total_volume=100
+            )
+            assert card['demand_description'] != "需求卡片生成失败"
+            assert 0 <= card['confidence_score'] <= 100
+
+    def test_rate_limit_injection(self):
+        """测试限流注入会抛出429错误并计入统计"""
+        from ai.local_stub import LocalStubClient, LocalStubRateLimitError
+
+        client = LocalStubClient({'rate_limit_rate': 1.0})
+        with pytest.raises(LocalStubRateLimitError):
+            client.chat.completions.create(messages=[{"role": "user", "content": "hi"}])
+
+        assert client.get_stats()['rate_limited'] == 1
+
+
+class TestBatchPlanner:
+    """测试token预算批次规划器"""
+
+    def test_plan_respects_completion_budget(self):
+        """测试长条目少放、短条目多放，且保持原顺序"""
+        planner = BatchPlanner(
+            'test', max_completion_tokens=125, max_items=50,
+            completion_tokens_fn=lambda item: len(item), stats=BatchStats()
+        )
+        items = ["a" * 10] * 10 + ["b" * 60, "c" * 60]
+        batches = planner.plan(items)
+
+        assert [item for batch in batches for item in batch] == items
+        assert len(batches[0]) == 10
+        assert all(sum(len(i) for i in batch) <= 100 or len(batch) == 1 for batch in batches)
+
+    def test_bisect_retry_and_fallback(self):
+        """测试解析失败时二分重试，只有坏条目走降级结果"""
+        stats = BatchStats()
+        planner = BatchPlanner('test', max_completion_tokens=2000, max_items=8, stats=stats)
+
+        def request(batch):
+            if "bad" in batch:
+                raise ValueError("truncated JSON")
+            return [(item, "ok") for item in batch]
+
+        items = ["w1", "w2", "w3", "bad", "w5", "w6", "w7", "w8"]
+        results = planner.run(items, request, lambda batch: [(item, "fallback") for item in batch])
+
+        assert results == [(item, "fallback" if item == "bad" else "ok") for item in items]
+        rates = stats.failure_rates('test')
+        assert rates[8] == (1, 1.0)
+        assert rates[4] == (2, 0.5)
+        assert rates[1] == (2, 0.5)
+
+    def test_failure_rate_tunes_max_items(self):
+        """测试某批次大小区间失败率过高时收紧最大条数"""
+        stats = BatchStats()
+        for _ in range(5):
+            stats.record('test', 40, failed=True)
+            stats.record('test', 20, failed=False)
+
+        planner = BatchPlanner('test', max_completion_tokens=2000, max_items=50, stats=stats)
+        assert planner.effective_max_items() == 31
+
+
+class TestClientRegistry:
+    """测试进程内共享的提供商客户端和HTTP连接池"""
+
+    def test_clients_share_connection_pool(self):
+        """测试多个LLMClient复用同一个SDK客户端和keep-alive连接"""
+        import threading
+        from ai import client_registry
+        from ai.local_stub import create_stub_server
+
+        server = create_stub_server(port=0, config={})
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        config = dict(TestLocalStubProvider.STUB_CONFIG['local_stub'],
+                      base_url=f"http://127.0.0.1:{server.server_address[1]}/v1")
+
+        client_registry.reset_registry()
+        try:
+            with patch('ai.client.LLM_CONFIG', {'local_stub': config}):
+                clients = [LLMClient(provider='local_stub') for _ in range(3)]
+                assert clients[0].client is clients[1].client is clients[2].client
+
+                for client in clients:
+                    client._call_llm([{"role": "user", "content": "hi"}])
+
+            stats = client_registry.get_pool_stats()
+            assert stats['clients_created'] == 1
+            assert stats['responses'] == 3
+            assert stats['connections'] == 1
+        finally:
+            client_registry.reset_registry()
+            server.shutdown()
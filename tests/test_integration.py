@@ -146,6 +146,27 @@ class TestPhase2Integration:
             stats = repo.get_statistics()
             assert stats['clustered_A'] > 0
 
+    def test_bulk_update_cluster_assignments(self, test_db_session):
+        """测试批量写入聚类分配（只更新提供的列）"""
+        test_db_session.add_all([
+            Phrase(phrase_id=i + 1, phrase=f'phrase {i}', source_type='semrush',
+                   first_seen_round=1, processed_status='unseen', frequency=1, volume=0,
+                   cluster_id_B=99)
+            for i in range(10)
+        ])
+        test_db_session.commit()
+
+        repo = PhraseRepository(session=test_db_session)
+        updated = repo.bulk_update_cluster_assignments(
+            list(range(1, 11)), cluster_ids_A=np.arange(10) % 3, chunk_size=4
+        )
+        assert updated == 10
+
+        phrases = test_db_session.query(Phrase).order_by(Phrase.phrase_id).all()
+        assert [p.cluster_id_A for p in phrases] == [i % 3 for i in range(10)]
+        assert all(p.cluster_id_B == 99 for p in phrases)
+        assert all(p.processed_status == 'assigned' for p in phrases)
+
     def test_cluster_meta_creation(self, test_db_session):
         """测试聚类元数据创建"""
         repo = ClusterMetaRepository(session=test_db_session)
@@ -196,6 +217,530 @@ class TestPhase3Integration:
         assert selected[0].selection_score == 90
 
 
+class TestClusterLabelReuseIntegration:
+    """聚类标注跨轮次复用集成测试"""
+
+    @staticmethod
+    def _embed(texts):
+        """按短语前缀生成确定的embedding：同一主题的短语方向相同"""
+        vectors = np.zeros((len(texts), 8), dtype=np.float32)
+        for i, text in enumerate(texts):
+            vectors[i, int(text.split()[0][-1])] = 1.0
+        return vectors
+
+    def test_reuse_only_for_stable_clusters(self, test_db_session):
+        """测试相同聚类复用标注，新聚类和漂移聚类需要重新标注"""
+        from unittest.mock import patch
+        from core.cluster_label_reuse import ClusterLabelReuser
+        from storage.repository import ClusterLabelMemoryRepository
+
+        with patch('core.cluster_label_reuse.ClusterLabelMemoryRepository',
+                   lambda: ClusterLabelMemoryRepository(session=test_db_session)):
+            round1 = ClusterLabelReuser('A', round_id=1, embed_fn=self._embed)
+            match = round1.match_cluster(7, [1, 2, 3, 4], ["t1 a", "t1 b", "t1 c", "t1 d"])
+            assert match['status'] == 'novel'
+            round1.remember(match, {'llm_label': 'Shoes', 'primary_demand_type': 'tool',
+                                    'secondary_demand_types': ['content']})
+
+            round2 = ClusterLabelReuser('A', round_id=2, embed_fn=self._embed)
+            # 成员基本不变（新增1个）→ 复用
+            stable = round2.match_cluster(3, [1, 2, 3, 4, 5], ["t1 a", "t1 b", "t1 c", "t1 d", "t1 e"])
+            assert stable['status'] == 'reused'
+            assert stable['labels']['llm_label'] == 'Shoes'
+            # 方向相同但成员几乎全换 → 漂移
+            drifted = round2.match_cluster(4, [10, 11, 12, 13], ["t1 w", "t1 x", "t1 y", "t1 z"])
+            assert drifted['status'] == 'drifted'
+            # 新方向 → 新聚类
+            assert round2.match_cluster(5, [20, 21], ["t2 a", "t2 b"])['status'] == 'novel'
+            # Phase 3需要main_theme，同一聚类只补全字段
+            assert round2.match_cluster(3, [1, 2, 3, 4], ["t1 a", "t1 b", "t1 c", "t1 d"],
+                                        required_field='main_theme')['status'] == 'matched'
+
+        assert round2.stats == {'reused': 1, 'matched': 1, 'drifted': 1, 'novel': 1}
+
+    def test_drifted_clears_stale_labels_and_skips_other_dimensions(self, test_db_session):
+        """测试漂移后未提供的标注字段被清空需重新标注；质心维度不同的记忆被跳过"""
+        from unittest.mock import patch
+        from core.cluster_label_reuse import ClusterLabelReuser
+        from storage.repository import ClusterLabelMemoryRepository
+
+        with patch('core.cluster_label_reuse.ClusterLabelMemoryRepository',
+                   lambda: ClusterLabelMemoryRepository(session=test_db_session)):
+            round1 = ClusterLabelReuser('A', round_id=1, embed_fn=self._embed)
+            round1.remember(round1.match_cluster(7, [1, 2, 3, 4], ["t1 a", "t1 b", "t1 c", "t1 d"]),
+                            {'llm_label': 'Shoes', 'primary_demand_type': 'tool'})
+
+            # Phase 3 对漂移聚类只生成main_theme，旧成员的Phase 2C标注已过期
+            round2 = ClusterLabelReuser('A', round_id=2, embed_fn=self._embed)
+            drifted = round2.match_cluster(4, [10, 11, 12, 13], ["t1 w", "t1 x", "t1 y", "t1 z"],
+                                           required_field='main_theme')
+            assert drifted['status'] == 'drifted'
+            round2.remember(drifted, {'main_theme': '鞋类'})
+            assert round2.match_cluster(4, [10, 11, 12, 13], ["t1 w", "t1 x", "t1 y", "t1 z"])['status'] == 'matched'
+
+            round3 = ClusterLabelReuser('A', round_id=3, embed_fn=self._embed)
+            match = round3.match_cluster(4, [10, 11, 12, 13], ["t1 w", "t1 x", "t1 y", "t1 z"])
+            assert match['status'] == 'matched'
+            assert match['labels']['llm_label'] is None
+            assert match['labels']['primary_demand_type'] is None
+
+            match = round3.match_cluster(4, [10, 11, 12, 13], ["t1 w", "t1 x", "t1 y", "t1 z"],
+                                         required_field='main_theme')
+            assert match['status'] == 'reused'
+            assert match['labels']['main_theme'] == '鞋类'
+
+            # 更换embedding模型（维度变化）后旧记忆不参与比较
+            wide = ClusterLabelReuser('A', round_id=4,
+                                      embed_fn=lambda texts: np.hstack([self._embed(texts)] * 2))
+            assert wide.match_cluster(4, [10, 11, 12, 13], ["t1 w", "t1 x", "t1 y", "t1 z"])['status'] == 'novel'
+
+
+class TestEngineCacheIntegration:
+    """共享引擎和连接池测试"""
+
+    def test_engine_cached_per_url(self, tmp_path):
+        """测试同一URL只创建一个引擎，会话从连接池取连接"""
+        from sqlalchemy import text
+        from storage.models import get_engine, get_session_factory, get_pool_stats
+
+        url = f"sqlite:///{tmp_path / 'pool.db'}"
+        assert get_engine(url) is get_engine(url)
+
+        factory = get_session_factory(url)
+        for _ in range(3):
+            session = factory()
+            session.execute(text("SELECT 1"))
+            session.close()
+
+        stats = get_pool_stats(url)
+        assert stats['connects'] == 1
+        assert stats['checkouts'] == 3
+        assert stats['checked_out'] == 0
+        get_engine(url).dispose()
+
+
+class TestWordSegmentUpsertIntegration:
+    """分词结果批量upsert测试"""
+
+    def test_save_word_segments_accumulates(self, test_db_session):
+        """测试重复保存时频次累加、新增数量正确、已有翻译不被空值覆盖"""
+        from collections import Counter
+        from unittest.mock import patch
+        from storage.models import WordSegment
+        from storage.word_segment_repository import WordSegmentRepository
+
+        with patch('storage.word_segment_repository.get_session', lambda: test_db_session):
+            with WordSegmentRepository() as repo:
+                new_words, new_ngrams = repo.save_word_segments(
+                    Counter({'best': 3, 'shoes': 2}),
+                    translations={'best': '最佳'},
+                    ngram_counter=Counter({'best shoes': 2}),
+                    chunk_size=2
+                )
+                assert (new_words, new_ngrams) == (2, 1)
+
+                new_words, new_ngrams = repo.save_word_segments(
+                    Counter({'best': 1, 'free': 4}),
+                    pos_tags={'free': ('JJ', 'Adjective', '形容词')},
+                    ngram_counter=Counter({'best shoes': 1, 'free shoes': 1}),
+                    chunk_size=2
+                )
+                assert (new_words, new_ngrams) == (1, 1)
+
+        rows = {ws.word: ws for ws in test_db_session.query(WordSegment).all()}
+        assert rows['best'].frequency == 4
+        assert rows['best'].translation == '最佳'
+        assert rows['best shoes'].frequency == 3
+        assert rows['best shoes'].word_count == 2
+        assert rows['free'].pos_category == 'Adjective'
+
+
+class TestIncrementalSegmentationIntegration:
+    """增量分词高水位测试"""
+
+    def test_only_new_phrases_are_segmented(self, test_db_session):
+        """测试第二轮只处理高水位之后的短语，频次增量累加到word_segments"""
+        from unittest.mock import patch
+        from storage.models import WordSegment
+        from utils.incremental_segmentation import incremental_segmentation, save_segmentation_results
+
+        phrase_repo = PhraseRepository(session=test_db_session)
+        phrase_repo.bulk_insert_phrases([
+            {'phrase_id': i + 1, 'phrase': text, 'source_type': 'semrush', 'first_seen_round': 1}
+            for i, text in enumerate(['best running shoes', 'running shoes for women', 'free vpn'])
+        ])
+
+        with patch('storage.word_segment_repository.get_session', lambda: test_db_session), \
+                patch('storage.repository.get_session', lambda: test_db_session):
+            counter, pos_tags, translations, stats = incremental_segmentation({'for'}, pos_tagging=False)
+            assert stats['new_phrases'] == 3 and stats['max_phrase_id'] == 3
+            save_segmentation_results(counter, pos_tags, translations, stats)
+
+            test_db_session.query(WordSegment).filter_by(word='running').update({'translation': '跑步'})
+            test_db_session.commit()
+            phrase_repo.bulk_insert_phrases([
+                {'phrase_id': 10, 'phrase': 'running app', 'source_type': 'semrush', 'first_seen_round': 2}
+            ])
+
+            counter, pos_tags, translations, stats = incremental_segmentation({'for'}, pos_tagging=False)
+            assert stats['watermark'] == 3 and stats['new_phrases'] == 1
+            assert counter == {'running': 1, 'app': 1}
+            assert stats['new_words'] == 1 and translations == {'running': '跑步'}
+            save_segmentation_results(counter, pos_tags, translations, stats)
+
+            counter, _, _, stats = incremental_segmentation({'for'}, pos_tagging=False)
+            assert stats['new_phrases'] == 0 and not counter
+            assert save_segmentation_results(counter, {}, {}, stats) is None
+
+        rows = {ws.word: ws for ws in test_db_session.query(WordSegment).all()}
+        assert rows['running'].frequency == 3
+        assert rows['running'].translation == '跑步'
+        assert rows['app'].frequency == 1 and rows['shoes'].frequency == 2
+
+
+class TestFullTextSearchIntegration:
+    """全文检索测试（SQLite FTS5）"""
+
+    def test_product_search_ranked_keyset(self, test_db_session):
+        """测试触发器同步、相关度排序、键集分页、计数模式和LIKE回退"""
+        from storage.fulltext import ensure_all_fulltext_indexes
+        from storage.product_repository import ProductRepository
+        from storage.reddit_repository import RedditSubredditRepository
+
+        ensure_all_fulltext_indexes(test_db_session.get_bind())
+
+        repo = ProductRepository(session=test_db_session)
+        repo.bulk_insert([
+            {'product_id': i + 1, 'product_name': name, 'description': desc,
+             'platform': 'etsy', 'url': f'https://example.com/{i}'}
+            for i, (name, desc) in enumerate([
+                ('Budget planner printable', 'monthly budget spreadsheet'),
+                ('Wedding planner', 'plan your wedding budget'),
+                ('Habit tracker', 'daily planner pages'),
+                ('Recipe cards', 'kitchen printable'),
+                ('Budget budget budget planner', None),
+                ('手账模板', '预算规划'),
+            ])
+        ])
+
+        results, total = repo.search(keyword='budget plan')
+        assert total == 3
+        assert results[0]['product_id'] == 5
+        assert {r['product_id'] for r in results} == {1, 2, 5}
+        assert results == sorted(results, key=lambda r: -r['relevance'])
+
+        # 键集分页拼起来与一次查询一致
+        page1, _ = repo.search(keyword='planner', limit=2, count_mode='skip')
+        page2, none_total = repo.search(keyword='planner', limit=2, after=repo.next_cursor(page1[-1]),
+                                        count_mode='skip')
+        everything, estimate = repo.search(keyword='planner', count_mode='estimate')
+        assert none_total is None
+        assert estimate == 4
+        assert [r['product_id'] for r in page1 + page2] == [r['product_id'] for r in everything][:4]
+
+        # 更新/删除经触发器同步到FTS表
+        repo.update(4, {'product_name': 'Recipe planner'})
+        repo.delete(1)
+        results, _ = repo.search(keyword='planner')
+        assert {r['product_id'] for r in results} == {2, 3, 4, 5}
+
+        # 中文关键词回退到LIKE
+        results, total = repo.search(keyword='预算')
+        assert total == 1 and 'relevance' not in results[0]
+
+        reddit = RedditSubredditRepository(session=test_db_session)
+        reddit.bulk_insert([
+            {'name': f'sub{i}', 'description': 'personal finance tips' if i % 2 else 'cooking',
+             'subscribers': i * 10}
+            for i in range(7)
+        ])
+        first = reddit.query(filters={'search_text': 'finance'}, sort_by='subscribers', limit=2)
+        second = reddit.query(filters={'search_text': 'finance'}, sort_by='subscribers', limit=2,
+                              after=first['next_cursor'])
+        assert first['total'] == 3
+        assert [r['subscribers'] for r in first['data'] + second['data']] == [50, 30, 10]
+        assert second['next_cursor'] is None
+
+
+class TestTagIndexIntegration:
+    """JSON标签字段关联表测试"""
+
+    def test_tag_index_sync_and_query(self, test_db_session):
+        """测试写入时同步关联表、按索引查询和回填"""
+        from storage.models import ProductTag
+        from storage.product_repository import ProductRepository
+        from storage.repository import SeedWordRepository
+        from storage.tag_index import backfill
+
+        products = ProductRepository(session=test_db_session)
+        products.bulk_insert([
+            {'product_id': i + 1, 'product_name': name, 'platform': 'etsy',
+             'url': f'https://example.com/{i}', 'tags': tags}
+            for i, (name, tags) in enumerate([
+                ('Planner', '["planner", "pdf"]'),
+                ('Tracker', '["tracker"]'),
+                ('Cards', None),
+            ])
+        ])
+        products.update_ai_analysis(3, ['pdf', 'kitchen'], 'recipes')
+        products.update(2, {'tags': '["habit"]'})
+
+        results, total = products.search(tags=['pdf'])
+        assert total == 2 and {r['product_id'] for r in results} == {1, 3}
+        assert products.search(tags=['tracker'])[1] == 0
+
+        products.delete(1)
+        assert test_db_session.query(ProductTag).filter_by(product_id=1).count() == 0
+
+        seeds = SeedWordRepository(session=test_db_session)
+        seeds.create_or_update_seed_word('budget', token_types=['object', 'intent'],
+                                         primary_token_type='object')
+        seeds.create_or_update_seed_word('plan', token_types=['action'], primary_token_type='action')
+        seeds.create_or_update_seed_word('plan', token_types=['action', 'intent'])
+        seeds.link_demand('budget', 7)
+        seeds.link_demand('plan', 8, is_primary=True)
+        seeds.link_demand('plan', 7)
+
+        assert {s.seed_word for s in seeds.get_seeds_by_type('intent')} == {'budget', 'plan'}
+        assert [s.seed_word for s in seeds.get_seeds_by_type('intent', include_secondary=False)] == []
+        assert {s.seed_word for s in seeds.get_seeds_by_demand(7)} == {'budget', 'plan'}
+        assert [s.seed_word for s in seeds.get_seeds_by_demand(8)] == ['plan']
+
+        # 回填结果与增量同步一致
+        counts = backfill(test_db_session)
+        assert counts == {'product_tags': 3, 'seed_word_types': 4, 'seed_word_demands': 3}
+        assert {s.seed_word for s in seeds.get_seeds_by_type('intent')} == {'budget', 'plan'}
+
+    def test_index_ready_rechecked_until_tables_exist(self, test_db_session):
+        """测试关联表不存在的结果不被缓存，建表后立即生效"""
+        from storage.models import ProductTag
+        from storage.tag_index import index_ready, sync_product_tags
+
+        ProductTag.__table__.drop(test_db_session.connection())
+        assert not index_ready(test_db_session)
+        sync_product_tags(test_db_session, {1: ['pdf']})
+
+        ProductTag.__table__.create(test_db_session.connection())
+        assert index_ready(test_db_session)
+        sync_product_tags(test_db_session, {1: ['pdf']})
+        assert test_db_session.query(ProductTag).filter_by(product_id=1).count() == 1
+
+
+class TestSeedWordStatsIntegration:
+    """词根扩展统计批量更新测试"""
+
+    def test_batch_update_matches_per_seed(self, test_db_session):
+        """测试GROUP BY批量更新与逐个更新一致，增量模式只更新最新一轮涉及的词根"""
+        from storage.repository import SeedWordRepository
+
+        phrase_repo = PhraseRepository(session=test_db_session)
+        phrase_repo.bulk_insert_phrases([
+            {'phrase_id': i + 1, 'phrase': f'phrase {i}', 'source_type': 'semrush',
+             'seed_word': ['budget', 'planner', 'habit'][i % 3], 'first_seen_round': 1,
+             'frequency': i + 1, 'volume': i * 10}
+            for i in range(12)
+        ])
+
+        seeds = SeedWordRepository(session=test_db_session)
+        for word in ('budget', 'planner', 'habit', 'unused'):
+            seeds.create_or_update_seed_word(word)
+
+        assert seeds.batch_update_all_stats() == 4
+        batch = {s.seed_word: (s.expansion_count, s.total_volume, s.avg_frequency)
+                 for s in seeds.get_all_seed_words()}
+        for word in batch:
+            seeds.update_expansion_stats(word)
+        single = {s.seed_word: (s.expansion_count, s.total_volume, s.avg_frequency)
+                  for s in seeds.get_all_seed_words()}
+        assert batch == single
+        assert batch['budget'] == (4, 180, 5) and batch['unused'] == (0, 0, 0)
+
+        # 第2轮只新增了planner的短语
+        phrase_repo.bulk_insert_phrases([
+            {'phrase_id': 100, 'phrase': 'planner new', 'source_type': 'semrush',
+             'seed_word': 'planner', 'first_seen_round': 2, 'frequency': 1, 'volume': 1000}
+        ])
+        assert seeds.get_round_seed_words() == ['planner']
+        assert seeds.batch_update_all_stats(incremental=True) == 1
+        assert seeds.get_seed_word('planner').total_volume == batch['planner'][1] + 1000
+
+
+class TestStatsSnapshotIntegration:
+    """统计快照增量维护测试"""
+
+    def test_incremental_matches_rebuild(self, test_db_session):
+        """测试导入/聚类/建需求/词根写入后，快照与实时聚合一致"""
+        from storage.repository import DemandRepository, SeedWordRepository, StatsSnapshotRepository
+
+        snapshot = StatsSnapshotRepository(test_db_session)
+        snapshot.rebuild()
+
+        phrase_repo = PhraseRepository(session=test_db_session)
+        phrase_repo.bulk_insert_phrases([
+            {'phrase_id': i + 1, 'phrase': f'phrase {i}', 'source_type': 'semrush' if i % 2 else 'dropdown',
+             'first_seen_round': 1 + i % 2, 'frequency': 1, 'volume': 0}
+            for i in range(20)
+        ], batch_size=7)
+        phrase_repo.bulk_update_cluster_assignments(list(range(1, 11)), cluster_ids_A=[i % 3 for i in range(10)])
+        phrase_repo.bulk_update_cluster_assignments([1, 2, 15], cluster_ids_B=[5, 5, 6])
+        phrase_repo.update_cluster_assignment(20, cluster_id_A=1)
+
+        cluster_repo = ClusterMetaRepository(session=test_db_session)
+        cluster_repo.create_or_update_cluster(0, 'A', size=4, example_phrases='a')
+        cluster_repo.create_or_update_cluster(0, 'A', size=5, example_phrases='a')
+        cluster_repo.update_selection(0, 'A', is_selected=True)
+
+        DemandRepository(session=test_db_session).create_demand(
+            'demand', 'desc', 'scenario', 'tool', 0, None
+        )
+
+        seed_repo = SeedWordRepository(session=test_db_session)
+        seed_repo.create_or_update_seed_word('best', primary_token_type='intent')
+        seed_repo.create_or_update_seed_word('free', primary_token_type='action', verified=True)
+        seed_repo.create_or_update_seed_word('best', primary_token_type='object', status='paused')
+
+        assert phrase_repo.get_statistics() == phrase_repo.get_statistics(use_snapshot=False)
+        assert seed_repo.get_statistics() == seed_repo.get_statistics(use_snapshot=False)
+
+        dashboard = snapshot.get_dashboard_stats()
+        assert dashboard['clusters_A'] == 1
+        assert dashboard['selected_A'] == 1
+        assert dashboard['demands_count'] == 1
+        assert dashboard['by_status'] == {'assigned': 12, 'unseen': 8}
+
+        incremental = snapshot.get_snapshot()
+        rebuilt = snapshot.rebuild()
+        assert {k: v for k, v in incremental.items() if v} == {k: v for k, v in rebuilt.items() if v}
+
+    def test_selection_import_demand_service_and_resplit_keep_snapshot(self, test_db_session, tmp_path):
+        """测试筛选导入脚本、溯源服务建需求、拆分时删除聚类后，快照与重建结果一致"""
+        import importlib.util
+        from unittest.mock import patch
+        from core.demand_provenance_service import DemandProvenanceService
+        from storage.models import Base
+        from storage.repository import StatsSnapshotRepository
+
+        Base.metadata.create_all(test_db_session.get_bind())  # 溯源表（models_traceability）
+        snapshot = StatsSnapshotRepository(test_db_session)
+        cluster_repo = ClusterMetaRepository(session=test_db_session)
+        for cluster_id in range(4):
+            cluster_repo.create_or_update_cluster(cluster_id, 'A', size=10, example_phrases='a')
+        snapshot.rebuild()
+
+        spec = importlib.util.spec_from_file_location(
+            'import_selection', Path(__file__).parent.parent / 'scripts' / 'import_selection.py'
+        )
+        import_selection = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(import_selection)
+
+        csv_file = tmp_path / 'selection.csv'
+        pd.DataFrame({'cluster_id': [0, 1, 2, 9], 'selection_score': [5, 4, 2, 5]}).to_csv(csv_file, index=False)
+        with patch.object(import_selection, 'ClusterMetaRepository',
+                          lambda: ClusterMetaRepository(session=test_db_session)):
+            assert import_selection.import_selections(csv_file)
+
+        DemandProvenanceService(session=test_db_session).create_demand_with_provenance(
+            'demand', 'desc', 'phase4', 'manual_review', [1, 2]
+        )
+        # run_phase2_resplit删除被拆分的已选中聚类
+        assert cluster_repo.delete_cluster(0, 'A')
+        assert not cluster_repo.delete_cluster(0, 'A')
+
+        dashboard = snapshot.get_dashboard_stats()
+        assert (dashboard['clusters_A'], dashboard['selected_A'], dashboard['demands_count']) == (3, 1, 1)
+
+        incremental = snapshot.get_snapshot()
+        rebuilt = snapshot.rebuild()
+        assert {k: v for k, v in incremental.items() if v} == {k: v for k, v in rebuilt.items() if v}
+
+    def test_table_exists_rechecked_until_created(self, test_db_session):
+        """测试未建表的结果不被缓存，建表后增量更新立即生效"""
+        from storage.models import StatsSnapshot
+        from storage.repository import StatsSnapshotRepository
+
+        StatsSnapshot.__table__.drop(test_db_session.connection())
+        snapshot = StatsSnapshotRepository(test_db_session)
+        assert not snapshot.table_exists()
+        snapshot.apply_deltas({'phrases.total': 1})
+
+        StatsSnapshot.__table__.create(test_db_session.connection())
+        assert snapshot.table_exists()
+        snapshot.apply_deltas({'phrases.total': 2})
+        assert snapshot.get_snapshot()['phrases.total'] == 2
+
+
+class TestReadModelIntegration:
+    """只读列加载器测试"""
+
+    def test_column_loaders(self, test_db_session):
+        """测试元组/结构化数组/按聚类加载与ORM结果一致"""
+        from storage.read_models import (
+            select_rows, select_structured, load_cluster_phrase_dicts, load_cluster_phrases
+        )
+
+        test_db_session.add_all([
+            Phrase(phrase_id=i + 1, phrase=f'phrase {i}', source_type='semrush',
+                   first_seen_round=1, frequency=i, volume=i * 10,
+                   cluster_id_A=i % 3 - 1 if i % 5 else None, cluster_id_B=None)
+            for i in range(15)
+        ])
+        test_db_session.commit()
+
+        rows = select_rows(test_db_session, (Phrase.phrase_id, Phrase.volume),
+                           where=[Phrase.volume >= 100], order_by=[Phrase.phrase_id])
+        assert rows == [(i + 1, i * 10) for i in range(10, 15)]
+
+        arr = select_structured(test_db_session, (Phrase.phrase_id, Phrase.cluster_id_A))
+        assert arr.dtype['phrase_id'] == np.int64
+        assert arr.dtype['cluster_id_A'] == object
+
+        orm = {p.phrase_id for p in PhraseRepository(session=test_db_session)
+               .get_phrases_by_cluster(1, cluster_level='A')}
+        dicts = load_cluster_phrase_dicts(test_db_session, 1, cluster_level='A')
+        assert {d['phrase_id'] for d in dicts} == orm
+        assert set(dicts[0]) == {'phrase_id', 'phrase', 'frequency', 'volume', 'seed_word', 'source_type'}
+
+        clusters = load_cluster_phrases(test_db_session, cluster_level='A')
+        assert set(clusters) == {0, 1}
+        assert sum(len(v) for v in clusters.values()) == len([
+            i for i in range(15) if i % 5 and i % 3 - 1 != -1
+        ])
+
+
+class TestDemandProvenanceBulkLinkIntegration:
+    """需求批量关联测试"""
+
+    def test_bulk_link_demand_to_phrases(self, test_db_session):
+        """测试批量关联：新增/更新混合、返回ID顺序、溯源事件数量"""
+        from storage.models import Base
+        from storage.models_traceability import DemandPhraseMapping, DemandProvenance
+        from core.demand_provenance_service import DemandProvenanceService
+
+        Base.metadata.create_all(test_db_session.get_bind())
+        service = DemandProvenanceService(session=test_db_session)
+
+        first = service.bulk_link_demand_to_phrases(
+            1, [10, 11], [0.5, 0.6], 'clustering', 'phase4', 'test'
+        )
+        second = service.bulk_link_demand_to_phrases(
+            1, [12, 10, 12], [0.7, 0.9, 0.8], 'clustering', 'phase4', 'test'
+        )
+
+        assert second[1] == first[0]
+        assert second[0] == second[2]
+        assert len(set(first + second)) == 3
+
+        scores = {
+            m.phrase_id: float(m.relevance_score)
+            for m in test_db_session.query(DemandPhraseMapping).filter_by(demand_id=1)
+        }
+        assert scores == {10: 0.9, 11: 0.6, 12: 0.8}
+
+        events = [e.event_type for e in test_db_session.query(DemandProvenance).order_by(
+            DemandProvenance.provenance_id)]
+        assert events == ['linked_phrase', 'linked_phrase', 'linked_phrase', 'updated', 'updated']
+
+
 class TestPaginationIntegration:
     """分页功能集成测试"""
 
@@ -295,6 +840,143 @@ class TestPaginationIntegration:
         assert total == 30
         assert all(p.first_seen_round == 2 for p in filtered)
 
+    def test_stream_phrases_keyset(self, test_db_session):
+        """测试键集分页流式读取：按ID有序、不重不漏、支持过滤/limit/数组模式"""
+        repo = PhraseRepository(session=test_db_session)
+
+        # ID不连续，验证游标不依赖OFFSET
+        test_db_session.add_all([
+            Phrase(
+                phrase_id=i * 3 + 1,
+                phrase=f'phrase {i}',
+                source_type='semrush' if i % 2 == 0 else 'dropdown',
+                first_seen_round=1,
+                processed_status='unseen',
+                frequency=1,
+                volume=i
+            )
+            for i in range(25)
+        ])
+        test_db_session.commit()
+
+        chunks = list(repo.stream_phrases(('phrase',), chunk_size=10))
+        assert [len(rows) for rows in chunks] == [10, 10, 5]
+        assert [row[0] for rows in chunks for row in rows] == [f'phrase {i}' for i in range(25)]
+
+        rows = [row for rows in repo.stream_phrases(
+            ('phrase_id', 'volume'), filters={'source_type': 'semrush'}, chunk_size=4) for row in rows]
+        assert rows == [(i * 3 + 1, i) for i in range(0, 25, 2)]
+
+        limited = [row for rows in repo.stream_phrases(chunk_size=4, limit=6) for row in rows]
+        assert len(limited) == 6
+
+        batch = next(repo.stream_phrases(('phrase_id', 'phrase'), chunk_size=5, as_arrays=True))
+        assert batch['phrase_id'].tolist() == [1, 4, 7, 10, 13]
+        assert batch['phrase'][0] == 'phrase 0'
+
+
+class TestDeltaLLMServiceIntegration:
+    """增量分类/翻译服务测试"""
+
+    class FakeLLM:
+        """记录送入的条目，按预设返回分类/翻译"""
+
+        def __init__(self, classifications=None, translations=None):
+            self.classifications = classifications or {}
+            self.translations = translations or {}
+            self.sent = []
+
+        def batch_classify_tokens(self, tokens, batch_size=None):
+            self.sent.append(list(tokens))
+            return [dict(self.classifications[t], token=t) for t in tokens]
+
+        def batch_translate_seed_words(self, words, batch_size=None):
+            self.sent.append(list(words))
+            return {w: self.translations[w] for w in words}
+
+    def test_bulk_upsert_tokens_counts(self, test_db_session):
+        """测试批量upsert的新增/更新计数和未分类标记规则"""
+        from storage.models import Token
+        from storage.repository import TokenRepository
+
+        repo = TokenRepository(session=test_db_session)
+        assert repo.bulk_upsert_tokens([
+            {'token_text': 'best', 'token_type': 'intent', 'in_phrase_count': 3},
+            {'token_text': 'shoes', 'token_type': 'other', 'notes': TokenRepository.UNCLASSIFIED_NOTE},
+        ]) == (2, 0)
+        assert repo.bulk_upsert_tokens([
+            {'token_text': 'best', 'token_type': 'other', 'in_phrase_count': 1,
+             'notes': TokenRepository.UNCLASSIFIED_NOTE},
+            {'token_text': 'shoes', 'token_type': 'object'},
+            {'token_text': 'free', 'token_type': 'intent'},
+        ]) == (1, 2)
+
+        tokens = {t.token_text: t for t in test_db_session.query(Token).all()}
+        # 未分类的新数据不覆盖已有的有效分类，in_phrase_count取最大值
+        assert (tokens['best'].token_type, tokens['best'].in_phrase_count) == ('intent', 3)
+        # 重新分类后清除未分类标记
+        assert (tokens['shoes'].token_type, tokens['shoes'].notes) == ('object', None)
+        assert set(repo.get_tokens_by_texts(['best', 'free', 'missing'])) == {'best', 'free'}
+
+    def test_classify_tokens_delta_accounting(self, test_db_session):
+        """测试复用/送LLM/降级计数：LLM真实给出的other/low不算降级，降级结果下次重跑重新送LLM"""
+        from unittest.mock import patch
+        from core.delta_llm_service import DeltaLLMService
+        from storage.repository import TokenRepository
+
+        TokenRepository(session=test_db_session).bulk_upsert_tokens([
+            {'token_text': 'best', 'token_type': 'intent'},
+            {'token_text': 'stale', 'token_type': 'other', 'notes': TokenRepository.UNCLASSIFIED_NOTE},
+        ])
+        llm = self.FakeLLM(classifications={
+            'stale': {'token_type': 'action', 'confidence': 'high'},
+            'genuine': {'token_type': 'other', 'confidence': 'low'},
+            'broken': {'token_type': 'other', 'confidence': 'low', 'fallback': True},
+        })
+
+        class SessionTokenRepository(TokenRepository):
+            def __init__(self):
+                super().__init__(session=test_db_session)
+
+        with patch('core.delta_llm_service.TokenRepository', SessionTokenRepository):
+            service = DeltaLLMService(llm_client=llm)
+            results, stats = service.classify_tokens(['best', 'stale', 'genuine', 'broken', 'best'])
+            assert stats == {'total': 4, 'cached': 1, 'sent': 3, 'fallback': 1}
+            assert [r['token'] for r in results] == ['best', 'stale', 'genuine', 'broken']
+            assert results[0]['cached'] is True
+
+            _, stats = service.classify_tokens(['best', 'stale', 'genuine', 'broken'])
+            assert stats == {'total': 4, 'cached': 3, 'sent': 1, 'fallback': 1}
+            assert llm.sent == [['stale', 'genuine', 'broken'], ['broken']]
+
+    def test_translate_words_delta_and_upsert_counts(self, test_db_session):
+        """测试翻译复用/失败计数，以及bulk_upsert_translations的新增/更新计数"""
+        from collections import Counter
+        from unittest.mock import patch
+        from core.delta_llm_service import DeltaLLMService
+        from storage.models import WordSegment
+        from storage.word_segment_repository import WordSegmentRepository
+
+        llm = self.FakeLLM(translations={'shoes': '鞋子', 'boot': '[boot]', 'hat': '帽子'})
+        with patch('storage.word_segment_repository.get_session', lambda: test_db_session):
+            with WordSegmentRepository() as repo:
+                repo.save_word_segments(Counter({'best': 2, 'shoes': 1, 'boot': 1}),
+                                        translations={'best': '最佳', 'boot': '[boot]'})
+
+            service = DeltaLLMService(llm_client=llm)
+            translations, stats = service.translate_words(['best', 'shoes', 'boot', 'hat'])
+            assert stats == {'total': 4, 'cached': 1, 'sent': 3, 'failed': 1}
+            assert translations == {'best': '最佳', 'shoes': '鞋子', 'boot': '[boot]', 'hat': '帽子'}
+            assert llm.sent == [['shoes', 'boot', 'hat']]
+
+            with WordSegmentRepository() as repo:
+                assert repo.bulk_upsert_translations({'hat': '礼帽', 'cap': '鸭舌帽'}) == (1, 1)
+
+        rows = dict(test_db_session.query(WordSegment.word, WordSegment.translation).all())
+        assert rows['shoes'] == '鞋子' and rows['hat'] == '礼帽' and rows['cap'] == '鸭舌帽'
+        # 降级标记不写回
+        assert rows['boot'] == '[boot]'
+
 
 class TestEmbeddingCacheIntegration:
     """Embedding缓存集成测试"""
@@ -107,3 +107,350 @@ class TestExceptions:
         """测试异常继承关系"""
         assert issubclass(LLMException, MVPBaseException)
         assert issubclass(MVPBaseException, Exception)
+
+
+class TestNgramCounting:
+    """测试n-gram计数引擎"""
+
+    class _Phrase:
+        def __init__(self, phrase, seed_word):
+            self.phrase = phrase
+            self.seed_word = seed_word
+
+    def test_numpy_engine_matches_python(self):
+        """测试整数词表引擎与字符串实现结果和顺序一致"""
+        import random
+        from utils.keyword_segmentation import segment_keywords_unified
+
+        rng = random.Random(7)
+        words = ['best', 'running', 'shoes', 'for', 'women', 'free', 'vpn', 'a', '10', 'x-ray', 'top_rated']
+        phrases = [
+            self._Phrase(' '.join(rng.choice(words) for _ in range(rng.randint(0, 9))),
+                         rng.choice(['running', 'vpn', None]))
+            for _ in range(2000)
+        ]
+        phrases.append(self._Phrase('Best-RUNNING shoes  for\tWomen', 'shoes'))
+
+        for min_frequency in (1, 2, 30):
+            for max_ngram_length in (1, 3, 6):
+                expected = segment_keywords_unified(phrases, {'for'}, min_frequency, max_ngram_length,
+                                                    engine='python')
+                actual = segment_keywords_unified(phrases, {'for'}, min_frequency, max_ngram_length)
+                assert actual == expected
+                assert list(actual[0].items()) == list(expected[0].items())
+
+    def test_sharded_matches_single_process(self):
+        """测试分片多进程计数归并后与单进程结果一致（含全局单词剪枝）"""
+        from utils.keyword_segmentation import segment_keywords_unified
+        from utils.ngram_counter import count_ngrams_sharded
+
+        phrases = [self._Phrase(text, seed) for text, seed in [
+            ('best running shoes', 'running'),
+            ('rare best running shoes', 'shoes'),
+            ('cheap running shoes for women', 'running'),
+            ('best vpn', None),
+            ('best running', 'running'),
+        ] * 3 + [('unique qqq running shoes', 'qqq')]]
+
+        expected = segment_keywords_unified(phrases, {'for'}, min_frequency=2, workers=1)
+        actual = count_ngrams_sharded(phrases, {'for'}, min_frequency=2, workers=2, shard_size=4)
+        assert actual == expected
+        assert list(actual[0].items()) == list(expected[0].items())
+        assert actual[1]['running shoes'] == {'running', 'shoes', 'qqq'}
+
+
+class TestSeedProvenance:
+    """测试CSR来源词根表"""
+
+    def test_mapping_and_merge(self):
+        """测试与dict[str, set]等价、按需解析、拆分与合并"""
+        from utils.seed_provenance import SeedProvenance
+
+        original = {'running shoes': {'shoes', 'running'}, 'vpn': {'vpn'}, 'best': set()}
+        provenance = SeedProvenance.from_sets(original)
+        assert provenance == original
+        assert list(provenance) == list(original)
+        assert provenance.resolve('running shoes') == ['running', 'shoes']
+        assert provenance.resolve('running shoes', limit=1) == ['running']
+        assert provenance.seed_count('running shoes') == 2
+        assert provenance.seed_count('missing') == 0
+        assert provenance.resolve('missing') == []
+
+        subset = provenance.subset(['vpn', 'missing', 'best'])
+        assert subset == {'vpn': {'vpn'}, 'best': set()}
+        assert subset.seeds is provenance.seeds
+
+        merged = subset.merge({'best': {'shoes', 'vpn'}, 'free vpn': {'free'}})
+        assert merged == {'vpn': {'vpn'}, 'best': {'shoes', 'vpn'}, 'free vpn': {'free'}}
+        assert list(merged) == ['vpn', 'best', 'free vpn']
+
+
+class TestAhoCorasick:
+    """测试Aho-Corasick多模式匹配"""
+
+    def test_matches_substring_search(self):
+        """测试与逐个子串查找结果一致（含重叠出现），按位置替换与str.replace一致"""
+        import random
+        from utils.aho_corasick import AhoCorasickMatcher, replace_at
+
+        rng = random.Random(3)
+        for _ in range(200):
+            patterns = [''.join(rng.choice('ab 手机') for _ in range(rng.randint(0, 4))) for _ in range(8)]
+            text = ''.join(rng.choice('ab 手机') for _ in range(rng.randint(0, 20)))
+            matcher = AhoCorasickMatcher(patterns, use_c=False)
+            found = matcher.find_all(text)
+            for pattern_id, pattern in enumerate(matcher.patterns):
+                expected = [k for k in range(len(text)) if text.startswith(pattern, k)]
+                assert found.get(pattern_id, []) == expected
+                if expected:
+                    assert replace_at(text, expected, len(pattern), '{X}') == text.replace(pattern, '{X}')
+
+    def test_junyan_templates_use_offsets(self):
+        """测试君言模板提取按出现位置构建模板"""
+        from core.junyan_method import JunyanTemplateExtractor
+
+        phrases = ['best running shoes', 'running shoes for running', 'cheap vpn', 'best vpn app', 'Best Running app']
+        templates = JunyanTemplateExtractor(phrases).extract_templates_from_seeds(
+            ['running', 'vpn', 'app'], min_frequency=1
+        )
+        by_pattern = {t['template_pattern']: t for t in templates}
+        assert by_pattern['best {X} app']['frequency'] == 2
+        assert by_pattern['best {X} app']['example_phrases'] == ['Best Running app', 'best vpn app']
+        assert by_pattern['{X} shoes for {X}']['matched_seeds'] == ['running']
+
+
+class TestTemplateMatcher:
+    """测试多模板匹配"""
+
+    def test_matches_per_template_regex(self):
+        """测试锚点筛选后的匹配与逐模板regex.search一致（含忽略大小写的特殊字符）"""
+        import re
+        import random
+        from utils.template_matcher import TemplateMatcher, template_literals
+
+        templates = ['best way to {X}', '{X} books in order', '{X} vs {Y}', '闲鱼上卖{X}', '{X}', 's {X}', 'I {X}']
+        regex_patterns = [re.escape(t).replace(r'\{X\}', '(.+)').replace(r'\{Y\}', '(.+)') for t in templates]
+        matcher = TemplateMatcher([(p, template_literals(t)) for p, t in zip(regex_patterns, templates)])
+
+        rng = random.Random(5)
+        words = ['best', 'way', 'to', '闲鱼', '上卖', 'books', 'in', 'order', 'vs', 'ſ', 'ı', 'a']
+        phrases = [' '.join(rng.choice(words) for _ in range(rng.randint(1, 6))) for _ in range(2000)]
+
+        buckets = matcher.match_all(phrases)
+        for template_id, regex_pattern in enumerate(regex_patterns):
+            regex = re.compile(regex_pattern, re.IGNORECASE)
+            expected = [(j, m.groups()) for j, m in enumerate(map(regex.search, phrases)) if m]
+            assert [(j, m.groups()) for j, m in buckets[template_id]] == expected
+
+
+class TestNGramIndex:
+    """测试n-gram倒排索引"""
+
+    def test_counts_postings_and_persistence(self, tmp_path):
+        """测试一次扫描的计数与逐n统计一致、倒排表按词匹配、持久化后可复用"""
+        import random
+        from core.template_discovery import NGramAnalyzer
+        from utils.ngram_index import NGramIndex
+
+        rng = random.Random(3)
+        words = ['how', 'to', 'make', 'best', 'Laptop', 'for', 'somehow']
+        phrases = [' '.join(rng.choice(words) for _ in range(rng.randint(0, 7))) for _ in range(1000)]
+
+        index = NGramIndex.build(phrases)
+        analyzer = NGramAnalyzer()
+        for n in (2, 3, 4):
+            expected = analyzer.extract_ngrams(phrases, n, min_freq=3)
+            assert list(index.counter(n, min_freq=3).items()) == list(expected.items())
+
+        for ngram in index.ngrams[:200]:
+            anchor = ngram.split()
+            expected = [j for j, phrase in enumerate(phrases)
+                        if any(phrase.lower().split()[i:i + len(anchor)] == anchor for i in range(len(phrase.split())))]
+            assert index.postings(ngram).tolist() == expected
+        assert index.postings('not indexed').tolist() == []
+
+        path = tmp_path / 'ngram_index.npz'
+        NGramIndex.load_or_build(phrases, path)
+        loaded = NGramIndex.load(path)
+        assert loaded.ngrams == index.ngrams
+        assert loaded.postings('how to').tolist() == index.postings('how to').tolist()
+        assert NGramIndex.load_or_build(phrases[:-1], path).fingerprint != index.fingerprint
+
+
+class TestIntentBatchClassification:
+    """测试意图批量分类"""
+
+    def test_batch_matches_per_pattern_search(self):
+        """测试得分矩阵与逐模式re.search累加一致，批量分类与逐条分类一致"""
+        import re
+        import random
+        from core.intent_classification import IntentClassifier
+
+        classifier = IntentClassifier()
+        rng = random.Random(9)
+        parts = ['best', 'how', 'to', 'for', 'free', 'app', 'vs', 'or', 'not', 'working', 'fix', 'Which', 'x', 'é']
+        seps = [' ', '  ', '-', '_', '\t', '']
+        phrases = [''.join(rng.choice(parts) + rng.choice(seps) for _ in range(rng.randint(0, 7)))
+                   for _ in range(3000)]
+
+        expected = []
+        for phrase in phrases:
+            row = []
+            for patterns in IntentClassifier.INTENT_PATTERNS.values():
+                score = 0.0
+                for key, factor in (('keywords', 1.0), ('prefixes', 1.5), ('suffixes', 0.5)):
+                    for pattern in patterns.get(key, []):
+                        if re.search(pattern, phrase.lower()):
+                            score += patterns['weight'] if key == 'keywords' else patterns['weight'] * factor
+                row.append(score)
+            expected.append(row)
+
+        assert classifier.score_matrix(phrases).tolist() == expected
+        assert classifier.score_matrix(phrases, workers=2, shard_size=1000).tolist() == expected
+        assert classifier.classify_batch(phrases) == [classifier.classify_phrase(p) for p in phrases]
+
+        clusters = {1: phrases[:10], 2: phrases[10:25]}
+        results = classifier.analyze_clusters_intent(clusters)
+        assert results[2] == classifier.analyze_cluster_intent(phrases[10:25], sample_size=None)
+        assert results[1]['sample_size'] == 10
+
+
+class TestAnnotationCache:
+    """测试词性/翻译缓存"""
+
+    def test_bulk_get_put_and_negative_cache(self, tmp_path):
+        """测试批量读写、负缓存及其过期"""
+        from utils.annotation_cache import AnnotationCache
+
+        cache = AnnotationCache(tmp_path / 'annotations.sqlite3')
+        cache.put_translations({'calculator': '计算器', 'vpn': 'VPN'})
+        cache.put_pos_tags({'running': ('VBG', 'Verb', '动词')})
+        cache.put_failures('translation', ['zzxq', 'calculator'])  # 不覆盖已有的成功结果
+
+        hits, failed = cache.get_translations(['calculator', 'vpn', 'zzxq', 'missing'])
+        assert hits == {'calculator': '计算器', 'vpn': 'VPN'}
+        assert failed == {'zzxq'}
+        assert cache.get_pos_tags(['running', 'calculator']) == ({'running': ('VBG', 'Verb', '动词')}, set())
+        assert cache.stats() == {'pos': 1, 'pos_failed': 0, 'translation': 2, 'translation_failed': 1}
+
+        # 另一个连接（另一个会话/进程）读到同样的结果；负缓存过期后视为未命中
+        expired = AnnotationCache(cache.path, negative_ttl=-1)
+        assert expired.get_translations(['calculator', 'zzxq']) == ({'calculator': '计算器'}, set())
+
+        cache.put_translations({'zzxq': 'zzxq'})
+        assert cache.get_translations(['zzxq']) == ({'zzxq': 'zzxq'}, set())
+
+    def test_tag_words_batch_only_tags_misses(self, tmp_path, monkeypatch):
+        """测试批量词性标注只把未命中的词交给标注器"""
+        import utils.pos_tagging as pos_tagging
+        from utils.annotation_cache import AnnotationCache
+
+        cache = AnnotationCache(tmp_path / 'annotations.sqlite3')
+        cache.put_pos_tags({'calculator': ('NN', 'Noun', '名词')})
+        calls = []
+
+        def fake_pos_tag(words):
+            calls.append(list(words))
+            return [(word, 'JJ') for word in words]
+
+        monkeypatch.setattr(pos_tagging, 'POS_TAGGING_AVAILABLE', True)
+        monkeypatch.setattr(pos_tagging, 'pos_tag', fake_pos_tag)
+        monkeypatch.setattr(pos_tagging, 'get_annotation_cache', lambda: cache)
+
+        words = ['fast', 'calculator', 'free']
+        expected = {'fast': ('JJ', 'Adjective', '形容词'),
+                    'calculator': ('NN', 'Noun', '名词'),
+                    'free': ('JJ', 'Adjective', '形容词')}
+        assert pos_tagging.tag_words_batch(words) == expected
+        assert pos_tagging.tag_words_batch(words) == expected
+        assert calls == [['fast', 'free']]
+
+
+    def test_pos_failures_negative_cache_only_per_word(self, tmp_path, monkeypatch):
+        """测试整批失败、NLTK数据缺失不写入负缓存，单个词标注失败才写入"""
+        import utils.pos_tagging as pos_tagging
+        from utils.annotation_cache import AnnotationCache
+
+        cache = AnnotationCache(tmp_path / 'annotations.sqlite3')
+        error = [LookupError('Resource averaged_perceptron_tagger not found')]
+
+        def fake_pos_tag(words):
+            if error[0] is not None:
+                raise error[0]
+            return [(word, 'NN') for word in words]
+
+        monkeypatch.setattr(pos_tagging, 'POS_TAGGING_AVAILABLE', True)
+        monkeypatch.setattr(pos_tagging, 'pos_tag', fake_pos_tag)
+        monkeypatch.setattr(pos_tagging, 'get_annotation_cache', lambda: cache)
+
+        assert pos_tagging.tag_words_batch(['shoes', 'hat']) == {'shoes': pos_tagging.UNKNOWN_POS,
+                                                                 'hat': pos_tagging.UNKNOWN_POS}
+        assert pos_tagging.get_pos_tag('boot') == pos_tagging.UNKNOWN_POS
+        error[0] = ValueError('bad token')
+        assert pos_tagging.tag_words_batch(['shoes']) == {'shoes': pos_tagging.UNKNOWN_POS}
+        assert cache.stats()['pos_failed'] == 0
+
+        assert pos_tagging.get_pos_tag('zzxq') == pos_tagging.UNKNOWN_POS
+        assert cache.get_pos_tags(['zzxq']) == ({}, {'zzxq'})
+
+        # NLTK数据装好后之前失败的词可以正常标注
+        error[0] = None
+        assert pos_tagging.tag_words_batch(['shoes', 'boot'])['boot'] == ('NN', 'Noun', '名词')
+
+
+class TestTranslationService:
+    """测试并发批量翻译"""
+
+    def test_pack_batches_respects_limits(self):
+        """测试装箱不超过字符上限和词数上限"""
+        from utils.translation import pack_batches
+
+        words = [f"word{i}" * (i % 5 + 1) for i in range(500)]
+        batches = pack_batches(words, max_chars=120, max_items=8)
+        assert [w for batch in batches for w in batch] == words
+        assert all(len('\n'.join(batch)) <= 120 and len(batch) <= 8 for batch in batches)
+        assert pack_batches(['x' * 50, 'y'], max_chars=10, max_items=5) == [['x' * 50], ['y']]
+
+    def test_concurrent_translation_with_failures(self, tmp_path):
+        """测试并发翻译在随机失败/丢行时仍得到正确结果，只有单个词行数不符写入负缓存"""
+        from utils.annotation_cache import AnnotationCache
+        from utils.translation import StubTranslator, TranslationService
+
+        words = [f"token {i}" for i in range(1000)]
+        stub = StubTranslator(fail_rate=0.2, drop_rate=0.2, seed=3)
+        service = TranslationService(lambda: stub, workers=4, max_chars=200, max_items=50,
+                                     max_retries=5, backoff=0, use_cache=False)
+        translations, stats = service.translate(words + words[:10])
+        assert translations == {w: f"译:{w}" for w in words}
+        assert stats['total'] == 1000 and stats['failed'] == 0 and stats['requests'] == stub.requests
+
+        cache = AnnotationCache(tmp_path / 'annotations.sqlite3')
+        cache.put_translations({'token 0': '缓存'})
+        down = StubTranslator(fail_rate=1.0)
+        service = TranslationService(lambda: down, workers=2, max_retries=1, backoff=0, use_cache=False)
+        service.cache = cache
+        translations, stats = service.translate(words[:5])
+        assert translations == {'token 0': '缓存'}
+        assert stats['cached'] == 1 and stats['failed'] == 0 and stats['unavailable'] == 4
+        assert down.requests == stats['batches'] * 2  # 重试耗尽后整批放弃，不拆分放大请求
+        # 批次级的网络失败不写入负缓存，恢复后重新请求
+        assert cache.get_translations(words[:5])[1] == set()
+
+        # 单个词的请求异常同样是服务问题，不写入负缓存
+        service.max_items = 1
+        _, stats = service.translate(words[1:3])
+        assert stats['failed'] == 0 and stats['unavailable'] == 2
+        assert cache.get_translations(words[:5])[1] == set()
+
+        # 单个词仍然行数不符才与词本身有关，写入负缓存
+        bad = 'token\nbroken'
+        up = StubTranslator()
+        service = TranslationService(lambda: up, workers=2, max_retries=1, backoff=0, use_cache=False)
+        service.cache = cache
+        translations, stats = service.translate(words[:5] + [bad])
+        assert translations == {w: '缓存' if w == 'token 0' else f"译:{w}" for w in words[:5]}
+        assert stats['failed'] == 1 and stats['unavailable'] == 0
+        assert cache.get_translations(words[:5] + [bad])[1] == {bad}
+
+        _, stats = service.translate([bad])
+        assert stats['negative_cached'] == 1 and stats['sent'] == 0
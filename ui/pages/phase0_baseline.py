@@ -14,7 +14,7 @@ import time
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from storage.repository import PhraseRepository, ClusterMetaRepository, TokenRepository
+from storage.repository import PhraseRepository, ClusterMetaRepository, TokenRepository, StatsSnapshotRepository
 
 
 def load_experiment_result(experiment_letter: str):
@@ -37,6 +37,18 @@ def check_prerequisites():
     issues = []
 
     try:
+        # 优先读取统计快照（O(1)），未初始化时回退到逐表查询
+        with StatsSnapshotRepository() as snapshot_repo:
+            snapshot_stats = snapshot_repo.get_dashboard_stats()
+        if snapshot_stats is not None:
+            if snapshot_stats['phrases_count'] == 0:
+                issues.append("❌ 没有短语数据，请先运行Phase 1导入数据")
+            if snapshot_stats['clusters_A'] == 0:
+                issues.append("❌ 没有大组聚类结果，请先运行Phase 2")
+            if snapshot_stats['tokens_count'] == 0:
+                issues.append("⚠️ 没有Token数据（实验B需要），可继续但实验B会失败")
+            return issues
+
         # 检查是否有短语数据
         with PhraseRepository() as phrase_repo:
             phrase_count = phrase_repo.get_phrase_count()
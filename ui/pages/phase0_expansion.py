@@ -27,7 +27,8 @@ from utils.stopwords import (
     reset_to_default,
     get_stopwords_info
 )
-from utils.translation import translate_words_batch, TRANSLATION_AVAILABLE
+from utils.seed_provenance import SeedProvenance
+from utils.translation import TranslationService, TRANSLATION_AVAILABLE
 from utils.pos_tagging import (
     tag_words_batch,
     get_pos_statistics,
@@ -754,24 +755,17 @@ def render_segmentation_tab():
             lambda w: seed_status.get(w, 0)
         )
 
-        # ========== 7. 添加来源词根列 ==========
-        # 合并单词和短语的seeds信息
-        all_seeds = {**st.session_state.word_to_seeds, **st.session_state.ngram_to_seeds}
+        # ========== 7. 添加来源词根数列 ==========
+        # 来源词根表是SeedProvenance（词根ID的CSR表），计数不需要解析词根名
+        word_to_seeds = SeedProvenance.from_sets(st.session_state.word_to_seeds)
+        ngram_to_seeds = SeedProvenance.from_sets(st.session_state.ngram_to_seeds)
 
-        def format_seeds(token, max_show=5):
-            """格式化词根显示，只显示前几个"""
-            seeds = sorted(all_seeds.get(token, ['unknown']))
-            if len(seeds) <= max_show:
-                return ', '.join(seeds)
-            else:
-                shown = ', '.join(seeds[:max_show])
-                return f"{shown}... (+{len(seeds)-max_show}个)"
+        def seed_source(token):
+            """token所在的来源词根表（单词或短语）"""
+            return word_to_seeds if token in word_to_seeds else ngram_to_seeds
 
-        df_all['来源词根'] = df_all['Token'].map(
-            lambda w: format_seeds(w, max_show=5)
-        )
         df_all['来源词根数'] = df_all['Token'].map(
-            lambda w: len(all_seeds.get(w, []))
+            lambda w: seed_source(w).seed_count(w)
         )
 
         # ========== 8. 高级筛选区域 ==========
@@ -921,38 +915,17 @@ def render_segmentation_tab():
                         if existing_translations:
                             st.info(f"✓ 从数据库加载了 {len(existing_translations)} 个已有翻译")
 
-                        # 翻译新token
+                        # 翻译新token（并发批量请求，结果批量upsert到word_segments）
                         new_translations = {}
                         if tokens_need_translation:
                             with st.spinner(f"正在翻译 {len(tokens_need_translation)} 个新token..."):
-                                new_translations = translate_words_batch(
+                                new_translations, translate_stats = TranslationService(max_items=100).translate(
                                     tokens_need_translation,
-                                    batch_size=100
+                                    save_to_db=True
                                 )
-
-                            # 保存新翻译到数据库
-                            if new_translations:
-                                with st.spinner("正在保存翻译到数据库..."):
-                                    with WordSegmentRepository() as ws_repo:
-                                        for token, trans in new_translations.items():
-                                            # 检查是否已存在
-                                            existing = ws_repo.get_word_segment(token)
-                                            if existing:
-                                                # 更新翻译
-                                                existing.translation = trans
-                                            else:
-                                                # 创建新记录（只保存token和translation）
-                                                from storage.models import WordSegment
-                                                from datetime import datetime
-                                                new_ws = WordSegment(
-                                                    word=token,
-                                                    frequency=0,  # 翻译功能不记录频次
-                                                    translation=trans,
-                                                    created_at=datetime.utcnow()
-                                                )
-                                                ws_repo.session.add(new_ws)
-                                        ws_repo.session.commit()
-                                st.success(f"✓ 翻译了 {len(new_translations)} 个新token并已保存")
+                            st.success(f"✓ 翻译了 {len(new_translations) - translate_stats['cached']} 个新token并已保存"
+                                       f"（缓存命中 {translate_stats['cached']} 个，失败 {translate_stats['failed']} 个，"
+                                       f"服务暂不可用 {translate_stats['unavailable']} 个）")
                         else:
                             st.success("✓ 所有token都已有翻译！")
 
@@ -1034,6 +1007,20 @@ def render_segmentation_tab():
         with col4:
             st.metric("已选择", len(st.session_state.selected_words))
 
+        # ========== 添加来源词根列（只为筛选后显示的行解析词根名）==========
+        def format_seeds(token, max_show=5):
+            """格式化词根显示，只显示前几个"""
+            seeds = seed_source(token).resolve(token) or ['unknown']
+            if len(seeds) <= max_show:
+                return ', '.join(seeds)
+            else:
+                shown = ', '.join(seeds[:max_show])
+                return f"{shown}... (+{len(seeds)-max_show}个)"
+
+        df_all['来源词根'] = df_all['Token'].map(
+            lambda w: format_seeds(w, max_show=5)
+        )
+
         # 准备显示用的DataFrame
         df_display = df_all.copy()
 
@@ -1473,7 +1460,6 @@ def add_selected_words_to_seeds():
 
                     if existing:
                         # 已存在，只更新统计信息
-                        seed_repo.update_expansion_stats(word)
                         updated_count += 1
                     else:
                         # 创建新词根（未分类状态，来源标记为phase0_selection）
@@ -1484,11 +1470,11 @@ def add_selected_words_to_seeds():
                             source='phase0_selection',
                             status='active'
                         )
-
-                        # 更新统计信息
-                        seed_repo.update_expansion_stats(word)
                         imported_count += 1
 
+                # 一次聚合更新所有选中词根的统计信息
+                seed_repo.batch_update_all_stats(seed_words=list(selected_words))
+
             # 显示结果
             st.success(f"✓ 添加完成！")
 
@@ -199,10 +199,12 @@ def render_seed_word_list():
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
+            only_latest_round = st.checkbox("仅最新一轮", value=False,
+                                            help="只更新最新一轮导入涉及的词根")
             if st.button("🔄 更新所有词根统计", help="从phrases表重新计算所有词根的扩展数、总搜索量等"):
                 with st.spinner("正在更新统计信息..."):
                     with SeedWordRepository() as repo:
-                        success_count = repo.batch_update_all_stats()
+                        success_count = repo.batch_update_all_stats(incremental=only_latest_round)
                     st.success(f"✓ 成功更新 {success_count} 个词根的统计信息")
                     st.rerun()
 
@@ -779,9 +781,8 @@ def import_seeds_from_phrases():
                         )
                         imported_count += 1
 
-                    # 更新统计信息（无论是否已存在）
-                    seed_repo.update_expansion_stats(seed_word)
-                    updated_count += 1
+                # 一次聚合更新统计信息（无论是否已存在）
+                updated_count = seed_repo.batch_update_all_stats(seed_words=list(all_seed_words))
 
             st.success(f"✓ 导入完成！新增 {imported_count} 个词根，更新了 {updated_count} 个词根的统计信息。")
 
@@ -821,7 +822,7 @@ def auto_classify_seeds():
 
         with st.spinner(f"正在使用LLM分类 {len(seed_words)} 个词根..."):
             llm = LLMClient()
-            classification_results = llm.batch_classify_tokens(seed_words, batch_size=50)
+            classification_results = llm.batch_classify_tokens(seed_words)
 
         # 保存分类结果
         success_count = 0
@@ -883,29 +884,12 @@ def batch_translate_seeds(seed_words_list, existing_translations):
 
         with st.spinner(f"正在使用AI翻译 {len(words_to_translate)} 个词根..."):
             llm = LLMClient()
-            new_translations = llm.batch_translate_seed_words(words_to_translate, batch_size=50)
+            new_translations = llm.batch_translate_seed_words(words_to_translate)
 
-            # 保存到数据库
+            # 保存到数据库（批量upsert）
             if new_translations:
                 with WordSegmentRepository() as ws_repo:
-                    for word, trans in new_translations.items():
-                        # 检查是否已存在
-                        existing = ws_repo.get_word_segment(word)
-                        if existing:
-                            # 更新翻译
-                            existing.translation = trans
-                        else:
-                            # 创建新记录
-                            from storage.models import WordSegment
-                            from datetime import datetime
-                            new_ws = WordSegment(
-                                word=word,
-                                frequency=0,
-                                translation=trans,
-                                created_at=datetime.utcnow()
-                            )
-                            ws_repo.session.add(new_ws)
-                    ws_repo.session.commit()
+                    ws_repo.bulk_upsert_translations(new_translations)
 
         st.success(f"✓ AI翻译完成！成功翻译 {len(new_translations)} 个词根")
         st.info("💡 AI翻译更准确、更符合SEO语境，已保存到数据库")
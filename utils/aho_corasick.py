@@ -0,0 +1,135 @@
+"""
+Aho-Corasick多模式匹配
+一次扫描文本，报告所有模式串的全部出现位置（含重叠出现）
+
+用于替代 "for 模式 in 模式列表: if 模式 in 文本" 这类 O(模式数 × 文本数) 的子串检查。
+安装了 pyahocorasick（C实现）时自动使用，否则使用纯Python自动机，两者结果相同。
+
+    matcher = AhoCorasickMatcher(['手机', '机'])
+    list(matcher.iter_matches('卖手机'))
+    # [(1, 3, 0), (2, 3, 1)]  # (起始, 结束, 模式ID)
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 尝试导入C实现，如果失败则使用纯Python实现
+try:
+    import ahocorasick
+    AHOCORASICK_C_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_C_AVAILABLE = False
+    ahocorasick = None
+
+
+class AhoCorasickMatcher:
+    """多模式串匹配自动机"""
+
+    def __init__(self, patterns: Iterable[str], use_c: Optional[bool] = None):
+        """
+        Args:
+            patterns: 模式串列表（去重后按首次出现顺序编号，空串忽略）
+            use_c: 是否使用pyahocorasick（None时可用即用）
+        """
+        self.patterns: List[str] = list(dict.fromkeys(p for p in patterns if p))
+        self.pattern_index: Dict[str, int] = {p: i for i, p in enumerate(self.patterns)}
+
+        if use_c is None:
+            use_c = AHOCORASICK_C_AVAILABLE
+        if use_c and not AHOCORASICK_C_AVAILABLE:
+            raise ImportError("pyahocorasick未安装，请运行: pip install pyahocorasick")
+        self.backend = 'c' if use_c else 'python'
+
+        if use_c:
+            self._automaton = ahocorasick.Automaton()
+            for pattern_id, pattern in enumerate(self.patterns):
+                self._automaton.add_word(pattern, (pattern_id, len(pattern)))
+            if self.patterns:
+                self._automaton.make_automaton()
+        else:
+            self._build()
+
+    def _build(self):
+        """构建trie和失败指针（BFS），每个状态的输出合并了失败链上的全部模式"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] = self._output[state] + (pattern_id,)
+
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[next_state] = fail
+                self._output[next_state] = self._output[next_state] + self._output[fail]
+                queue.append(next_state)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        扫描一次文本，按结束位置依次产出所有出现
+
+        Yields:
+            (start, end, pattern_id)，text[start:end] == patterns[pattern_id]
+        """
+        if not self.patterns:
+            return
+        if self.backend == 'c':
+            for last, (pattern_id, length) in self._automaton.iter(text):
+                yield last + 1 - length, last + 1, pattern_id
+            return
+
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern_id in output[state]:
+                yield i + 1 - len(patterns[pattern_id]), i + 1, pattern_id
+
+    def find_all(self, text: str) -> Dict[int, List[int]]:
+        """
+        文本中每个模式的全部起始位置
+
+        Returns:
+            {pattern_id: [start, ...]}（起始位置升序）
+        """
+        starts: Dict[int, List[int]] = {}
+        for start, _, pattern_id in self.iter_matches(text):
+            starts.setdefault(pattern_id, []).append(start)
+        return starts
+
+
+def replace_at(text: str, starts: List[int], length: int, placeholder: str) -> str:
+    """
+    按出现位置替换，与 str.replace 一致：从左到右替换互不重叠的出现
+
+    Args:
+        text: 原文本
+        starts: 模式的起始位置（升序，可重叠）
+        length: 模式长度
+        placeholder: 替换文本
+    """
+    parts = []
+    last = 0
+    for start in starts:
+        if start < last:
+            continue
+        parts.append(text[last:start])
+        parts.append(placeholder)
+        last = start + length
+    parts.append(text[last:])
+    return ''.join(parts)
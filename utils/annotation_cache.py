@@ -0,0 +1,226 @@
+"""
+词性标注 / 翻译结果的本地缓存（SQLite键值表）
+
+分词结果的词性和翻译原本只存在于 word_segments 表和 st.session_state 中，
+每次重新分词、换一个浏览器会话都要重新调用NLTK和外部翻译服务。
+这里用进程外持久化的SQLite文件缓存 word → 词性、word → 翻译：
+1. 批量读写（get_pos_tags / put_pos_tags / get_translations / put_translations）
+2. 失败也缓存（负缓存）：失败的词在 negative_ttl 秒内直接返回失败，不反复请求
+3. warm_up_from_word_segments() 从 word_segments 已有的词性/翻译预热
+
+多个进程（Streamlit会话、脚本）共用同一个缓存文件（WAL模式），
+进程内通过 get_annotation_cache() 共用一个实例。
+
+    cache = get_annotation_cache()
+    hits, failed = cache.get_translations(['calculator', 'vpn'])
+    cache.put_translations({'calculator': '计算器'})
+    cache.put_failures('translation', ['vpn'])
+"""
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 词性缓存值：(详细标签, 简化分类, 中文名称)
+PosTag = Tuple[str, str, str]
+
+# SQLite单条语句的变量个数上限（旧版本为999）
+_SQL_CHUNK = 900
+
+_TABLES = {
+    'pos': ('pos_cache', ('pos_tag', 'pos_category', 'pos_chinese')),
+    'translation': ('translation_cache', ('translation',)),
+}
+
+
+class AnnotationCache:
+    """word → 词性 / 翻译 缓存"""
+
+    def __init__(self, path: Path, negative_ttl: float = 86400):
+        """
+        Args:
+            path: SQLite缓存文件路径
+            negative_ttl: 失败记录的有效期（秒），过期后重新尝试
+        """
+        self.path = Path(path)
+        self.negative_ttl = negative_ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            for table, columns in _TABLES.values():
+                value_columns = ', '.join(f'{column} TEXT' for column in columns)
+                self._conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS {table} ('
+                    f'word TEXT PRIMARY KEY, {value_columns}, '
+                    f'failed INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL)'
+                )
+
+    # ==================== 通用读写 ====================
+
+    def _get_many(self, kind: str, words: Iterable[str]) -> Tuple[Dict[str, tuple], Set[str]]:
+        """批量读取，返回 (命中值, 负缓存仍有效的词)"""
+        table, columns = _TABLES[kind]
+        words = list(dict.fromkeys(words))
+        expire_before = time.time() - self.negative_ttl
+
+        hits: Dict[str, tuple] = {}
+        failed: Set[str] = set()
+        with self._lock:
+            for i in range(0, len(words), _SQL_CHUNK):
+                chunk = words[i:i + _SQL_CHUNK]
+                rows = self._conn.execute(
+                    f'SELECT word, {", ".join(columns)}, failed, updated_at FROM {table} '
+                    f'WHERE word IN ({", ".join("?" * len(chunk))})',
+                    chunk
+                )
+                for word, *values, is_failed, updated_at in rows:
+                    if not is_failed:
+                        hits[word] = tuple(values)
+                    elif updated_at >= expire_before:
+                        failed.add(word)
+        return hits, failed
+
+    def _put_many(self, kind: str, values: Dict[str, tuple]):
+        """批量写入成功结果（覆盖旧值和负缓存）"""
+        if not values:
+            return
+        table, columns = _TABLES[kind]
+        now = time.time()
+        placeholders = ', '.join('?' * (len(columns) + 3))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f'INSERT OR REPLACE INTO {table} (word, {", ".join(columns)}, failed, updated_at) '
+                f'VALUES ({placeholders})',
+                [(word, *value, 0, now) for word, value in values.items()]
+            )
+
+    def put_failures(self, kind: str, words: Iterable[str]):
+        """
+        记录失败（负缓存），不覆盖已有的成功结果
+
+        Args:
+            kind: 'pos' 或 'translation'
+            words: 失败的词
+        """
+        table, _ = _TABLES[kind]
+        now = time.time()
+        rows = [(word, now) for word in dict.fromkeys(words)]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f'INSERT INTO {table} (word, failed, updated_at) VALUES (?, 1, ?) '
+                f'ON CONFLICT(word) DO UPDATE SET updated_at = excluded.updated_at WHERE failed = 1',
+                rows
+            )
+
+    # ==================== 词性 ====================
+
+    def get_pos_tags(self, words: Iterable[str]) -> Tuple[Dict[str, PosTag], Set[str]]:
+        """
+        批量查询词性
+
+        Returns:
+            ({word: (详细标签, 简化分类, 中文名称)}, 负缓存仍有效的词)
+        """
+        return self._get_many('pos', words)
+
+    def put_pos_tags(self, pos_tags: Dict[str, PosTag]):
+        """批量写入词性"""
+        self._put_many('pos', {word: tuple(tag) for word, tag in pos_tags.items()})
+
+    # ==================== 翻译 ====================
+
+    def get_translations(self, words: Iterable[str]) -> Tuple[Dict[str, str], Set[str]]:
+        """
+        批量查询翻译
+
+        Returns:
+            ({word: 翻译}, 负缓存仍有效的词)
+        """
+        hits, failed = self._get_many('translation', words)
+        return {word: value[0] for word, value in hits.items()}, failed
+
+    def put_translations(self, translations: Dict[str, str]):
+        """批量写入翻译"""
+        self._put_many('translation', {word: (translation,) for word, translation in translations.items()})
+
+    # ==================== 预热 / 统计 ====================
+
+    def warm_up_from_word_segments(self) -> Dict[str, int]:
+        """
+        从 word_segments 表已有的词性和翻译预热缓存
+
+        Returns:
+            {'pos': 写入的词性数, 'translation': 写入的翻译数}
+        """
+        from storage.word_segment_repository import WordSegmentRepository
+        from storage.read_models import load_word_annotation_rows
+
+        with WordSegmentRepository() as ws_repo:
+            rows = load_word_annotation_rows(ws_repo.session)
+
+        pos_tags = {}
+        translations = {}
+        for word, pos_tag, pos_category, pos_chinese, translation in rows:
+            if pos_tag:
+                pos_tags[word] = (pos_tag, pos_category, pos_chinese)
+            if translation:
+                translations[word] = translation
+
+        self.put_pos_tags(pos_tags)
+        self.put_translations(translations)
+        logger.info(f"注释缓存预热完成: 词性 {len(pos_tags)} 个, 翻译 {len(translations)} 个")
+        return {'pos': len(pos_tags), 'translation': len(translations)}
+
+    def stats(self) -> Dict[str, int]:
+        """各表的成功/失败条数"""
+        result = {}
+        with self._lock:
+            for kind, (table, _) in _TABLES.items():
+                ok, failed = self._conn.execute(
+                    f'SELECT COALESCE(SUM(failed = 0), 0), COALESCE(SUM(failed = 1), 0) FROM {table}'
+                ).fetchone()
+                result[kind] = int(ok)
+                result[f'{kind}_failed'] = int(failed)
+        return result
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[AnnotationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_annotation_cache() -> Optional[AnnotationCache]:
+    """
+    进程内共用的缓存实例（ANNOTATION_CACHE_CONFIG['enabled']为False时返回None）
+
+    缓存文件首次创建时从 word_segments 预热（数据库不可用时跳过）。
+    """
+    global _cache
+    from config.settings import ANNOTATION_CACHE_FILE, ANNOTATION_CACHE_CONFIG
+
+    if not ANNOTATION_CACHE_CONFIG['enabled']:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            is_new = not Path(ANNOTATION_CACHE_FILE).exists()
+            _cache = AnnotationCache(ANNOTATION_CACHE_FILE, ANNOTATION_CACHE_CONFIG['negative_ttl_seconds'])
+            if is_new and ANNOTATION_CACHE_CONFIG['warm_up_on_create']:
+                try:
+                    _cache.warm_up_from_word_segments()
+                except Exception as e:
+                    logger.warning(f"注释缓存预热失败（跳过）: {str(e)}")
+        return _cache
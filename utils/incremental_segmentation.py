@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 """
 增量分词模块
-实现智能的增量分词：只对新增关键词分词，合并已有结果
+实现真正的增量分词：按phrase_id高水位只对新增关键词分词，频次增量批量upsert累加到已有结果
 """
 import time
 from typing import List, Dict, Tuple, Set
@@ -10,6 +10,7 @@ from collections import Counter
 from utils.keyword_segmentation import segment_keywords
 from storage.repository import PhraseRepository
 from storage.word_segment_repository import WordSegmentRepository
+from storage.read_models import load_token_rows
 
 
 def incremental_segmentation(
@@ -18,14 +19,16 @@ def incremental_segmentation(
     translation: bool = False
 ) -> Tuple[Counter, Dict, Dict, Dict]:
     """
-    执行增量分词：只对新增的关键词进行分词
+    执行增量分词：只对上次分词之后新增的关键词进行分词
 
     工作流程：
-    1. 从数据库加载所有关键词
-    2. 检查哪些关键词已经分过词
-    3. 只对新增的关键词进行分词
-    4. 合并新旧分词结果
-    5. 保存到数据库
+    1. 读取高水位（已完成批次记录的最大phrase_id）
+    2. 只流式读取 phrase_id > 高水位 的关键词
+    3. 对新增关键词分词，得到频次增量
+    4. 批量查询增量中已有词的词性和翻译
+    5. 只对缺少词性/翻译的词进行标注
+    耗时只与新增关键词数量有关；频次增量由save_segmentation_results批量upsert累加，
+    并记录新的高水位
 
     Args:
         stopwords: 停用词集合
@@ -34,10 +37,14 @@ def incremental_segmentation(
 
     Returns:
         (word_counter, pos_tags, translations, stats)
+        - word_counter: 新增关键词的词频增量（不是全量）
+        - pos_tags / translations: word_counter中各词的词性和翻译
+        - stats: 统计信息（max_phrase_id为本次处理到的最大phrase_id）
     """
     stats = {
+        'watermark': 0,
+        'max_phrase_id': None,
         'total_phrases': 0,
-        'existing_phrases': 0,
         'new_phrases': 0,
         'total_words': 0,
         'existing_words': 0,
@@ -47,73 +54,48 @@ def incremental_segmentation(
 
     start_time = time.time()
 
-    # 1. 加载所有关键词
-    print("[1/6] Loading keywords from database...")
+    # 1. 读取高水位
+    print("[1/6] Loading segmentation watermark...")
+    with WordSegmentRepository() as ws_repo:
+        watermark = ws_repo.get_segmentation_watermark()
+    stats['watermark'] = watermark
+    print(f"[OK] Already segmented up to phrase_id {watermark}")
+
+    # 2. 只加载高水位之后的关键词（按phrase_id键集分页流式读取）
+    print("[2/6] Loading new keywords from database...")
+    keywords = []
     with PhraseRepository() as phrase_repo:
-        all_phrases = []
-        page = 1
-        page_size = 10000
-
-        while True:
-            phrases, total = phrase_repo.get_phrases_paginated(
-                page=page,
-                page_size=page_size
-            )
-            if not phrases:
-                break
-            all_phrases.extend([p.phrase for p in phrases])
-            page += 1
-            if len(all_phrases) >= total:
-                break
-
-    keywords = all_phrases
-    stats['total_phrases'] = len(keywords)
-    print(f"[OK] Loaded {len(keywords)} keywords")
-
-    # 2. 检查已分词的关键词（通过记录批次）
-    # 这里简化处理：加载已有的分词结果
-    print("[2/6] Loading existing word segments...")
+        for rows in phrase_repo.stream_phrases(
+            columns=('phrase_id', 'phrase'),
+            filters={'after_phrase_id': watermark},
+            chunk_size=10000
+        ):
+            keywords.extend(row[1] for row in rows)
+            stats['max_phrase_id'] = rows[-1][0]
+
+    stats['total_phrases'] = stats['new_phrases'] = len(keywords)
+    print(f"[OK] Loaded {len(keywords)} new keywords")
+
+    if not keywords:
+        stats['duration_seconds'] = int(time.time() - start_time)
+        return Counter(), {}, {}, stats
+
+    # 3. 只对新关键词分词（频次增量）
+    print("[3/6] Segmenting new keywords...")
+    word_counter = segment_keywords(keywords, stopwords)
+    print(f"[OK] Segmented into {len(word_counter)} unique words")
+
+    # 4. 批量查询增量中已有词的词性和翻译
+    print("[4/6] Loading existing annotations...")
     with WordSegmentRepository() as ws_repo:
-        existing_word_counter = ws_repo.get_word_segments(min_frequency=1)
-        existing_pos_tags = {}
-        existing_translations = {}
-
-        # 加载已有的词性和翻译信息
-        for word in existing_word_counter.keys():
-            ws = ws_repo.get_word_segment(word)
-            if ws:
-                if ws.pos_tag:
-                    existing_pos_tags[word] = (
-                        ws.pos_tag,
-                        ws.pos_category,
-                        ws.pos_chinese
-                    )
-                if ws.translation:
-                    existing_translations[word] = ws.translation
-
-    stats['existing_words'] = len(existing_word_counter)
-    print(f"[OK] Found {len(existing_word_counter)} existing words")
-
-    # 3. 对新关键词进行分词
-    # 注意：这里简化处理，直接对所有关键词分词
-    # 更精确的做法是记录哪些phrases已分词
-    print("[3/6] Segmenting keywords...")
-    new_word_counter = segment_keywords(keywords, stopwords)
-    print(f"[OK] Segmented into {len(new_word_counter)} unique words")
-
-    # 4. 合并新旧结果（频次累加）
-    print("[4/6] Merging results...")
-    merged_counter = Counter(existing_word_counter)
-    for word, freq in new_word_counter.items():
-        if word in merged_counter:
-            # 注意：这里不累加，因为新分词是全量的
-            merged_counter[word] = freq
-        else:
-            merged_counter[word] = freq
-            stats['new_words'] += 1
+        existing_words, existing_pos_tags, existing_translations = ws_repo.get_word_annotations(
+            list(word_counter)
+        )
 
-    stats['total_words'] = len(merged_counter)
-    print(f"[OK] Total unique words: {stats['total_words']} (new: {stats['new_words']})")
+    stats['existing_words'] = len(existing_words)
+    stats['new_words'] = len(word_counter) - len(existing_words)
+    stats['total_words'] = len(word_counter)
+    print(f"[OK] Words in delta: {stats['total_words']} (new: {stats['new_words']})")
 
     # 5. 词性标注（可选）
     pos_tags = existing_pos_tags.copy()
@@ -124,7 +106,7 @@ def incremental_segmentation(
         if POS_TAGGING_AVAILABLE:
             # 只对新词和缺少词性的词进行标注
             words_to_tag = [
-                w for w in merged_counter.keys()
+                w for w in word_counter.keys()
                 if w not in pos_tags
             ]
 
@@ -148,7 +130,7 @@ def incremental_segmentation(
         if TRANSLATION_AVAILABLE:
             # 只对缺少翻译的词进行翻译
             words_to_translate = [
-                w for w in merged_counter.keys()
+                w for w in word_counter.keys()
                 if w not in translations
             ]
 
@@ -166,7 +148,7 @@ def incremental_segmentation(
     # 计算耗时
     stats['duration_seconds'] = int(time.time() - start_time)
 
-    return merged_counter, pos_tags, translations, stats
+    return word_counter, pos_tags, translations, stats
 
 
 def save_segmentation_results(
@@ -178,15 +160,22 @@ def save_segmentation_results(
     """
     保存分词结果到数据库
 
+    频次增量通过批量upsert累加到word_segments，批次记录本次的高水位（max_phrase_id），
+    下一次增量分词从其后继续
+
     Args:
-        word_counter: 词频统计
+        word_counter: 词频增量（incremental_segmentation的返回值）
         pos_tags: 词性标注
         translations: 翻译
         stats: 统计信息
 
     Returns:
-        批次ID
+        批次ID（没有新增关键词时为None）
     """
+    if not stats.get('new_phrases'):
+        print("\n[Skip] No new keywords since last segmentation")
+        return None
+
     print("\n[Save] Saving results to database...")
 
     with WordSegmentRepository() as ws_repo:
@@ -197,7 +186,7 @@ def save_segmentation_results(
         )
 
         # 保存分词结果
-        new_words_count = ws_repo.save_word_segments(
+        new_words_count, _ = ws_repo.save_word_segments(
             word_counter=word_counter,
             pos_tags=pos_tags,
             translations=translations,
@@ -209,7 +198,8 @@ def save_segmentation_results(
             batch_id=batch_id,
             word_count=len(word_counter),
             new_word_count=new_words_count,
-            duration_seconds=stats['duration_seconds']
+            duration_seconds=stats['duration_seconds'],
+            max_phrase_id=stats['max_phrase_id']
         )
 
         print(f"[OK] Saved batch #{batch_id}")
@@ -226,18 +216,16 @@ def load_segmentation_results() -> Tuple[Counter, Dict, Dict]:
         (word_counter, pos_tags, translations)
     """
     with WordSegmentRepository() as ws_repo:
-        word_counter = Counter(ws_repo.get_word_segments())
-
-        # 加载词性和翻译
-        pos_tags = {}
-        translations = {}
-
-        for word in word_counter.keys():
-            ws = ws_repo.get_word_segment(word)
-            if ws:
-                if ws.pos_tag:
-                    pos_tags[word] = (ws.pos_tag, ws.pos_category, ws.pos_chinese)
-                if ws.translation:
-                    translations[word] = ws.translation
+        rows = load_token_rows(ws_repo.session, 1)
+
+    word_counter = Counter()
+    pos_tags = {}
+    translations = {}
+    for word, frequency, _, pos_tag, pos_category, pos_chinese, translation in rows:
+        word_counter[word] = frequency
+        if pos_tag:
+            pos_tags[word] = (pos_tag, pos_category, pos_chinese)
+        if translation:
+            translations[word] = translation
 
     return word_counter, pos_tags, translations
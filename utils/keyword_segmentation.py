@@ -4,7 +4,9 @@
 """
 import re
 from collections import Counter, defaultdict
-from typing import List, Set, Tuple, Dict
+from typing import List, Set, Tuple, Dict, Mapping, Optional
+
+from utils.seed_provenance import SeedProvenance
 
 
 def segment_keywords(keywords: List[str], stopwords: Set[str]) -> Counter:
@@ -52,7 +54,7 @@ def segment_keywords(keywords: List[str], stopwords: Set[str]) -> Counter:
 
 def segment_keywords_with_seed_tracking(phrases_objects: list, stopwords: Set[str],
                                         extract_ngrams: bool = True,
-                                        min_ngram_frequency: int = 2) -> Tuple[Counter, Dict[str, Set[str]], Counter, Dict[str, Set[str]]]:
+                                        min_ngram_frequency: int = 2) -> Tuple[Counter, SeedProvenance, Counter, SeedProvenance]:
     """
     将关键词短语分词并统计词频，同时追踪每个词和短语来源于哪些seed_word
 
@@ -71,15 +73,16 @@ def segment_keywords_with_seed_tracking(phrases_objects: list, stopwords: Set[st
         - word_to_seeds: {word: {seed1, seed2, ...}} 每个单词对应的所有原始词根集合
         - ngram_counter: Counter对象，包含2-6-gram（短语）频次统计
         - ngram_to_seeds: {ngram: {seed1, seed2, ...}} 每个短语对应的所有原始词根集合
+        两个seeds映射都是SeedProvenance（共享同一词根表），取值为词根名frozenset
 
     Example:
         >>> phrases = [Phrase(phrase="best running shoes", seed_word="running")]
         >>> stopwords = {"for"}
         >>> counter, word_seeds, ngrams, ngram_seeds = segment_keywords_with_seed_tracking(phrases, stopwords)
         >>> word_seeds['running']
-        {'running'}
-        >>> ngram_seeds['best running']
-        {'running'}
+        frozenset({'running'})
+        >>> ngram_seeds.resolve('best running')
+        ['running']
 
     Note:
         现在内部使用segment_keywords_unified()进行穷尽式n-gram提取，
@@ -96,21 +99,20 @@ def segment_keywords_with_seed_tracking(phrases_objects: list, stopwords: Set[st
 
     # 为了向后兼容，拆分为word_counter（1-gram）和ngram_counter（2-6-gram）
     word_counter = Counter()
-    word_to_seeds = {}
     ngram_counter = Counter()
-    ngram_to_seeds = {}
 
     for token, count in token_counter.items():
-        word_count = len(token.split())
-
-        if word_count == 1:
+        if ' ' not in token:
             # 1-gram（单词）
             word_counter[token] = count
-            word_to_seeds[token] = token_to_seeds[token]
         else:
             # 2-6-gram（短语）
             ngram_counter[token] = count
-            ngram_to_seeds[token] = token_to_seeds[token]
+
+    # 来源词根表按token拆分（共享词根表，不复制词根名）
+    token_to_seeds = SeedProvenance.from_sets(token_to_seeds)
+    word_to_seeds = token_to_seeds.subset(word_counter)
+    ngram_to_seeds = token_to_seeds.subset(ngram_counter)
 
     return word_counter, word_to_seeds, ngram_counter, ngram_to_seeds
 
@@ -119,8 +121,10 @@ def segment_keywords_unified(
     phrases_objects: list,
     stopwords: Set[str],
     min_frequency: int = 2,
-    max_ngram_length: int = 6
-) -> Tuple[Counter, Dict[str, Set[str]]]:
+    max_ngram_length: int = 6,
+    engine: str = 'numpy',
+    workers: Optional[int] = None
+) -> Tuple[Counter, Mapping[str, Set[str]]]:
     """
     统一提取1-6词的所有n-gram（穷尽式分词）
 
@@ -132,11 +136,17 @@ def segment_keywords_unified(
         stopwords: 停用词集合
         min_frequency: 最小频次阈值（适用于所有n-gram，无论1词还是多词）
         max_ngram_length: 最大n-gram长度（默认6）
+        engine: 计数引擎
+            - 'numpy': 整数词表 + np.unique逐层计数（默认，见utils/ngram_counter.py）
+            - 'python': 逐个拼接字符串计数（原实现，结果相同，用于对照）
+        workers: numpy引擎的进程数（None时读取SEGMENTATION_CONFIG；1为单进程）。
+            短语数达到SEGMENTATION_CONFIG['min_parallel_phrases']时分片多进程计数
 
     Returns:
         (token_counter, token_to_seeds)
         - token_counter: Counter对象，包含所有tokens的统一频次统计（1-6词）
         - token_to_seeds: {token: {seed1, seed2, ...}} 每个token对应的所有原始词根集合
+          （numpy引擎返回SeedProvenance，python引擎返回dict，两者比较相等）
 
     Example:
         >>> phrases = [Phrase(phrase="best running shoes", seed_word="running")]
@@ -154,6 +164,18 @@ def segment_keywords_unified(
 
         然后用min_frequency统一过滤所有结果。
     """
+    if engine == 'numpy':
+        from config.settings import SEGMENTATION_CONFIG
+        from utils.ngram_counter import count_ngrams, count_ngrams_sharded, resolve_workers
+
+        workers = resolve_workers(workers)
+        if workers > 1 and len(phrases_objects) >= SEGMENTATION_CONFIG['min_parallel_phrases']:
+            return count_ngrams_sharded(phrases_objects, stopwords, min_frequency, max_ngram_length,
+                                        workers=workers)
+        return count_ngrams(phrases_objects, stopwords, min_frequency, max_ngram_length)
+    if engine != 'python':
+        raise ValueError(f"不支持的计数引擎: {engine}")
+
     token_counter = Counter()
     token_to_seeds = defaultdict(set)
 
@@ -378,12 +400,12 @@ def segment_new_phrases_incrementally(
     new_phrases: list,
     existing_word_counter: Counter,
     existing_ngram_counter: Counter,
-    existing_word_to_seeds: Dict[str, Set[str]],
-    existing_ngram_to_seeds: Dict[str, Set[str]],
+    existing_word_to_seeds: Mapping[str, Set[str]],
+    existing_ngram_to_seeds: Mapping[str, Set[str]],
     stopwords: Set[str],
     extract_ngrams: bool = False,
     min_ngram_frequency: int = 2
-) -> Tuple[Counter, Dict[str, Set[str]], Counter, Dict[str, Set[str]]]:
+) -> Tuple[Counter, SeedProvenance, Counter, SeedProvenance]:
     """
     增量分词：只对新phrases进行分词，然后与已有结果合并
 
@@ -400,7 +422,7 @@ def segment_new_phrases_incrementally(
     Returns:
         (merged_word_counter, merged_word_to_seeds, merged_ngram_counter, merged_ngram_to_seeds)
         - 合并后的单词频次
-        - 合并后的单词到seeds映射
+        - 合并后的单词到seeds映射（SeedProvenance）
         - 合并后的短语频次
         - 合并后的短语到seeds映射
     """
@@ -418,28 +440,20 @@ def segment_new_phrases_incrementally(
     merged_word_counter.update(new_word_counter)
 
     # 3. 合并单词到seeds映射
-    merged_word_to_seeds = defaultdict(set)
-    for word, seeds in existing_word_to_seeds.items():
-        merged_word_to_seeds[word].update(seeds)
-    for word, seeds in new_word_to_seeds.items():
-        merged_word_to_seeds[word].update(seeds)
+    merged_word_to_seeds = SeedProvenance.from_sets(existing_word_to_seeds).merge(new_word_to_seeds)
 
     # 4. 合并短语频次
     merged_ngram_counter = Counter(existing_ngram_counter)
     merged_ngram_counter.update(new_ngram_counter)
 
     # 5. 合并短语到seeds映射
-    merged_ngram_to_seeds = defaultdict(set)
-    for ngram, seeds in existing_ngram_to_seeds.items():
-        merged_ngram_to_seeds[ngram].update(seeds)
-    for ngram, seeds in new_ngram_to_seeds.items():
-        merged_ngram_to_seeds[ngram].update(seeds)
+    merged_ngram_to_seeds = SeedProvenance.from_sets(existing_ngram_to_seeds).merge(new_ngram_to_seeds)
 
     return (
         merged_word_counter,
-        dict(merged_word_to_seeds),
+        merged_word_to_seeds,
         merged_ngram_counter,
-        dict(merged_ngram_to_seeds)
+        merged_ngram_to_seeds
     )
 
 
@@ -0,0 +1,500 @@
+"""
+整数词表n-gram计数引擎
+segment_keywords_unified的默认实现
+
+原实现每个n-gram都用 ' '.join 拼成字符串再进Counter/defaultdict(set)，
+百万级短语时耗时和内存都花在字符串分配上。这里：
+1. 每个单词只映射一次整数ID，短语变成一条扁平的int64数组
+2. 逐层（1-gram → max_n-gram）用 上一层n-gram的稠密ID * 词表大小 + 下一个词ID
+   得到精确的整数键，np.unique 一次完成计数（没有哈希冲突）
+3. Apriori剪枝：低于min_frequency的(n-1)-gram不会再向后扩展，
+   包含低频单词的n-gram也直接跳过（n-gram频次不超过其任一前缀/单词的频次，剪枝不影响结果）
+4. 只有通过min_frequency的n-gram才解码为字符串
+
+分片多进程模式（count_ngrams_sharded）：
+- 第1遍：各进程统计分片内的单词频次，合并后得到全局词表，只保留频次>=min_frequency的单词
+  （全局剪枝，分片内不能按局部频次剪枝）
+- 第2遍：各进程在全局词表上统计分片内的全部n-gram，生成可合并的部分计数表
+  （n-gram词ID矩阵 → 频次、首次出现位置、词根ID集合）
+- 部分计数表两两树形归并，最后统一按min_frequency过滤并解码
+
+token_to_seeds以SeedProvenance（词根ID的CSR表，见utils/seed_provenance.py）返回，
+与dict[str, set]比较相等。两种模式输出都与逐字符串实现完全一致（包括Counter的插入顺序）
+"""
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.seed_provenance import SeedProvenance
+
+# 按空格和连字符分词
+SPLIT_RE = re.compile(r'[\s\-_]+')
+# 仅包含小写字母
+WORD_RE = re.compile(r'[a-z]+')
+
+# 组合键上限：超过时改用二维np.unique（避免int64溢出）
+_MAX_PACKED_KEY = 2 ** 62
+
+# 首次出现位置键：短语序号 * _POS_BASE + 词在短语中的位置
+_POS_BASE = 1 << 20
+
+
+def tokenize(keyword: str, stopwords: Set[str]) -> List[str]:
+    """
+    短语分词：转小写、按空格/连字符切分，去掉停用词、单字母和非纯字母的词
+    """
+    return [
+        w for w in SPLIT_RE.split(keyword.lower())
+        if len(w) >= 2 and w not in stopwords and WORD_RE.fullmatch(w)
+    ]
+
+
+@dataclass
+class EncodedPhrases:
+    """
+    整数编码后的短语集合（所有片段的词ID首尾相接）
+
+    使用固定词表编码时，词表外的单词会把短语切成多个片段（n-gram不跨越片段）
+    """
+    vocab: List[str]          # 词ID → 单词
+    seeds: List[str]          # 词根ID → 词根
+    ids: np.ndarray           # (T,) 每个位置的词ID
+    pos: np.ndarray           # (T,) 在所属片段中的位置
+    length: np.ndarray        # (T,) 所属片段的词数
+    phrase_index: np.ndarray  # (T,) 所属短语序号
+    phrase_pos: np.ndarray    # (T,) 在所属短语（分词后）中的位置
+    seed_ids: np.ndarray      # (T,) 所属短语的词根ID
+
+
+def encode_pairs(pairs: Iterable[Tuple[str, Optional[str]]], stopwords: Set[str],
+                 vocab_index: Optional[Dict[str, int]] = None,
+                 seed_index: Optional[Dict[str, int]] = None,
+                 phrase_offset: int = 0) -> EncodedPhrases:
+    """
+    分词并把单词、词根映射为整数ID
+
+    Args:
+        pairs: (短语文本, 词根) 序列
+        stopwords: 停用词集合
+        vocab_index: 固定词表 {单词: ID}；None时按出现顺序新建
+        seed_index: 固定词根表 {词根: ID}；None时按出现顺序新建
+        phrase_offset: 第一条短语的全局序号（分片时使用）
+    """
+    fixed_vocab = vocab_index is not None
+    vocab_index = vocab_index if fixed_vocab else {}
+    seed_index = seed_index if seed_index is not None else {}
+
+    ids: List[int] = []
+    lengths: List[int] = []
+    segment_offsets: List[int] = []
+    segment_seeds: List[int] = []
+    segment_phrases: List[int] = []
+
+    for number, (text, seed_word) in enumerate(pairs, start=phrase_offset):
+        words = tokenize(text, stopwords)
+        if not words:
+            continue
+
+        seed_word = seed_word or "unknown"
+        seed_id = seed_index.get(seed_word)
+        if seed_id is None:
+            seed_id = seed_index[seed_word] = len(seed_index)
+
+        if not fixed_vocab:
+            for w in words:
+                word_id = vocab_index.get(w)
+                if word_id is None:
+                    word_id = vocab_index[w] = len(vocab_index)
+                ids.append(word_id)
+            lengths.append(len(words))
+            segment_offsets.append(0)
+            segment_seeds.append(seed_id)
+            segment_phrases.append(number)
+            continue
+
+        # 固定词表：词表外的单词作为片段边界
+        run_start = None
+        for position, w in enumerate(words + [None]):
+            word_id = vocab_index.get(w) if w is not None else None
+            if word_id is not None:
+                if run_start is None:
+                    run_start = position
+                ids.append(word_id)
+            elif run_start is not None:
+                lengths.append(position - run_start)
+                segment_offsets.append(run_start)
+                segment_seeds.append(seed_id)
+                segment_phrases.append(number)
+                run_start = None
+
+    lengths_arr = np.asarray(lengths, dtype=np.int64)
+    starts = np.zeros(len(lengths_arr), dtype=np.int64)
+    if len(lengths_arr):
+        starts[1:] = np.cumsum(lengths_arr)[:-1]
+    total = int(lengths_arr.sum())
+    pos = np.arange(total, dtype=np.int64) - np.repeat(starts, lengths_arr)
+
+    return EncodedPhrases(
+        vocab=list(vocab_index),
+        seeds=list(seed_index),
+        ids=np.asarray(ids, dtype=np.int64),
+        pos=pos,
+        length=np.repeat(lengths_arr, lengths_arr),
+        phrase_index=np.repeat(np.asarray(segment_phrases, dtype=np.int64), lengths_arr),
+        phrase_pos=pos + np.repeat(np.asarray(segment_offsets, dtype=np.int64), lengths_arr),
+        seed_ids=np.repeat(np.asarray(segment_seeds, dtype=np.int64), lengths_arr),
+    )
+
+
+def encode_phrases(phrases_objects: list, stopwords: Set[str]) -> EncodedPhrases:
+    """
+    分词并编码Phrase对象列表（需要有phrase和seed_word属性）
+    """
+    return encode_pairs(((p.phrase, p.seed_word) for p in phrases_objects), stopwords)
+
+
+def _unique_pairs(left: np.ndarray, right: np.ndarray, right_size: int):
+    """
+    对 (left, right) 整数对去重计数
+
+    Returns:
+        (first_index, inverse, counts)，与np.unique的同名返回值含义相同
+    """
+    if left.size and (int(left.max()) + 1) * right_size < _MAX_PACKED_KEY:
+        keys = left * right_size + right
+        _, first_index, inverse, counts = np.unique(
+            keys, return_index=True, return_inverse=True, return_counts=True
+        )
+    else:
+        _, first_index, inverse, counts = np.unique(
+            np.column_stack([left, right]), axis=0,
+            return_index=True, return_inverse=True, return_counts=True
+        )
+    return first_index, inverse.reshape(-1), counts
+
+
+def _unique_rows(grams: np.ndarray, vocab_size: int):
+    """
+    对n-gram词ID矩阵按行去重：逐列用 (前缀稠密ID, 下一列) 压缩成稠密ID
+
+    Returns:
+        (first_index, inverse)
+    """
+    _, first_index, inverse = np.unique(grams[:, 0], return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    for col in range(1, grams.shape[1]):
+        first_index, inverse, _ = _unique_pairs(inverse, grams[:, col].astype(np.int64), vocab_size)
+    return first_index, inverse
+
+
+@dataclass
+class NgramLevel:
+    """某一长度n-gram中通过频次阈值的结果"""
+    n: int
+    first_start: np.ndarray   # 每个n-gram首次出现的起始位置
+    counts: np.ndarray        # 频次
+    seed_pairs: np.ndarray    # (k, 2) [结果序号, 词根ID] 去重后的词根关联
+
+
+def count_encoded(encoded: EncodedPhrases, min_frequency: int = 2,
+                  max_ngram_length: int = 6) -> List[NgramLevel]:
+    """
+    在整数编码上逐层统计1~max_ngram_length-gram
+
+    Returns:
+        每一层通过min_frequency的n-gram（未解码）
+    """
+    ids = encoded.ids
+    vocab_size = max(len(encoded.vocab), 1)
+    seed_size = max(len(encoded.seeds), 1)
+    levels: List[NgramLevel] = []
+    if ids.size == 0:
+        return levels
+
+    # 1-gram：词ID本身就是稠密ID（固定词表时部分ID可能不在本分片出现）
+    starts = np.arange(ids.size, dtype=np.int64)
+    gram = ids
+    counts = np.bincount(ids, minlength=len(encoded.vocab))
+    present, present_first = np.unique(ids, return_index=True)
+    first_index = np.zeros(counts.size, dtype=np.int64)
+    first_index[present] = present_first
+    word_keep = counts >= min_frequency
+
+    n = 1
+    while True:
+        survive = counts >= min_frequency
+        if not survive.any():
+            break
+
+        # 结果序号：稠密ID → 通过阈值的n-gram序号
+        selected = np.flatnonzero(survive)
+        remap = np.full(counts.size, -1, dtype=np.int64)
+        remap[selected] = np.arange(selected.size)
+
+        occurrence = survive[gram]
+        seed_first, _, _ = _unique_pairs(remap[gram[occurrence]], encoded.seed_ids[starts[occurrence]], seed_size)
+        pairs_source = np.flatnonzero(occurrence)[seed_first]
+        seed_pairs = np.column_stack([
+            remap[gram[pairs_source]],
+            encoded.seed_ids[starts[pairs_source]]
+        ])
+
+        levels.append(NgramLevel(
+            n=n,
+            first_start=starts[first_index[selected]],
+            counts=counts[selected],
+            seed_pairs=seed_pairs,
+        ))
+
+        if n >= max_ngram_length:
+            break
+
+        # 向后扩展一个词：前缀必须通过阈值、片段内还有下一个词、且下一个词本身通过阈值
+        n += 1
+        extend = occurrence & (encoded.pos[starts] + n <= encoded.length[starts])
+        starts, prefix = starts[extend], gram[extend]
+        next_words = ids[starts + n - 1]
+        keep = word_keep[next_words]
+        starts, prefix, next_words = starts[keep], prefix[keep], next_words[keep]
+        if starts.size == 0:
+            break
+
+        first_index, gram, counts = _unique_pairs(prefix, next_words, vocab_size)
+
+    return levels
+
+
+# ==================== 可合并的部分计数表 ====================
+
+@dataclass
+class NgramTable:
+    """某一长度n-gram的部分计数表（可与其他分片的同长度表合并）"""
+    grams: np.ndarray       # (k, n) 词ID
+    counts: np.ndarray      # (k,) 频次
+    first: np.ndarray       # (k,) 首次出现位置键（短语序号 * _POS_BASE + 位置）
+    seed_pairs: np.ndarray  # (p, 2) [行号, 词根ID]
+
+
+def to_tables(encoded: EncodedPhrases, levels: List[NgramLevel]) -> Dict[int, NgramTable]:
+    """把逐层计数结果转换为 {n: NgramTable}"""
+    tables = {}
+    for level in levels:
+        offsets = np.arange(level.n, dtype=np.int64)
+        tables[level.n] = NgramTable(
+            grams=encoded.ids[level.first_start[:, None] + offsets].astype(np.int32),
+            counts=level.counts.astype(np.int64),
+            first=encoded.phrase_index[level.first_start] * _POS_BASE + encoded.phrase_pos[level.first_start],
+            seed_pairs=level.seed_pairs,
+        )
+    return tables
+
+
+def merge_tables(left: Dict[int, NgramTable], right: Dict[int, NgramTable],
+                 vocab_size: int, seed_size: int) -> Dict[int, NgramTable]:
+    """
+    合并两个部分计数表：频次相加、首次出现位置取最小、词根集合取并集
+    """
+    merged = dict(left)
+    for n, b in right.items():
+        a = merged.get(n)
+        if a is None:
+            merged[n] = b
+            continue
+
+        grams = np.vstack([a.grams, b.grams])
+        first_index, inverse = _unique_rows(grams, vocab_size)
+        size = first_index.size
+
+        counts = np.bincount(inverse, weights=np.concatenate([a.counts, b.counts]),
+                             minlength=size).astype(np.int64)
+        first = np.full(size, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first, inverse, np.concatenate([a.first, b.first]))
+
+        rows = inverse[np.concatenate([a.seed_pairs[:, 0], b.seed_pairs[:, 0] + a.counts.size])]
+        seed_ids = np.concatenate([a.seed_pairs[:, 1], b.seed_pairs[:, 1]])
+        pair_first, _, _ = _unique_pairs(rows, seed_ids, seed_size)
+
+        merged[n] = NgramTable(
+            grams=grams[first_index],
+            counts=counts,
+            first=first,
+            seed_pairs=np.column_stack([rows[pair_first], seed_ids[pair_first]]),
+        )
+    return merged
+
+
+def decode_tables(tables: Dict[int, NgramTable], vocab: List[str], seeds: List[str],
+                  min_frequency: int) -> Tuple[Counter, SeedProvenance]:
+    """
+    过滤并解码为字符串
+
+    顺序与逐字符串实现一致：按首次出现的 (短语, n, 位置) 排序。
+    词根关联直接转为CSR来源词根表，不为每个token创建set
+    """
+    entries = []
+    for n, table in sorted(tables.items()):
+        keep = table.counts >= min_frequency
+        if not keep.any():
+            continue
+        rows = np.flatnonzero(keep)
+        row_slot = np.full(table.counts.size, -1, dtype=np.int64)
+        row_slot[rows] = np.arange(rows.size)
+        pair_slots = row_slot[table.seed_pairs[:, 0]]
+        pair_keep = pair_slots >= 0
+
+        tokens = [' '.join(vocab[w] for w in gram) for gram in table.grams[rows].tolist()]
+        entries.append((n, table.first[rows], table.counts[rows].tolist(), tokens,
+                        pair_slots[pair_keep], table.seed_pairs[pair_keep, 1]))
+
+    token_counter = Counter()
+    if not entries:
+        return token_counter, SeedProvenance.from_pairs([], seeds, [], [])
+
+    first = np.concatenate([e[1] for e in entries])
+    n_values = np.concatenate([np.full(e[1].size, e[0]) for e in entries])
+    order = np.lexsort((first % _POS_BASE, n_values, first // _POS_BASE))
+
+    tokens = [t for e in entries for t in e[3]]
+    counts = [c for e in entries for c in e[2]]
+    for idx in order.tolist():
+        token_counter[tokens[idx]] = counts[idx]
+
+    # 关联对的行号：层内序号 → 拼接后序号 → 排序后位置
+    level_offsets = np.cumsum([0] + [e[1].size for e in entries[:-1]])
+    position = np.empty(order.size, dtype=np.int64)
+    position[order] = np.arange(order.size)
+    pair_rows = position[np.concatenate([e[4] + offset for e, offset in zip(entries, level_offsets)])]
+    pair_seeds = np.concatenate([e[5] for e in entries])
+    return token_counter, SeedProvenance.from_pairs(list(token_counter), seeds, pair_rows, pair_seeds)
+
+
+def count_ngrams(phrases_objects: list, stopwords: Set[str], min_frequency: int = 2,
+                 max_ngram_length: int = 6) -> Tuple[Counter, SeedProvenance]:
+    """
+    整数词表n-gram计数（单进程，返回值与segment_keywords_unified相同）
+
+    Returns:
+        (token_counter, token_to_seeds)
+    """
+    encoded = encode_phrases(phrases_objects, stopwords)
+    levels = count_encoded(encoded, min_frequency, max_ngram_length)
+    return decode_tables(to_tables(encoded, levels), encoded.vocab, encoded.seeds, min_frequency)
+
+
+# ==================== 分片多进程 ====================
+
+# 第2遍worker进程的只读状态（由initializer设置，避免每个分片重复传输词表）
+_worker_state: Dict = {}
+
+
+def _shard_word_counts(args) -> Tuple[Counter, List[str]]:
+    """第1遍：统计分片内的单词频次和词根（按出现顺序）"""
+    pairs, stopwords = args
+    word_counts = Counter()
+    seeds = {}
+    for text, seed_word in pairs:
+        words = tokenize(text, stopwords)
+        if words:
+            word_counts.update(words)
+            seeds.setdefault(seed_word or "unknown", None)
+    return word_counts, list(seeds)
+
+
+def _init_shard_worker(stopwords, vocab_index, seed_index, max_ngram_length):
+    _worker_state.update(
+        stopwords=stopwords,
+        vocab_index=vocab_index,
+        seed_index=seed_index,
+        max_ngram_length=max_ngram_length,
+    )
+
+
+def _shard_tables(args) -> Dict[int, NgramTable]:
+    """第2遍：在全局词表上统计分片内的全部n-gram（不按局部频次剪枝）"""
+    pairs, phrase_offset = args
+    encoded = encode_pairs(
+        pairs, _worker_state['stopwords'],
+        vocab_index=_worker_state['vocab_index'],
+        seed_index=_worker_state['seed_index'],
+        phrase_offset=phrase_offset
+    )
+    levels = count_encoded(encoded, min_frequency=1, max_ngram_length=_worker_state['max_ngram_length'])
+    return to_tables(encoded, levels)
+
+
+def _merge_pair(args) -> Dict[int, NgramTable]:
+    left, right = args
+    return merge_tables(left, right, len(_worker_state['vocab_index']) or 1,
+                        len(_worker_state['seed_index']) or 1)
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """进程数：参数优先，其次SEGMENTATION_CONFIG['workers']，0表示CPU核数"""
+    if workers is None:
+        from config.settings import SEGMENTATION_CONFIG
+        workers = SEGMENTATION_CONFIG['workers']
+    return workers if workers and workers > 0 else (os.cpu_count() or 1)
+
+
+def count_ngrams_sharded(phrases_objects: list, stopwords: Set[str], min_frequency: int = 2,
+                         max_ngram_length: int = 6, workers: Optional[int] = None,
+                         shard_size: Optional[int] = None) -> Tuple[Counter, SeedProvenance]:
+    """
+    分片多进程n-gram计数（返回值与count_ngrams完全相同）
+
+    Args:
+        phrases_objects: Phrase对象列表（需要有phrase和seed_word属性）
+        stopwords: 停用词集合
+        min_frequency: 最小频次阈值
+        max_ngram_length: 最大n-gram长度
+        workers: 进程数（None时读取SEGMENTATION_CONFIG）
+        shard_size: 每个分片的短语数（None时读取SEGMENTATION_CONFIG）
+
+    Returns:
+        (token_counter, token_to_seeds)
+    """
+    from config.settings import SEGMENTATION_CONFIG
+
+    workers = resolve_workers(workers)
+    shard_size = shard_size or SEGMENTATION_CONFIG['shard_size']
+    pairs = [(p.phrase, p.seed_word) for p in phrases_objects]
+    shards = [(pairs[i:i + shard_size], i) for i in range(0, len(pairs), shard_size)]
+    if not shards:
+        return Counter(), {}
+
+    stopwords = set(stopwords)
+
+    # 第1遍：全局单词频次 → 只保留可能通过阈值的单词
+    word_counts = Counter()
+    seed_index: Dict[str, int] = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard_counts, shard_seeds in executor.map(_shard_word_counts, [(s, stopwords) for s, _ in shards]):
+            word_counts.update(shard_counts)
+            for seed_word in shard_seeds:
+                seed_index.setdefault(seed_word, len(seed_index))
+
+    vocab = [w for w, count in word_counts.items() if count >= min_frequency]
+    vocab_index = {w: i for i, w in enumerate(vocab)}
+    seeds = list(seed_index)
+    if not vocab:
+        return Counter(), {}
+
+    # 第2遍：分片计数 + 树形归并
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_shard_worker,
+        initargs=(stopwords, vocab_index, seed_index, max_ngram_length)
+    ) as executor:
+        partials = list(executor.map(_shard_tables, shards))
+        while len(partials) > 1:
+            merged = list(executor.map(_merge_pair, zip(partials[0::2], partials[1::2])))
+            if len(partials) % 2:
+                merged.append(partials[-1])
+            partials = merged
+
+    return decode_tables(partials[0], vocab, seeds, min_frequency)
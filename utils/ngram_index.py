@@ -0,0 +1,221 @@
+"""
+n-gram倒排索引（n-gram → 包含它的短语ID）
+
+一次扫描全部短语，同时得到：
+1. 每个n-gram的出现次数（与 NGramAnalyzer.extract_ngrams 相同的分词和计数方式）
+2. 每个n-gram的倒排表：包含它的短语ID（升序、去重），CSR压缩存储：
+   第i个n-gram的短语ID为 indices[indptr[i]:indptr[i+1]]
+
+"包含某个n-gram的所有短语" 由此变成一次倒排表查找，不再需要每次全量扫描短语。
+索引可以用 save()/load() 持久化，load_or_build() 会校验短语指纹，短语变化时自动重建。
+
+    index = NGramIndex.build(['how to edit videos', 'how to cook rice'])
+    index.postings('how to')      # array([0, 1])
+    index.counter(2, min_freq=2)  # Counter({'how to': 2})
+"""
+import hashlib
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_NGRAM_SIZES = (2, 3, 4)
+
+
+def phrases_fingerprint(phrases: Iterable[str]) -> str:
+    """短语列表指纹（内容和顺序都参与），用于判断持久化的索引是否仍然有效"""
+    digest = hashlib.blake2b(digest_size=16)
+    for phrase in phrases:
+        digest.update(phrase.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class NGramIndex:
+    """n-gram倒排索引（CSR存储）"""
+
+    def __init__(
+        self,
+        ngrams: List[str],
+        sizes: np.ndarray,
+        counts: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        ngram_sizes: Sequence[int],
+        fingerprint: str = ''
+    ):
+        """
+        Args:
+            ngrams: n-gram列表（顺序即ID，同一n内按首次出现顺序）
+            sizes: 每个n-gram的词数
+            counts: 每个n-gram的出现次数（同一短语内出现多次计多次）
+            indptr: (len(ngrams)+1,) 每个n-gram的短语ID区间
+            indices: 按n-gram排列的短语ID（每段内升序、去重）
+            ngram_sizes: 建索引时统计的n
+            fingerprint: 建索引时的短语指纹
+        """
+        self.ngrams = ngrams
+        self.ngram_index = {ngram: ngram_id for ngram_id, ngram in enumerate(ngrams)}
+        self.sizes = np.asarray(sizes, dtype=np.uint8)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.fingerprint = fingerprint
+
+    # ==================== 构建 ====================
+
+    @classmethod
+    def build(cls, phrases: Sequence[str], ngram_sizes: Sequence[int] = DEFAULT_NGRAM_SIZES) -> 'NGramIndex':
+        """
+        一次扫描短语构建索引
+
+        Args:
+            phrases: 短语列表（短语ID即列表下标）
+            ngram_sizes: 要统计的n（如 (2, 3, 4)）
+        """
+        ngram_ids = {}
+        ngrams: List[str] = []
+        sizes = array('B')
+        counts: List[int] = []
+        last_phrase: List[int] = []  # 每个n-gram最近一次记入倒排表的短语ID，用于去重
+        rows = array('i')
+        phrase_ids = array('i')
+
+        for phrase_id, phrase in enumerate(phrases):
+            words = phrase.lower().split()
+            for n in ngram_sizes:
+                for i in range(len(words) - n + 1):
+                    ngram = ' '.join(words[i:i + n])
+                    ngram_id = ngram_ids.get(ngram)
+                    if ngram_id is None:
+                        ngram_id = len(ngrams)
+                        ngram_ids[ngram] = ngram_id
+                        ngrams.append(ngram)
+                        sizes.append(n)
+                        counts.append(0)
+                        last_phrase.append(-1)
+                    counts[ngram_id] += 1
+                    if last_phrase[ngram_id] != phrase_id:
+                        last_phrase[ngram_id] = phrase_id
+                        rows.append(ngram_id)
+                        phrase_ids.append(phrase_id)
+
+        # 关联对按短语顺序产生，按n-gram稳定排序后每段内短语ID自然升序
+        rows = np.frombuffer(rows, dtype=np.int32) if rows else np.zeros(0, dtype=np.int32)
+        phrase_ids = np.frombuffer(phrase_ids, dtype=np.int32) if phrase_ids else np.zeros(0, dtype=np.int32)
+        order = np.argsort(rows, kind='stable')
+        indptr = np.zeros(len(ngrams) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(ngrams)), out=indptr[1:])
+
+        return cls(ngrams, np.frombuffer(sizes, dtype=np.uint8), np.asarray(counts, dtype=np.int64),
+                   indptr, phrase_ids[order], ngram_sizes, phrases_fingerprint(phrases))
+
+    # ==================== 查询 ====================
+
+    def __len__(self) -> int:
+        return len(self.ngrams)
+
+    def __contains__(self, ngram) -> bool:
+        return ngram in self.ngram_index
+
+    def postings(self, ngram: str) -> np.ndarray:
+        """包含该n-gram的短语ID（升序），不存在时为空数组"""
+        ngram_id = self.ngram_index.get(ngram)
+        if ngram_id is None:
+            return self.indices[:0]
+        return self.indices[self.indptr[ngram_id]:self.indptr[ngram_id + 1]]
+
+    def ngram_phrases(self, ngram: str, phrases: Sequence[str]) -> List[str]:
+        """包含该n-gram的短语文本（按短语顺序）"""
+        return [phrases[phrase_id] for phrase_id in self.postings(ngram).tolist()]
+
+    def count(self, ngram: str) -> int:
+        """n-gram的出现次数"""
+        ngram_id = self.ngram_index.get(ngram)
+        return 0 if ngram_id is None else int(self.counts[ngram_id])
+
+    def counter(self, n: int, min_freq: int = 1) -> Counter:
+        """
+        n-gram频次（与 NGramAnalyzer.extract_ngrams(phrases, n, min_freq) 相同，含插入顺序）
+
+        Args:
+            n: n-gram的n（必须在ngram_sizes中）
+            min_freq: 最小频次过滤
+        """
+        if n not in self.ngram_sizes:
+            raise ValueError(f"索引未统计{n}-gram（ngram_sizes={self.ngram_sizes}）")
+        selected = np.flatnonzero((self.sizes == n) & (self.counts >= min_freq))
+        return Counter({self.ngrams[i]: int(self.counts[i]) for i in selected.tolist()})
+
+    # ==================== 持久化 ====================
+
+    def save(self, path: Path):
+        """保存为npz（n-gram以换行拼接后按UTF-8字节存储，不需要pickle）"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            ngrams=np.frombuffer('\n'.join(self.ngrams).encode('utf-8'), dtype=np.uint8),
+            sizes=self.sizes,
+            counts=self.counts,
+            indptr=self.indptr,
+            indices=self.indices,
+            ngram_sizes=np.asarray(self.ngram_sizes, dtype=np.uint8),
+            fingerprint=np.array(self.fingerprint)
+        )
+        logger.info(f"已保存n-gram索引: {len(self.ngrams)} 个n-gram -> {path.name}")
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['NGramIndex']:
+        """读取索引，文件不存在或损坏时返回None"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                joined = data['ngrams'].tobytes().decode('utf-8')
+                return cls(
+                    joined.split('\n') if joined else [],
+                    data['sizes'],
+                    data['counts'],
+                    data['indptr'],
+                    data['indices'],
+                    data['ngram_sizes'].tolist(),
+                    str(data['fingerprint'])
+                )
+        except Exception as e:
+            logger.warning(f"n-gram索引加载失败: {str(e)}")
+            return None
+
+    @classmethod
+    def load_or_build(
+        cls,
+        phrases: Sequence[str],
+        path: Path,
+        ngram_sizes: Sequence[int] = DEFAULT_NGRAM_SIZES
+    ) -> 'NGramIndex':
+        """
+        短语与n的设置都没变时复用持久化的索引，否则重建并保存
+
+        Args:
+            phrases: 短语列表
+            path: 索引文件路径
+            ngram_sizes: 要统计的n
+        """
+        index = cls.load(path)
+        if (index is not None
+                and set(ngram_sizes) <= set(index.ngram_sizes)
+                and index.fingerprint == phrases_fingerprint(phrases)):
+            logger.info(f"复用n-gram索引: {path.name}（{len(index)} 个n-gram）")
+            return index
+
+        index = cls.build(phrases, ngram_sizes)
+        index.save(path)
+        return index
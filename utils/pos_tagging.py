@@ -5,6 +5,8 @@
 from typing import List, Tuple, Dict
 from collections import Counter
 
+from utils.annotation_cache import get_annotation_cache
+
 # 尝试导入NLTK，如果失败则标记为不可用
 try:
     import nltk
@@ -107,13 +109,34 @@ POS_CATEGORY_NAMES = {
     'Other': '其他'
 }
 
+UNKNOWN_POS = ('UNKNOWN', 'Other', '未知')
+
+# 环境问题（NLTK数据缺失等）导致的异常，与具体的词无关，不写入负缓存
+ENVIRONMENT_ERRORS = (LookupError, ImportError, OSError)
+
+
+def _describe_pos(pos: str) -> Tuple[str, str, str]:
+    """Penn Treebank标签 → (详细标签, 简化分类, 中文名称)"""
+    # 找到简化分类
+    category = 'Other'
+    for cat, tags in POS_CATEGORIES.items():
+        if pos in tags:
+            category = cat
+            break
+
+    # 获取中文名称
+    chinese_name = POS_CATEGORY_NAMES.get(category, '其他')
 
-def get_pos_tag(word: str) -> Tuple[str, str, str]:
+    return (pos, category, chinese_name)
+
+
+def get_pos_tag(word: str, use_cache: bool = True) -> Tuple[str, str, str]:
     """
     获取单个词的词性标注
 
     Args:
         word: 英文单词
+        use_cache: 是否先查词性缓存（utils/annotation_cache.py）
 
     Returns:
         (详细标签, 简化分类, 中文名称)
@@ -126,36 +149,39 @@ def get_pos_tag(word: str) -> Tuple[str, str, str]:
         ('NN', 'Noun', '名词')
     """
     if not POS_TAGGING_AVAILABLE:
-        return ('UNKNOWN', 'Other', '未知')
+        return UNKNOWN_POS
+
+    cache = get_annotation_cache() if use_cache else None
+    if cache is not None:
+        hits, failed = cache.get_pos_tags([word])
+        if word in hits:
+            return hits[word]
+        if word in failed:
+            return UNKNOWN_POS
 
     try:
         # NLTK词性标注
         tagged = pos_tag([word])
-        pos = tagged[0][1]
-
-        # 找到简化分类
-        category = 'Other'
-        for cat, tags in POS_CATEGORIES.items():
-            if pos in tags:
-                category = cat
-                break
-
-        # 获取中文名称
-        chinese_name = POS_CATEGORY_NAMES.get(category, '其他')
-
-        return (pos, category, chinese_name)
+        result = _describe_pos(tagged[0][1])
+        if cache is not None:
+            cache.put_pos_tags({word: result})
+        return result
 
     except Exception as e:
         print(f"⚠️  词性标注失败: {word} - {str(e)}")
-        return ('UNKNOWN', 'Other', '未知')
+        # 只有这个词本身标注失败才写入负缓存
+        if cache is not None and not isinstance(e, ENVIRONMENT_ERRORS):
+            cache.put_failures('pos', [word])
+        return UNKNOWN_POS
 
 
-def tag_words_batch(words: List[str]) -> Dict[str, Tuple[str, str, str]]:
+def tag_words_batch(words: List[str], use_cache: bool = True) -> Dict[str, Tuple[str, str, str]]:
     """
     批量标注词性
 
     Args:
         words: 单词列表
+        use_cache: 是否先查词性缓存（命中的词不再调用NLTK）
 
     Returns:
         {单词: (详细标签, 简化分类, 中文名称)}
@@ -170,34 +196,34 @@ def tag_words_batch(words: List[str]) -> Dict[str, Tuple[str, str, str]]:
         }
     """
     if not POS_TAGGING_AVAILABLE:
-        return {word: ('UNKNOWN', 'Other', '未知') for word in words}
+        return {word: UNKNOWN_POS for word in words}
 
     result = {}
-
-    try:
-        # NLTK批量标注
-        tagged = pos_tag(words)
-
-        for word, pos in tagged:
-            # 找到简化分类
-            category = 'Other'
-            for cat, tags in POS_CATEGORIES.items():
-                if pos in tags:
-                    category = cat
-                    break
-
-            # 获取中文名称
-            chinese_name = POS_CATEGORY_NAMES.get(category, '其他')
-
-            result[word] = (pos, category, chinese_name)
-
-    except Exception as e:
-        print(f"❌ 批量词性标注失败: {str(e)}")
-        # 失败时返回未知
-        for word in words:
-            result[word] = ('UNKNOWN', 'Other', '未知')
-
-    return result
+    pending = words
+
+    # 先查缓存，只有未命中的词才交给NLTK
+    cache = get_annotation_cache() if use_cache else None
+    if cache is not None:
+        hits, failed = cache.get_pos_tags(words)
+        result.update(hits)
+        result.update((word, UNKNOWN_POS) for word in failed)
+        pending = [word for word in words if word not in result]
+
+    if pending:
+        try:
+            # NLTK批量标注
+            tagged = [(word, _describe_pos(pos)) for word, pos in pos_tag(pending)]
+            result.update(tagged)
+            if cache is not None:
+                cache.put_pos_tags(dict(tagged))
+
+        except Exception as e:
+            print(f"❌ 批量词性标注失败: {str(e)}")
+            # 失败时返回未知；整批失败与具体的词无关（如NLTK数据缺失），不写入负缓存
+            for word in pending:
+                result[word] = UNKNOWN_POS
+
+    return {word: result[word] for word in words}
 
 
 def get_pos_statistics(word_counter: Counter,
@@ -0,0 +1,191 @@
+"""
+紧凑的token来源词根表（token_to_seeds）
+
+原结构是 {token: {seed1, seed2, ...}}：每个token一个Python set，
+几十万n-gram × 上百个词根时，光是set对象本身就要占用上GB内存，
+而Phase 0页面还要在st.session_state里为每个浏览器会话各存一份。
+
+这里改为：
+1. 词根名驻留为小整数ID（seeds列表：ID → 词根名，所有token共享）
+2. token → 词根ID 用CSR压缩存储：第i个token的词根ID为
+   indices[indptr[i]:indptr[i+1]]（已排序、去重）
+3. 只有真正显示的行才通过 resolve() 解析为词根名
+
+SeedProvenance实现了Mapping接口，token_to_seeds[token] 返回词根名frozenset，
+与原 dict[str, set] 比较相等，现有调用方无需修改。
+"""
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+import numpy as np
+
+
+def _seed_id_dtype(seed_count: int):
+    """词根ID使用能容纳的最小整数类型（词根一般只有几百个）"""
+    return np.uint16 if seed_count <= np.iinfo(np.uint16).max + 1 else np.int32
+
+
+class SeedProvenance(Mapping):
+    """token → 来源词根集合（CSR存储）"""
+
+    __slots__ = ('seeds', 'token_index', 'indptr', 'indices')
+
+    def __init__(self, seeds: List[str], tokens: Iterable[str], indptr: np.ndarray, indices: np.ndarray):
+        """
+        Args:
+            seeds: 词根ID → 词根名
+            tokens: token列表（顺序即行号）
+            indptr: (len(tokens)+1,) 每个token的词根ID区间
+            indices: 按行排列的词根ID（行内已排序去重）
+        """
+        self.seeds = seeds
+        self.token_index: Dict[str, int] = {token: row for row, token in enumerate(tokens)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=_seed_id_dtype(len(seeds)))
+
+    # ==================== 构建 ====================
+
+    @classmethod
+    def from_pairs(cls, tokens: List[str], seeds: List[str],
+                   rows: np.ndarray, seed_ids: np.ndarray) -> 'SeedProvenance':
+        """
+        从 (行号, 词根ID) 关联对构建
+
+        Args:
+            tokens: token列表
+            seeds: 词根ID → 词根名
+            rows: 关联对的token行号
+            seed_ids: 关联对的词根ID（可重复，构建时去重）
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        seed_ids = np.asarray(seed_ids, dtype=np.int64)
+        if rows.size:
+            order = np.lexsort((seed_ids, rows))
+            rows, seed_ids = rows[order], seed_ids[order]
+            keep = np.ones(rows.size, dtype=bool)
+            keep[1:] = (rows[1:] != rows[:-1]) | (seed_ids[1:] != seed_ids[:-1])
+            rows, seed_ids = rows[keep], seed_ids[keep]
+
+        indptr = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(tokens)), out=indptr[1:])
+        return cls(seeds, tokens, indptr, seed_ids)
+
+    @classmethod
+    def from_sets(cls, token_to_seeds: Mapping) -> 'SeedProvenance':
+        """从 {token: {seed, ...}} 构建（已是SeedProvenance时直接返回）"""
+        if isinstance(token_to_seeds, SeedProvenance):
+            return token_to_seeds
+
+        seed_index: Dict[str, int] = {}
+        tokens = list(token_to_seeds)
+        rows: List[int] = []
+        seed_ids: List[int] = []
+        for row, token in enumerate(tokens):
+            for seed in token_to_seeds[token]:
+                seed_id = seed_index.setdefault(seed, len(seed_index))
+                rows.append(row)
+                seed_ids.append(seed_id)
+        return cls.from_pairs(tokens, list(seed_index), rows, seed_ids)
+
+    # ==================== Mapping接口 ====================
+
+    def __getitem__(self, token: str) -> frozenset:
+        return frozenset(self.seeds[seed_id] for seed_id in self.seed_ids(token).tolist())
+
+    def __contains__(self, token) -> bool:
+        return token in self.token_index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.token_index)
+
+    def __len__(self) -> int:
+        return len(self.token_index)
+
+    def __repr__(self) -> str:
+        return f"SeedProvenance({len(self)} tokens, {len(self.seeds)} seeds, {self.indices.size} links)"
+
+    # ==================== 按需解析 ====================
+
+    def seed_ids(self, token: str) -> np.ndarray:
+        """token的词根ID数组（不存在时抛出KeyError）"""
+        row = self.token_index[token]
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def seed_count(self, token: str) -> int:
+        """token的来源词根数（不存在时为0），不解析词根名"""
+        row = self.token_index.get(token)
+        if row is None:
+            return 0
+        return int(self.indptr[row + 1] - self.indptr[row])
+
+    def resolve(self, token: str, limit: Optional[int] = None) -> List[str]:
+        """
+        解析token的来源词根名（按名称排序，仅在显示时调用）
+
+        Args:
+            token: token
+            limit: 最多返回几个（None为全部）
+        """
+        if token not in self.token_index:
+            return []
+        names = sorted(self.seeds[seed_id] for seed_id in self.seed_ids(token).tolist())
+        return names if limit is None else names[:limit]
+
+    # ==================== 组合 ====================
+
+    def subset(self, tokens: Iterable[str]) -> 'SeedProvenance':
+        """取部分token（共享词根表），不存在的token忽略"""
+        tokens = [token for token in tokens if token in self.token_index]
+        rows = np.fromiter((self.token_index[token] for token in tokens), dtype=np.int64, count=len(tokens))
+        starts, ends = self.indptr[rows], self.indptr[rows + 1]
+        lengths = ends - starts
+
+        indptr = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        # 每个关联在原indices中的位置 = 所在行起点 + 行内偏移
+        offsets = np.arange(indptr[-1]) - np.repeat(indptr[:-1], lengths)
+        indices = self.indices[np.repeat(starts, lengths) + offsets]
+        return SeedProvenance(self.seeds, tokens, indptr, indices)
+
+    def merge(self, other: Mapping) -> 'SeedProvenance':
+        """
+        与另一个来源词根表取并集（other可以是dict[str, set]）
+
+        token顺序：先self的token，再other中新出现的token
+        """
+        other = SeedProvenance.from_sets(other)
+        seed_index = {seed: seed_id for seed_id, seed in enumerate(self.seeds)}
+        remap = np.fromiter((seed_index.setdefault(seed, len(seed_index)) for seed in other.seeds),
+                            dtype=np.int64, count=len(other.seeds))
+
+        tokens = list(self.token_index)
+        token_index = dict(self.token_index)
+        for token in other.token_index:
+            if token not in token_index:
+                token_index[token] = len(tokens)
+                tokens.append(token)
+
+        other_rows = np.fromiter((token_index[token] for token in other.token_index),
+                                 dtype=np.int64, count=len(other))
+        rows = np.concatenate([
+            np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.indptr)),
+            np.repeat(other_rows, np.diff(other.indptr)),
+        ])
+        seed_ids = np.concatenate([self.indices.astype(np.int64), remap[other.indices.astype(np.int64)]])
+        return SeedProvenance.from_pairs(tokens, list(seed_index), rows, seed_ids)
+
+    def to_sets(self) -> Dict[str, Set[str]]:
+        """还原为 {token: {seed, ...}}（仅用于导出/调试）"""
+        return {token: set(self[token]) for token in self.token_index}
+
+    @property
+    def nbytes(self) -> int:
+        """
+        占用字节数估算：CSR数组 + token索引dict + 词根表
+
+        token字符串与token_counter共享、词根名全局只有一份，均不计入
+        """
+        return (self.indptr.nbytes + self.indices.nbytes
+                + sys.getsizeof(self.token_index) + sys.getsizeof(self.seeds)
+                + sum(sys.getsizeof(row) for row in self.token_index.values()))
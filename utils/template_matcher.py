@@ -0,0 +1,105 @@
+"""
+多模板匹配
+把每个模板的最长字面片段作为锚点建一个Aho-Corasick自动机，
+每条短语扫描一次得到候选模板，只对候选模板运行正则，结果与逐模板逐短语 regex.search 完全相同。
+
+用于替代 "for 模板 in 模板列表: for 短语 in 短语列表: regex.search(短语)" 这类 O(模板数 × 短语数) 的匹配。
+
+    matcher = TemplateMatcher([(r'best (.+)', ['best ']), (r'(.+?) books', [' books'])])
+    list(matcher.iter_matches('best fantasy books'))
+    # [(0, <re.Match ...>), (1, <re.Match ...>)]  # (模板ID, 匹配对象)，按模板ID升序
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from utils.aho_corasick import AhoCorasickMatcher
+
+# re.IGNORECASE 下ASCII字母还能匹配的两个小写非ASCII字符（'ı'.lower()和'ſ'.lower()都是其自身）
+_IGNORECASE_FOLD = str.maketrans({'ı': 'i', 'ſ': 's'})
+
+
+def template_literals(template: str, placeholder: str = r'\{[XYZ]\}') -> List[str]:
+    """模板中占位符之间的非空字面片段"""
+    return [part for part in re.split(placeholder, template) if part]
+
+
+def _usable_anchor(literal: str) -> bool:
+    """锚点的字符必须是ASCII或无大小写（如中文），保证忽略大小写匹配时锚点一定出现在小写文本中"""
+    return all(ch.isascii() or ch.lower() == ch.upper() for ch in literal)
+
+
+class TemplateMatcher:
+    """多模板正则匹配：锚点倒排 + 候选模板正则验证"""
+
+    def __init__(
+        self,
+        templates: Sequence[Tuple[Optional[str], List[str]]],
+        flags: int = re.IGNORECASE
+    ):
+        """
+        Args:
+            templates: [(正则表达式, [字面片段, ...]), ...]，正则为空的模板永不匹配
+            flags: 正则编译标志（与原逐模板匹配保持一致）
+        """
+        self.regexes: List[Optional[re.Pattern]] = [
+            re.compile(regex_pattern, flags) if regex_pattern else None
+            for regex_pattern, _ in templates
+        ]
+
+        # 锚点 -> 模板ID列表；没有可用锚点的模板对每条短语都是候选
+        anchor_templates: Dict[str, List[int]] = {}
+        self._always: List[int] = []
+        for template_id, (regex_pattern, literals) in enumerate(templates):
+            if not regex_pattern:
+                continue
+            anchors = [lit for lit in literals if _usable_anchor(lit)]
+            if not anchors:
+                self._always.append(template_id)
+                continue
+            anchor = max(anchors, key=len).lower() if flags & re.IGNORECASE else max(anchors, key=len)
+            anchor_templates.setdefault(anchor, []).append(template_id)
+
+        self._fold = bool(flags & re.IGNORECASE)
+        self._anchors = AhoCorasickMatcher(anchor_templates)
+        self._anchor_templates = [anchor_templates[a] for a in self._anchors.patterns]
+
+    @property
+    def backend(self) -> str:
+        return self._anchors.backend
+
+    def candidates(self, text: str) -> List[int]:
+        """文本的候选模板ID（升序）"""
+        scan = text
+        if self._fold and not text.isascii():
+            scan = text.translate(_IGNORECASE_FOLD)
+
+        found = set(self._always)
+        for pattern_id in self._anchors.find_all(scan):
+            found.update(self._anchor_templates[pattern_id])
+        return sorted(found)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, re.Match]]:
+        """
+        文本匹配到的全部模板
+
+        Yields:
+            (template_id, match)，match 与 regexes[template_id].search(text) 相同
+        """
+        for template_id in self.candidates(text):
+            match = self.regexes[template_id].search(text)
+            if match:
+                yield template_id, match
+
+    def match_all(self, texts: Iterable[str]) -> List[List[Tuple[int, re.Match]]]:
+        """
+        按模板分桶的全部匹配
+
+        Returns:
+            [[(文本序号, match), ...] for 每个模板]，桶内按文本顺序，
+            即逐模板逐文本匹配时的结果顺序
+        """
+        buckets: List[List[Tuple[int, re.Match]]] = [[] for _ in self.regexes]
+        for text_index, text in enumerate(texts):
+            for template_id, match in self.iter_matches(text):
+                buckets[template_id].append((text_index, match))
+        return buckets
@@ -10,9 +10,28 @@ deep-translator支持多种翻译服务:
 等等
 
 本模块使用Google Translate（免费，无需API key）
+
+批量翻译由 TranslationService 完成：
+1. 先查翻译缓存（utils/annotation_cache.py），只翻译未命中的词
+2. 按字符上限装箱：多个词用换行符连接成一个请求，不超过服务的单次字符限制
+3. 有界线程池并发发送各批次，失败按指数退避重试
+4. 按行数校验结果，行数对不上的批次对半拆分重新请求，直到单个词
+5. 每批结果立即写入缓存（只有单个词仍然行数不符才写入负缓存，请求异常/限流不缓存），
+   可选批量upsert到word_segments
+
+基准测试可用 StubTranslator（本地模拟翻译服务）代替真实服务。
 """
+import random
+import threading
 import time
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Optional, Tuple
+
+from config.settings import TRANSLATION_CONFIG
+from utils.annotation_cache import get_annotation_cache
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # 尝试导入翻译库，如果失败则标记为不可用
 try:
@@ -23,22 +42,261 @@ except ImportError:
     GoogleTranslator = None
 
 
+def _google_translator():
+    return GoogleTranslator(source='en', target='zh-CN')
+
+
+class StubTranslator:
+    """
+    本地模拟翻译服务（基准测试/单元测试用，与GoogleTranslator相同的translate接口）
+
+    每行返回 "译:" + 原文，可模拟请求延迟、超长报错、随机失败和丢行。
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        per_char_latency: float = 0.0,
+        max_chars: int = 5000,
+        fail_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        seed: int = 0
+    ):
+        """
+        Args:
+            latency: 每个请求的固定延迟（秒）
+            per_char_latency: 每个字符的额外延迟（秒）
+            max_chars: 单次请求的字符上限，超过时抛出ValueError
+            fail_rate: 请求随机抛出ConnectionError的概率
+            drop_rate: 返回结果随机丢掉最后一行的概率（行数校验失败）
+            seed: 随机种子
+        """
+        self.latency = latency
+        self.per_char_latency = per_char_latency
+        self.max_chars = max_chars
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def translate(self, text: str) -> str:
+        if len(text) > self.max_chars:
+            raise ValueError(f"text length {len(text)} exceeds {self.max_chars}")
+        with self._lock:
+            self.requests += 1
+            fail = self._rng.random() < self.fail_rate
+            drop = self._rng.random() < self.drop_rate
+
+        time.sleep(self.latency + self.per_char_latency * len(text))
+        if fail:
+            raise ConnectionError("stub translator: simulated failure")
+
+        lines = [f"译:{line}" for line in text.split('\n')]
+        if drop and len(lines) > 1:
+            lines.pop()
+        return '\n'.join(lines)
+
+
+def pack_batches(words: List[str], max_chars: int, max_items: int) -> List[List[str]]:
+    """
+    按字符上限装箱：每批用换行符连接后不超过max_chars，且不超过max_items个词
+
+    超过max_chars的单个词单独成批（交给翻译服务报错，记为失败）。
+    """
+    batches = []
+    batch: List[str] = []
+    size = 0
+    for word in words:
+        added = len(word) + (1 if batch else 0)
+        if batch and (size + added > max_chars or len(batch) >= max_items):
+            batches.append(batch)
+            batch, size, added = [], 0, len(word)
+        batch.append(word)
+        size += added
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class TranslationService:
+    """并发批量翻译：查缓存 → 按字符上限装箱 → 线程池并发请求 → 行数校验 → 写回缓存"""
+
+    def __init__(
+        self,
+        translator_factory: Optional[Callable] = None,
+        workers: int = None,
+        max_chars: int = None,
+        max_items: int = None,
+        max_retries: int = None,
+        backoff: float = None,
+        use_cache: bool = True
+    ):
+        """
+        Args:
+            translator_factory: 创建翻译器的函数（每个线程一个实例），默认GoogleTranslator
+            workers: 并发线程数
+            max_chars: 单次请求的字符上限
+            max_items: 单次请求的最大词数
+            max_retries: 单个请求的最大重试次数
+            backoff: 退避基数（秒），第k次重试前等待 backoff * 2**k（带随机抖动）
+            use_cache: 是否读写翻译缓存
+
+        未指定的参数取 TRANSLATION_CONFIG。
+        """
+        self.translator_factory = translator_factory or _google_translator
+        self.workers = workers or TRANSLATION_CONFIG['workers']
+        self.max_chars = max_chars or TRANSLATION_CONFIG['max_chars']
+        self.max_items = max_items or TRANSLATION_CONFIG['max_items']
+        self.max_retries = TRANSLATION_CONFIG['max_retries'] if max_retries is None else max_retries
+        self.backoff = TRANSLATION_CONFIG['backoff_seconds'] if backoff is None else backoff
+        self.cache = get_annotation_cache() if use_cache else None
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+
+    def _translator(self):
+        """当前线程的翻译器实例"""
+        translator = getattr(self._local, 'translator', None)
+        if translator is None:
+            translator = self._local.translator = self.translator_factory()
+        return translator
+
+    def _request(self, batch: List[str]) -> Optional[List[str]]:
+        """发送一个批次，失败按指数退避重试，重试耗尽时返回None"""
+        text = '\n'.join(batch)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self._stats_lock:
+                    self._retries += 1
+                time.sleep(self.backoff * (2 ** (attempt - 1)) * (1 + random.random()))
+            with self._stats_lock:
+                self._requests += 1
+            try:
+                return [line.strip() for line in self._translator().translate(text).split('\n')]
+            except Exception as e:
+                logger.debug(f"翻译请求失败（第{attempt + 1}次，{len(batch)}个词）: {str(e)}")
+        return None
+
+    def _translate_batch(self, batch: List[str]) -> Tuple[Dict[str, str], List[str], List[str]]:
+        """
+        翻译一个批次
+
+        行数对不上（服务合并/拆分了行）时对半拆分重试，直到单个词；
+        请求重试耗尽时整批记为暂不可用（服务不可用时不再放大请求数）。
+
+        Returns:
+            (成功的翻译, 失败的词, 暂不可用的词)
+            - 失败的词：单个词仍然行数不符，与这个词本身有关，写入负缓存
+            - 暂不可用的词：请求异常（网络/限流，不论批次大小），不写入负缓存，下次调用重新请求
+        """
+        lines = self._request(batch)
+        if lines is None:
+            return {}, [], list(batch)
+        if len(lines) == len(batch):
+            return dict(zip(batch, lines)), [], []
+
+        logger.debug(f"翻译结果行数不符: 期望{len(batch)}行，得到{len(lines)}行")
+        if len(batch) == 1:
+            return {}, list(batch), []
+        middle = len(batch) // 2
+        left, left_failed, left_unavailable = self._translate_batch(batch[:middle])
+        right, right_failed, right_unavailable = self._translate_batch(batch[middle:])
+        left.update(right)
+        return left, left_failed + right_failed, left_unavailable + right_unavailable
+
+    def translate(self, words: List[str], save_to_db: bool = False) -> Tuple[Dict[str, str], Dict]:
+        """
+        批量翻译
+
+        Args:
+            words: 英文词汇列表
+            save_to_db: 是否把翻译结果（含缓存命中的）批量upsert到word_segments
+
+        Returns:
+            (translations, stats)
+            - translations: {word: 译文}，失败的词不在结果中
+            - stats: {'total', 'cached', 'negative_cached', 'sent', 'batches',
+                      'requests', 'retries', 'failed', 'unavailable', 'seconds'}
+              failed为与词本身有关的失败（写入负缓存），unavailable为服务暂不可用未翻译的词
+        """
+        start = time.time()
+        unique_words = list(dict.fromkeys(words))
+        translations: Dict[str, str] = {}
+        skipped = set()
+
+        if self.cache is not None:
+            translations, skipped = self.cache.get_translations(unique_words)
+        cached = len(translations)
+        pending = [w for w in unique_words if w not in translations and w not in skipped]
+
+        batches = pack_batches(pending, self.max_chars, self.max_items)
+        fresh: Dict[str, str] = {}
+        failed: List[str] = []
+        unavailable: List[str] = []
+        self._requests = self._retries = 0
+
+        if batches:
+            logger.info(f"翻译: {len(pending)} 个词，{len(batches)} 批，{self.workers} 个线程")
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(self._translate_batch, batch) for batch in batches]
+                for done, future in enumerate(as_completed(futures), 1):
+                    batch_translations, batch_failed, batch_unavailable = future.result()
+                    fresh.update(batch_translations)
+                    failed.extend(batch_failed)
+                    unavailable.extend(batch_unavailable)
+                    # 每批完成后立即写入缓存，中断后已完成的部分不会丢失
+                    if self.cache is not None:
+                        self.cache.put_translations(batch_translations)
+                        self.cache.put_failures('translation', batch_failed)
+                    if done % 10 == 0 or done == len(batches):
+                        logger.info(f"翻译进度: {done}/{len(batches)} 批")
+
+        translations.update(fresh)
+
+        # 缓存命中的也一起写回：调用方要翻译的正是word_segments中缺少翻译的词
+        if save_to_db and translations:
+            from storage.word_segment_repository import WordSegmentRepository
+            with WordSegmentRepository() as ws_repo:
+                inserted, updated = ws_repo.bulk_upsert_translations(translations)
+            logger.info(f"翻译结果已写回word_segments: 新增{inserted}个，更新{updated}个")
+        stats = {
+            'total': len(unique_words),
+            'cached': cached,
+            'negative_cached': len(skipped),
+            'sent': len(pending),
+            'batches': len(batches),
+            'requests': self._requests,
+            'retries': self._retries,
+            'failed': len(failed),
+            'unavailable': len(unavailable),
+            'seconds': round(time.time() - start, 2),
+        }
+        return translations, stats
+
+
 def translate_words_batch(words: List[str],
                           batch_size: int = 100,
-                          delay: float = 0.3) -> Dict[str, str]:
+                          delay: float = 0.3,
+                          use_cache: bool = True,
+                          workers: int = None) -> Dict[str, str]:
     """
-    批量将英文词汇翻译为中文（优化版：真正的批量翻译）
+    批量将英文词汇翻译为中文
 
-    策略：将多个词用换行符连接，一次性翻译，再拆分结果
-    这样大大减少网络请求次数，速度提升10倍以上
+    策略：将多个词用换行符连接，一次性翻译，再拆分结果；
+    各批次由TranslationService并发发送，已缓存的词不再请求
 
     Args:
         words: 英文词汇列表
-        batch_size: 批次大小（默认100个词一批）
-        delay: 批次间延迟（秒，默认0.3秒）
+        batch_size: 批次大小（默认100个词一批，同时受TRANSLATION_CONFIG['max_chars']限制）
+        delay: 失败重试的退避基数（秒，默认0.3秒）
+        use_cache: 是否先查翻译缓存（命中的词不再请求翻译服务，
+            失败的词在负缓存有效期内直接返回原文）
+        workers: 并发线程数（默认TRANSLATION_CONFIG['workers']）
 
     Returns:
-        翻译字典 {英文: 中文}
+        翻译字典 {英文: 中文}（翻译失败的词保留原文）
 
     Example:
         >>> words = ["calculator", "dashboard", "simulator"]
@@ -51,69 +309,28 @@ def translate_words_batch(words: List[str],
         print("提示：运行 pip install deep-translator 安装翻译库")
         return {word: word for word in words}  # 返回原文
 
-    translator = GoogleTranslator(source='en', target='zh-CN')
-    translations = {}
-
-    # 去重
-    unique_words = list(dict.fromkeys(words))  # 保持顺序去重
-    total_batches = (len(unique_words) + batch_size - 1) // batch_size
-
-    print(f"开始翻译 {len(unique_words)} 个词，共 {total_batches} 批...")
-
-    # 分批处理
-    for batch_idx in range(0, len(unique_words), batch_size):
-        batch = unique_words[batch_idx:batch_idx + batch_size]
-        current_batch = batch_idx // batch_size + 1
-
-        try:
-            # 关键优化：将多个词用换行符连接成一个文本
-            # 这样只需要一次网络请求就能翻译整批词
-            text_to_translate = '\n'.join(batch)
-
-            # 一次性翻译整批
-            translated_text = translator.translate(text_to_translate)
+    service = TranslationService(workers=workers, max_items=batch_size, backoff=delay, use_cache=use_cache)
+    translations, stats = service.translate(words)
 
-            # 拆分翻译结果
-            translated_words = translated_text.split('\n')
+    print(f"[OK] 翻译完成！{stats['total']} 个词：缓存命中 {stats['cached']} 个，"
+          f"新翻译 {stats['sent'] - stats['failed'] - stats['unavailable']} 个，"
+          f"失败 {stats['failed'] + stats['negative_cached']} 个，服务暂不可用 {stats['unavailable']} 个"
+          f"（{stats['batches']} 批，{stats['requests']} 次请求，{stats['seconds']}s）")
+    if stats['unavailable']:
+        print(f"[警告] {stats['unavailable']} 个词因网络/限流未翻译（未缓存，下次重新请求）")
 
-            # 建立映射
-            for i, word in enumerate(batch):
-                if i < len(translated_words):
-                    translations[word] = translated_words[i].strip()
-                else:
-                    translations[word] = word  # 如果拆分失败，保留原文
+    # 失败的词保留原文
+    return {word: translations.get(word, word) for word in dict.fromkeys(words)}
 
-            print(f"[OK] 完成第 {current_batch}/{total_batches} 批 ({len(batch)} 个词)")
 
-            # 批次间延迟，避免触发限流
-            if batch_idx + batch_size < len(unique_words):
-                time.sleep(delay)
-
-        except Exception as e:
-            print(f"[警告] 批量翻译失败 (第{current_batch}批): {str(e)}")
-            print("   尝试逐个翻译此批次...")
-
-            # 失败时回退到逐个翻译（仅针对失败的批次）
-            for word in batch:
-                try:
-                    result = translator.translate(word)
-                    translations[word] = result
-                    time.sleep(0.1)  # 逐个翻译时添加短暂延迟
-                except Exception as word_error:
-                    print(f"   [警告] 翻译失败: {word} - {str(word_error)}")
-                    translations[word] = word  # 保留原文
-
-    print(f"[OK] 翻译完成！成功翻译 {len(translations)} 个词")
-    return translations
-
-
-def translate_single_word(word: str, retry: int = 3) -> str:
+def translate_single_word(word: str, retry: int = 3, use_cache: bool = True) -> str:
     """
     翻译单个英文词汇为中文
 
     Args:
         word: 英文词汇
         retry: 重试次数
+        use_cache: 是否先查翻译缓存
 
     Returns:
         中文翻译（失败时返回原文）
@@ -125,14 +342,25 @@ def translate_single_word(word: str, retry: int = 3) -> str:
     if not TRANSLATION_AVAILABLE:
         return word  # 翻译不可用时返回原文
 
+    cache = get_annotation_cache() if use_cache else None
+    if cache is not None:
+        hits, failed = cache.get_translations([word])
+        if word in hits:
+            return hits[word]
+        if word in failed:
+            return word
+
     translator = GoogleTranslator(source='en', target='zh-CN')
 
     for attempt in range(retry):
         try:
             result = translator.translate(word)
+            if cache is not None:
+                cache.put_translations({word: result})
             return result
         except Exception as e:
             if attempt == retry - 1:
+                # 请求异常与词本身无关，不写入负缓存
                 print(f"⚠️  翻译失败 ({retry}次尝试): {word} - {str(e)}")
                 return word  # 失败时返回原文
             time.sleep(0.5)  # 短暂延迟后重试
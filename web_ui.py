@@ -17,7 +17,9 @@ from datetime import datetime
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from storage.repository import PhraseRepository, ClusterMetaRepository, DemandRepository, TokenRepository
+from storage.repository import (
+    PhraseRepository, ClusterMetaRepository, DemandRepository, TokenRepository, StatsSnapshotRepository
+)
 from config.settings import LLM_PROVIDER, DATABASE_CONFIG
 
 
@@ -82,6 +84,12 @@ def get_database_stats():
     try:
         from storage.models import Demand
 
+        # 优先读取统计快照（O(1)），未初始化时回退到实时统计
+        with StatsSnapshotRepository() as snapshot_repo:
+            snapshot_stats = snapshot_repo.get_dashboard_stats()
+        if snapshot_stats is not None:
+            return snapshot_stats
+
         with PhraseRepository() as phrase_repo:
             phrase_stats = phrase_repo.get_statistics()
 